@@ -1,11 +1,25 @@
 import sys
 
 from . import qasm2svg
+from . import qasm2svgz
 from . import qasm2png
 from . import qasm2pdf
 from . import qasm2ps
+from . import qasm2html
+from . import qasm2text
+from . import qasm2layout
+from . import prepared
+from .svg import _layout
 
+setattr(sys.modules[__name__], "qasms2ps", qasm2ps.qasms2ps)
+setattr(sys.modules[__name__], "qasms2pdf", qasm2pdf.qasms2pdf)
 setattr(sys.modules[__name__], "qasm2svg", qasm2svg.qasm2svg)
+setattr(sys.modules[__name__], "qasm2svgz", qasm2svgz.qasm2svgz)
 setattr(sys.modules[__name__], "qasm2png", qasm2png.qasm2png)
 setattr(sys.modules[__name__], "qasm2ps",  qasm2ps.qasm2ps)
 setattr(sys.modules[__name__], "qasm2pdf", qasm2pdf.qasm2pdf)
+setattr(sys.modules[__name__], "qasm2html", qasm2html.qasm2html)
+setattr(sys.modules[__name__], "qasm2text", qasm2text.qasm2text)
+setattr(sys.modules[__name__], "qasm2layout", qasm2layout.qasm2layout)
+setattr(sys.modules[__name__], "prepare", prepared.prepare)
+setattr(sys.modules[__name__], "register_gate", _layout.register_gate)
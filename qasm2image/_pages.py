@@ -0,0 +1,145 @@
+# ======================================================================
+# Copyright CERFACS (October 2018)
+# Contributor: Adrien Suau (suau@cerfacs.fr)
+#
+# This software is governed by the CeCILL-B license under French law and
+# abiding  by the  rules of  distribution of free software. You can use,
+# modify  and/or  redistribute  the  software  under  the  terms  of the
+# CeCILL-B license as circulated by CEA, CNRS and INRIA at the following
+# URL "http://www.cecill.info".
+#
+# As a counterpart to the access to  the source code and rights to copy,
+# modify and  redistribute granted  by the  license, users  are provided
+# only with a limited warranty and  the software's author, the holder of
+# the economic rights,  and the  successive licensors  have only limited
+# liability.
+#
+# In this respect, the user's attention is drawn to the risks associated
+# with loading,  using, modifying and/or  developing or reproducing  the
+# software by the user in light of its specific status of free software,
+# that  may mean  that it  is complicated  to manipulate,  and that also
+# therefore  means that  it is reserved for  developers and  experienced
+# professionals having in-depth  computer knowledge. Users are therefore
+# encouraged  to load and  test  the software's  suitability as  regards
+# their  requirements  in  conditions  enabling  the  security  of their
+# systems  and/or  data to be  ensured and,  more generally,  to use and
+# operate it in the same conditions as regards security.
+#
+# The fact that you  are presently reading this  means that you have had
+# knowledge of the CeCILL-B license and that you accept its terms.
+# ======================================================================
+
+
+"""Draw several SVG images as the pages of a single PDF or PostScript file.
+
+The svg2pdf and svg2ps functions of cairosvg create a new cairo surface, and
+so a new document, for each image. Here all the images are drawn on the
+successive pages of the same cairo surface: the fonts and other resources are
+embedded once in the document, and each page is written to the output as
+soon as it is drawn.
+"""
+
+import io
+from typing import BinaryIO, Iterable, Iterator, Optional, Union
+
+import cairocffi
+from cairosvg.parser import Tree
+from cairosvg.surface import PDFSurface, PSSurface
+
+from qasm2image import _parsing
+from qasm2image.svg import _drawing, _layout
+
+
+class _PageMixin:
+    """Draw a cairosvg surface on the current page of a cairo surface."""
+
+    def __init__(self, tree: Tree, document: cairocffi.Surface,
+                 scale: float = 1.0, dpi: float = 96) -> None:
+        # Set before drawing, see _create_surface.
+        self.document = document
+        super().__init__(tree, None, dpi, scale=scale)
+
+    def _create_surface(self, width: float, height: float):
+        # The size of a page can be changed until something is drawn on it.
+        self.document.set_size(width, height)
+        return self.document, width, height
+
+
+class _PDFPage(_PageMixin, PDFSurface):
+    """A page of a PDF document."""
+
+
+class _PSPage(_PageMixin, PSSurface):
+    """A page of a PostScript document."""
+
+
+_DOCUMENT_CLASSES = {'pdf': (cairocffi.PDFSurface, _PDFPage),
+                     'ps': (cairocffi.PSSurface, _PSPage)}
+
+
+def svgs2document(svgs: Iterable[str], output_format: str = 'pdf',
+                  scale: float = 1.0,
+                  write_to: Union[str, BinaryIO] = None) -> Optional[bytes]:
+    """Draw SVG images as the pages of a single document.
+
+    Args:
+        svgs          (Iterable[str]): The SVG images, one per page. They are
+                                       consumed lazily, each page is drawn as
+                                       soon as its image is available.
+        output_format (str)  : 'pdf' or 'ps'.
+        scale         (float): The scaling imposed to the pages.
+        write_to      (str or file): If given, the document is written to
+                               this path or writable binary stream instead of
+                               being returned.
+    Returns:
+        bytes: The document, or None if write_to is given.
+    """
+    document_class, page_class = _DOCUMENT_CLASSES[output_format]
+    output = io.BytesIO() if write_to is None else write_to
+    # The real size of each page is set before drawing it.
+    document = document_class(output, 1, 1)
+    try:
+        for svg in svgs:
+            page_class(Tree(bytestring=svg.encode('utf-8')), document, scale)
+            document.show_page()
+    finally:
+        document.finish()
+    if write_to is None:
+        return output.getvalue()
+    return None
+
+
+def qasm2svg_pages(qasm_str: str, basis: str, show_clbits: bool,
+                   columns_per_page: int = None,
+                   collapse_repeats: bool = False, vectorize: bool = False,
+                   processes: int = 1) -> Iterator[str]:
+    """Draw a QASM code as SVG pages.
+
+    Args:
+        qasm_str    (str) : The QASM quantum circuit to draw.
+        basis       (str) : The gate basis used to represent the circuit as a
+                            comma-separated string of names.
+        show_clbits (bool): Flag that control the drawing of classical bit
+                            lines.
+        columns_per_page (int): Maximum number of columns on a page. If None,
+                            the circuit is drawn on a single page.
+        collapse_repeats (bool): If True, the blocks of instructions repeated
+                            consecutively are drawn once, see
+                            _layout.layout_json_circuit.
+        vectorize   (bool): If True, the layout is computed with NumPy, see
+                            _layout.layout_json_circuit.
+        processes   (int) : Number of processes computing the layout, see
+                            _layout.layout_json_circuit.
+    Returns:
+        Iterator[str]: The SVG images of the pages, drawn lazily.
+    """
+    json_circuit = _parsing.qasm2json(qasm_str, basis)
+    layout = _layout.layout_json_circuit(json_circuit, show_clbits,
+                                         vectorize=vectorize,
+                                         processes=processes,
+                                         collapse_repeats=collapse_repeats)
+    if columns_per_page is None:
+        yield _drawing.draw_layout(layout)[0]
+        return
+    for svg, _ in _drawing.draw_layout_pages(layout, columns_per_page):
+        yield svg
@@ -0,0 +1,191 @@
+# ======================================================================
+# Copyright CERFACS (October 2018)
+# Contributor: Adrien Suau (suau@cerfacs.fr)
+#
+# This software is governed by the CeCILL-B license under French law and
+# abiding  by the  rules of  distribution of free software. You can use,
+# modify  and/or  redistribute  the  software  under  the  terms  of the
+# CeCILL-B license as circulated by CEA, CNRS and INRIA at the following
+# URL "http://www.cecill.info".
+#
+# As a counterpart to the access to  the source code and rights to copy,
+# modify and  redistribute granted  by the  license, users  are provided
+# only with a limited warranty and  the software's author, the holder of
+# the economic rights,  and the  successive licensors  have only limited
+# liability.
+#
+# In this respect, the user's attention is drawn to the risks associated
+# with loading,  using, modifying and/or  developing or reproducing  the
+# software by the user in light of its specific status of free software,
+# that  may mean  that it  is complicated  to manipulate,  and that also
+# therefore  means that  it is reserved for  developers and  experienced
+# professionals having in-depth  computer knowledge. Users are therefore
+# encouraged  to load and  test  the software's  suitability as  regards
+# their  requirements  in  conditions  enabling  the  security  of their
+# systems  and/or  data to be  ensured and,  more generally,  to use and
+# operate it in the same conditions as regards security.
+#
+# The fact that you  are presently reading this  means that you have had
+# knowledge of the CeCILL-B license and that you accept its terms.
+# ======================================================================
+
+"""This module transforms QASM code into the JSON circuit used for drawing.
+
+It also splits QASM code into statements, which lets the incremental renderer
+(see qasm2image.incremental) re-parse only the statements that changed.
+"""
+
+import os
+import re
+from typing import List, Optional, Tuple
+
+import qiskit
+
+# Keywords starting the statements that declare something instead of applying
+# an instruction. These statements form the header of a program.
+_HEADER_KEYWORDS = ('OPENQASM', 'include', 'gate', 'opaque', 'qreg', 'creg')
+# Types of the AST nodes produced by the statements applying an instruction.
+_INSTRUCTION_NODE_TYPES = ('universal_unitary', 'cnot', 'custom_unitary',
+                           'barrier', 'reset', 'measure', 'if')
+# Tokens relevant to find the end of the statements: strings, comments,
+# braces and semicolons. The other characters are matched by chunks.
+_STATEMENT_TOKEN = re.compile(r'"[^"]*"|//[^\n]*|[{};]|[^"/{};]+|/')
+_INCLUDE_STATEMENT = re.compile(r'include\s*"([^"]*)"')
+# Directory of the include files provided by QISKit, like qelib1.inc.
+_CORE_LIBS_PATH = os.path.join(os.path.dirname(qiskit.qasm.__file__), 'libs')
+
+
+def qasm2json(qasm_str: str, basis: str) -> dict:
+    """Parse and unroll a QASM code to the QISKit JSON circuit format.
+
+    Args:
+        qasm_str (str): The QASM quantum circuit.
+        basis    (str): The gate basis used to represent the circuit as a
+                        comma-separated string of names.
+    Returns:
+        dict: The JSON representation of the circuit, as computed by
+              qiskit.unroll.JsonBackend.
+    """
+    # Uncompile the QASM code to recover the gates to draw.
+    ast = qiskit.qasm.Qasm(data=qasm_str).parse()
+    unroller = qiskit.unroll.Unroller(ast, qiskit.unroll.JsonBackend(
+        basis.split(',')))
+    unroller.execute()
+    return unroller.backend.circuit
+
+
+def qasm2json_statements(qasm_str: str, basis: str) -> Tuple[dict, List[int]]:
+    """Parse and unroll a QASM code, keeping track of the statements.
+
+    Args:
+        qasm_str (str): The QASM quantum circuit.
+        basis    (str): The gate basis used to represent the circuit as a
+                        comma-separated string of names.
+    Returns:
+        Tuple[dict, List[int]]: The JSON representation of the circuit, see
+            qasm2json, and the number of instructions in the circuit after
+            each statement applying an instruction (i.e. each statement that
+            is not a header statement, see is_header_statement).
+    """
+    ast = qiskit.qasm.Qasm(data=qasm_str).parse()
+    unroller = qiskit.unroll.Unroller(ast, qiskit.unroll.JsonBackend(
+        basis.split(',')))
+    instructions = unroller.backend.circuit['instructions']
+    statement_ends = list()
+    # The statements are unrolled one by one, as Unroller.execute does, to
+    # know the instructions produced by each of them.
+    for node in ast.children:
+        unroller._process_node(node)  # pylint: disable=protected-access
+        if node.type in _INSTRUCTION_NODE_TYPES:
+            statement_ends.append(len(instructions))
+    return unroller.backend.circuit, statement_ends
+
+
+def split_statements(qasm_str: str) -> List[str]:
+    """Split a QASM code into its statements.
+
+    The comments are removed. A gate definition is one statement, from the
+    'gate' keyword to the closing brace.
+
+    Args:
+        qasm_str (str): The QASM code.
+    Returns:
+        List[str]: The statements of the code, without the surrounding
+                   whitespaces.
+    """
+    statements, current, depth = list(), list(), 0
+    for match in _STATEMENT_TOKEN.finditer(qasm_str):
+        token = match.group()
+        if token.startswith('//'):
+            continue
+        current.append(token)
+        if token == '{':
+            depth += 1
+        elif token == '}':
+            depth -= 1
+        if (token == ';' and depth == 0) or (token == '}' and depth == 0):
+            statements.append("".join(current).strip())
+            current = list()
+    # Keep an unterminated statement so that the parser reports the error.
+    last_statement = "".join(current).strip()
+    if last_statement:
+        statements.append(last_statement)
+    return statements
+
+
+def is_header_statement(statement: str) -> bool:
+    """Check if a statement declares something instead of applying an instruction.
+
+    Args:
+        statement (str): A statement returned by split_statements.
+    Returns:
+        bool: True for the version, include, gate, opaque, qreg and creg
+              statements, False otherwise.
+    """
+    keyword = statement.split(None, 1)[0] if statement else ''
+    return keyword.split('(', 1)[0] in _HEADER_KEYWORDS
+
+
+def get_include_path(statement: str) -> Optional[str]:
+    """Compute the path of the file included by a statement.
+
+    The path is resolved as QISKit does: the files provided by QISKit (like
+    qelib1.inc) are taken from the QISKit installation, the other ones are
+    relative to the current directory.
+
+    Args:
+        statement (str): A statement returned by split_statements.
+    Returns:
+        Optional[str]: The path of the included file, or None if the
+                       statement is not an include statement.
+    """
+    match = _INCLUDE_STATEMENT.match(statement)
+    if match is None:
+        return None
+    core_path = os.path.join(_CORE_LIBS_PATH, match.group(1))
+    return core_path if os.path.exists(core_path) else match.group(1)
+
+
+def get_included_files(qasm_str: str) -> List[str]:
+    """List the files included, directly or not, by a QASM code.
+
+    Args:
+        qasm_str (str): The QASM code.
+    Returns:
+        List[str]: The paths of the included files, see get_include_path. The
+                   files that cannot be read are listed but not searched for
+                   nested includes.
+    """
+    included_files, pending = list(), [qasm_str]
+    while pending:
+        for statement in split_statements(pending.pop()):
+            path = get_include_path(statement)
+            if path is None or path in included_files:
+                continue
+            included_files.append(path)
+            try:
+                with open(path, 'r') as included_file:
+                    pending.append(included_file.read())
+            except OSError:
+                pass
+    return included_files
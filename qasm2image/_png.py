@@ -0,0 +1,287 @@
+# ======================================================================
+# Copyright CERFACS (October 2018)
+# Contributor: Adrien Suau (suau@cerfacs.fr)
+#
+# This software is governed by the CeCILL-B license under French law and
+# abiding  by the  rules of  distribution of free software. You can use,
+# modify  and/or  redistribute  the  software  under  the  terms  of the
+# CeCILL-B license as circulated by CEA, CNRS and INRIA at the following
+# URL "http://www.cecill.info".
+#
+# As a counterpart to the access to  the source code and rights to copy,
+# modify and  redistribute granted  by the  license, users  are provided
+# only with a limited warranty and  the software's author, the holder of
+# the economic rights,  and the  successive licensors  have only limited
+# liability.
+#
+# In this respect, the user's attention is drawn to the risks associated
+# with loading,  using, modifying and/or  developing or reproducing  the
+# software by the user in light of its specific status of free software,
+# that  may mean  that it  is complicated  to manipulate,  and that also
+# therefore  means that  it is reserved for  developers and  experienced
+# professionals having in-depth  computer knowledge. Users are therefore
+# encouraged  to load and  test  the software's  suitability as  regards
+# their  requirements  in  conditions  enabling  the  security  of their
+# systems  and/or  data to be  ensured and,  more generally,  to use and
+# operate it in the same conditions as regards security.
+#
+# The fact that you  are presently reading this  means that you have had
+# knowledge of the CeCILL-B license and that you accept its terms.
+# ======================================================================
+
+
+"""Encode the images drawn by cairo in compact PNG files.
+
+cairo only writes 32-bit RGBA PNG files, with the default zlib compression.
+Circuits are drawn in black and white, so they can be stored with far less
+bits per pixel: this module reads the ARGB pixels of a cairo image surface
+and writes them as RGBA, RGB, 8-bit grayscale, 1-bit black and white or
+palette PNG files, with a chosen zlib compression level.
+
+The conversions work on whole rows with bytes slicing and translation
+tables, so that their cost stays small compared to the drawing.
+"""
+
+import io
+import struct
+import sys
+import zlib
+from typing import BinaryIO, Dict, List, Optional, Union
+
+from cairosvg.parser import Tree
+from cairosvg.surface import PNGSurface
+
+from qasm2image import _trees
+
+COLOR_MODES = ('rgba', 'rgb', 'gray', 'bilevel', 'palette')
+
+_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+_COLOR_TYPES = {'gray': 0, 'bilevel': 0, 'rgb': 2, 'palette': 3, 'rgba': 6}
+_METERS_PER_INCH = 0.0254
+_NO_FILTER, _UP_FILTER = b'\x00', b'\x02'
+# Index of the blue, green, red and alpha bytes in a cairo ARGB32 pixel,
+# stored as a native-endian 32-bit integer.
+if sys.byteorder == 'little':
+    _BLUE, _GREEN, _RED, _ALPHA = 0, 1, 2, 3
+else:
+    _BLUE, _GREEN, _RED, _ALPHA = 3, 2, 1, 0
+# Map a gray level to the ASCII digit of its 1-bit value.
+_BILEVEL_DIGITS = bytes(b'0'[0] if level < 128 else b'1'[0]
+                        for level in range(256))
+# Digits used to write the palette indices in base 2, 4 and 16.
+_INDEX_DIGITS = b'0123456789abcdef'
+
+
+def _write_chunk(output: BinaryIO, chunk_type: bytes, data: bytes) -> None:
+    output.write(struct.pack('>I', len(data)))
+    output.write(chunk_type)
+    output.write(data)
+    output.write(struct.pack('>I', zlib.crc32(data, zlib.crc32(chunk_type))))
+
+
+def _unpremultiply(row: bytes) -> bytearray:
+    """Convert a row of premultiplied ARGB32 pixels to straight RGBA."""
+    rgba = bytearray(len(row))
+    rgba[0::4] = row[_RED::4]
+    rgba[1::4] = row[_GREEN::4]
+    rgba[2::4] = row[_BLUE::4]
+    alphas = row[_ALPHA::4]
+    rgba[3::4] = alphas
+    # Only the partially transparent pixels need a division.
+    if alphas.translate(None, b'\x00\xff'):
+        for pixel, alpha in enumerate(alphas):
+            if 0 < alpha < 255:
+                for channel in range(4 * pixel, 4 * pixel + 3):
+                    rgba[channel] = (rgba[channel] * 255 + alpha // 2) // alpha
+    return rgba
+
+
+def _rgb(row: bytes) -> bytes:
+    """Convert a row of opaque ARGB32 pixels to RGB."""
+    rgb = bytearray(3 * (len(row) // 4))
+    rgb[0::3] = row[_RED::4]
+    rgb[1::3] = row[_GREEN::4]
+    rgb[2::3] = row[_BLUE::4]
+    return bytes(rgb)
+
+
+def _gray(row: bytes) -> bytes:
+    """Convert a row of opaque ARGB32 pixels to 8-bit gray levels."""
+    reds, greens, blues = row[_RED::4], row[_GREEN::4], row[_BLUE::4]
+    if reds == greens == blues:
+        return greens
+    # ITU-R BT.601 luma, as used by most image tools.
+    return bytes((299 * red + 587 * green + 114 * blue + 500) // 1000
+                 for red, green, blue in zip(reds, greens, blues))
+
+
+def _pack(digits: bytes, base: int, row_bytes: int) -> bytes:
+    """Pack a row of 1, 2 or 4-bit values written as ASCII digits."""
+    digits_per_byte = {2: 8, 4: 4, 16: 2}[base]
+    padded = digits.ljust(row_bytes * digits_per_byte, b'0')
+    return int(padded, base).to_bytes(row_bytes, 'big')
+
+
+def _build_palette(rows: List[bytes]) -> Dict[bytes, int]:
+    """Map each RGB colour of the rows to its index in the palette.
+
+    Raises:
+        ValueError: if the image has more than 256 colours.
+    """
+    palette = dict()
+    for row in rows:
+        if _is_gray(row):
+            # Avoid a loop over the pixels for the usual gray rows.
+            colours = (bytes((level,) * 3) for level in sorted(set(row[::3])))
+        else:
+            colours = (row[start:start + 3] for start in range(0, len(row), 3))
+        for colour in colours:
+            if colour not in palette:
+                if len(palette) == 256:
+                    raise ValueError("The image has more than 256 colours "
+                                     "and cannot be written with a palette.")
+                palette[colour] = len(palette)
+    return palette
+
+
+def _is_gray(rgb_row: bytes) -> bool:
+    return rgb_row[0::3] == rgb_row[1::3] == rgb_row[2::3]
+
+
+def _index(rgb_row: bytes, palette: Dict[bytes, int],
+           gray_indices: bytes) -> bytes:
+    """Convert a row of RGB pixels to palette indices."""
+    if _is_gray(rgb_row):
+        return rgb_row[0::3].translate(gray_indices)
+    return bytes(palette[rgb_row[start:start + 3]]
+                 for start in range(0, len(rgb_row), 3))
+
+
+def argb2png(data: bytes, width: int, height: int, stride: int,
+             color_mode: str = 'rgba', compresslevel: int = 6,
+             dpi: float = None,
+             write_to: Union[str, BinaryIO] = None) -> Optional[bytes]:
+    """Encode the pixels of a cairo ARGB32 image surface as a PNG file.
+
+    Args:
+        data       (bytes): The pixels, as returned by ImageSurface.get_data.
+        width        (int): The width of the image, in pixels.
+        height       (int): The height of the image, in pixels.
+        stride       (int): The number of bytes of a row in data.
+        color_mode   (str): One of COLOR_MODES. Only 'rgba' keeps the
+                            transparency, the other modes expect opaque
+                            pixels. 'palette' fails on images with more than
+                            256 colours and 'bilevel' turns each pixel to
+                            black or white.
+        compresslevel (int): The zlib compression level, from 0 (none) to 9
+                            (smallest).
+        dpi        (float): If given, the resolution stored in the file.
+        write_to (str or file): If given, the PNG is written to this path or
+                            writable binary stream instead of being returned.
+    Returns:
+        bytes: The PNG file, or None if write_to is given.
+    Raises:
+        ValueError: if the colour mode is unknown or if the image cannot be
+                    written with a palette.
+    """
+    if color_mode not in _COLOR_TYPES:
+        raise ValueError("Unknown colour mode '{}', expected one of {}."
+                         .format(color_mode, ', '.join(COLOR_MODES)))
+    if isinstance(write_to, str):
+        with open(write_to, 'wb') as output_file:
+            argb2png(data, width, height, stride, color_mode, compresslevel,
+                     dpi, output_file)
+        return None
+
+    data = memoryview(data).cast('B')
+    argb_rows = (data[row * stride:row * stride + 4 * width].tobytes()
+                 for row in range(height))
+    bit_depth, palette = 8, None
+    if color_mode == 'rgba':
+        rows = map(_unpremultiply, argb_rows)
+    elif color_mode == 'rgb':
+        rows = map(_rgb, argb_rows)
+    elif color_mode == 'gray':
+        rows = map(_gray, argb_rows)
+    elif color_mode == 'bilevel':
+        bit_depth, row_bytes = 1, (width + 7) // 8
+        rows = (_pack(gray.translate(_BILEVEL_DIGITS), 2, row_bytes)
+                for gray in map(_gray, argb_rows))
+    else:
+        # The palette is only known once all the rows have been read.
+        rgb_rows = list(map(_rgb, argb_rows))
+        palette = _build_palette(rgb_rows)
+        bit_depth = next(depth for depth in (1, 2, 4, 8)
+                         if len(palette) <= 1 << depth)
+        gray_indices = bytes(palette.get(bytes((level,) * 3), 0)
+                             for level in range(256))
+        rows = (_index(row, palette, gray_indices) for row in rgb_rows)
+        if bit_depth < 8:
+            base, row_bytes = 1 << bit_depth, (width * bit_depth + 7) // 8
+            digits = bytes(_INDEX_DIGITS[index % base] for index in range(256))
+            rows = (_pack(row.translate(digits), base, row_bytes)
+                    for row in rows)
+
+    output = write_to if write_to is not None else io.BytesIO()
+    output.write(_SIGNATURE)
+    _write_chunk(output, b'IHDR', struct.pack('>IIBBBBB', width, height,
+                                              bit_depth,
+                                              _COLOR_TYPES[color_mode],
+                                              0, 0, 0))
+    if palette is not None:
+        _write_chunk(output, b'PLTE', b''.join(palette))
+    if dpi is not None:
+        pixels_per_meter = int(round(dpi / _METERS_PER_INCH))
+        _write_chunk(output, b'pHYs', struct.pack('>IIB', pixels_per_meter,
+                                                  pixels_per_meter, 1))
+    # Each row is preceded by its filter type. The rows of a circuit are
+    # mostly made of long runs that zlib compresses well without filtering,
+    # and of rows identical to the previous one, which the "Up" filter turns
+    # into zeros.
+    compressor = zlib.compressobj(compresslevel)
+    compressed, previous_row = list(), None
+    for row in rows:
+        if row == previous_row:
+            compressed.append(compressor.compress(_UP_FILTER + bytes(len(row))))
+        else:
+            compressed.append(compressor.compress(_NO_FILTER + row))
+        previous_row = row
+    compressed.append(compressor.flush())
+    _write_chunk(output, b'IDAT', b''.join(compressed))
+    _write_chunk(output, b'IEND', b'')
+    if write_to is None:
+        return output.getvalue()
+    return None
+
+
+def tree2png(tree: Tree, scale: float = 1.0, color_mode: str = 'rgba',
+             compresslevel: int = 6, background: str = None,
+             dpi: float = None,
+             write_to: Union[str, BinaryIO] = None) -> Optional[bytes]:
+    """Draw a parsed SVG image with cairo and encode it with argb2png.
+
+    Args:
+        tree        (Tree): The SVG image, parsed by cairosvg.
+        scale      (float): The scaling imposed to the image.
+        color_mode   (str): See argb2png.
+        compresslevel (int): See argb2png.
+        background   (str): If given, the colour, in any SVG syntax, painted
+                            below the image. The modes other than 'rgba'
+                            need an opaque image, their default background
+                            is white. Needs cairosvg 2.2 or later.
+        dpi        (float): See argb2png.
+        write_to (str or file): See argb2png.
+    Returns:
+        bytes: See argb2png.
+    """
+    if background is None and color_mode != 'rgba':
+        background = 'white'
+    surface = PNGSurface(tree, None, _trees.SVG_DPI, scale=scale,
+                         **_trees.get_background_argument(background))
+    image = surface.cairo
+    image.flush()
+    png_bytes = argb2png(image.get_data(), image.get_width(),
+                         image.get_height(), image.get_stride(), color_mode,
+                         compresslevel, dpi, write_to)
+    surface.finish()
+    return png_bytes
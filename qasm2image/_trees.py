@@ -0,0 +1,94 @@
+# ======================================================================
+# Copyright CERFACS (October 2018)
+# Contributor: Adrien Suau (suau@cerfacs.fr)
+#
+# This software is governed by the CeCILL-B license under French law and
+# abiding  by the  rules of  distribution of free software. You can use,
+# modify  and/or  redistribute  the  software  under  the  terms  of the
+# CeCILL-B license as circulated by CEA, CNRS and INRIA at the following
+# URL "http://www.cecill.info".
+#
+# As a counterpart to the access to  the source code and rights to copy,
+# modify and  redistribute granted  by the  license, users  are provided
+# only with a limited warranty and  the software's author, the holder of
+# the economic rights,  and the  successive licensors  have only limited
+# liability.
+#
+# In this respect, the user's attention is drawn to the risks associated
+# with loading,  using, modifying and/or  developing or reproducing  the
+# software by the user in light of its specific status of free software,
+# that  may mean  that it  is complicated  to manipulate,  and that also
+# therefore  means that  it is reserved for  developers and  experienced
+# professionals having in-depth  computer knowledge. Users are therefore
+# encouraged  to load and  test  the software's  suitability as  regards
+# their  requirements  in  conditions  enabling  the  security  of their
+# systems  and/or  data to be  ensured and,  more generally,  to use and
+# operate it in the same conditions as regards security.
+#
+# The fact that you  are presently reading this  means that you have had
+# knowledge of the CeCILL-B license and that you accept its terms.
+# ======================================================================
+
+
+"""Render SVG images parsed once by cairosvg.
+
+cairosvg parses the SVG bytes again in each call of its svg2* functions. The
+functions of this module draw an already parsed cairosvg Tree instead, so
+that the same image can be drawn several times, at several scales or in
+several formats, for the cost of a single parse.
+"""
+
+import io
+from typing import BinaryIO, Optional, Type, Union
+
+from cairosvg.parser import Tree
+from cairosvg.surface import Surface
+
+# The resolution of an SVG pixel, as defined by CSS.
+SVG_DPI = 96
+
+
+def parse(svg: Union[str, Tree]) -> Tree:
+    """Parse an SVG image, or return it unchanged if it is already parsed."""
+    if isinstance(svg, Tree):
+        return svg
+    return Tree(bytestring=svg.encode('utf-8'))
+
+
+def get_background_argument(background: str = None) -> dict:
+    """Keyword arguments of a cairosvg surface painting the background.
+
+    The background_color argument only exists since cairosvg 2.2, so it is
+    only given when a background is requested: the renders without
+    background keep working with older versions.
+    """
+    if background is None:
+        return dict()
+    return {'background_color': background}
+
+
+def render(surface_class: Type[Surface], tree: Tree, scale: float = 1.0,
+           write_to: Union[str, BinaryIO] = None,
+           background: str = None) -> Optional[bytes]:
+    """Draw a parsed SVG image on a cairosvg surface, as cairosvg.svg2* do.
+
+    Args:
+        surface_class (type): The cairosvg surface class, for example
+                              cairosvg.surface.PDFSurface.
+        tree          (Tree): The parsed SVG image.
+        scale        (float): The scaling imposed to the image.
+        write_to (str or file): If given, the output is written to this path
+                              or writable binary stream instead of being
+                              returned.
+        background     (str): If given, the colour painted below the image.
+                              Needs cairosvg 2.2 or later.
+    Returns:
+        bytes: The output, or None if write_to is given.
+    """
+    output = io.BytesIO() if write_to is None else write_to
+    surface = surface_class(tree, output, SVG_DPI, scale=scale,
+                            **get_background_argument(background))
+    surface.finish()
+    if write_to is None:
+        return output.getvalue()
+    return None
@@ -0,0 +1,245 @@
+# ======================================================================
+# Copyright CERFACS (October 2018)
+# Contributor: Adrien Suau (suau@cerfacs.fr)
+#
+# This software is governed by the CeCILL-B license under French law and
+# abiding  by the  rules of  distribution of free software. You can use,
+# modify  and/or  redistribute  the  software  under  the  terms  of the
+# CeCILL-B license as circulated by CEA, CNRS and INRIA at the following
+# URL "http://www.cecill.info".
+#
+# As a counterpart to the access to  the source code and rights to copy,
+# modify and  redistribute granted  by the  license, users  are provided
+# only with a limited warranty and  the software's author, the holder of
+# the economic rights,  and the  successive licensors  have only limited
+# liability.
+#
+# In this respect, the user's attention is drawn to the risks associated
+# with loading,  using, modifying and/or  developing or reproducing  the
+# software by the user in light of its specific status of free software,
+# that  may mean  that it  is complicated  to manipulate,  and that also
+# therefore  means that  it is reserved for  developers and  experienced
+# professionals having in-depth  computer knowledge. Users are therefore
+# encouraged  to load and  test  the software's  suitability as  regards
+# their  requirements  in  conditions  enabling  the  security  of their
+# systems  and/or  data to be  ensured and,  more generally,  to use and
+# operate it in the same conditions as regards security.
+#
+# The fact that you  are presently reading this  means that you have had
+# knowledge of the CeCILL-B license and that you accept its terms.
+# ======================================================================
+
+"""This module provide asyncio counterparts of the qasm2* functions.
+
+The qasm2* functions are blocking: parsing, layout and rasterisation with
+cairo can take seconds for large circuits. The coroutines of this module run
+them in an executor (a thread pool by default, see configure) so that an
+event loop can keep many renders in flight:
+
+    svg_str = await render_svg(qasm_str)
+    png_bytes = await render_png(qasm_str, scale=2.0, timeout=10)
+
+The number of renders executed at the same time is limited (see configure).
+The timeout includes the time waited for a concurrency slot. A render that
+exceeds its timeout or whose task is cancelled is removed from the executor
+queue if it did not start yet. A render already running in a worker cannot be
+interrupted: its result is discarded, and it keeps its concurrency slot until
+it finishes so that the limit always holds.
+"""
+
+import asyncio
+import concurrent.futures
+import os
+import weakref
+
+from qasm2image.qasm2html import qasm2html
+from qasm2image.qasm2pdf import qasm2pdf
+from qasm2image.qasm2png import qasm2png
+from qasm2image.qasm2ps import qasm2ps
+from qasm2image.qasm2svg import qasm2svg
+from qasm2image.qasm2svgz import qasm2svgz
+
+_DEFAULT_BASIS = ('id,u0,u1,u2,u3,x,y,z,h,s,sdg,t,tdg,rx,ry,rz,'
+                  'cx,cy,cz,ch,crz,cu1,cu3,swap,ccx')
+
+_EXECUTOR = None
+_MAX_CONCURRENCY = os.cpu_count() or 1
+# The asyncio.Semaphore limiting the concurrency, one per event loop.
+_LIMITERS = weakref.WeakKeyDictionary()
+
+
+def configure(executor: concurrent.futures.Executor = None,
+              max_concurrency: int = None) -> None:
+    """Configure the executor and the concurrency used by the coroutines.
+
+    Args:
+        executor        (Executor): The executor running the renders. It can
+                                    be a ThreadPoolExecutor or, to render in
+                                    parallel on several cores, a
+                                    ProcessPoolExecutor. By default, a
+                                    ThreadPoolExecutor is created on first use.
+        max_concurrency (int)     : Maximum number of renders submitted to the
+                                    executor at the same time. Default to the
+                                    number of processors.
+    """
+    global _EXECUTOR, _MAX_CONCURRENCY  # pylint: disable=global-statement
+    if executor is not None:
+        _EXECUTOR = executor
+    if max_concurrency is not None:
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency should be a positive integer.")
+        _MAX_CONCURRENCY = max_concurrency
+        _LIMITERS.clear()
+
+
+def _get_executor() -> concurrent.futures.Executor:
+    global _EXECUTOR  # pylint: disable=global-statement
+    if _EXECUTOR is None:
+        _EXECUTOR = concurrent.futures.ThreadPoolExecutor(
+            max_workers=_MAX_CONCURRENCY)
+    return _EXECUTOR
+
+
+def _get_limiter(loop: asyncio.AbstractEventLoop) -> asyncio.Semaphore:
+    limiter = _LIMITERS.get(loop, None)
+    if limiter is None:
+        limiter = asyncio.Semaphore(_MAX_CONCURRENCY)
+        _LIMITERS[loop] = limiter
+    return limiter
+
+
+async def _run(function, *args, timeout: float = None,
+               executor: concurrent.futures.Executor = None, **kwargs):
+    """Run function(*args, **kwargs) in the executor, without blocking.
+
+    Args:
+        function (callable): The blocking function to call. It should be
+                             picklable, as well as its arguments, if executor
+                             is a ProcessPoolExecutor.
+        timeout  (float)   : Maximum time (in seconds) waited for the result,
+                             including the time waited for a concurrency
+                             slot. None to wait without limit.
+        executor (Executor): The executor to use instead of the configured
+                             one.
+    Returns:
+        The value returned by the function.
+    Raises:
+        asyncio.TimeoutError: if the render did not end before the timeout.
+    """
+    loop = asyncio.get_event_loop()
+    limiter = _get_limiter(loop)
+
+    def _release(_):
+        # Called from the worker thread when the render ends, or directly when
+        # a pending render is cancelled.
+        try:
+            loop.call_soon_threadsafe(limiter.release)
+        except RuntimeError:
+            # The event loop has been closed, nobody is waiting for the slot.
+            pass
+
+    async def _acquire_and_submit():
+        # A cancellation while waiting for the slot is handled by the
+        # semaphore. Once the slot is acquired, nothing is awaited until the
+        # concurrent future releasing it exists.
+        await limiter.acquire()
+        try:
+            future = (executor or _get_executor()).submit(function, *args,
+                                                          **kwargs)
+        except BaseException:
+            limiter.release()
+            raise
+        future.add_done_callback(_release)
+        # Cancelling the asyncio future (timeout or task cancellation)
+        # cancels the concurrent future if it did not start yet.
+        return await asyncio.wrap_future(future, loop=loop)
+
+    return await asyncio.wait_for(_acquire_and_submit(), timeout)
+
+
+async def render_svg(qasm_str: str, basis: str = _DEFAULT_BASIS,
+                     show_clbits: bool = True, timeout: float = None,
+                     executor: concurrent.futures.Executor = None,
+                     **kwargs) -> str:
+    """Asynchronous version of qasm2svg.
+
+    See qasm2svg for the description of the parameters, the other keyword
+    arguments are passed to it. See _run for the description of timeout and
+    executor.
+    """
+    return await _run(qasm2svg, qasm_str, basis, show_clbits,
+                      timeout=timeout, executor=executor, **kwargs)
+
+
+async def render_svgz(qasm_str: str, basis: str = _DEFAULT_BASIS,
+                      show_clbits: bool = True, timeout: float = None,
+                      executor: concurrent.futures.Executor = None,
+                      **kwargs) -> bytes:
+    """Asynchronous version of qasm2svgz.
+
+    See qasm2svgz for the description of the parameters, the other keyword
+    arguments are passed to it. See _run for the description of timeout and
+    executor.
+    """
+    return await _run(qasm2svgz, qasm_str, basis, show_clbits,
+                      timeout=timeout, executor=executor, **kwargs)
+
+
+async def render_png(qasm_str: str, basis: str = _DEFAULT_BASIS,
+                     show_clbits: bool = True, scale: float = 1.0,
+                     timeout: float = None,
+                     executor: concurrent.futures.Executor = None,
+                     **kwargs) -> bytes:
+    """Asynchronous version of qasm2png.
+
+    See qasm2png for the description of the parameters, the other keyword
+    arguments (color_mode, compresslevel, background, pixel_width, dpi,
+    collapse_repeats, ...) are passed to it. See _run for the description of
+    timeout and executor.
+    """
+    return await _run(qasm2png, qasm_str, basis, show_clbits, scale,
+                      timeout=timeout, executor=executor, **kwargs)
+
+
+async def render_pdf(qasm_str: str, basis: str = _DEFAULT_BASIS,
+                     show_clbits: bool = True, scale: float = 1.0,
+                     timeout: float = None,
+                     executor: concurrent.futures.Executor = None,
+                     **kwargs) -> bytes:
+    """Asynchronous version of qasm2pdf.
+
+    See qasm2pdf for the description of the parameters, the other keyword
+    arguments (columns_per_page, collapse_repeats, ...) are passed to it. See
+    _run for the description of timeout and executor.
+    """
+    return await _run(qasm2pdf, qasm_str, basis, show_clbits, scale,
+                      timeout=timeout, executor=executor, **kwargs)
+
+
+async def render_ps(qasm_str: str, basis: str = _DEFAULT_BASIS,
+                    show_clbits: bool = True, scale: float = 1.0,
+                    timeout: float = None,
+                    executor: concurrent.futures.Executor = None,
+                    **kwargs) -> bytes:
+    """Asynchronous version of qasm2ps.
+
+    See qasm2ps for the description of the parameters, the other keyword
+    arguments (columns_per_page, collapse_repeats, ...) are passed to it. See
+    _run for the description of timeout and executor.
+    """
+    return await _run(qasm2ps, qasm_str, basis, show_clbits, scale,
+                      timeout=timeout, executor=executor, **kwargs)
+
+
+async def render_html(qasm_str: str, basis: str = _DEFAULT_BASIS,
+                      show_clbits: bool = True, timeout: float = None,
+                      executor: concurrent.futures.Executor = None,
+                      **kwargs) -> str:
+    """Asynchronous version of qasm2html.
+
+    See qasm2html for the description of the parameters, the other keyword
+    arguments are passed to it. See _run for the description of timeout and
+    executor.
+    """
+    return await _run(qasm2html, qasm_str, basis, show_clbits,
+                      timeout=timeout, executor=executor, **kwargs)
@@ -0,0 +1,275 @@
+# ======================================================================
+# Copyright CERFACS (October 2018)
+# Contributor: Adrien Suau (suau@cerfacs.fr)
+#
+# This software is governed by the CeCILL-B license under French law and
+# abiding  by the  rules of  distribution of free software. You can use,
+# modify  and/or  redistribute  the  software  under  the  terms  of the
+# CeCILL-B license as circulated by CEA, CNRS and INRIA at the following
+# URL "http://www.cecill.info".
+#
+# As a counterpart to the access to  the source code and rights to copy,
+# modify and  redistribute granted  by the  license, users  are provided
+# only with a limited warranty and  the software's author, the holder of
+# the economic rights,  and the  successive licensors  have only limited
+# liability.
+#
+# In this respect, the user's attention is drawn to the risks associated
+# with loading,  using, modifying and/or  developing or reproducing  the
+# software by the user in light of its specific status of free software,
+# that  may mean  that it  is complicated  to manipulate,  and that also
+# therefore  means that  it is reserved for  developers and  experienced
+# professionals having in-depth  computer knowledge. Users are therefore
+# encouraged  to load and  test  the software's  suitability as  regards
+# their  requirements  in  conditions  enabling  the  security  of their
+# systems  and/or  data to be  ensured and,  more generally,  to use and
+# operate it in the same conditions as regards security.
+#
+# The fact that you  are presently reading this  means that you have had
+# knowledge of the CeCILL-B license and that you accept its terms.
+# ======================================================================
+
+
+"""This module provide a renderer for programs that are edited incrementally.
+
+Editors and notebooks usually render successive versions of the same QASM
+program, each version adding or modifying a few statements at the end of the
+previous one. The IncrementalRenderer keeps the work done for the previous
+version: the unrolled instructions of each statement, snapshots of the
+bit_gate_rank structure used by the layout (see svg/_layout.py) and the SVG
+elements drawn for each instruction. When a new version shares a prefix of
+statements with the previous one, only the following statements are parsed,
+laid out and drawn again:
+
+    renderer = IncrementalRenderer()
+    svg_str = renderer.render(qasm_str)
+    svg_str = renderer.render(qasm_str + "h q[0];")
+
+The header statements (version, include, gate, opaque, qreg and creg
+statements) and the included files are not cached: QISKit cannot parse the
+changed statements without the declarations they use, so the header and the
+included files are parsed again with them for each render. Any change in
+them triggers a full render.
+"""
+
+import copy
+from typing import List, Tuple, Union
+
+from qasm2image import _parsing, metrics
+from qasm2image.svg import _drawing, _helpers, _instructions, _layout, _types
+
+_DEFAULT_BASIS = ('id,u0,u1,u2,u3,x,y,z,h,s,sdg,t,tdg,rx,ry,rz,'
+                  'cx,cy,cz,ch,crz,cu1,cu3,swap,ccx')
+
+# Number of instructions between two snapshots of the bit_gate_rank
+# structure. When a statement changes, the layout is resumed from the last
+# snapshot before it.
+_CHECKPOINT_INTERVAL = 64
+
+
+class IncrementalRenderer:
+    """Render successive versions of a QASM program to SVG.
+
+    Args:
+        basis       (str) : The gate basis used to represent the circuit as a
+                            comma-separated string of names.
+        show_clbits (bool): Flag that control the drawing of classical bit
+                            lines.
+        collapse_repeats (bool): Must be False: the renderer draws every
+                            repetition of the repeated blocks, see
+                            qasm2svg. Rendering or accessing the layout
+                            raises a ValueError otherwise.
+    """
+
+    def __init__(self, basis: str = _DEFAULT_BASIS,
+                 show_clbits: bool = True,
+                 collapse_repeats: bool = False) -> None:
+        self.basis = basis
+        self.show_clbits = show_clbits
+        self.collapse_repeats = collapse_repeats
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget the previous program, the next render will be a full one."""
+        # Header statements and content of the included files.
+        self._header_key = None
+        # Statements applying instructions and number of instructions after
+        # each of them.
+        self._statements = list()  # type: List[str]
+        self._statement_ends = list()  # type: List[int]
+        self._json_circuit = None
+        self._gates = list()  # type: List[_types.GateLayout]
+        # SVG elements drawn for each instruction.
+        self._fragments = list()  # type: List[str]
+        # Snapshots of bit_gate_rank before every _CHECKPOINT_INTERVAL-th
+        # instruction.
+        self._checkpoints = list()  # type: List[_types.BitRankType]
+        self._bit_gate_rank = None
+        self._coordinates = None
+        # Font size of the texts already drawn, see _drawing.get_font_sizes.
+        self._font_sizes = dict()  # type: _types.FontSizesType
+        self._output = None
+
+    @property
+    def layout(self) -> _types.CircuitLayout:
+        """The layout of the last rendered program."""
+        self._check_collapse_repeats()
+        if self._json_circuit is None:
+            raise RuntimeError("No program has been rendered yet.")
+        qubit_labels, clbit_labels = _layout.get_bit_labels(self._json_circuit)
+        qubits_number = len(self._bit_gate_rank['qubits'])
+        clbits_number = len(self._bit_gate_rank['clbits'])
+        if not self.show_clbits:
+            clbit_labels, clbits_number = [], 0
+        columns = max(self._bit_gate_rank['qubits'] +
+                      self._bit_gate_rank['clbits'], default=0)
+        qubit_rows, clbit_rows = _layout.get_bit_rows(self._json_circuit)
+        return _types.CircuitLayout(
+            ["{}[{}]".format(*label) for label in qubit_labels],
+            ["{}[{}]".format(*label) for label in clbit_labels],
+            qubits_number, clbits_number, columns, qubit_rows, clbit_rows,
+            self._gates, [])
+
+    @metrics.instrument('svg')
+    def render(self, qasm_str: str, output_dimensions: bool = False) -> \
+            Union[str, Tuple[str, Tuple[int, int]]]:
+        """Render a new version of the program to SVG.
+
+        Args:
+            qasm_str    (str) : The QASM quantum circuit to draw in SVG.
+            output_dimensions (bool): If True, return (SVG, (width, height))
+                                instead of the SVG alone, see qasm2svg.
+        Returns:
+            Union[str, Tuple[str, Tuple[int, int]]]: SVG or (SVG, (width,
+                height)), the same as the output of qasm2svg.
+        Raises:
+            ValueError: if collapse_repeats is True.
+        """
+        self._check_collapse_repeats()
+        statements = _parsing.split_statements(qasm_str)
+        header = [statement for statement in statements
+                  if _parsing.is_header_statement(statement)]
+        body = [statement for statement in statements
+                if not _parsing.is_header_statement(statement)]
+        header_key = (header, _read_files(_parsing.get_included_files(
+            "\n".join(header))))
+
+        kept = 0
+        if header_key == self._header_key:
+            if body == self._statements and self._output is not None:
+                return self._get_output(output_dimensions)
+            for old_statement, statement in zip(self._statements, body):
+                if old_statement != statement:
+                    break
+                kept += 1
+
+        try:
+            if self._header_key is not None and \
+                    header_key == self._header_key:
+                start = self._statement_ends[kept - 1] if kept else 0
+                self._parse_suffix(header, body, kept, start)
+            else:
+                start = 0
+                self._parse(qasm_str, body)
+            self._header_key = header_key
+            self._layout_and_draw(start)
+        except Exception:
+            # The state may be partially updated, the next render must not
+            # reuse it.
+            self.reset()
+            raise
+        return self._get_output(output_dimensions)
+
+    def _check_collapse_repeats(self) -> None:
+        if self.collapse_repeats:
+            # The instructions are laid out one statement at a time, while
+            # the repeated blocks can only be found in the whole circuit.
+            raise ValueError("The IncrementalRenderer cannot collapse the "
+                             "repeated blocks, use qasm2svg instead.")
+
+    def _parse(self, qasm_str: str, body: List[str]) -> None:
+        self._output = None
+        self._json_circuit, self._statement_ends = \
+            _parsing.qasm2json_statements(qasm_str, self.basis)
+        self._statements = body
+        if len(self._statement_ends) != len(body):
+            # The statements were not split as QISKit did, the next render
+            # cannot reuse this one.
+            self._statements, self._statement_ends = list(), list()
+
+    def _parse_suffix(self, header: List[str], body: List[str], kept: int,
+                      start: int) -> None:
+        self._output = None
+        suffix = body[kept:]
+        json_suffix, suffix_ends = _parsing.qasm2json_statements(
+            "\n".join(header + suffix), self.basis)
+        if len(suffix_ends) != len(suffix):
+            self._parse("\n".join(header + body), body)
+            return
+        del self._json_circuit['instructions'][start:]
+        self._json_circuit['instructions'].extend(json_suffix['instructions'])
+        self._statements = body
+        self._statement_ends[kept:] = [start + end for end in suffix_ends]
+
+    def _layout_and_draw(self, start: int) -> None:
+        """Lay out and draw the instructions from the start-th one."""
+        header = self._json_circuit['header']
+        if start == 0:
+            self._checkpoints = [{
+                'clbits': [0] * header.get('number_of_clbits', 0),
+                'qubits': [0] * header.get('number_of_qubits', 0)}]
+            qubit_rows, clbit_rows = _layout.get_bit_rows(self._json_circuit)
+            self._coordinates = _helpers.get_coordinates(
+                0, qubit_rows, clbit_rows, len(qubit_rows))
+
+        # Resume the layout from the last snapshot before the first changed
+        # instruction. The unchanged instructions after the snapshot are laid
+        # out again to update bit_gate_rank, but not drawn again.
+        checkpoint = start // _CHECKPOINT_INTERVAL
+        first = checkpoint * _CHECKPOINT_INTERVAL
+        del self._checkpoints[checkpoint + 1:]
+        del self._gates[start:]
+        del self._fragments[start:]
+        self._bit_gate_rank = copy.deepcopy(self._checkpoints[checkpoint])
+
+        instructions = _instructions.InstructionTable.from_json(
+            {'header': header,
+             'instructions': self._json_circuit['instructions'][first:]})
+        new_gates = list()
+        for index, gate in enumerate(_layout.iter_gate_layouts(
+                instructions, self.show_clbits,
+                bit_gate_rank=self._bit_gate_rank), first):
+            if index >= start:
+                new_gates.append(gate)
+            if (index + 1) % _CHECKPOINT_INTERVAL == 0:
+                self._checkpoints.append(copy.deepcopy(self._bit_gate_rank))
+
+        # Extend the coordinates with the new columns, then draw the new
+        # instructions.
+        column_x = self._coordinates.column_x
+        columns = max((gate.column + 1 for gate in new_gates), default=0)
+        column_x.extend(_helpers.get_x_from_index(index)
+                        for index in range(len(column_x), columns))
+        self._gates.extend(new_gates)
+        self._fragments.extend(_drawing.draw_gates(new_gates,
+                                                   self._coordinates,
+                                                   self._font_sizes))
+
+    def _get_output(self, output_dimensions: bool) -> \
+            Union[str, Tuple[str, Tuple[int, int]]]:
+        if self._output is None:
+            self._output = _drawing.draw_layout_fragments(
+                self.layout, self._fragments, font_sizes=self._font_sizes)
+        return self._output if output_dimensions else self._output[0]
+
+
+def _read_files(paths: List[str]) -> List[str]:
+    """Read the content of files, None for the files that cannot be read."""
+    contents = list()
+    for path in paths:
+        try:
+            with open(path, 'r') as file:
+                contents.append(file.read())
+        except OSError:
+            contents.append(None)
+    return contents
@@ -0,0 +1,171 @@
+# ======================================================================
+# Copyright CERFACS (October 2018)
+# Contributor: Adrien Suau (suau@cerfacs.fr)
+#
+# This software is governed by the CeCILL-B license under French law and
+# abiding  by the  rules of  distribution of free software. You can use,
+# modify  and/or  redistribute  the  software  under  the  terms  of the
+# CeCILL-B license as circulated by CEA, CNRS and INRIA at the following
+# URL "http://www.cecill.info".
+#
+# As a counterpart to the access to  the source code and rights to copy,
+# modify and  redistribute granted  by the  license, users  are provided
+# only with a limited warranty and  the software's author, the holder of
+# the economic rights,  and the  successive licensors  have only limited
+# liability.
+#
+# In this respect, the user's attention is drawn to the risks associated
+# with loading,  using, modifying and/or  developing or reproducing  the
+# software by the user in light of its specific status of free software,
+# that  may mean  that it  is complicated  to manipulate,  and that also
+# therefore  means that  it is reserved for  developers and  experienced
+# professionals having in-depth  computer knowledge. Users are therefore
+# encouraged  to load and  test  the software's  suitability as  regards
+# their  requirements  in  conditions  enabling  the  security  of their
+# systems  and/or  data to be  ensured and,  more generally,  to use and
+# operate it in the same conditions as regards security.
+#
+# The fact that you  are presently reading this  means that you have had
+# knowledge of the CeCILL-B license and that you accept its terms.
+# ======================================================================
+
+
+"""This module provide an on-disk index to serve windows of huge circuits.
+
+The layout of a circuit with millions of instructions is computed once and
+written to a file in the binary layout format (see qasm2layout.py): fixed
+width records sorted by column, with a column -> first record table. A
+LayoutIndex opens this file with mmap, so that a query for the columns
+[first, last) only reads the pages holding the two entries of the column
+table, the records of the window, their bits and their labels:
+
+    write_layout_index(layout, 'circuit.layout')
+    with LayoutIndex('circuit.layout') as index:
+        instructions = index.window(1000000, 1000050)
+
+The file is mapped read-only, so the worker processes of a server that open
+the same index share its pages through the page cache of the operating
+system: no copy of the layout is made per process.
+"""
+
+import mmap
+import os
+from typing import List
+
+from qasm2image import _parsing
+from qasm2image.qasm2layout import (_unpack_strings, read_binary_header,
+                                    read_binary_instructions,
+                                    write_binary_layout)
+from qasm2image.svg import _layout, _types
+
+
+class LayoutIndex:
+    """Read-only, memory-mapped access to a binary layout file.
+
+    Args:
+        path (str): The path of a file written by write_layout_index or by
+                    qasm2layout with binary=True.
+    Raises:
+        ValueError: if the file is not a binary layout of a supported
+                    version.
+    """
+
+    def __init__(self, path: str) -> None:
+        with open(path, 'rb') as layout_file:
+            self._map = mmap.mmap(layout_file.fileno(), 0,
+                                  access=mmap.ACCESS_READ)
+        try:
+            # The windows are read at random places: reading ahead the
+            # following pages would only waste memory.
+            if hasattr(self._map, 'madvise'):
+                self._map.madvise(mmap.MADV_RANDOM)
+            self.header = read_binary_header(self._map)
+        except BaseException:
+            self._map.close()
+            raise
+        self._qubit_labels = None
+        self._clbit_labels = None
+
+    @property
+    def columns(self) -> int:
+        """The number of columns of the circuit."""
+        return self.header.columns
+
+    @property
+    def qubit_labels(self) -> List[str]:
+        """The labels of the qubit lines, decoded on first use."""
+        if self._qubit_labels is None:
+            self._qubit_labels = _unpack_strings(
+                self._map, self.header.qubit_labels_offset)
+        return self._qubit_labels
+
+    @property
+    def clbit_labels(self) -> List[str]:
+        """The labels of the classical bit lines, decoded on first use."""
+        if self._clbit_labels is None:
+            self._clbit_labels = _unpack_strings(
+                self._map, self.header.clbit_labels_offset)
+        return self._clbit_labels
+
+    def __len__(self) -> int:
+        return self.header.records_number
+
+    def window(self, first_column: int, last_column: int) -> List[dict]:
+        """Read the instructions drawn in the columns [first_column,
+        last_column), in the JSON form of qasm2layout.layout2dict."""
+        return read_binary_instructions(self._map, self.header, first_column,
+                                        last_column)
+
+    def close(self) -> None:
+        """Unmap the file."""
+        self._map.close()
+
+    def __enter__(self) -> 'LayoutIndex':
+        return self
+
+    def __exit__(self, *exception_info) -> None:
+        self.close()
+
+
+def write_layout_index(layout: _types.CircuitLayout, path: str) -> None:
+    """Write the layout of a circuit to an index file.
+
+    The file is written next to its final path and then renamed, so that the
+    processes opening the index never see a partially written file.
+
+    Args:
+        layout (CircuitLayout): The layout of the circuit, see
+                                _layout.layout_json_circuit.
+        path   (str): The path of the index file.
+    """
+    temporary_path = path + '.tmp'
+    try:
+        with open(temporary_path, 'wb') as index_file:
+            write_binary_layout(layout, index_file)
+        os.replace(temporary_path, path)
+    except BaseException:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+        raise
+
+
+def build_layout_index(qasm_str: str, path: str,
+                       basis: str = ('id,u0,u1,u2,u3,x,y,z,h,s,sdg,t,tdg,rx,'
+                                     'ry,rz,cx,cy,cz,ch,crz,cu1,cu3,swap,ccx'),
+                       show_clbits: bool = True, processes: int = 1) -> None:
+    """Lay out a QASM code and write its layout to an index file.
+
+    Args:
+        qasm_str    (str) : The QASM quantum circuit to lay out.
+        path        (str) : The path of the index file.
+        basis       (str) : The gate basis used to represent the circuit as a
+                            comma-separated string of names.
+        show_clbits (bool): Flag that control the drawing of classical bit
+                            lines.
+        processes   (int) : Number of processes used to compute the layout,
+                            see _layout.layout_json_circuit.
+    """
+    json_circuit = _parsing.qasm2json(qasm_str, basis)
+    layout = _layout.layout_json_circuit(json_circuit, show_clbits,
+                                         processes=processes)
+    write_layout_index(layout, path)
@@ -0,0 +1,363 @@
+# ======================================================================
+# Copyright CERFACS (October 2018)
+# Contributor: Adrien Suau (suau@cerfacs.fr)
+#
+# This software is governed by the CeCILL-B license under French law and
+# abiding  by the  rules of  distribution of free software. You can use,
+# modify  and/or  redistribute  the  software  under  the  terms  of the
+# CeCILL-B license as circulated by CEA, CNRS and INRIA at the following
+# URL "http://www.cecill.info".
+#
+# As a counterpart to the access to  the source code and rights to copy,
+# modify and  redistribute granted  by the  license, users  are provided
+# only with a limited warranty and  the software's author, the holder of
+# the economic rights,  and the  successive licensors  have only limited
+# liability.
+#
+# In this respect, the user's attention is drawn to the risks associated
+# with loading,  using, modifying and/or  developing or reproducing  the
+# software by the user in light of its specific status of free software,
+# that  may mean  that it  is complicated  to manipulate,  and that also
+# therefore  means that  it is reserved for  developers and  experienced
+# professionals having in-depth  computer knowledge. Users are therefore
+# encouraged  to load and  test  the software's  suitability as  regards
+# their  requirements  in  conditions  enabling  the  security  of their
+# systems  and/or  data to be  ensured and,  more generally,  to use and
+# operate it in the same conditions as regards security.
+#
+# The fact that you  are presently reading this  means that you have had
+# knowledge of the CeCILL-B license and that you accept its terms.
+# ======================================================================
+
+"""This module provide a registry of metrics about the renders.
+
+The qasm2* functions report to this registry the number of renders, their
+latency, the size of their output, the failures and the internal retries
+(for example when qasm2png reduces the scale after a CAIRO_STATUS_INVALID_SIZE
+error). The registry can be exported in the Prometheus text format or as a
+JSON-serialisable snapshot:
+
+    from qasm2image import metrics
+    metrics.enable()
+    ...
+    print(metrics.to_prometheus())
+
+Metrics are disabled by default. When disabled, the instrumented functions
+only pay for a check of a global flag.
+
+Latency and size percentiles are computed over a sliding window of the last
+SUMMARY_WINDOW observations of each series.
+"""
+
+import collections
+import functools
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+SUMMARY_WINDOW = 1024
+SUMMARY_QUANTILES = (0.5, 0.9, 0.99)
+
+_ENABLED = False
+_LOCAL = threading.local()
+
+_DESCRIPTIONS = {
+    'qasm2image_renders_total':
+        ('counter', 'Number of successful renders.'),
+    'qasm2image_render_failures_total':
+        ('counter', 'Number of renders that raised an exception.'),
+    'qasm2image_png_scale_reductions_total':
+        ('counter', 'Number of times qasm2png halved the scale because the '
+                    'image was too large for cairo.'),
+    'qasm2image_cache_requests_total':
+        ('counter', 'Number of cache lookups, by cache and result.'),
+    'qasm2image_render_seconds':
+        ('summary', 'Duration of the renders in seconds.'),
+    'qasm2image_output_bytes':
+        ('summary', 'Size of the rendered outputs in bytes.'),
+}
+
+LabelsType = Tuple[Tuple[str, str], ...]
+
+
+class _Summary:
+    """Count, sum and recent observations of a series."""
+
+    def __init__(self):
+        self.count = 0
+        self.sum = 0.0
+        self.window = collections.deque(maxlen=SUMMARY_WINDOW)
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.sum += value
+        self.window.append(value)
+
+    def quantiles(self) -> Dict[float, float]:
+        values = sorted(self.window)
+        if not values:
+            return {quantile: float('nan') for quantile in SUMMARY_QUANTILES}
+        return {quantile: values[min(int(quantile * len(values)),
+                                     len(values) - 1)]
+                for quantile in SUMMARY_QUANTILES}
+
+
+class MetricsRegistry:
+    """Thread-safe storage for counters and summaries."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = dict()
+        self._summaries = dict()
+        self._start_time = time.time()
+
+    def reset(self) -> None:
+        """Forget all the recorded values."""
+        with self._lock:
+            self._counters.clear()
+            self._summaries.clear()
+            self._start_time = time.time()
+
+    def increment(self, name: str, labels: LabelsType,
+                  value: float = 1) -> None:
+        """Add value to the counter name{labels}."""
+        with self._lock:
+            series = self._counters.setdefault(name, dict())
+            series[labels] = series.get(labels, 0) + value
+
+    def observe(self, name: str, labels: LabelsType, value: float) -> None:
+        """Record an observation in the summary name{labels}."""
+        with self._lock:
+            series = self._summaries.setdefault(name, dict())
+            if labels not in series:
+                series[labels] = _Summary()
+            series[labels].observe(value)
+
+    def drain(self) -> Tuple[dict, dict]:
+        """Return the recorded values in a picklable form and forget them.
+
+        It allows to record metrics in a worker process and to add them to
+        the registry of the main process, see merge.
+
+        Returns:
+            Tuple[dict, dict]: the counters, {name: {labels: value}}, and the
+                summaries, {name: {labels: (count, sum, window)}}.
+        """
+        with self._lock:
+            counters = self._counters
+            summaries = {
+                name: {labels: (summary.count, summary.sum,
+                                list(summary.window))
+                       for labels, summary in series.items()}
+                for name, series in self._summaries.items()}
+            self._counters, self._summaries = dict(), dict()
+        return counters, summaries
+
+    def merge(self, values: Tuple[dict, dict]) -> None:
+        """Add the values returned by the drain method of another registry."""
+        counters, summaries = values
+        with self._lock:
+            for name, series in counters.items():
+                own_series = self._counters.setdefault(name, dict())
+                for labels, value in series.items():
+                    own_series[labels] = own_series.get(labels, 0) + value
+            for name, series in summaries.items():
+                own_series = self._summaries.setdefault(name, dict())
+                for labels, (count, total, window) in series.items():
+                    summary = own_series.setdefault(labels, _Summary())
+                    summary.count += count
+                    summary.sum += total
+                    summary.window.extend(window)
+
+    def snapshot(self) -> dict:
+        """Return the current values in a JSON-serialisable dictionary.
+
+        Returns:
+            dict: {'uptime_seconds': float,
+                   'renders_per_second': float,
+                   'counters': {name: [{'labels': dict, 'value': float}]},
+                   'summaries': {name: [{'labels': dict, 'count': int,
+                                         'sum': float,
+                                         'quantiles': {str: float}}]}}
+        """
+        with self._lock:
+            uptime = time.time() - self._start_time
+            counters = {
+                name: [{'labels': dict(labels), 'value': value}
+                       for labels, value in sorted(series.items())]
+                for name, series in self._counters.items()}
+            summaries = {
+                name: [{'labels': dict(labels), 'count': summary.count,
+                        'sum': summary.sum,
+                        'quantiles': {str(quantile): value for
+                                      quantile, value in
+                                      summary.quantiles().items()}}
+                       for labels, summary in sorted(series.items())]
+                for name, series in self._summaries.items()}
+        renders = sum(series['value'] for series in
+                      counters.get('qasm2image_renders_total', []))
+        return {'uptime_seconds': uptime,
+                'renders_per_second': renders / uptime if uptime > 0 else 0.0,
+                'counters': counters, 'summaries': summaries}
+
+    def to_prometheus(self) -> str:
+        """Return the current values in the Prometheus text format."""
+        snapshot = self.snapshot()
+        lines = list()
+        for name in sorted(set(snapshot['counters']) |
+                           set(snapshot['summaries'])):
+            metric_type, description = _DESCRIPTIONS.get(
+                name, ('summary' if name in snapshot['summaries'] else
+                       'counter', name))
+            lines.append("# HELP {} {}".format(name, description))
+            lines.append("# TYPE {} {}".format(name, metric_type))
+            for series in snapshot['counters'].get(name, []):
+                lines.append("{}{} {}".format(
+                    name, _format_labels(series['labels']),
+                    _format_value(series['value'])))
+            for series in snapshot['summaries'].get(name, []):
+                for quantile, value in series['quantiles'].items():
+                    labels = dict(series['labels'], quantile=quantile)
+                    lines.append("{}{} {}".format(
+                        name, _format_labels(labels), _format_value(value)))
+                labels = _format_labels(series['labels'])
+                lines.append("{}_sum{} {}".format(
+                    name, labels, _format_value(series['sum'])))
+                lines.append("{}_count{} {}".format(name, labels,
+                                                    series['count']))
+        return "\n".join(lines) + "\n"
+
+
+def _format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    escaped = ('{}="{}"'.format(key, str(value).replace('\\', '\\\\')
+                                .replace('"', '\\"').replace('\n', '\\n'))
+               for key, value in sorted(labels.items()))
+    return "{" + ",".join(escaped) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value != value:  # NaN
+        return "NaN"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+REGISTRY = MetricsRegistry()
+
+
+def enable() -> None:
+    """Start recording metrics."""
+    global _ENABLED  # pylint: disable=global-statement
+    _ENABLED = True
+
+
+def disable() -> None:
+    """Stop recording metrics. The values already recorded are kept."""
+    global _ENABLED  # pylint: disable=global-statement
+    _ENABLED = False
+
+
+def is_enabled() -> bool:
+    """Return True if the metrics are recorded."""
+    return _ENABLED
+
+
+def increment(name: str, value: float = 1, **labels) -> None:
+    """Add value to the counter name{labels} if the metrics are enabled."""
+    if _ENABLED:
+        REGISTRY.increment(name, tuple(sorted(labels.items())), value)
+
+
+def observe(name: str, value: float, **labels) -> None:
+    """Record value in the summary name{labels} if the metrics are enabled."""
+    if _ENABLED:
+        REGISTRY.observe(name, tuple(sorted(labels.items())), value)
+
+
+def record_render(output_format: str, duration: float, size: int = None,
+                  error: BaseException = None) -> None:
+    """Record the outcome of a render if the metrics are enabled.
+
+    Args:
+        output_format (str): The format of the render ('svg', 'png', ...).
+        duration    (float): The duration of the render in seconds.
+        size          (int): The size of the output in bytes, None if unknown.
+        error   (Exception): The exception raised by the render, None if the
+                             render succeeded.
+    """
+    if not _ENABLED:
+        return
+    if error is not None:
+        increment('qasm2image_render_failures_total', format=output_format,
+                  reason=type(error).__name__)
+        return
+    increment('qasm2image_renders_total', format=output_format)
+    observe('qasm2image_render_seconds', duration, format=output_format)
+    if size is not None:
+        observe('qasm2image_output_bytes', size, format=output_format)
+
+
+def _output_size(output) -> Optional[int]:
+    """Size of the output of a qasm2* function in bytes.
+
+    None is returned when the size is unknown, for example when the output
+    was written to write_to, so that no size is recorded for this render.
+    """
+    if isinstance(output, tuple):
+        # qasm2svg called with output_dimensions=True
+        output = output[0]
+    if isinstance(output, str):
+        return len(output.encode('utf-8'))
+    if isinstance(output, (bytes, bytearray)):
+        return len(output)
+    return None
+
+
+def instrument(output_format: str) -> Callable:
+    """Decorator recording the renders performed by a qasm2* function.
+
+    Only the outermost instrumented call is recorded, so that the SVG
+    generated internally by qasm2png is not counted as an SVG render.
+
+    Args:
+        output_format (str): The format produced by the decorated function.
+    """
+
+    def decorator(function: Callable) -> Callable:
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not _ENABLED or getattr(_LOCAL, 'in_render', False):
+                return function(*args, **kwargs)
+            _LOCAL.in_render = True
+            start = time.perf_counter()
+            try:
+                output = function(*args, **kwargs)
+            except BaseException as exception:
+                record_render(output_format, time.perf_counter() - start,
+                              error=exception)
+                raise
+            finally:
+                _LOCAL.in_render = False
+            record_render(output_format, time.perf_counter() - start,
+                          _output_size(output))
+            return output
+
+        return wrapper
+
+    return decorator
+
+
+def to_prometheus() -> str:
+    """Return the recorded metrics in the Prometheus text format."""
+    return REGISTRY.to_prometheus()
+
+
+def snapshot() -> dict:
+    """Return the recorded metrics in a JSON-serialisable dictionary."""
+    return REGISTRY.snapshot()
+
+
+def reset() -> None:
+    """Forget all the recorded metrics."""
+    REGISTRY.reset()
@@ -0,0 +1,118 @@
+# ======================================================================
+# Copyright CERFACS (October 2018)
+# Contributor: Adrien Suau (suau@cerfacs.fr)
+#
+# This software is governed by the CeCILL-B license under French law and
+# abiding  by the  rules of  distribution of free software. You can use,
+# modify  and/or  redistribute  the  software  under  the  terms  of the
+# CeCILL-B license as circulated by CEA, CNRS and INRIA at the following
+# URL "http://www.cecill.info".
+#
+# As a counterpart to the access to  the source code and rights to copy,
+# modify and  redistribute granted  by the  license, users  are provided
+# only with a limited warranty and  the software's author, the holder of
+# the economic rights,  and the  successive licensors  have only limited
+# liability.
+#
+# In this respect, the user's attention is drawn to the risks associated
+# with loading,  using, modifying and/or  developing or reproducing  the
+# software by the user in light of its specific status of free software,
+# that  may mean  that it  is complicated  to manipulate,  and that also
+# therefore  means that  it is reserved for  developers and  experienced
+# professionals having in-depth  computer knowledge. Users are therefore
+# encouraged  to load and  test  the software's  suitability as  regards
+# their  requirements  in  conditions  enabling  the  security  of their
+# systems  and/or  data to be  ensured and,  more generally,  to use and
+# operate it in the same conditions as regards security.
+#
+# The fact that you  are presently reading this  means that you have had
+# knowledge of the CeCILL-B license and that you accept its terms.
+# ======================================================================
+
+
+"""This module provide circuits prepared for several outputs.
+
+qasm2png, qasm2pdf and qasm2ps each draw the circuit in SVG and let cairosvg
+parse this SVG again. When the same circuit is needed in several outputs,
+for example thumbnails at several scales and a PDF, a PreparedCircuit draws
+the SVG and parses it once, and then renders it to each output:
+
+    circuit = prepare(qasm_str)
+    for scale in (0.25, 1, 2):
+        circuit.to_png(scale, write_to='circuit-{}.png'.format(scale))
+    circuit.to_pdf(write_to='circuit.pdf')
+"""
+
+from typing import BinaryIO, Optional, Union
+
+from cairosvg.parser import Tree
+from cairosvg.surface import PDFSurface, PSSurface
+
+from qasm2image import _trees, metrics, qasm2png, qasm2svg
+
+
+class PreparedCircuit:
+    """A circuit drawn in SVG, parsed by cairosvg when first rendered.
+
+    Args:
+        svg    (str): The SVG representation of the circuit.
+        width  (int): The width of the SVG, in pixels.
+        height (int): The height of the SVG, in pixels.
+    """
+
+    def __init__(self, svg: str, width: int, height: int) -> None:
+        self.svg = svg
+        self.width = width
+        self.height = height
+        self._tree = None
+
+    @property
+    def tree(self) -> Tree:
+        """The SVG parsed by cairosvg, shared by all the renders."""
+        if self._tree is None:
+            self._tree = _trees.parse(self.svg)
+        return self._tree
+
+    @metrics.instrument('png')
+    def to_png(self, scale: float = 1.0,
+               write_to: Union[str, BinaryIO] = None, color_mode: str = None,
+               compresslevel: int = 6, background: str = None,
+               pixel_width: int = None,
+               dpi: float = None) -> Optional[bytes]:
+        """Render the circuit to PNG. See qasm2png for the parameters."""
+        return qasm2png._svg2png(self.tree, self.width, self.height, scale,
+                                 write_to, color_mode, compresslevel,
+                                 background, pixel_width, dpi)
+
+    @metrics.instrument('pdf')
+    def to_pdf(self, scale: float = 1.0,
+               write_to: Union[str, BinaryIO] = None) -> Optional[bytes]:
+        """Render the circuit to PDF. See qasm2pdf for the parameters."""
+        return _trees.render(PDFSurface, self.tree, scale, write_to)
+
+    @metrics.instrument('ps')
+    def to_ps(self, scale: float = 1.0,
+              write_to: Union[str, BinaryIO] = None) -> Optional[bytes]:
+        """Render the circuit to PostScript. See qasm2ps for the parameters."""
+        return _trees.render(PSSurface, self.tree, scale, write_to)
+
+
+def prepare(qasm_str: str,
+            basis: str = ('id,u0,u1,u2,u3,x,y,z,h,s,sdg,t,tdg,rx,ry,rz,'
+                          'cx,cy,cz,ch,crz,cu1,cu3,swap,ccx'),
+            show_clbits: bool = True) -> PreparedCircuit:
+    """Draw a QASM code once, to render it to several outputs.
+
+    Args:
+        qasm_str    (str) : The QASM quantum circuit to draw.
+        basis       (str) : The gate basis used to represent the circuit as a
+                            comma-separated string of names.
+        show_clbits (bool): Flag that control the drawing of classical bit
+                            lines.
+    Returns:
+        PreparedCircuit: The circuit, ready to be rendered.
+    """
+    svg, (width, height) = qasm2svg.qasm2svg(qasm_str, basis=basis,
+                                             show_clbits=show_clbits,
+                                             output_dimensions=True)
+    return PreparedCircuit(svg, width, height)
@@ -0,0 +1,507 @@
+# ======================================================================
+# Copyright CERFACS (October 2018)
+# Contributor: Adrien Suau (suau@cerfacs.fr)
+#
+# This software is governed by the CeCILL-B license under French law and
+# abiding  by the  rules of  distribution of free software. You can use,
+# modify  and/or  redistribute  the  software  under  the  terms  of the
+# CeCILL-B license as circulated by CEA, CNRS and INRIA at the following
+# URL "http://www.cecill.info".
+#
+# As a counterpart to the access to  the source code and rights to copy,
+# modify and  redistribute granted  by the  license, users  are provided
+# only with a limited warranty and  the software's author, the holder of
+# the economic rights,  and the  successive licensors  have only limited
+# liability.
+#
+# In this respect, the user's attention is drawn to the risks associated
+# with loading,  using, modifying and/or  developing or reproducing  the
+# software by the user in light of its specific status of free software,
+# that  may mean  that it  is complicated  to manipulate,  and that also
+# therefore  means that  it is reserved for  developers and  experienced
+# professionals having in-depth  computer knowledge. Users are therefore
+# encouraged  to load and  test  the software's  suitability as  regards
+# their  requirements  in  conditions  enabling  the  security  of their
+# systems  and/or  data to be  ensured and,  more generally,  to use and
+# operate it in the same conditions as regards security.
+#
+# The fact that you  are presently reading this  means that you have had
+# knowledge of the CeCILL-B license and that you accept its terms.
+# ======================================================================
+
+"""This module provide the qasm2html function.
+
+The HTML output is an interactive viewer for very deep circuits: instead of
+embedding one SVG element per drawn shape, the page embeds the compact layout
+table of the circuit (column, bits and label of each instruction) and only
+draws the visible part of the circuit on a canvas while the user scrolls and
+zooms.
+
+The instructions are stored in a flat integer array, sorted by column, along
+with a column -> offset table. Each instruction spans exactly one column, so
+this table is an interval index: finding the instructions intersecting the
+visible columns [first, last] is a constant-time slice of the flat array,
+whatever the size of the circuit.
+"""
+
+import html
+import json
+
+from qasm2image import _parsing, metrics
+from qasm2image.svg import _constants, _helpers, _layout, _types
+
+# Glyphs that can appear in the layout table. The position of a glyph in this
+# list is the integer used to encode it.
+_GLYPHS = [_layout.GLYPH_NONE, _layout.GLYPH_GATE,
+           _layout.GLYPH_CONTROLLED_GATE, _layout.GLYPH_CNOT,
+           _layout.GLYPH_SWAP, _layout.GLYPH_MEASURE]
+
+_LAYOUT_PLACEHOLDER = '__QASM2IMAGE_LAYOUT__'
+_TITLE_PLACEHOLDER = '__QASM2IMAGE_TITLE__'
+
+_HTML_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>__QASM2IMAGE_TITLE__</title>
+<style>
+html, body { margin: 0; height: 100%; overflow: hidden; }
+#viewer { position: absolute; top: 0; left: 0; right: 0; bottom: 28px;
+          cursor: grab; }
+#viewer canvas { display: block; width: 100%; height: 100%; }
+#toolbar { position: absolute; left: 0; right: 0; bottom: 0; height: 28px;
+           display: flex; align-items: center; padding: 0 8px;
+           font: 12px sans-serif; background: #eee; }
+#scroll { flex: 1; margin-right: 8px; }
+</style>
+</head>
+<body>
+<div id="viewer"><canvas id="canvas"></canvas></div>
+<div id="toolbar">
+  <input id="scroll" type="range" min="0" max="10000" value="0">
+  <span id="status"></span>
+</div>
+<script type="application/json" id="layout">__QASM2IMAGE_LAYOUT__</script>
+<script>
+(function () {
+  'use strict';
+  var layout = JSON.parse(document.getElementById('layout').textContent);
+  var geo = layout.geometry, gates = layout.gates, labels = layout.labels;
+  var offsets = layout.column_offsets;
+  var GATE = layout.glyphs.indexOf('gate');
+  var CONTROLLED_GATE = layout.glyphs.indexOf('controlled_gate');
+  var CNOT = layout.glyphs.indexOf('cnot');
+  var SWAP = layout.glyphs.indexOf('swap');
+  var MEASURE = layout.glyphs.indexOf('measure');
+
+  var viewer = document.getElementById('viewer');
+  var canvas = document.getElementById('canvas');
+  var scroll = document.getElementById('scroll');
+  var status = document.getElementById('status');
+  var ctx = canvas.getContext('2d');
+  // Top-left corner of the view in circuit coordinates, and zoom factor.
+  var view = {x: 0, y: 0, zoom: 1};
+  var screen = {width: 0, height: 0, ratio: 1};
+  var fontSizes = {}, pending = false;
+
+  function columnX(column) {
+    return geo.gates_origin + column * geo.column_width + geo.gate_size / 2;
+  }
+  function qubitY(row) { return geo.vertical_border + row * geo.row_height; }
+  function clbitY(row) { return qubitY(layout.qubits_number + row); }
+
+  function fitFontSize(text, width, height) {
+    ctx.font = '100px sans-serif';
+    var metrics = ctx.measureText(text);
+    var textHeight = (metrics.actualBoundingBoxAscent +
+                      metrics.actualBoundingBoxDescent) || 72;
+    return 100 / Math.max(metrics.width / width, textHeight / height);
+  }
+  function labelFontSize(label) {
+    if (!(label in fontSizes)) {
+      var inside = geo.gate_size - 2 * geo.gate_inside_margin;
+      fontSizes[label] = fitFontSize(labels[label], inside, inside);
+    }
+    return fontSizes[label];
+  }
+  var namesFontSize = geo.register_name_font_size;
+  layout.qubit_labels.concat(layout.clbit_labels).forEach(function (name) {
+    namesFontSize = Math.min(namesFontSize, fitFontSize(
+      name, geo.register_name_width - geo.register_name_borders,
+      geo.max_register_name_height));
+  });
+
+  function line(x1, y1, x2, y2) {
+    ctx.beginPath(); ctx.moveTo(x1, y1); ctx.lineTo(x2, y2); ctx.stroke();
+  }
+  function doubleLine(x1, y1, x2, y2) {
+    var dx = x1 === x2 ? geo.double_lines_separation : 0;
+    var dy = x1 === x2 ? 0 : geo.double_lines_separation;
+    line(x1 - dx, y1 - dy, x2 - dx, y2 - dy);
+    line(x1 + dx, y1 + dy, x2 + dx, y2 + dy);
+  }
+  function circle(x, y, radius, fill) {
+    ctx.beginPath(); ctx.arc(x, y, radius, 0, 2 * Math.PI);
+    ctx.fillStyle = fill; ctx.fill(); ctx.stroke();
+  }
+  function text(label, x, y, fontSize) {
+    ctx.font = fontSize + 'px sans-serif';
+    ctx.fillStyle = 'black';
+    ctx.fillText(labels[label], x, y + geo.center_vertically * fontSize);
+  }
+  function box(x, y, label) {
+    var half = geo.gate_size / 2;
+    ctx.fillStyle = 'white';
+    ctx.fillRect(x - half, y - half, geo.gate_size, geo.gate_size);
+    ctx.strokeRect(x - half, y - half, geo.gate_size, geo.gate_size);
+    text(label, x, y, labelFontSize(label));
+  }
+  function cross(x, y) {
+    var half = geo.gate_size / 2;
+    line(x - half, y - half, x + half, y + half);
+    line(x + half, y - half, x - half, y + half);
+  }
+
+  // Draw the instruction stored at position p in the flat gates array and
+  // return the position of the next instruction. The record format is
+  //   glyph, label, #controls, #qubits, qubits..., #clbits, clbits...,
+  //   condition, #condition clbits, condition clbits...
+  function drawGate(x, p, top, bottom) {
+    var glyph = gates[p], label = gates[p + 1], controls = gates[p + 2];
+    var nq = gates[p + 3], q = p + 4;
+    var nc = gates[q + nq], c = q + nq + 1;
+    var condition = gates[c + nc], nk = gates[c + nc + 1], k = c + nc + 2;
+    var i, y, ys = [];
+    for (i = 0; i < nq; i++) { ys.push(qubitY(gates[q + i])); }
+    var ymin = Math.min.apply(null, ys), ymax = Math.max.apply(null, ys);
+    if (nc > 0) { ymax = Math.max(ymax, clbitY(gates[c])); }
+    if (nk > 0) { ymax = Math.max(ymax, clbitY(gates[k + nk - 1])); }
+    if (ymax + geo.gate_size < top || ymin - geo.gate_size > bottom) {
+      return k + nk;
+    }
+    if (nk > 0) {
+      doubleLine(x, ys[0], x, clbitY(gates[k + nk - 1]));
+      for (i = 0; i < nk; i++) {
+        var value = Math.floor(condition / Math.pow(2, i)) % 2;
+        circle(x, clbitY(gates[k + i]), geo.control_gate_size / 2,
+               value ? 'black' : 'white');
+      }
+    }
+    var qymax = Math.max.apply(null, ys), targets = ys.slice(controls);
+    if (controls > 0 || (glyph === GATE && targets.length > 1) ||
+        glyph === SWAP) {
+      line(x, ymin, x, qymax);
+    }
+    for (i = 0; i < controls; i++) {
+      circle(x, ys[i], geo.control_gate_size / 2, 'black');
+    }
+    if (glyph === MEASURE) {
+      y = clbitY(gates[c]);
+      doubleLine(x, targets[0], x, y);
+      var half = geo.measure_gate_clbit_size / 2;
+      ctx.fillStyle = 'black';
+      ctx.fillRect(x - half, y - half, 2 * half, 2 * half);
+      box(x, targets[0], label);
+    } else if (glyph === SWAP) {
+      cross(x, targets[0]); cross(x, targets[1]);
+    } else if (glyph === CNOT) {
+      y = targets[0];
+      circle(x, y, geo.gate_size / 2, 'white');
+      line(x - geo.gate_size / 2, y, x + geo.gate_size / 2, y);
+      line(x, y - geo.gate_size / 2, x, y + geo.gate_size / 2);
+    } else if (glyph === CONTROLLED_GATE && labels[label]) {
+      targets.forEach(function (y) {
+        circle(x, y, geo.gate_size / 2, 'white');
+        text(label, x, y, labelFontSize(label) *
+             geo.font_size_reduction_for_controlled_gates);
+      });
+    } else if (glyph === GATE && labels[label]) {
+      targets.forEach(function (y) { box(x, y, label); });
+    }
+    return k + nk;
+  }
+
+  function draw() {
+    pending = false;
+    var width = screen.width / view.zoom, height = screen.height / view.zoom;
+    var left = view.x + geo.register_name_width, right = view.x + width;
+    var top = view.y, bottom = view.y + height;
+    var ratio = screen.ratio, zoom = view.zoom, row, y;
+
+    ctx.setTransform(ratio, 0, 0, ratio, 0, 0);
+    ctx.fillStyle = 'white';
+    ctx.fillRect(0, 0, screen.width, screen.height);
+    ctx.setTransform(ratio * zoom, 0, 0, ratio * zoom,
+                     -view.x * zoom * ratio, -view.y * zoom * ratio);
+    ctx.lineWidth = geo.stroke_thickness;
+    ctx.strokeStyle = 'black';
+    ctx.textAlign = 'center';
+
+    // Register lines, clipped to the visible region.
+    var start = Math.max(left, geo.register_name_width);
+    var end = Math.min(right, layout.width);
+    for (row = 0; row < layout.qubits_number; row++) {
+      line(start, qubitY(row), end, qubitY(row));
+    }
+    for (row = 0; row < layout.clbits_number; row++) {
+      doubleLine(start, clbitY(row), end, clbitY(row));
+    }
+
+    // Gates of the visible columns only.
+    var first = Math.max(0, Math.floor(
+      (left - geo.gates_origin - geo.gate_size) / geo.column_width));
+    var last = Math.min(offsets.length - 2, Math.ceil(
+      (right - geo.gates_origin) / geo.column_width));
+    for (var column = first; column <= last; column++) {
+      var x = columnX(column);
+      for (var p = offsets[column]; p < offsets[column + 1];) {
+        p = drawGate(x, p, top, bottom);
+      }
+    }
+
+    // Register names stay on the left of the view.
+    ctx.setTransform(ratio * zoom, 0, 0, ratio * zoom, 0,
+                     -view.y * zoom * ratio);
+    ctx.fillStyle = 'white';
+    ctx.fillRect(0, top, geo.register_name_width, height);
+    ctx.fillStyle = 'black';
+    ctx.textAlign = 'end';
+    ctx.font = namesFontSize + 'px sans-serif';
+    layout.qubit_labels.concat(layout.clbit_labels).forEach(function (name, i) {
+      y = qubitY(i) + geo.center_vertically * namesFontSize;
+      ctx.fillText(name, geo.register_name_width - geo.register_name_right_border,
+                   y);
+    });
+
+    status.textContent = 'columns ' + Math.max(first, 0) + '-' +
+      Math.max(last, 0) + ' / ' + layout.columns + ', zoom ' +
+      Math.round(zoom * 100) + '%';
+  }
+
+  function update() {
+    var maxX = Math.max(0, layout.width - screen.width / view.zoom);
+    var maxY = Math.max(0, layout.height - screen.height / view.zoom);
+    view.x = Math.min(Math.max(view.x, 0), maxX);
+    view.y = Math.min(Math.max(view.y, 0), maxY);
+    scroll.value = maxX > 0 ? Math.round(view.x / maxX * scroll.max) : 0;
+    if (!pending) {
+      pending = true;
+      window.requestAnimationFrame(draw);
+    }
+  }
+
+  function zoomAt(factor, screenX, screenY) {
+    var zoom = Math.min(Math.max(view.zoom * factor, 1e-3), 8);
+    view.x += screenX / view.zoom - screenX / zoom;
+    view.y += screenY / view.zoom - screenY / zoom;
+    view.zoom = zoom;
+    update();
+  }
+
+  function resize() {
+    screen.ratio = window.devicePixelRatio || 1;
+    screen.width = viewer.clientWidth;
+    screen.height = viewer.clientHeight;
+    canvas.width = Math.round(screen.width * screen.ratio);
+    canvas.height = Math.round(screen.height * screen.ratio);
+    update();
+  }
+
+  viewer.addEventListener('wheel', function (event) {
+    event.preventDefault();
+    var bounds = canvas.getBoundingClientRect();
+    if (event.ctrlKey) {
+      zoomAt(Math.exp(-event.deltaY * 0.002), event.clientX - bounds.left,
+             event.clientY - bounds.top);
+      return;
+    }
+    if (event.shiftKey) {
+      view.y += event.deltaY / view.zoom;
+    } else {
+      view.x += (event.deltaX + event.deltaY) / view.zoom;
+    }
+    update();
+  }, {passive: false});
+
+  var drag = null;
+  viewer.addEventListener('mousedown', function (event) {
+    drag = {x: event.clientX, y: event.clientY};
+    viewer.style.cursor = 'grabbing';
+  });
+  window.addEventListener('mousemove', function (event) {
+    if (drag === null) { return; }
+    view.x -= (event.clientX - drag.x) / view.zoom;
+    view.y -= (event.clientY - drag.y) / view.zoom;
+    drag = {x: event.clientX, y: event.clientY};
+    update();
+  });
+  window.addEventListener('mouseup', function () {
+    drag = null;
+    viewer.style.cursor = 'grab';
+  });
+  window.addEventListener('keydown', function (event) {
+    var step = screen.width / view.zoom / 2;
+    if (event.key === 'ArrowRight') { view.x += step; }
+    else if (event.key === 'ArrowLeft') { view.x -= step; }
+    else if (event.key === 'ArrowDown') { view.y += step; }
+    else if (event.key === 'ArrowUp') { view.y -= step; }
+    else if (event.key === 'Home') { view.x = 0; }
+    else if (event.key === 'End') { view.x = layout.width; }
+    else if (event.key === '+') { zoomAt(1.25, 0, 0); return; }
+    else if (event.key === '-') { zoomAt(0.8, 0, 0); return; }
+    else { return; }
+    update();
+  });
+  scroll.addEventListener('input', function () {
+    var maxX = Math.max(0, layout.width - screen.width / view.zoom);
+    view.x = scroll.value / scroll.max * maxX;
+    update();
+  });
+  window.addEventListener('resize', resize);
+
+  resize();
+  view.zoom = Math.min(1, screen.height / layout.height);
+  update();
+})();
+</script>
+</body>
+</html>
+"""
+
+
+def _get_layout_table(layout: _types.CircuitLayout) -> dict:
+    """Encode the layout of a circuit in the compact table embedded in HTML.
+
+    The instructions are sorted by column and flattened in a single integer
+    array. Each instruction is encoded as
+        glyph, label, #controls, #qubits, qubits..., #clbits, clbits...,
+        condition, #condition clbits, condition clbits...
+    where the bits are given as drawn rows and the labels as indices in a
+    table of unique labels. The column_offsets array stores, for each column,
+    the position of its first instruction in the flat array. As in
+    draw_layout, the table has one more column than the layout: a barrier or
+    an instruction without glyph can be conditioned in the last column, and
+    the columns counted by the layout end at the last drawn instruction.
+
+    :param layout: the layout of the circuit.
+    :return: the layout table, ready to be serialised in JSON.
+    """
+    qubit_rows, clbit_rows = layout.qubit_rows, layout.clbit_rows
+    label_ids = dict()
+    # Counting sort of the instructions by column.
+    columns = [list() for _ in range(layout.columns + 1)]
+    for gate in layout.gates:
+        if gate.glyph in (_layout.GLYPH_BARRIER, _layout.GLYPH_NONE) and \
+                not gate.condition_clbits:
+            continue
+        label = label_ids.setdefault(gate.label, len(label_ids))
+        # Only the condition of a barrier is drawn, as for GLYPH_NONE.
+        glyph = _layout.GLYPH_NONE if gate.glyph == _layout.GLYPH_BARRIER \
+            else gate.glyph
+        record = [_GLYPHS.index(glyph), label, gate.controls,
+                  len(gate.qubits)]
+        record.extend(qubit_rows[qubit] for qubit in gate.qubits)
+        record.append(len(gate.clbits))
+        record.extend(clbit_rows[clbit] for clbit in gate.clbits)
+        record.append(-1 if gate.condition is None else gate.condition)
+        record.append(len(gate.condition_clbits))
+        record.extend(clbit_rows[clbit] for clbit in gate.condition_clbits)
+        columns[gate.column].extend(record)
+
+    gates, column_offsets = list(), [0]
+    for column in columns:
+        gates.extend(column)
+        column_offsets.append(len(gates))
+
+    width, height = _helpers.get_dimensions_from_sizes(
+        layout.columns, layout.qubits_number + layout.clbits_number)
+    geometry = {
+        'gate_size': _constants.GATE_SIZE,
+        'gate_inside_margin': _constants.GATE_INSIDE_MARGIN,
+        'control_gate_size': _constants.CONTROL_GATE_SIZE,
+        'measure_gate_clbit_size': _constants.MEASURE_GATE_CLBIT_SIZE,
+        'stroke_thickness': _constants.STROKE_THICKNESS,
+        'double_lines_separation': _constants.DOUBLE_LINES_SEPARATION,
+        'register_name_width': _constants.REGISTER_NAME_WIDTH,
+        'register_name_right_border': _constants.REGISTER_NAME_RIGHT_BORDER,
+        'register_name_borders': (_constants.REGISTER_NAME_LEFT_BORDER +
+                                  _constants.REGISTER_NAME_RIGHT_BORDER),
+        'register_name_font_size': _constants.REGISTER_NAME_FONT_SIZE,
+        'max_register_name_height': _constants.MAX_REGISTER_NAME_HEIGHT,
+        'gates_origin': (_constants.REGISTER_NAME_WIDTH +
+                         _constants.GATE_LEFT_BORDER),
+        'column_width': (_constants.GATE_SIZE +
+                         _constants.GATE_HORIZONTAL_SPACING),
+        'vertical_border': _constants.VERTICAL_BORDER,
+        'row_height': _constants.REGISTER_LINES_VERTICAL_SPACING,
+        'center_vertically': _constants.FONT_SIZE_CENTER_VERTICALLY_MULTIPLIER,
+        'font_size_reduction_for_controlled_gates':
+            _constants.FONT_SIZE_REDUCTION_FACTOR_FOR_CONTROLLED_GATES}
+
+    return {'width': width, 'height': height, 'columns': layout.columns,
+            'qubits_number': layout.qubits_number,
+            'clbits_number': layout.clbits_number,
+            'qubit_labels': layout.qubit_labels,
+            'clbit_labels': layout.clbit_labels,
+            'glyphs': _GLYPHS, 'labels': sorted(label_ids, key=label_ids.get),
+            'geometry': geometry, 'column_offsets': column_offsets,
+            'gates': gates}
+
+
+@metrics.instrument('html')
+def qasm2html(qasm_str: str,
+              basis: str = ('id,u0,u1,u2,u3,x,y,z,h,s,sdg,t,tdg,rx,ry,rz,'
+                            'cx,cy,cz,ch,crz,cu1,cu3,swap,ccx'),
+              show_clbits: bool = True, title: str = 'Quantum circuit',
+              vectorize: bool = False, processes: int = 1) -> str:
+    """Transform a QASM code to an interactive HTML page.
+
+    This method output a standalone HTML page that displays the quantum
+    circuit provided as a QASM program. The page only draws the visible part
+    of the circuit, which makes it usable for circuits too deep to be
+    displayed as a single SVG or PNG image. Scroll with the mouse wheel (or
+    the slider at the bottom of the page), pan by dragging and zoom with
+    Ctrl + mouse wheel.
+
+    Remark: not all gates are implemented. If a gate is not implemented
+            then a message will be printed to warn the user and the gate
+            will not be drawn in the HTML page.
+            If you want to implement more gates see the register_gate
+            function in ./svg/_layout.py.
+
+    Args:
+        qasm_str    (str) : The QASM quantum circuit to draw in HTML.
+        basis       (str) : The gate basis used to represent the circuit as a
+                            comma-separated string of names.
+        show_clbits (bool): Flag that control the drawing of classical bit
+                            lines.
+        title       (str) : The title of the HTML page.
+        vectorize   (bool): If True, the layout is computed with NumPy, see
+                            qasm2svg.
+        processes   (int) : Number of processes computing the layout, see
+                            qasm2svg.
+
+    Returns:
+        str: The HTML page displaying the given QASM circuit.
+    """
+
+    json_circuit = _parsing.qasm2json(qasm_str, basis)
+    layout = _layout.layout_json_circuit(json_circuit, show_clbits=show_clbits,
+                                         vectorize=vectorize,
+                                         processes=processes)
+    return _layout2html(layout, title)
+
+
+def _layout2html(layout: _types.CircuitLayout, title: str) -> str:
+    """Build the HTML page displaying a circuit whose layout is computed.
+
+    :param layout: the layout of the circuit.
+    :param title: the title of the HTML page.
+    :return: the HTML page, see qasm2html.
+    """
+    table = json.dumps(_get_layout_table(layout), separators=(',', ':'))
+    # Avoid closing the <script> tag if a label contains "</".
+    table = table.replace('</', '<\\/')
+
+    return _HTML_TEMPLATE.replace(_TITLE_PLACEHOLDER, html.escape(title)) \
+        .replace(_LAYOUT_PLACEHOLDER, table)
@@ -0,0 +1,437 @@
+# ======================================================================
+# Copyright CERFACS (October 2018)
+# Contributor: Adrien Suau (suau@cerfacs.fr)
+#
+# This software is governed by the CeCILL-B license under French law and
+# abiding  by the  rules of  distribution of free software. You can use,
+# modify  and/or  redistribute  the  software  under  the  terms  of the
+# CeCILL-B license as circulated by CEA, CNRS and INRIA at the following
+# URL "http://www.cecill.info".
+#
+# As a counterpart to the access to  the source code and rights to copy,
+# modify and  redistribute granted  by the  license, users  are provided
+# only with a limited warranty and  the software's author, the holder of
+# the economic rights,  and the  successive licensors  have only limited
+# liability.
+#
+# In this respect, the user's attention is drawn to the risks associated
+# with loading,  using, modifying and/or  developing or reproducing  the
+# software by the user in light of its specific status of free software,
+# that  may mean  that it  is complicated  to manipulate,  and that also
+# therefore  means that  it is reserved for  developers and  experienced
+# professionals having in-depth  computer knowledge. Users are therefore
+# encouraged  to load and  test  the software's  suitability as  regards
+# their  requirements  in  conditions  enabling  the  security  of their
+# systems  and/or  data to be  ensured and,  more generally,  to use and
+# operate it in the same conditions as regards security.
+#
+# The fact that you  are presently reading this  means that you have had
+# knowledge of the CeCILL-B license and that you accept its terms.
+# ======================================================================
+
+
+"""This module provide the qasm2layout function.
+
+The layout output only contains the computed layout of a circuit, so that it
+can be drawn by another renderer, for example in a web browser, without
+shipping the drawn image. It exists in two forms.
+
+The JSON form is a single object:
+
+    {"format": "qasm2image-layout", "version": 1,
+     "width": ..., "height": ..., "columns": ...,
+     "qubits_number": ..., "clbits_number": ...,
+     "qubit_labels": [...], "clbit_labels": [...],
+     "instructions": [{"column": ..., "glyph": ..., "label": ...,
+                       "controls": ..., "qubits": [...], "clbits": [...],
+                       "condition": ..., "condition_clbits": [...]}, ...]}
+
+where the instructions are sorted by column, the bits are given as drawn rows
+(the classical bit rows being counted from the first classical bit line),
+glyph is one of the GLYPH_* constants of svg/_layout.py and condition is
+null for instructions that are not classically controlled. Barriers and
+instructions that are not drawn are left out, except for their condition:
+a conditioned barrier is given with the "none" glyph. As the barriers are
+laid out after the gates they follow, its column can be the number of
+columns.
+
+The binary form stores the same data in little-endian arrays that can be
+memory-mapped and sliced by column range without being parsed:
+
+    header          HEADER_FORMAT, see below
+    column offsets  (columns + 2) uint32, the index of the first record of
+                    each column and of the column following the last one,
+                    followed by the number of records
+    records         RECORD_FORMAT, one per instruction, sorted by column
+    bits            uint32, the qubits, clbits and condition clbits of each
+                    record, starting at the bits offset of the record
+    labels          a string table with the gate labels
+    qubit labels    a string table with the qubit labels
+    clbit labels    a string table with the classical bit labels
+
+A string table is the uint32 number of strings, followed by (strings + 1)
+uint32 offsets in the UTF-8 data that follows them. Each section starts at a
+multiple of 8 bytes.
+"""
+
+import io
+import json
+import struct
+from typing import (BinaryIO, Dict, List, NamedTuple, Optional, Sequence,
+                    Tuple, Union)
+
+from qasm2image import _parsing, metrics
+from qasm2image.svg import _helpers, _layout, _types
+
+FORMAT_NAME = 'qasm2image-layout'
+FORMAT_VERSION = 1
+
+# Glyphs of the binary form. The position of a glyph in this list is the
+# integer used to encode it.
+GLYPHS = (_layout.GLYPH_NONE, _layout.GLYPH_GATE,
+          _layout.GLYPH_CONTROLLED_GATE, _layout.GLYPH_CNOT,
+          _layout.GLYPH_SWAP, _layout.GLYPH_MEASURE)
+
+MAGIC = b'Q2IL'
+# magic, version, columns, qubits_number, clbits_number, width, height,
+# number of records and the byte offsets of the sections: column offsets,
+# records, bits, labels, qubit labels and clbit labels.
+HEADER_FORMAT = struct.Struct('<4sI12I')
+# column, glyph, controls, qubits count, label index, bits offset,
+# condition (-1 if none), clbits count, condition clbits count.
+RECORD_FORMAT = struct.Struct('<IBBHIIqHH4x')
+
+_UINT32 = struct.Struct('<I')
+
+BinaryHeader = NamedTuple('BinaryHeader', [
+    ('magic', bytes),
+    ('version', int),
+    ('columns', int),
+    ('qubits_number', int),
+    ('clbits_number', int),
+    ('width', int),
+    ('height', int),
+    ('records_number', int),
+    ('column_offsets_offset', int),
+    ('records_offset', int),
+    ('bits_offset', int),
+    ('labels_offset', int),
+    ('qubit_labels_offset', int),
+    ('clbit_labels_offset', int)])
+"""Decoded header of the binary form, see HEADER_FORMAT."""
+
+
+def _get_drawn_gates(layout: _types.CircuitLayout) -> \
+        List[_types.GateLayout]:
+    """Return the drawn instructions of a layout, sorted by column.
+
+    Only the condition of a barrier is drawn, in the column following the
+    gates before it, so the barriers are given the GLYPH_NONE glyph and one
+    more column is needed.
+    """
+    columns = [list() for _ in range(layout.columns + 1)]
+    for gate in layout.gates:
+        if gate.glyph in (_layout.GLYPH_BARRIER, _layout.GLYPH_NONE) and \
+                not gate.condition_clbits:
+            continue
+        if gate.glyph == _layout.GLYPH_BARRIER:
+            gate = gate._replace(glyph=_layout.GLYPH_NONE)
+        columns[gate.column].append(gate)
+    return [gate for column in columns for gate in column]
+
+
+def layout2dict(layout: _types.CircuitLayout) -> dict:
+    """Build the JSON form of a layout, as a Python dictionary.
+
+    :param layout: the layout of the circuit, see
+    _layout.layout_json_circuit.
+    :return: the dictionary described in the documentation of this module.
+    """
+    qubit_rows, clbit_rows = layout.qubit_rows, layout.clbit_rows
+    width, height = _helpers.get_dimensions_from_sizes(
+        layout.columns, layout.qubits_number + layout.clbits_number)
+    instructions = [
+        {'column': gate.column, 'glyph': gate.glyph, 'label': gate.label,
+         'controls': gate.controls,
+         'qubits': [qubit_rows[qubit] for qubit in gate.qubits],
+         'clbits': [clbit_rows[clbit] for clbit in gate.clbits],
+         'condition': gate.condition,
+         'condition_clbits': [clbit_rows[clbit]
+                              for clbit in gate.condition_clbits]}
+        for gate in _get_drawn_gates(layout)]
+    return {'format': FORMAT_NAME, 'version': FORMAT_VERSION,
+            'width': width, 'height': height, 'columns': layout.columns,
+            'qubits_number': layout.qubits_number,
+            'clbits_number': layout.clbits_number,
+            'qubit_labels': list(layout.qubit_labels),
+            'clbit_labels': list(layout.clbit_labels),
+            'instructions': instructions}
+
+
+def _pad(data: bytes) -> bytes:
+    return data + bytes(-len(data) % 8)
+
+
+def _pack_uint32(values: Sequence[int]) -> bytes:
+    return struct.pack('<{}I'.format(len(values)), *values)
+
+
+def _pack_strings(strings: Sequence[str]) -> bytes:
+    encoded = [string.encode('utf-8') for string in strings]
+    offsets = [0]
+    for data in encoded:
+        offsets.append(offsets[-1] + len(data))
+    return _pack_uint32([len(encoded)] + offsets) + b''.join(encoded)
+
+
+def _encode_gate(gate: _types.GateLayout, label: int, bits_start: int,
+                 qubit_rows: Sequence[int],
+                 clbit_rows: Sequence[int]) -> Tuple[bytes, List[int]]:
+    """Encode a gate as a record and the list of its bits."""
+    condition = -1 if gate.condition is None else gate.condition
+    if condition >= 1 << 63:
+        raise ValueError("The condition {} is too large for the binary "
+                         "layout format.".format(condition))
+    record = RECORD_FORMAT.pack(
+        gate.column, GLYPHS.index(gate.glyph), gate.controls, len(gate.qubits),
+        label, bits_start, condition, len(gate.clbits),
+        len(gate.condition_clbits))
+    bits = [qubit_rows[qubit] for qubit in gate.qubits]
+    bits.extend(clbit_rows[clbit] for clbit in gate.clbits)
+    bits.extend(clbit_rows[clbit] for clbit in gate.condition_clbits)
+    return record, bits
+
+
+def write_binary_layout(layout: _types.CircuitLayout,
+                        write_to: BinaryIO) -> None:
+    """Write the binary form of a layout to a stream.
+
+    The records and the bits are written as they are encoded, so the binary
+    form is never held in memory as a whole.
+
+    :param layout: the layout of the circuit, see
+    _layout.layout_json_circuit.
+    :param write_to: a writable binary stream.
+    :raise ValueError: if a condition does not fit in a signed 64-bit integer.
+    """
+    gates = _get_drawn_gates(layout)
+    # First pass: sizes of the sections.
+    label_ids = dict()  # type: Dict[str, int]
+    column_offsets = [0] * (layout.columns + 2)
+    bits_number = 0
+    for gate in gates:
+        label_ids.setdefault(gate.label, len(label_ids))
+        column_offsets[gate.column + 1] += 1
+        bits_number += (len(gate.qubits) + len(gate.clbits) +
+                        len(gate.condition_clbits))
+    # Cumulative sum of the number of records of each column.
+    for column in range(layout.columns + 1):
+        column_offsets[column + 1] += column_offsets[column]
+    tables = [_pad(_pack_strings(sorted(label_ids, key=label_ids.get))),
+              _pad(_pack_strings(layout.qubit_labels)),
+              _pad(_pack_strings(layout.clbit_labels))]
+    sizes = [4 * len(column_offsets), RECORD_FORMAT.size * len(gates),
+             4 * bits_number] + [len(table) for table in tables]
+    section_offsets, offset = list(), HEADER_FORMAT.size
+    for size in sizes:
+        section_offsets.append(offset)
+        offset += size + (-size % 8)
+
+    # Second pass: the sections.
+    width, height = _helpers.get_dimensions_from_sizes(
+        layout.columns, layout.qubits_number + layout.clbits_number)
+    write_to.write(_pad(HEADER_FORMAT.pack(
+        MAGIC, FORMAT_VERSION, layout.columns, layout.qubits_number,
+        layout.clbits_number, width, height, len(gates), *section_offsets)))
+    write_to.write(_pad(_pack_uint32(column_offsets)))
+    del column_offsets
+    bits_start = 0
+    for gate in gates:
+        record, bits = _encode_gate(gate, label_ids[gate.label], bits_start,
+                                    layout.qubit_rows, layout.clbit_rows)
+        write_to.write(record)
+        bits_start += len(bits)
+    for gate in gates:
+        _, bits = _encode_gate(gate, 0, 0, layout.qubit_rows,
+                               layout.clbit_rows)
+        write_to.write(_pack_uint32(bits))
+    write_to.write(bytes(-bits_number * 4 % 8))
+    for table in tables:
+        write_to.write(table)
+
+
+def layout2binary(layout: _types.CircuitLayout) -> bytes:
+    """Build the binary form of a layout.
+
+    :param layout: the layout of the circuit, see
+    _layout.layout_json_circuit.
+    :return: the binary form described in the documentation of this module.
+    :raise ValueError: if a condition does not fit in a signed 64-bit integer.
+    """
+    output = io.BytesIO()
+    write_binary_layout(layout, output)
+    return output.getvalue()
+
+
+def _unpack_strings(data: memoryview, offset: int) -> List[str]:
+    """Decode all the strings of a string table."""
+    number = _UINT32.unpack_from(data, offset)[0]
+    return [_unpack_string(data, offset, index) for index in range(number)]
+
+
+def _unpack_string(data: memoryview, offset: int, index: int) -> str:
+    """Decode the string of a string table without reading the others."""
+    number = _UINT32.unpack_from(data, offset)[0]
+    begin, end = struct.unpack_from('<2I', data, offset + 4 * (index + 1))
+    start = offset + 4 * (number + 2)
+    return bytes(data[start + begin:start + end]).decode('utf-8')
+
+
+def read_binary_header(data: Union[bytes, memoryview]) -> BinaryHeader:
+    """Decode the header of a binary layout.
+
+    :param data: the binary form of a layout, see layout2binary.
+    :return: the decoded header.
+    :raise ValueError: if data is not a binary layout of a supported version.
+    """
+    if len(data) < HEADER_FORMAT.size:
+        raise ValueError("Not a binary layout: too short.")
+    header = BinaryHeader(*HEADER_FORMAT.unpack_from(data))
+    if header.magic != MAGIC or header.version != FORMAT_VERSION:
+        raise ValueError("Not a binary layout of version {}."
+                         .format(FORMAT_VERSION))
+    return header
+
+
+def read_binary_instructions(data: Union[bytes, memoryview],
+                             header: BinaryHeader, first_column: int = 0,
+                             last_column: int = None) -> List[dict]:
+    """Decode the instructions of a column range from a binary layout.
+
+    Only the requested records, their bits and their labels are read, so
+    data can be a memory-mapped file (mmap.mmap) of any size.
+
+    :param data: the binary form of a layout, see layout2binary.
+    :param header: the header of data, see read_binary_header.
+    :param first_column: the first column of the range.
+    :param last_column: the column following the range, by default all the
+    columns.
+    :return: the instructions of the columns [first_column, last_column), in
+    the JSON form (see layout2dict).
+    """
+    # A conditioned barrier can follow the last column.
+    columns = header.columns + 1
+    if last_column is None:
+        last_column = columns
+    first_column = min(max(first_column, 0), columns)
+    last_column = min(max(last_column, first_column), columns)
+    first_record, = _UINT32.unpack_from(
+        data, header.column_offsets_offset + 4 * first_column)
+    last_record, = _UINT32.unpack_from(
+        data, header.column_offsets_offset + 4 * last_column)
+
+    labels = dict()  # type: Dict[int, str]
+    instructions = list()
+    for record in range(first_record, last_record):
+        (column, glyph, controls, qubits_count, label, bits_start, condition,
+         clbits_count, condition_clbits_count) = RECORD_FORMAT.unpack_from(
+             data, header.records_offset + RECORD_FORMAT.size * record)
+        if label not in labels:
+            labels[label] = _unpack_string(data, header.labels_offset, label)
+        bits_count = qubits_count + clbits_count + condition_clbits_count
+        bits = struct.unpack_from('<{}I'.format(bits_count), data,
+                                  header.bits_offset + 4 * bits_start)
+        instructions.append({
+            'column': column, 'glyph': GLYPHS[glyph], 'label': labels[label],
+            'controls': controls, 'qubits': list(bits[:qubits_count]),
+            'clbits': list(bits[qubits_count:qubits_count + clbits_count]),
+            'condition': None if condition < 0 else condition,
+            'condition_clbits': list(bits[qubits_count + clbits_count:])})
+    return instructions
+
+
+def read_binary_layout(data: Union[bytes, memoryview], first_column: int = 0,
+                       last_column: int = None) -> dict:
+    """Decode the instructions of a column range from a binary layout.
+
+    Only the header, the register labels and the requested records, bits and
+    labels are read, so data can be a memory-mapped file (mmap.mmap) of any
+    size. See also layout_index.LayoutIndex.
+
+    :param data: the binary form of a layout, see layout2binary.
+    :param first_column: the first column of the range.
+    :param last_column: the column following the range, by default all the
+    columns.
+    :return: the JSON form of the layout (see layout2dict), with only the
+    instructions of the columns [first_column, last_column).
+    :raise ValueError: if data is not a binary layout of a supported version.
+    """
+    data = memoryview(data)
+    header = read_binary_header(data)
+    return {'format': FORMAT_NAME, 'version': FORMAT_VERSION,
+            'width': header.width, 'height': header.height,
+            'columns': header.columns,
+            'qubits_number': header.qubits_number,
+            'clbits_number': header.clbits_number,
+            'qubit_labels': _unpack_strings(data, header.qubit_labels_offset),
+            'clbit_labels': _unpack_strings(data, header.clbit_labels_offset),
+            'instructions': read_binary_instructions(data, header,
+                                                     first_column,
+                                                     last_column)}
+
+
+@metrics.instrument('layout')
+def qasm2layout(qasm_str: str,
+                basis: str = ('id,u0,u1,u2,u3,x,y,z,h,s,sdg,t,tdg,rx,ry,rz,'
+                              'cx,cy,cz,ch,crz,cu1,cu3,swap,ccx'),
+                show_clbits: bool = True, binary: bool = False,
+                write_to: Union[str, BinaryIO] = None,
+                vectorize: bool = False, processes: int = 1) -> \
+        Optional[Union[str, bytes]]:
+    """Compute the layout of a QASM code, for client-side rendering.
+
+    Remark: not all gates are implemented. If a gate is not implemented
+            then a message will be printed to warn the user and the gate
+            will not be in the layout.
+            If you want to implement more gates see the register_gate
+            function in ./svg/_layout.py.
+
+    Args:
+        qasm_str    (str) : The QASM quantum circuit to lay out.
+        basis       (str) : The gate basis used to represent the circuit as a
+                            comma-separated string of names.
+        show_clbits (bool): Flag that control the drawing of classical bit
+                            lines.
+        binary      (bool): If True, the binary form of the layout is
+                            produced instead of the JSON one. See the
+                            documentation of this module.
+        write_to    (str or file): If given, the layout is written to this
+                            path or writable binary stream instead of being
+                            returned.
+        vectorize   (bool): If True, the layout is computed with NumPy, see
+                            qasm2svg.
+        processes   (int) : Number of processes computing the layout, see
+                            qasm2svg.
+
+    Returns:
+        str or bytes: The JSON or binary form of the layout, or None if
+                      write_to is given.
+    """
+    json_circuit = _parsing.qasm2json(qasm_str, basis)
+    layout = _layout.layout_json_circuit(json_circuit, show_clbits=show_clbits,
+                                         vectorize=vectorize,
+                                         processes=processes)
+    if binary:
+        output = layout2binary(layout)
+    else:
+        output = json.dumps(layout2dict(layout), separators=(',', ':'))
+    if write_to is None:
+        return output
+    if isinstance(output, str):
+        output = output.encode('utf-8')
+    if isinstance(write_to, str):
+        with open(write_to, 'wb') as output_file:
+            output_file.write(output)
+    else:
+        write_to.write(output)
+    return None
@@ -29,17 +29,25 @@
 # knowledge of the CeCILL-B license and that you accept its terms.
 # ======================================================================
 
-"""This module provide the qasm2pdf function."""
+"""This module provide the qasm2pdf and qasms2pdf functions."""
+
+import itertools
+from typing import BinaryIO, Iterable, Optional, Union
 
 from cairosvg import svg2pdf
 
-from qasm2image import qasm2svg
+from qasm2image import _pages, metrics, qasm2svg
 
 
+@metrics.instrument('pdf')
 def qasm2pdf(qasm_str: str,
              basis: str = ('id,u0,u1,u2,u3,x,y,z,h,s,sdg,t,tdg,rx,ry,rz,'
                            'cx,cy,cz,ch,crz,cu1,cu3,swap,ccx'),
-             show_clbits: bool = True, scale: float = 1.0) -> bytes:
+             show_clbits: bool = True, scale: float = 1.0,
+             write_to: Union[str, BinaryIO] = None,
+             columns_per_page: int = None,
+             collapse_repeats: bool = False, vectorize: bool = False,
+             processes: int = 1) -> Optional[bytes]:
     """Transform a QASM code to a PDF file.
 
     This method output the PDF representation of the quantum circuit
@@ -48,8 +56,8 @@ def qasm2pdf(qasm_str: str,
     Remark: not all gates are implemented. If a gate is not implemented
             then a message will be printed to warn the user and the gate
             will not be drawn in the PDF.
-            If you want to implement more gates see the _draw_gate method
-            in ./svg/drawing.py.
+            If you want to implement more gates see the register_gate
+            function in ./svg/_layout.py.
 
     Args:
         qasm_str    (str)  : The QASM quantum circuit to draw in PDF.
@@ -58,16 +66,96 @@ def qasm2pdf(qasm_str: str,
                              lines.
         scale       (float): The scaling imposed to the produced PostScript
         file.
+        write_to    (str or file): If given, the PDF is written directly to
+                             this path or writable binary stream instead of
+                             being returned, so that the whole file is never
+                             held in memory.
+
+        columns_per_page (int): If given, the circuit is split into pages
+                             of at most columns_per_page columns, each page
+                             repeating the register names. The pages are
+                             drawn and written one by one.
+        collapse_repeats (bool): If True, the blocks of instructions repeated
+                             consecutively are drawn once, in a box annotated
+                             with the number of repetitions.
+        vectorize   (bool) : If True, the layout is computed with NumPy, see
+                             qasm2svg.
+        processes   (int)  : Number of processes computing the layout, see
+                             qasm2svg.
 
     Returns:
-        bytes: The PDF representation of the given QASM circuit.
+        bytes: The PDF representation of the given QASM circuit, or None if
+               write_to is given.
     """
 
+    if columns_per_page is not None:
+        svgs = _pages.qasm2svg_pages(qasm_str, basis, show_clbits,
+                                     columns_per_page, collapse_repeats,
+                                     vectorize, processes)
+        return _pages.svgs2document(svgs, 'pdf', scale, write_to)
+
     # Generate the SVG first.
     svg, (_, _) = qasm2svg.qasm2svg(qasm_str, basis=basis,
                                     show_clbits=show_clbits,
-                                    output_dimensions=True)
+                                    output_dimensions=True,
+                                    collapse_repeats=collapse_repeats,
+                                    vectorize=vectorize, processes=processes)
     # And generate PDF
-    pdf_bytes = svg2pdf(bytestring=svg.encode('utf-8'), scale=scale)
+    pdf_bytes = svg2pdf(bytestring=svg.encode('utf-8'), scale=scale,
+                        write_to=write_to)
 
     return pdf_bytes
+
+
+@metrics.instrument('pdf')
+def qasms2pdf(qasm_strs: Iterable[str],
+              basis: str = ('id,u0,u1,u2,u3,x,y,z,h,s,sdg,t,tdg,rx,ry,rz,'
+                            'cx,cy,cz,ch,crz,cu1,cu3,swap,ccx'),
+              show_clbits: bool = True, scale: float = 1.0,
+              write_to: Union[str, BinaryIO] = None,
+              columns_per_page: int = None,
+              collapse_repeats: bool = False, vectorize: bool = False,
+              processes: int = 1) -> Optional[bytes]:
+    """Transform several QASM codes to a single multi-page PDF file.
+
+    Each circuit is drawn on its own page. All the pages are drawn on the
+    same cairo surface, so the fonts are embedded only once, and each page
+    is written as soon as it is drawn: qasm_strs can be a generator reading
+    the circuits one by one.
+
+    Args:
+        qasm_strs   (Iterable[str]): The QASM quantum circuits to draw.
+        basis       (list) : The gate basis used to represent the circuits.
+        show_clbits (bool) : Flag that control the drawing of classical bit
+                             lines.
+        scale       (float): The scaling imposed to the pages.
+        write_to    (str or file): If given, the PDF is written directly to
+                             this path or writable binary stream instead of
+                             being returned.
+
+        columns_per_page (int): If given, each circuit is split into
+                             pages of at most columns_per_page columns.
+        collapse_repeats (bool): If True, the blocks of instructions repeated
+                             consecutively are drawn once, in a box annotated
+                             with the number of repetitions.
+        vectorize   (bool) : If True, the layout is computed with NumPy, see
+                             qasm2svg.
+        processes   (int)  : Number of processes computing the layout, see
+                             qasm2svg.
+
+    Returns:
+        bytes: The PDF document, or None if write_to is given.
+    """
+    if columns_per_page is not None:
+        svgs = itertools.chain.from_iterable(
+            _pages.qasm2svg_pages(qasm_str, basis, show_clbits,
+                                  columns_per_page, collapse_repeats,
+                                  vectorize, processes)
+            for qasm_str in qasm_strs)
+    else:
+        svgs = (qasm2svg.qasm2svg(qasm_str, basis=basis,
+                                  show_clbits=show_clbits,
+                                  collapse_repeats=collapse_repeats,
+                                  vectorize=vectorize, processes=processes)
+                for qasm_str in qasm_strs)
+    return _pages.svgs2document(svgs, 'pdf', scale, write_to)
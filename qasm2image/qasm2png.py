@@ -32,18 +32,26 @@
 """This module provide the qasm2png function."""
 
 from math import sqrt
+from typing import BinaryIO, Optional, Union
 
 from cairocffi import CairoError
-from cairosvg import svg2png
+from cairosvg.parser import Tree
+from cairosvg.surface import PNGSurface
 
-from qasm2image import qasm2svg
+from qasm2image import _png, _trees, metrics, qasm2svg
 from qasm2image.svg import _constants as constants
 
 
+@metrics.instrument('png')
 def qasm2png(qasm_str: str,
              basis: str = ('id,u0,u1,u2,u3,x,y,z,h,s,sdg,t,tdg,rx,ry,rz,'
                            'cx,cy,cz,ch,crz,cu1,cu3,swap,ccx'),
-             show_clbits: bool = True, scale: float = 1.0) -> bytes:
+             show_clbits: bool = True, scale: float = 1.0,
+             write_to: Union[str, BinaryIO] = None, color_mode: str = None,
+             compresslevel: int = 6, background: str = None,
+             pixel_width: int = None, dpi: float = None,
+             collapse_repeats: bool = False, vectorize: bool = False,
+             processes: int = 1) -> Optional[bytes]:
     """Transform a QASM code to a PNG file.
 
     This method output the PNG representation of the quantum circuit
@@ -52,8 +60,8 @@ def qasm2png(qasm_str: str,
     Remark: not all gates are implemented. If a gate is not implemented
             then a message will be printed to warn the user and the gate
             will not be drawn in the PNG.
-            If you want to implement more gates see the _draw_gate method
-            in ./svg/drawing.py.
+            If you want to implement more gates see the register_gate
+            function in ./svg/_layout.py.
 
     Args:
         qasm_str    (str)  : The QASM quantum circuit to draw in PNG.
@@ -61,11 +69,42 @@ def qasm2png(qasm_str: str,
         show_clbits (bool) : Flag that control the drawing of classical bit
                              lines.
         scale       (float): The scaling imposed to the produced PNG file.
+        write_to    (str or file): If given, the PNG is written directly to
+                             this path or writable binary stream instead of
+                             being returned, so that the whole file is never
+                             held in memory.
+        color_mode  (str)  : If given, the PNG is encoded by qasm2image
+                             instead of cairo, with one of the colour modes
+                             'rgba', 'rgb', 'gray' (8-bit grayscale),
+                             'bilevel' (1-bit black and white) or 'palette'.
+                             See _png.argb2png.
+        compresslevel (int): The zlib compression level, from 0 to 9, of a
+                             PNG encoded by qasm2image.
+        background  (str)  : If given, the colour painted below the circuit.
+                             By default, only 'rgba' PNG files have a
+                             transparent background. The colour modes other
+                             than 'rgba' and the background need cairosvg
+                             2.2 or later.
+        pixel_width (int)  : If given, the width of the PNG in pixels. It
+                             replaces scale.
+        dpi         (float): If given, the resolution of the PNG. It replaces
+                             scale, a dpi of 96 giving a scale of 1, and is
+                             stored in the PNG encoded by qasm2image.
+        collapse_repeats (bool): If True, the blocks of instructions repeated
+                             consecutively are drawn once, in a box annotated
+                             with the number of repetitions.
+        vectorize   (bool) : If True, the layout is computed with NumPy, see
+                             qasm2svg.
+        processes   (int)  : Number of processes computing the layout, see
+                             qasm2svg.
 
     Returns:
-        bytes: The PNG representation of the given QASM circuit.
+        bytes: The PNG representation of the given QASM circuit, or None if
+               write_to is given.
 
     Raises:
+        ValueError: if the colour mode is unknown, or if the circuit cannot
+                    be written in a palette PNG.
         CairoError: if cairo (the backend used to transform SVG to PNG)
                     failed at one step. The error resulting of an
                     invalid size (typically raised because the output
@@ -76,7 +115,45 @@ def qasm2png(qasm_str: str,
     # Generate the SVG first.
     svg, (width, height) = qasm2svg.qasm2svg(qasm_str, basis=basis,
                                              show_clbits=show_clbits,
-                                             output_dimensions=True)
+                                             output_dimensions=True,
+                                             collapse_repeats=collapse_repeats,
+                                             vectorize=vectorize,
+                                             processes=processes)
+    return _svg2png(svg, width, height, scale, write_to, color_mode,
+                    compresslevel, background, pixel_width, dpi)
+
+
+def _svg2png(svg: Union[str, Tree], width: int, height: int, scale: float,
+             write_to: Union[str, BinaryIO] = None, color_mode: str = None,
+             compresslevel: int = 6, background: str = None,
+             pixel_width: int = None, dpi: float = None) -> Optional[bytes]:
+    """Transform the SVG generated for a circuit to PNG.
+
+    Args:
+        svg         (str or Tree): The SVG representation of the circuit,
+                             possibly already parsed by cairosvg.
+        width       (int)  : The width of the SVG, in pixels.
+        height      (int)  : The height of the SVG, in pixels.
+        scale       (float): See qasm2png.
+        write_to    (str or file): See qasm2png.
+        color_mode  (str)  : See qasm2png.
+        compresslevel (int): See qasm2png.
+        background  (str)  : See qasm2png.
+        pixel_width (int)  : See qasm2png.
+        dpi         (float): See qasm2png.
+
+    Returns:
+        bytes: See qasm2png.
+    """
+    if pixel_width is not None:
+        scale = pixel_width / width
+    elif dpi is not None:
+        scale = dpi / _trees.SVG_DPI
+    if color_mode is None and background is not None:
+        color_mode = 'rgba'
+    # The SVG is parsed once, even if the scaling has to be reduced.
+    tree = _trees.parse(svg)
+
     # Adapt scaling if needed
     # Here scale is a square root because the scaling coefficient will be
     # applied
@@ -87,11 +164,17 @@ def qasm2png(qasm_str: str,
     succeed = False
     while not succeed:
         try:
-            png_bytes = svg2png(bytestring=svg.encode('utf-8'), scale=scale)
+            if color_mode is None:
+                png_bytes = _trees.render(PNGSurface, tree, scale, write_to)
+            else:
+                png_bytes = _png.tree2png(tree, scale, color_mode,
+                                          compresslevel, background, dpi,
+                                          write_to)
         except CairoError as cairo_error:
             # If the error is caused by a too huge size then reduce the scaling
             if 'CAIRO_STATUS_INVALID_SIZE' in str(cairo_error):
                 scale /= 2
+                metrics.increment('qasm2image_png_scale_reductions_total')
             # Else, raise again the exception to warn the calling context
             else:
                 raise cairo_error
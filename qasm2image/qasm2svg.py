@@ -38,15 +38,20 @@ from typing import Tuple, Union
 
 import qiskit
 
-from qasm2image.svg import _drawing
+from qasm2image import _parsing, metrics
+from qasm2image.svg import _compact, _drawing
 
 QubitType = Tuple[qiskit.QuantumRegister, int]
 
 
+@metrics.instrument('svg')
 def qasm2svg(qasm_str: str,
              basis: str = ('id,u0,u1,u2,u3,x,y,z,h,s,sdg,t,tdg,rx,ry,rz,'
                            'cx,cy,cz,ch,crz,cu1,cu3,swap,ccx'),
-             show_clbits: bool = True, output_dimensions: bool = False) -> \
+             show_clbits: bool = True, output_dimensions: bool = False,
+             compact: bool = False, precision: int = 1,
+             collapse_repeats: bool = False, vectorize: bool = False,
+             processes: int = 1) -> \
     Union[str, Tuple[str, Tuple[int, int]]]:
     """Transform a QASM code to an SVG file.
 
@@ -56,8 +61,8 @@ def qasm2svg(qasm_str: str,
     Remark: not all gates are implemented. If a gate is not implemented
             then a message will be printed to warn the user and the gate
             will not be drawn in the SVG.
-            If you want to implement more gates see the _draw_gate method
-            in ./svg/drawing.py.
+            If you want to implement more gates see the register_gate
+            function in ./svg/_layout.py.
 
     Args:
         qasm_str    (str) : The QASM quantum circuit to draw in SVG.
@@ -71,19 +76,34 @@ def qasm2svg(qasm_str: str,
                             for (SVG, (width, height)). Else, the function
                             will only
                             return the SVG representation.
+        compact     (bool): Flag that control the compaction of the SVG. If
+                            set to True, the numbers are rounded and the
+                            redundant attributes are removed, see
+                            svg/_compact.py.
+        precision   (int) : Number of digits kept after the decimal point in
+                            a compact SVG.
+        collapse_repeats (bool): Flag that control the drawing of the blocks
+                            of instructions repeated consecutively. If set to
+                            True, each block is drawn once, in a box annotated
+                            with the number of repetitions, see
+                            svg/_repeats.py.
+        vectorize   (bool): Flag that control the computation of the layout
+                            with NumPy, when it is installed. See
+                            svg/_vectorized.py.
+        processes   (int) : Number of processes computing the layout, see
+                            svg/_parallel.py. None uses all the processors.
     Returns:
         Union[str, Tuple[str, Tuple[int, int]]]: SVG or (SVG, (width, height))
     """
 
     # Uncompile the QASM code to recover the gates to draw.
-    ast = qiskit.qasm.Qasm(data=qasm_str).parse()
-    unroller = qiskit.unroll.Unroller(ast, qiskit.unroll.JsonBackend(
-        basis.split(',')))
-    unroller.execute()
-    json_circuit = unroller.backend.circuit
+    json_circuit = _parsing.qasm2json(qasm_str, basis)
 
-    svg_repr, (width, height) = _drawing.draw_json_circuit(json_circuit,
-                                                           show_clbits=show_clbits)
+    svg_repr, (width, height) = _drawing.draw_json_circuit(
+        json_circuit, show_clbits=show_clbits, vectorize=vectorize,
+        processes=processes, collapse_repeats=collapse_repeats)
+    if compact:
+        svg_repr = _compact.compact_svg(svg_repr, precision)
     if not output_dimensions:
         return svg_repr
 
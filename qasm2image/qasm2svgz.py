@@ -0,0 +1,112 @@
+# ======================================================================
+# Copyright CERFACS (October 2018)
+# Contributor: Adrien Suau (suau@cerfacs.fr)
+#
+# This software is governed by the CeCILL-B license under French law and
+# abiding  by the  rules of  distribution of free software. You can use,
+# modify  and/or  redistribute  the  software  under  the  terms  of the
+# CeCILL-B license as circulated by CEA, CNRS and INRIA at the following
+# URL "http://www.cecill.info".
+#
+# As a counterpart to the access to  the source code and rights to copy,
+# modify and  redistribute granted  by the  license, users  are provided
+# only with a limited warranty and  the software's author, the holder of
+# the economic rights,  and the  successive licensors  have only limited
+# liability.
+#
+# In this respect, the user's attention is drawn to the risks associated
+# with loading,  using, modifying and/or  developing or reproducing  the
+# software by the user in light of its specific status of free software,
+# that  may mean  that it  is complicated  to manipulate,  and that also
+# therefore  means that  it is reserved for  developers and  experienced
+# professionals having in-depth  computer knowledge. Users are therefore
+# encouraged  to load and  test  the software's  suitability as  regards
+# their  requirements  in  conditions  enabling  the  security  of their
+# systems  and/or  data to be  ensured and,  more generally,  to use and
+# operate it in the same conditions as regards security.
+#
+# The fact that you  are presently reading this  means that you have had
+# knowledge of the CeCILL-B license and that you accept its terms.
+# ======================================================================
+
+
+"""This module provide the qasm2svgz function."""
+
+import gzip
+import io
+from typing import BinaryIO, Optional, Union
+
+from qasm2image import metrics, qasm2svg
+
+
+@metrics.instrument('svgz')
+def qasm2svgz(qasm_str: str,
+              basis: str = ('id,u0,u1,u2,u3,x,y,z,h,s,sdg,t,tdg,rx,ry,rz,'
+                            'cx,cy,cz,ch,crz,cu1,cu3,swap,ccx'),
+              show_clbits: bool = True, compact: bool = False,
+              precision: int = 1, compresslevel: int = 9,
+              write_to: Union[str, BinaryIO] = None,
+              collapse_repeats: bool = False, vectorize: bool = False,
+              processes: int = 1) -> Optional[bytes]:
+    """Transform a QASM code to a gzip-compressed SVG (SVGZ) file.
+
+    Remark: not all gates are implemented. If a gate is not implemented
+            then a message will be printed to warn the user and the gate
+            will not be drawn in the SVGZ.
+            If you want to implement more gates see the register_gate
+            function in ./svg/_layout.py.
+
+    Args:
+        qasm_str    (str)  : The QASM quantum circuit to draw in SVGZ.
+        basis       (list) : The gate basis used to represent the circuit.
+        show_clbits (bool) : Flag that control the drawing of classical bit
+                             lines.
+        compact     (bool) : Flag that control the compaction of the SVG
+                             before its compression, see qasm2svg.
+        precision   (int)  : Number of digits kept after the decimal point in
+                             a compact SVG.
+        compresslevel (int): The gzip compression level, from 1 (fastest) to
+                             9 (smallest).
+        write_to    (str or file): If given, the SVGZ is written directly to
+                             this path or writable binary stream instead of
+                             being returned.
+        collapse_repeats (bool): If True, the blocks of instructions repeated
+                             consecutively are drawn once, in a box annotated
+                             with the number of repetitions.
+        vectorize   (bool) : If True, the layout is computed with NumPy, see
+                             qasm2svg.
+        processes   (int)  : Number of processes computing the layout, see
+                             qasm2svg.
+
+    Returns:
+        bytes: The SVGZ representation of the given QASM circuit, or None if
+               write_to is given.
+    """
+    svg = qasm2svg.qasm2svg(qasm_str, basis=basis, show_clbits=show_clbits,
+                            compact=compact, precision=precision,
+                            collapse_repeats=collapse_repeats,
+                            vectorize=vectorize, processes=processes)
+    return _svg2svgz(svg, compresslevel, write_to)
+
+
+def _svg2svgz(svg: str, compresslevel: int = 9,
+              write_to: Union[str, BinaryIO] = None) -> Optional[bytes]:
+    """Compress an SVG image with gzip.
+
+    The modification time stored in the gzip header is set to 0, so that the
+    same image always gives the same bytes.
+    """
+    svg_bytes = svg.encode('utf-8')
+    if write_to is None:
+        # gzip.compress only accepts the mtime argument since Python 3.8.
+        output = io.BytesIO()
+        _svg2svgz(svg, compresslevel, output)
+        return output.getvalue()
+    if isinstance(write_to, str):
+        with open(write_to, 'wb') as output_file:
+            _svg2svgz(svg, compresslevel, output_file)
+        return None
+    with gzip.GzipFile(filename='', mode='wb', fileobj=write_to,
+                       compresslevel=compresslevel, mtime=0) as gzip_file:
+        gzip_file.write(svg_bytes)
+    return None
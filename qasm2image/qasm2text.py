@@ -0,0 +1,277 @@
+# ======================================================================
+# Copyright CERFACS (October 2018)
+# Contributor: Adrien Suau (suau@cerfacs.fr)
+#
+# This software is governed by the CeCILL-B license under French law and
+# abiding  by the  rules of  distribution of free software. You can use,
+# modify  and/or  redistribute  the  software  under  the  terms  of the
+# CeCILL-B license as circulated by CEA, CNRS and INRIA at the following
+# URL "http://www.cecill.info".
+#
+# As a counterpart to the access to  the source code and rights to copy,
+# modify and  redistribute granted  by the  license, users  are provided
+# only with a limited warranty and  the software's author, the holder of
+# the economic rights,  and the  successive licensors  have only limited
+# liability.
+#
+# In this respect, the user's attention is drawn to the risks associated
+# with loading,  using, modifying and/or  developing or reproducing  the
+# software by the user in light of its specific status of free software,
+# that  may mean  that it  is complicated  to manipulate,  and that also
+# therefore  means that  it is reserved for  developers and  experienced
+# professionals having in-depth  computer knowledge. Users are therefore
+# encouraged  to load and  test  the software's  suitability as  regards
+# their  requirements  in  conditions  enabling  the  security  of their
+# systems  and/or  data to be  ensured and,  more generally,  to use and
+# operate it in the same conditions as regards security.
+#
+# The fact that you  are presently reading this  means that you have had
+# knowledge of the CeCILL-B license and that you accept its terms.
+# ======================================================================
+
+
+"""This module provide the qasm2text function.
+
+The text output draws a circuit with Unicode box-drawing characters, for
+logs, continuous integration outputs and terminal previews, without cairo:
+
+    q[0]: ─┤H├──●──┤M├──────
+                │   ║
+    q[1]: ──────⊕───╫───┤M├─
+                    ║    ║
+    c[0]: ══════════╩════╬══
+                         ║
+    c[1]: ═══════════════╩══
+
+It uses the same layout as the SVG output (see svg/_layout.py): each layout
+column becomes a column of characters, as wide as the longest label drawn in
+it, and each register line becomes a line of text, separated from the next
+one by a line holding the vertical links between bits.
+
+The text is produced line by line. Wide circuits can be split into pages of
+a fixed number of layout columns, printed one below the other, so that the
+memory used and the length of the lines only depend on the size of a page.
+"""
+
+import itertools
+from typing import Dict, Iterator, List, TextIO, Tuple, Union
+
+from qasm2image import _parsing, metrics
+from qasm2image.svg import _layout, _types
+
+_QUBIT_WIRE = '─'
+_CLBIT_WIRE = '═'
+_QUANTUM_LINK = '│'
+_CLASSICAL_LINK = '║'
+# Character drawn where a vertical link crosses a register line, indexed by
+# (register line is a classical one, link is a classical one).
+_CROSSINGS = {(False, False): '┼', (False, True): '╫',
+              (True, False): '╪', (True, True): '╬'}
+_CONTROL = '●'
+_OPEN_CONTROL = '○'
+_CNOT_TARGET = '⊕'
+_SWAP_TARGET = '╳'
+_MEASURE_TARGET = '╩'
+_BOX_LEFT, _BOX_RIGHT = '┤', '├'
+
+# Cell of a register line: (kind, text) where kind is _BOX for a label drawn
+# in a box and _SYMBOL for a single character replacing the wire.
+_BOX, _SYMBOL = 'box', 'symbol'
+CellType = Tuple[str, str]
+
+
+def _get_line(layout: _types.CircuitLayout, qubit: int = None,
+              clbit: int = None) -> int:
+    """Return the register line of a qubit or of a classical bit."""
+    if qubit is not None:
+        return layout.qubit_rows[qubit]
+    return layout.qubits_number + layout.clbit_rows[clbit]
+
+
+def _get_gate_cells(gate: _types.GateLayout,
+                    layout: _types.CircuitLayout) -> \
+        Tuple[Dict[int, CellType], List[Tuple[int, int, bool]]]:
+    """Compute what is drawn for a gate in its column.
+
+    :param gate: the layout of the gate.
+    :param layout: the layout of the circuit.
+    :return: (cells, links) where cells maps register lines to the cell
+    drawn on them, and links lists the (first line, last line, is classical)
+    vertical links.
+    """
+    cells, links = dict(), list()
+    qubit_lines = [_get_line(layout, qubit=qubit) for qubit in gate.qubits]
+    target_lines = qubit_lines[gate.controls:]
+
+    if gate.condition_clbits:
+        condition_lines = [_get_line(layout, clbit=clbit)
+                           for clbit in gate.condition_clbits]
+        for bit_rank, line in enumerate(condition_lines):
+            closed = (gate.condition >> bit_rank) & 1
+            cells[line] = (_SYMBOL, _CONTROL if closed else _OPEN_CONTROL)
+        links.append((min(qubit_lines + condition_lines),
+                       max(qubit_lines + condition_lines), True))
+
+    if gate.controls or (len(target_lines) > 1 and
+                         gate.glyph != _layout.GLYPH_MEASURE):
+        links.append((min(qubit_lines), max(qubit_lines), False))
+    for line in qubit_lines[:gate.controls]:
+        cells[line] = (_SYMBOL, _CONTROL)
+
+    if gate.glyph == _layout.GLYPH_MEASURE:
+        clbit_line = _get_line(layout, clbit=gate.clbits[0])
+        cells[target_lines[0]] = (_BOX, gate.label)
+        cells[clbit_line] = (_SYMBOL, _MEASURE_TARGET)
+        links.append((target_lines[0], clbit_line, True))
+    elif gate.glyph == _layout.GLYPH_SWAP:
+        for line in target_lines:
+            cells[line] = (_SYMBOL, _SWAP_TARGET)
+    elif gate.glyph == _layout.GLYPH_CNOT:
+        cells[target_lines[0]] = (_SYMBOL, _CNOT_TARGET)
+    elif gate.label and gate.glyph in (_layout.GLYPH_GATE,
+                                       _layout.GLYPH_CONTROLLED_GATE):
+        for line in target_lines:
+            cells[line] = (_BOX, gate.label)
+    elif not cells:
+        # Nothing is drawn, as in the SVG output.
+        links = list()
+    return cells, links
+
+
+def _draw_cell(cell: CellType, width: int, wire: str) -> str:
+    kind, text = cell
+    if kind == _BOX:
+        text = _BOX_LEFT + text + _BOX_RIGHT
+    padding = width - len(text)
+    return wire * (padding // 2) + text + wire * (padding - padding // 2)
+
+
+def _draw_page(layout: _types.CircuitLayout,
+               gates: List[_types.GateLayout], first_column: int,
+               columns: int) -> Iterator[str]:
+    """Draw the gates of the columns [first_column, first_column + columns).
+
+    :param layout: the layout of the circuit.
+    :param gates: the gates drawn in the page.
+    :param first_column: the first column of the page.
+    :param columns: the number of columns of the page.
+    :return: an iterator over the lines of text of the page.
+    """
+    lines_number = layout.qubits_number + layout.clbits_number
+    # For each register line: column -> cell. For each line of text between
+    # two register lines: column -> link character.
+    register_cells = [dict() for _ in range(lines_number)]
+    link_cells = [dict() for _ in range(max(0, lines_number - 1))]
+    # The content of each column is surrounded by a wire character.
+    widths = [3] * columns
+    for gate in gates:
+        column = gate.column - first_column
+        cells, links = _get_gate_cells(gate, layout)
+        for first_line, last_line, classical in links:
+            for line in range(first_line, last_line):
+                link_cells[line][column] = (
+                    _CLASSICAL_LINK if classical else _QUANTUM_LINK)
+            for line in range(first_line + 1, last_line):
+                register_cells[line][column] = (_SYMBOL, _CROSSINGS[
+                    line >= layout.qubits_number, classical])
+        for line, cell in cells.items():
+            register_cells[line][column] = cell
+            if cell[0] == _BOX:
+                widths[column] = max(widths[column], len(cell[1]) + 4)
+
+    labels = layout.qubit_labels + layout.clbit_labels
+    labels_width = max(map(len, labels), default=0)
+    for line, cells in enumerate(register_cells):
+        wire = _QUBIT_WIRE if line < layout.qubits_number else _CLBIT_WIRE
+        yield labels[line].rjust(labels_width) + ': ' + ''.join(
+            _draw_cell(cells[column], width, wire) if column in cells
+            else wire * width for column, width in enumerate(widths))
+        if line < len(link_cells):
+            links = link_cells[line]
+            yield (' ' * (labels_width + 2) + ''.join(
+                _draw_cell((_SYMBOL, links[column]), width, ' ')
+                if column in links else ' ' * width
+                for column, width in enumerate(widths))).rstrip()
+
+
+def _layout2text(layout: _types.CircuitLayout,
+                 columns_per_page: int = None) -> Iterator[str]:
+    """Draw a circuit whose layout is computed as lines of text.
+
+    :param layout: the layout of the circuit.
+    :param columns_per_page: if given, the circuit is split into pages of at
+    most this number of layout columns, separated by an empty line.
+    :return: an iterator over the lines of text, without line terminators.
+    :raise ValueError: if columns_per_page is not positive.
+    """
+    if columns_per_page is None:
+        columns_per_page = max(layout.columns, 1)
+    if columns_per_page < 1:
+        raise ValueError("The number of columns per page should be "
+                         "positive.")
+    pages_number = max(1, -(-layout.columns // columns_per_page))
+    pages_gates = [list() for _ in range(pages_number)]
+    for gate in layout.gates:
+        # Barriers are not drawn and may be placed after the last column.
+        if gate.glyph != _layout.GLYPH_BARRIER:
+            pages_gates[gate.column // columns_per_page].append(gate)
+
+    for page, page_gates in enumerate(pages_gates):
+        if page:
+            yield ''
+        first_column = page * columns_per_page
+        yield from _draw_page(layout, page_gates, first_column,
+                              min(columns_per_page,
+                                  layout.columns - first_column))
+        # Free the gates of the page once it is drawn.
+        pages_gates[page] = None
+
+
+@metrics.instrument('text')
+def qasm2text(qasm_str: str,
+              basis: str = ('id,u0,u1,u2,u3,x,y,z,h,s,sdg,t,tdg,rx,ry,rz,'
+                            'cx,cy,cz,ch,crz,cu1,cu3,swap,ccx'),
+              show_clbits: bool = True, columns_per_page: int = None,
+              write_to: Union[str, TextIO] = None, vectorize: bool = False,
+              processes: int = 1) -> Union[str, None]:
+    """Transform a QASM code to a text diagram.
+
+    Remark: not all gates are implemented. If a gate is not implemented
+            then a message will be printed to warn the user and the gate
+            will not be drawn in the diagram.
+            If you want to implement more gates see the register_gate
+            function in ./svg/_layout.py.
+
+    Args:
+        qasm_str    (str) : The QASM quantum circuit to draw.
+        basis       (str) : The gate basis used to represent the circuit as a
+                            comma-separated string of names.
+        show_clbits (bool): Flag that control the drawing of classical bit
+                            lines.
+        columns_per_page (int): If given, the circuit is split into pages of
+                            at most this number of columns, printed one below
+                            the other.
+        write_to    (str or file): If given, the diagram is written line by
+                            line to this path or writable text stream instead
+                            of being returned.
+        vectorize   (bool): If True, the layout is computed with NumPy, see
+                            qasm2svg.
+        processes   (int) : Number of processes computing the layout, see
+                            qasm2svg.
+
+    Returns:
+        str: The diagram, or None if write_to is given.
+    """
+    json_circuit = _parsing.qasm2json(qasm_str, basis)
+    layout = _layout.layout_json_circuit(json_circuit, show_clbits=show_clbits,
+                                         vectorize=vectorize,
+                                         processes=processes)
+    lines = _layout2text(layout, columns_per_page)
+    if write_to is None:
+        return '\n'.join(lines) + '\n'
+    if isinstance(write_to, str):
+        with open(write_to, 'w', encoding='utf-8') as output_file:
+            output_file.writelines(line + '\n' for line in lines)
+    else:
+        write_to.writelines(line + '\n' for line in lines)
+    return None
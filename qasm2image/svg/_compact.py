@@ -0,0 +1,131 @@
+# ======================================================================
+# Copyright CERFACS (October 2018)
+# Contributor: Adrien Suau (suau@cerfacs.fr)
+#
+# This software is governed by the CeCILL-B license under French law and
+# abiding  by the  rules of  distribution of free software. You can use,
+# modify  and/or  redistribute  the  software  under  the  terms  of the
+# CeCILL-B license as circulated by CEA, CNRS and INRIA at the following
+# URL "http://www.cecill.info".
+#
+# As a counterpart to the access to  the source code and rights to copy,
+# modify and  redistribute granted  by the  license, users  are provided
+# only with a limited warranty and  the software's author, the holder of
+# the economic rights,  and the  successive licensors  have only limited
+# liability.
+#
+# In this respect, the user's attention is drawn to the risks associated
+# with loading,  using, modifying and/or  developing or reproducing  the
+# software by the user in light of its specific status of free software,
+# that  may mean  that it  is complicated  to manipulate,  and that also
+# therefore  means that  it is reserved for  developers and  experienced
+# professionals having in-depth  computer knowledge. Users are therefore
+# encouraged  to load and  test  the software's  suitability as  regards
+# their  requirements  in  conditions  enabling  the  security  of their
+# systems  and/or  data to be  ensured and,  more generally,  to use and
+# operate it in the same conditions as regards security.
+#
+# The fact that you  are presently reading this  means that you have had
+# knowledge of the CeCILL-B license and that you accept its terms.
+# ======================================================================
+
+
+"""Rewrite the SVG produced by svgwrite in a compact form.
+
+svgwrite writes the coordinates with the full precision of Python floats and
+repeats the same presentation attributes on every element. The functions of
+this module shorten the SVG without changing the drawn image:
+
+- the numbers are written with a fixed number of digits after the decimal
+  point and without trailing zeros,
+- the colours are written with their short hexadecimal form,
+- the attributes with their default value are removed, as well as the
+  attributes of the root element that are not needed to draw the image,
+- the most common inherited attributes are set once on the root element.
+"""
+
+import re
+from typing import Dict, List, Tuple
+
+# Attributes whose value is a number, possibly followed by a unit.
+_NUMERIC_ATTRIBUTES = frozenset(('x', 'y', 'x1', 'x2', 'y1', 'y2', 'cx', 'cy',
+                                 'r', 'width', 'height', 'font-size',
+                                 'stroke-width'))
+_SHORT_COLOURS = {'black': '#000', 'white': '#fff'}
+# Attributes of the root element that are not needed to draw the image.
+_ROOT_DROPPED_ATTRIBUTES = frozenset(('baseProfile', 'version', 'xmlns:ev',
+                                      'xmlns:xlink'))
+# Attributes removed when they have their default value.
+_DEFAULT_VALUES = {'fill': '#000'}
+# Inherited attributes set on the root element: (name, value on the root,
+# initial value, predicate telling if an element uses the attribute). The
+# initial value is written on the elements that used it.
+_INHERITED_ATTRIBUTES = (
+    ('stroke-width', '2', '1', lambda tag, attributes: 'stroke' in attributes),
+    ('text-anchor', 'middle', 'start', lambda tag, attributes: tag == 'text'))
+
+_TAG_REGEX = re.compile(r'<([\w:]+)((?:\s+[\w:-]+="[^"]*")*)\s*(/?)>')
+_ATTRIBUTE_REGEX = re.compile(r'([\w:-]+)="([^"]*)"')
+_NUMBER_REGEX = re.compile(r'^(-?\d+(?:\.\d*)?(?:[eE][-+]?\d+)?)(px)?$')
+_EMPTY_DEFS = '<defs/>'
+
+
+def _format_number(value: str, precision: int) -> str:
+    """Write a number with at most precision digits after the decimal point.
+
+    A "px" unit is removed, as it is the default unit. Values that are not
+    numbers are returned unchanged.
+    """
+    match = _NUMBER_REGEX.match(value)
+    if match is None:
+        return value
+    number = '{:.{}f}'.format(float(match.group(1)), precision)
+    if '.' in number:
+        number = number.rstrip('0').rstrip('.')
+    return '0' if number == '-0' else number
+
+
+def _compact_attributes(tag: str, attributes: List[Tuple[str, str]],
+                        precision: int) -> Dict[str, str]:
+    compacted = dict()
+    for name, value in attributes:
+        if name in _NUMERIC_ATTRIBUTES:
+            value = _format_number(value, precision)
+        value = _SHORT_COLOURS.get(value, value)
+        if tag != 'svg' and _DEFAULT_VALUES.get(name) == value:
+            continue
+        compacted[name] = value
+    return compacted
+
+
+def compact_svg(svg: str, precision: int = 1) -> str:
+    """Rewrite an SVG image produced by svgwrite in a compact form.
+
+    Args:
+        svg       (str): The SVG image, as returned by svgwrite.
+        precision (int): The number of digits kept after the decimal point.
+    Returns:
+        str: The compact SVG image.
+    """
+
+    def compact_tag(match) -> str:
+        tag, attributes, closing = match.groups()
+        attributes = _compact_attributes(
+            tag, _ATTRIBUTE_REGEX.findall(attributes), precision)
+        if tag == 'svg':
+            for name in _ROOT_DROPPED_ATTRIBUTES:
+                attributes.pop(name, None)
+            for name, value, _, _ in _INHERITED_ATTRIBUTES:
+                attributes[name] = value
+        else:
+            for name, value, initial_value, uses in _INHERITED_ATTRIBUTES:
+                if attributes.get(name) == value:
+                    del attributes[name]
+                elif name not in attributes and uses(tag, attributes):
+                    attributes[name] = initial_value
+        return '<{}{}{}>'.format(
+            tag, ''.join(' {}="{}"'.format(name, value)
+                         for name, value in attributes.items()), closing)
+
+    svg = _TAG_REGEX.sub(compact_tag, svg)
+    return svg.replace(_EMPTY_DEFS, '')
@@ -38,6 +38,7 @@ MEASURE_GATE_CLBIT_SIZE = 20
 STROKE_THICKNESS = 2
 REGISTER_NAME_WIDTH = 150
 MAX_REGISTER_NAME_HEIGHT = 50
+REPEAT_BOX_MARGIN = 15
 
 # Margins, spacing, border
 GATE_HORIZONTAL_SPACING = 100
@@ -57,6 +58,8 @@ REGISTER_LINES_COLOR = 'black'
 CONTROL_TRUE_GATE_FILL_COLOR = 'black'
 CONTROL_FALSE_GATE_FILL_COLOR = 'white'
 MEASURE_GATE_CLBIT_FILL_COLOR = 'black'
+REPEAT_BOX_COLOR = 'black'
+REPEAT_BOX_DASH_ARRAY = '10,5'
 
 # Font size
 REGISTER_NAME_FONT_SIZE = 200
@@ -67,6 +70,9 @@ REGISTER_NAME_FONT_SIZE = 200
 # here as "a little value".
 FONT_SIZE_CENTER_VERTICALLY_MULTIPLIER = 1 / 3 + 1 / 30
 FONT_SIZE_REDUCTION_FACTOR_FOR_CONTROLLED_GATES = 0.8
+# The number of repetitions is written above the top-right corner of the box
+# surrounding a repeated block.
+REPEAT_COUNT_FONT_SIZE = 30
 
 # Other
 PARAMETERS_ROUND_DECIMAL = 2
@@ -80,3 +86,8 @@ assert REGISTER_LINES_VERTICAL_SPACING > GATE_SIZE, \
     "Gates may vertically overlap with the given constants."
 assert VERTICAL_BORDER > GATE_SIZE / 2, \
     "Gates may be drawn outside the image with the given constants."
+assert REPEAT_BOX_MARGIN < GATE_HORIZONTAL_SPACING / 2, \
+    "Boxes of repeated blocks may overlap with the given constants."
+assert GATE_SIZE / 2 + REPEAT_BOX_MARGIN + REPEAT_COUNT_FONT_SIZE < min(
+    VERTICAL_BORDER, REGISTER_LINES_VERTICAL_SPACING - GATE_SIZE / 2), \
+    "Repetition counts may overlap with gates with the given constants."
@@ -35,8 +35,9 @@ All the functions related to SVG drawing with svgwrite and needed by qasm2svg
 are in this module. The main function is draw_json_circuit, which use all the
 other functions to draw a quantum circuit in SVG.
 
-The functions use a specific data structure for keeping track of the positions
-where they can draw. The variable bit_gate_rank is this data structure and is
+The position of each gate is computed beforehand by the _layout module, which
+uses a specific data structure for keeping track of the positions where gates
+can be drawn. The variable bit_gate_rank is this data structure and is
 described below:
 
    Structure: {'qubits' : [ 3,    # last drawn gate on the first qubit
@@ -56,11 +57,19 @@ described below:
 """
 
 import itertools
-from typing import Tuple
+from typing import Iterable, Iterator, Tuple
 
 from svgwrite import Drawing
 
-from qasm2image.svg import _helpers, _constants, _types
+from qasm2image.svg import _helpers, _constants, _layout, _types
+
+# Boxes in which the texts are fitted.
+_GATE_TEXT_WIDTH = _constants.GATE_SIZE - 2 * _constants.GATE_INSIDE_MARGIN
+_GATE_TEXT_HEIGHT = _constants.GATE_SIZE - 2 * _constants.GATE_INSIDE_MARGIN
+_REGISTER_NAME_TEXT_WIDTH = (_constants.REGISTER_NAME_WIDTH -
+                             _constants.REGISTER_NAME_LEFT_BORDER -
+                             _constants.REGISTER_NAME_RIGHT_BORDER)
+_REGISTER_NAME_TEXT_HEIGHT = _constants.MAX_REGISTER_NAME_HEIGHT
 
 
 def _draw_classical_double_line(drawing: Drawing, x1_coord: int, y1_coord: int,
@@ -96,30 +105,20 @@ def _draw_classical_double_line(drawing: Drawing, x1_coord: int, y1_coord: int,
                      stroke_width=_constants.STROKE_THICKNESS))
 
 
-def _draw_line_between_qubits(drawing: Drawing,
-                              bit_gate_rank: _types.BitRankType,
+def _draw_line_between_qubits(drawing: Drawing, x_coord: float,
                               control_qubit: int, target_qubit: int,
-                              bit_mapping: dict,
-                              index_to_draw: int = None) -> None:
+                              coordinates: _types.Coordinates) -> None:
     """Draw a line between the two given qubits.
 
     :param drawing: Drawing that will be used to draw.
-    :param bit_gate_rank: Structure used to keep track of the used and free
-    places. See module docstring for more information.
+    :param x_coord: x-coordinate of the line.
     :param control_qubit: First qubit.
     :param target_qubit: Second qubit.
-    :param bit_mapping: Unused at the moment.
-    :param index_to_draw: If precised, force the line to be drawn at the given
-    index. Else, the index is computed and the line drawn at the first free
-    place possible.
+    :param coordinates: Precomputed coordinates of the drawing. See
+    _helpers.get_coordinates.
     """
-    if index_to_draw is None:
-        index_to_draw, _ = _helpers.get_max_index(bit_gate_rank,
-                                                  qubits=[control_qubit,
-                                                          target_qubit])
-    x_coord = _helpers.get_x_from_index(index_to_draw)
-    y1_coord = _helpers.get_y_from_quantum_register(control_qubit, bit_mapping)
-    y2_coord = _helpers.get_y_from_quantum_register(target_qubit, bit_mapping)
+    y1_coord = coordinates.qubit_y[control_qubit]
+    y2_coord = coordinates.qubit_y[target_qubit]
     drawing.add(drawing.line(start=(x_coord, y1_coord), end=(x_coord, y2_coord),
                              stroke=_constants.GATE_BORDER_COLOR,
                              stroke_width=_constants.STROKE_THICKNESS))
@@ -200,64 +199,43 @@ def _draw_swap_cross(drawing: Drawing, x_coord: float, y_coord: float) -> None:
                              stroke_width=_constants.STROKE_THICKNESS))
 
 
-def _draw_swap_gate(drawing: Drawing, bit_gate_rank: _types.BitRankType,
-                    qubit1: int, qubit2: int, bit_mapping: dict) -> None:
-    index_to_draw, _ = _helpers.get_max_index(bit_gate_rank,
-                                              qubits=[qubit1, qubit2])
-    x_coord = _helpers.get_x_from_index(index_to_draw)
-    yq1_coord = _helpers.get_y_from_quantum_register(qubit1, bit_mapping)
-    yq2_coord = _helpers.get_y_from_quantum_register(qubit2, bit_mapping)
+def _draw_swap_gate(drawing: Drawing, x_coord: float, qubit1: int,
+                    qubit2: int, coordinates: _types.Coordinates) -> None:
+    yq1_coord = coordinates.qubit_y[qubit1]
+    yq2_coord = coordinates.qubit_y[qubit2]
 
     _draw_swap_cross(drawing, x_coord, yq1_coord)
     _draw_swap_cross(drawing, x_coord, yq2_coord)
-    _draw_line_between_qubits(drawing, bit_gate_rank, qubit1, qubit2,
-                              bit_mapping, index_to_draw)
-
-
-def _draw_measure_gate(drawing: Drawing, bit_gate_rank: _types.BitRankType,
-                       measured_qubit: int, target_clbit: int,
-                       show_clbits: bool, bit_mapping: dict) -> None:
-    index_to_draw, _ = _helpers.get_max_index(bit_gate_rank,
-                                              qubits=[measured_qubit],
-                                              clbits=[target_clbit])
-
-    x_coord = _helpers.get_x_from_index(index_to_draw)
-    yq_coord = _helpers.get_y_from_quantum_register(measured_qubit, bit_mapping)
-    if show_clbits:
-        yc_coord = _helpers.get_y_from_classical_register(target_clbit, len(
-            bit_gate_rank['qubits']), bit_mapping)
-        # Draw the line between the 2 bits
-        _draw_classical_double_line(drawing, x_coord, yq_coord, x_coord,
-                                    yc_coord)
-
-        # Draw the little thing that tells where we put the measure.
-        anchor = tuple((x_coord - _constants.MEASURE_GATE_CLBIT_SIZE / 2,
-                        yc_coord - _constants.MEASURE_GATE_CLBIT_SIZE / 2))
-        sizes = tuple((_constants.MEASURE_GATE_CLBIT_SIZE,
-                       _constants.MEASURE_GATE_CLBIT_SIZE))
-        drawing.add(drawing.rect(insert=anchor, size=sizes,
-                                 fill=_constants.MEASURE_GATE_CLBIT_FILL_COLOR,
-                                 stroke=_constants.GATE_BORDER_COLOR,
-                                 stroke_width=_constants.STROKE_THICKNESS))
-        # Draw the "measure" gate.
-        _draw_unitary_gate(drawing, bit_gate_rank, measured_qubit, "M",
-                           bit_mapping, index_to_draw=index_to_draw)
+    _draw_line_between_qubits(drawing, x_coord, qubit1, qubit2, coordinates)
 
-    else:
-        # Draw the "measure" gate.
-        _draw_unitary_gate(drawing, bit_gate_rank, measured_qubit,
-                           "M" + str(target_clbit), bit_mapping,
-                           index_to_draw=index_to_draw)
+
+def _draw_measure_gate(drawing: Drawing, x_coord: float, measured_qubit: int,
+                       target_clbit: int, coordinates: _types.Coordinates,
+                       font_sizes: _types.FontSizesType) -> None:
+    yq_coord = coordinates.qubit_y[measured_qubit]
+    yc_coord = coordinates.clbit_y[target_clbit]
+    # Draw the line between the 2 bits
+    _draw_classical_double_line(drawing, x_coord, yq_coord, x_coord, yc_coord)
+
+    # Draw the little thing that tells where we put the measure.
+    anchor = tuple((x_coord - _constants.MEASURE_GATE_CLBIT_SIZE / 2,
+                    yc_coord - _constants.MEASURE_GATE_CLBIT_SIZE / 2))
+    sizes = tuple((_constants.MEASURE_GATE_CLBIT_SIZE,
+                   _constants.MEASURE_GATE_CLBIT_SIZE))
+    drawing.add(drawing.rect(insert=anchor, size=sizes,
+                             fill=_constants.MEASURE_GATE_CLBIT_FILL_COLOR,
+                             stroke=_constants.GATE_BORDER_COLOR,
+                             stroke_width=_constants.STROKE_THICKNESS))
+    # Draw the "measure" gate.
+    _draw_unitary_gate(drawing, x_coord, measured_qubit, "M", coordinates,
+                       font_sizes)
 
 
-def _draw_unitary_gate(drawing: Drawing, bit_gate_rank: _types.BitRankType,
-                       qubit: int, gate_name: str, bit_mapping: dict,
-                       index_to_draw: int = None,
+def _draw_unitary_gate(drawing: Drawing, x_coord: float, qubit: int,
+                       gate_name: str, coordinates: _types.Coordinates,
+                       font_sizes: _types.FontSizesType,
                        is_controlled_gate: bool = False) -> None:
-    if index_to_draw is None:
-        index_to_draw = bit_gate_rank['qubits'][qubit]
-    x_coord = _helpers.get_x_from_index(index_to_draw)
-    y_coord = _helpers.get_y_from_quantum_register(qubit, bit_mapping)
+    y_coord = coordinates.qubit_y[qubit]
 
     # Draw the good gate shape
     if is_controlled_gate:
@@ -265,10 +243,8 @@ def _draw_unitary_gate(drawing: Drawing, bit_gate_rank: _types.BitRankType,
     else:
         _draw_gate_rect(drawing, x_coord, y_coord)
 
-    desired_width = _constants.GATE_SIZE - 2 * _constants.GATE_INSIDE_MARGIN
-    desired_height = _constants.GATE_SIZE - 2 * _constants.GATE_INSIDE_MARGIN
-    font_size = _helpers.adapt_text_font_size(gate_name, desired_width,
-                                              desired_height)
+    font_size = _get_font_size(font_sizes, gate_name, _GATE_TEXT_WIDTH,
+                               _GATE_TEXT_HEIGHT)
     if is_controlled_gate:
         font_size *= _constants.FONT_SIZE_REDUCTION_FACTOR_FOR_CONTROLLED_GATES
 
@@ -279,204 +255,129 @@ def _draw_unitary_gate(drawing: Drawing, bit_gate_rank: _types.BitRankType,
                              text_anchor="middle", font_size=font_size))
 
 
-def _draw_classically_conditioned_part(drawing: Drawing,
-                                       bit_gate_rank: _types.BitRankType,
-                                       instruction, bit_mapping: dict) -> None:
+def _draw_classically_conditioned_part(drawing: Drawing, x_coord: float,
+                                       gate: _types.GateLayout,
+                                       coordinates: _types.Coordinates) -> None:
     """Draw the line and the controls for classically controlled instructions.
 
     :param drawing: an instance of svgwrite.Drawing, used to write the SVG.
-    :param bit_gate_rank: see module documentation for more information on this
-    data structure.
-    :param instruction: A QISKit instruction. The dict has a key 'conditional'
-    associated to an other Python dict with entries:
-        'type': the type of the instruction. For example 'equals'.
-        'mask': the classical bits used (?)
-        'val' : the value compared with 'type' comparator to the classical bit.
-    :param bit_mapping:
-    :raise NotImplementedError: if the given instruction affects more than 1
-    qubit.
+    :param x_coord: x-coordinate of the instruction.
+    :param gate: The layout of a classically controlled instruction. The
+    condition field stores the value compared to the classical bits listed in
+    the condition_clbits field.
+    :param coordinates: Precomputed coordinates of the drawing. See
+    _helpers.get_coordinates.
     """
-
-    qubits = instruction['qubits']
-    if len(qubits) > 1:
-        raise NotImplementedError("Classically controlled multi-qubit "
-                                  "instructions are not implemented for the "
-                                  "moment.")
-    total_qubits_number = len(bit_gate_rank['qubits'])
-    total_clbits_number = len(bit_gate_rank['clbits'])
-
-    # We take the binary little-endian representation of the value that
-    # should be compared with the value stored in classical registers.
-    # int(x, 0) let the 'int' function choose automatically the good basis.
-    value = int(instruction['conditional']['val'], 0)
-    mask = int(instruction['conditional']['mask'], 0)
-    # The [2:] is to remove the "Ob" part returned by the "bin" function.
-    # The [::-1] is to reverse the list order, to have a little-endian
-    # representation.
-    little_endian_bit_value = bin(value)[2:][::-1]
-    number_of_clbits = len(bin(mask)[2:])
-
-    assert number_of_clbits <= total_clbits_number
-
     # Compute the important coordinates.
-    index_to_draw, _ = _helpers.get_max_index(bit_gate_rank,
-                                              instruction=instruction)
-    x_coord = _helpers.get_x_from_index(index_to_draw)
-    yq_coord = _helpers.get_y_from_quantum_register(qubits[0], bit_mapping)
-    yc_coord = _helpers.get_y_from_classical_register(number_of_clbits - 1,
-                                                      total_qubits_number,
-                                                      bit_mapping)
+    yq_coord = coordinates.qubit_y[gate.qubits[0]]
+    yc_coord = coordinates.clbit_y[gate.condition_clbits[-1]]
     # Then draw the double line representing the classical control.
     _draw_classical_double_line(drawing, x_coord, yq_coord, x_coord, yc_coord)
 
-    # Finally draw all the controlled circles
-    for classical_register_index in range(number_of_clbits):
-        y_coord = _helpers.get_y_from_classical_register(
-            classical_register_index, total_qubits_number, bit_mapping)
-        clbit_should_be_1 = (
-            classical_register_index < len(little_endian_bit_value) and
-            little_endian_bit_value[classical_register_index] == '1')
+    # Finally draw all the controlled circles. We take the binary
+    # little-endian representation of the value that should be compared with
+    # the value stored in classical registers.
+    for bit_rank, clbit in enumerate(gate.condition_clbits):
+        y_coord = coordinates.clbit_y[clbit]
+        clbit_should_be_1 = bool((gate.condition >> bit_rank) & 1)
         _draw_control_circle(drawing, x_coord, y_coord, clbit_should_be_1)
 
 
-def _draw_gate(drawing: Drawing, bit_gate_rank: _types.BitRankType, instruction,
-               show_clbits: bool, bit_mapping: dict) -> None:
-    unitary_gate_names = set('xyzhst')
-    supported_base_gates = unitary_gate_names | {'sdg', 'tdg'}
-    supported_u_gates = {"u{}".format(i) for i in [1, 2, 3]} | {'u'}
-    supported_unitary_gates = supported_base_gates | supported_u_gates
-    supported_controlled_gates = (
-        {"c{}".format(name) for name in supported_unitary_gates} |
-        {"cc{}".format(name) for name in supported_unitary_gates})
-    supported_special_gates = {'measure', 'barrier', 'reset', 'swap'}
-    supported_gates = (supported_unitary_gates | supported_controlled_gates |
-                       supported_special_gates)
-
-    name = instruction['name']
-    qubits = instruction['qubits']
-    name_conditional_part = ""
-
-    if 'conditional' in instruction:
-        if show_clbits:
-            _draw_classically_conditioned_part(drawing, bit_gate_rank,
-                                               instruction, bit_mapping)
-        else:
-            # TODO: Change 'c' by the name of the classical register.
-            name_conditional_part = "[c={}]".format(
-                int(instruction['conditional']['val'], 0))
-
-    # Tag needed later
-    drawing_controlled_gate = False
-    # Compute the x coordinate of the gate.
-    index_to_draw, _ = _helpers.get_max_index(bit_gate_rank,
-                                              instruction=instruction)
+def _draw_gate(drawing: Drawing, gate: _types.GateLayout,
+               coordinates: _types.Coordinates,
+               font_sizes: _types.FontSizesType) -> None:
+    x_coord = coordinates.column_x[gate.column]
 
-    # If it is a measure gate then call the specialized function to draw it.
-    if name == 'measure':
-        _draw_measure_gate(drawing, bit_gate_rank, qubits[0],
-                           instruction['clbits'][0], show_clbits, bit_mapping)
+    if gate.condition_clbits:
+        _draw_classically_conditioned_part(drawing, x_coord, gate,
+                                           coordinates)
 
-    # If it is a barrier gate then we do not draw anything
-    if name == 'barrier':
-        pass
+    # If the gate is a controlled one then draw the controlled part and then
+    # the targets.
+    if gate.controls:
+        # Draw the line between the two qubits at the extremities, then the
+        # little control circles.
+        _draw_line_between_qubits(drawing, x_coord, min(gate.qubits),
+                                  max(gate.qubits), coordinates)
+        for control_qubit in gate.qubits[:gate.controls]:
+            _draw_control_circle(drawing, x_coord,
+                                 coordinates.qubit_y[control_qubit], True)
+    targets = gate.qubits[gate.controls:]
 
-    # If it is a reset gate, then draw a unitary gate with 'reset' name.
-    if name == 'reset':
-        _draw_unitary_gate(drawing, bit_gate_rank, qubits[0],
-                           name + name_conditional_part, bit_mapping)
+    # If it is a measure gate then call the specialized function to draw it.
+    if gate.glyph == _layout.GLYPH_MEASURE:
+        _draw_measure_gate(drawing, x_coord, targets[0], gate.clbits[0],
+                           coordinates, font_sizes)
 
     # If it is a swap gate, then draw the specific gate.
-    if name == 'swap':
-        _draw_swap_gate(drawing, bit_gate_rank, qubits[0], qubits[1],
-                        bit_mapping)
-
-    # If the gate is a controlled one then draw the controlled part and let the
-    # code just after draw the main gate.
-    if name.lower().startswith('c'):
-        # Used to draw the line, we need the two qubits at the extremities.
-        upper_qubit = min(qubits)
-        lower_qubit = max(qubits)
-        control_qubits = qubits[:-1]  # All the qubits except the last one
-        target_qubit = qubits[-1]  # The last qubit is the target
-
-        # Draw the line, then the little control circle
-        _draw_line_between_qubits(drawing, bit_gate_rank, upper_qubit,
-                                  lower_qubit, bit_mapping, index_to_draw)
-        for control_qubit in control_qubits:
-            _draw_control_circle(drawing,
-                                 _helpers.get_x_from_index(index_to_draw),
-                                 _helpers.get_y_from_quantum_register(
-                                     control_qubit, bit_mapping), True)
-        # Then if it's a (C)CX gate, draw the stylised (C)CX gate.
-        if name.lower().lstrip('c') == 'x':
-            _draw_cnot_cross(drawing, _helpers.get_x_from_index(index_to_draw),
-                             _helpers.get_y_from_quantum_register(target_qubit,
-                                                                  bit_mapping))
-        # Else keep the information that we should draw a controlled gate.
-        else:
-            drawing_controlled_gate = True
-            name = name[1:]
-            qubits = qubits[1:]
-
-    # Draw the main gate.
-    # 1. Special case for gates with parameters
-    if instruction.get('params', None):
-        def _round_numeric_param(numeric_param: float) -> str:
-            if abs(numeric_param) < 1e-10:
-                # Avoid the "0.0"
-                return "0"
-            return str(
-                round(numeric_param, _constants.PARAMETERS_ROUND_DECIMAL))
-
-        _draw_unitary_gate(drawing, bit_gate_rank, qubits[0],
-                           name + name_conditional_part + "({})".format(
-                               ",".join(map(_round_numeric_param,
-                                            instruction['params']))), bit_mapping,
-                           is_controlled_gate=drawing_controlled_gate,
-                           index_to_draw=index_to_draw)
-
-    # 2. For all the gates without parameters, simply draw them
-    elif name.lower() in supported_base_gates:
-        _draw_unitary_gate(drawing, bit_gate_rank, qubits[0],
-                           name.upper() + name_conditional_part, bit_mapping,
-                           is_controlled_gate=drawing_controlled_gate,
-                           index_to_draw=index_to_draw)
-
-    # Warn the user we encountered a non-implemented gate.
-    if instruction['name'].lower() not in supported_gates:
-        print("WARNING: Gate '{}' is not implemented".format(instruction['name']))
-
-    # And finally take care of our data structure that keeps track of the
-    # position
-    # where we want to draw.
-    _helpers._update_data_structure(bit_gate_rank, instruction)
+    elif gate.glyph == _layout.GLYPH_SWAP:
+        _draw_swap_gate(drawing, x_coord, targets[0], targets[1], coordinates)
+
+    # Then if it's a (C)CX gate, draw the stylised (C)CX gate.
+    elif gate.glyph == _layout.GLYPH_CNOT:
+        _draw_cnot_cross(drawing, x_coord, coordinates.qubit_y[targets[0]])
+
+    # Else draw the main gate if it has a representation.
+    elif gate.label and gate.glyph in (_layout.GLYPH_GATE,
+                                       _layout.GLYPH_CONTROLLED_GATE):
+        # Gates acting on several qubits are drawn on each of their targets.
+        if len(targets) > 1 and not gate.controls:
+            _draw_line_between_qubits(drawing, x_coord, min(targets),
+                                      max(targets), coordinates)
+        for target_qubit in targets:
+            _draw_unitary_gate(drawing, x_coord, target_qubit, gate.label,
+                               coordinates, font_sizes, is_controlled_gate=(
+                                   gate.glyph == _layout.GLYPH_CONTROLLED_GATE))
+
+
+def _draw_repeat(drawing: Drawing, repeat: _types.RepeatLayout,
+                 coordinates: _types.Coordinates) -> None:
+    """Draw the box surrounding a repeated block and its number of copies.
+
+    :param drawing: an instance of svgwrite.Drawing, used to write the SVG.
+    :param repeat: The layout of the repeated block.
+    :param coordinates: Precomputed coordinates of the drawing. See
+    _helpers.get_coordinates.
+    """
+    half_width = _constants.GATE_SIZE / 2 + _constants.REPEAT_BOX_MARGIN
+    y_coords = [coordinates.qubit_y[qubit] for qubit in repeat.qubits]
+    y_coords.extend(coordinates.clbit_y[clbit] for clbit in repeat.clbits)
+    x1_coord = coordinates.column_x[repeat.first_column] - half_width
+    x2_coord = coordinates.column_x[repeat.last_column] + half_width
+    y1_coord = min(y_coords) - half_width
+    y2_coord = max(y_coords) + half_width
+    drawing.add(drawing.rect(
+        insert=(x1_coord, y1_coord),
+        size=(x2_coord - x1_coord, y2_coord - y1_coord), fill='none',
+        stroke=_constants.REPEAT_BOX_COLOR,
+        stroke_width=_constants.STROKE_THICKNESS,
+        stroke_dasharray=_constants.REPEAT_BOX_DASH_ARRAY))
+    drawing.add(drawing.text("\u00d7{}".format(repeat.count),
+                             insert=(x2_coord, y1_coord -
+                                     _constants.STROKE_THICKNESS),
+                             text_anchor="end",
+                             font_size=_constants.REPEAT_COUNT_FONT_SIZE))
 
 
 def _draw_registers_names_and_lines(drawing: Drawing, circuit_width: int,
-                                    json_circuit, show_clbits: bool) -> None:
+                                    layout: _types.CircuitLayout,
+                                    font_sizes: _types.FontSizesType) -> None:
     # First we draw the names of each register
-    qubit_labels = json_circuit['header'].get('qubit_labels', [])
-    clbit_labels = (
-        json_circuit['header'].get('clbit_labels', []) if show_clbits else [])
+    bit_labels = list(itertools.chain(layout.qubit_labels,
+                                      layout.clbit_labels))
 
     # 1. Compute the font size that will be used to keep good dimensions
     font_size = _constants.REGISTER_NAME_FONT_SIZE
-    for qubit_label in itertools.chain(qubit_labels, clbit_labels):
-        qubit_text_name = "{}[{}]".format(*qubit_label)
-        desired_width = (
-            _constants.REGISTER_NAME_WIDTH -
-            _constants.REGISTER_NAME_LEFT_BORDER -
-            _constants.REGISTER_NAME_RIGHT_BORDER)
-        adapted_font_size = _helpers.adapt_text_font_size(qubit_text_name,
-                                                          desired_width,
-                                                          _constants.MAX_REGISTER_NAME_HEIGHT)
+    for bit_text_name in bit_labels:
+        adapted_font_size = _get_font_size(font_sizes, bit_text_name,
+                                           _REGISTER_NAME_TEXT_WIDTH,
+                                           _REGISTER_NAME_TEXT_HEIGHT)
         font_size = min(font_size, adapted_font_size)
 
     # 2. Draw the bit names
     y_coord = _constants.VERTICAL_BORDER
-    for bit_label in itertools.chain(qubit_labels, clbit_labels):
-        qubit_text_name = "{}[{}]".format(*bit_label)
-        drawing.add(drawing.text(qubit_text_name, insert=(
+    for bit_text_name in bit_labels:
+        drawing.add(drawing.text(bit_text_name, insert=(
             _constants.REGISTER_NAME_WIDTH -
             _constants.REGISTER_NAME_RIGHT_BORDER,
             y_coord + _constants.FONT_SIZE_CENTER_VERTICALLY_MULTIPLIER *
@@ -488,8 +389,7 @@ def _draw_registers_names_and_lines(drawing: Drawing, circuit_width: int,
     y_coord = _constants.VERTICAL_BORDER
 
     # Start with quantum registers
-    quantum_register_number = json_circuit['header'].get('number_of_qubits', 0)
-    for _ in range(quantum_register_number):
+    for _ in range(layout.qubits_number):
         drawing.add(
             drawing.line(start=(_constants.REGISTER_NAME_WIDTH, y_coord),
                          end=(circuit_width, y_coord),
@@ -497,19 +397,63 @@ def _draw_registers_names_and_lines(drawing: Drawing, circuit_width: int,
                          stroke_width=_constants.STROKE_THICKNESS))
         y_coord += _constants.REGISTER_LINES_VERTICAL_SPACING
 
-    # And see if we want to plot classical registers.
-    if show_clbits:
-        classical_register_number = json_circuit['header'].get(
-            'number_of_clbits', 0)
-        for _ in range(classical_register_number):
-            _draw_classical_double_line(drawing, _constants.REGISTER_NAME_WIDTH,
-                                        y_coord, circuit_width, y_coord)
-            y_coord += _constants.REGISTER_LINES_VERTICAL_SPACING
+    # And then the classical registers, if they are drawn.
+    for _ in range(layout.clbits_number):
+        _draw_classical_double_line(drawing, _constants.REGISTER_NAME_WIDTH,
+                                    y_coord, circuit_width, y_coord)
+        y_coord += _constants.REGISTER_LINES_VERTICAL_SPACING
+
+
+def _get_font_size(font_sizes: _types.FontSizesType, text: str,
+                   desired_width: float, desired_height: float) -> int:
+    """Look up the font size of a text, measuring it if it is missing."""
+    key = (text, desired_width, desired_height)
+    if key not in font_sizes:
+        font_sizes[key] = _helpers.adapt_text_font_size(text, desired_width,
+                                                        desired_height)
+    return font_sizes[key]
+
+
+def _iter_gates_texts(gates: Iterable[_types.GateLayout]) -> \
+        Iterator[Tuple[str, float, float]]:
+    """Yield the (text, box width, box height) drawn by each gate."""
+    for gate in gates:
+        if gate.glyph == _layout.GLYPH_MEASURE:
+            yield "M", _GATE_TEXT_WIDTH, _GATE_TEXT_HEIGHT
+        elif gate.label and gate.glyph in (_layout.GLYPH_GATE,
+                                           _layout.GLYPH_CONTROLLED_GATE):
+            yield gate.label, _GATE_TEXT_WIDTH, _GATE_TEXT_HEIGHT
+
+
+def get_font_sizes(layout: _types.CircuitLayout,
+                   processes: int = 1) -> _types.FontSizesType:
+    """Compute the font size of all the texts drawn for a circuit.
+
+    The distinct texts of the circuit are collected first and each of them is
+    measured once, instead of once per drawn gate.
+
+    Args:
+        layout (CircuitLayout): The layout of the circuit.
+        processes (int): Number of processes measuring the texts, see
+                         _helpers.adapt_texts_font_sizes.
+    Returns:
+        FontSizesType: The font size of each text, looked up by the drawing
+                       functions.
+    """
+    registers_texts = ((label, _REGISTER_NAME_TEXT_WIDTH,
+                        _REGISTER_NAME_TEXT_HEIGHT)
+                       for label in itertools.chain(layout.qubit_labels,
+                                                    layout.clbit_labels))
+    return _helpers.adapt_texts_font_sizes(
+        itertools.chain(registers_texts, _iter_gates_texts(layout.gates)),
+        processes)
 
 
 def draw_json_circuit(json_circuit, unit: str = 'px', round_index: int = 0,
-                      show_clbits: bool = True, bit_order: dict = None) -> \
-    Tuple[str, Tuple[int, int]]:
+                      show_clbits: bool = True, bit_order: dict = None,
+                      vectorize: bool = False, processes: int = 1,
+                      collapse_repeats: bool = False) -> \
+        Tuple[str, Tuple[int, int]]:
     """Draw a circuit represented as a JSON string.
 
     Args:
@@ -529,69 +473,205 @@ def draw_json_circuit(json_circuit, unit: str = 'px', round_index: int = 0,
         show_clbits  (bool): True if the function should draw the classical
         bits, False
                              otherwise.
-        bit_order    (dict): A Python dictionary storing the bit ordering.
+        bit_order    (dict): A Python dictionary mapping each bit label, given
+                             as a (register name, index) tuple, to the row
+                             where it is drawn.
+        vectorize    (bool): True to compute the layout with NumPy. See
+                             _layout.iter_gate_layouts.
+        processes    (int) : Number of processes used to compute the layout.
+                             See _layout.layout_json_circuit.
+        collapse_repeats (bool): True to draw only once the blocks of
+                             instructions repeated consecutively, in a box
+                             annotated with the number of repetitions.
     Returns:
         Tuple[str, Tuple[int, int]]: (SVG, (width, height))
             - SVG: string representing the given circuit in SVG format.
             - width: computed width in pixels.
             - height: computed height in pixels.
     """
+    # Compute the position of each gate.
+    layout = _layout.layout_json_circuit(json_circuit, show_clbits, bit_order,
+                                         vectorize, processes,
+                                         collapse_repeats)
+    return draw_layout(layout, unit=unit, round_index=round_index,
+                       processes=processes)
 
-    json_header = json_circuit["header"]
-
-    # TEMPORARY FIX FOR THE QOBJ STRUCTURE
-    # "issue": the json_circuit['header']['clbit_labels'] and
-    # json_circuit['header']['qubit_labels'] don't have the same meaning and it
-    # seems unintuitive. I fix that here. This part should be removed if the
-    # qobj structure change to fix this behaviour.
-    new_clbit_labels = list()
-    for clbit_label in json_circuit['header']['clbit_labels']:
-        for i in range(clbit_label[1] + 1):
-            new_clbit_labels.append([clbit_label[0], i])
-    json_header['clbit_labels'] = new_clbit_labels
-
-    # Take the appropriate default value for bit_order if not provided by the
-    # user.
-    if bit_order is None:
-        bit_order = dict()
-        for qubit_index, qubit_label in enumerate(json_header['qubit_labels']):
-            bit_key = "".join(map(str, qubit_label))
-            bit_order[bit_key] = qubit_index
-        for clbit_index, clbit_label in enumerate(json_header['clbit_labels']):
-            bit_key = "".join(map(str, clbit_label))
-            bit_order[bit_key] = clbit_index
-
-    # Transform the bit_order structure in a more useful one: the bit_order
-    # structure associates bit labels to their index, but in the json circuit
-    # we don't have bit labels but rather bit indices. So we want to have a
-    # dictionary mapping indices in the json circuit to indices on the drawn
-    # circuit.
-    bit_mapping = {'clbits': dict(), 'qubits': dict()}
-    for qubit_index, qubit_label in enumerate(json_header['qubit_labels']):
-        bit_key = "".join(map(str, qubit_label))
-        bit_mapping['qubits'][qubit_index] = bit_order[bit_key]
-    for clbit_index, clbit_label in enumerate(json_header['clbit_labels']):
-        bit_key = "".join(map(str, clbit_label))
-        bit_mapping['clbits'][clbit_index] = bit_order[bit_key]
 
+def draw_layout(layout: _types.CircuitLayout, unit: str = 'px',
+                round_index: int = 0,
+                font_sizes: _types.FontSizesType = None,
+                processes: int = 1) -> Tuple[str, Tuple[int, int]]:
+    """Draw a circuit whose layout has already been computed.
+
+    Args:
+        layout (CircuitLayout): The layout of the circuit, computed by
+                                _layout.layout_json_circuit.
+        unit         (str) : Unit used to draw the circuit. See
+                             draw_json_circuit.
+        round_index  (int) : Number of digits after the decimal point to keep
+                             in the SVG. See draw_json_circuit.
+        font_sizes (FontSizesType): Font size of the drawn texts, see
+                                    get_font_sizes. Computed if not given.
+        processes    (int) : Number of processes measuring the texts when
+                             font_sizes is not given.
+    Returns:
+        Tuple[str, Tuple[int, int]]: (SVG, (width, height))
+    """
+    if font_sizes is None:
+        font_sizes = get_font_sizes(layout, processes)
     # Compute the width and height
-    width, height = _helpers.get_dimensions(json_circuit, show_clbits)
+    width, height = _helpers.get_dimensions_from_sizes(
+        layout.columns, layout.qubits_number + layout.clbits_number)
     width, height = round(width, round_index), round(height, round_index)
     width_str, height_str = str(width) + unit, str(height) + unit
 
     # Create the drawing
     drawing = Drawing(size=(width_str, height_str))
 
-    # Create the internal structure used by the drawing functions
-    index_last_gate_on_reg = {
-        'clbits': [0] * json_circuit['header'].get('number_of_clbits', 0),
-        'qubits': [0] * json_circuit['header'].get('number_of_qubits', 0)}
-
     # And draw!
     # First the registers names and lines
-    _draw_registers_names_and_lines(drawing, width, json_circuit, show_clbits)
-    # And then each gate
-    for instruction in json_circuit['instructions']:
-        _draw_gate(drawing, index_last_gate_on_reg, instruction, show_clbits,
-                   bit_mapping)
+    _draw_registers_names_and_lines(drawing, width, layout, font_sizes)
+    # And then each gate, with coordinates computed once for the whole circuit.
+    # A trailing barrier does not take a column but is placed in the column
+    # following the last one.
+    coordinates = _helpers.get_coordinates(layout.columns + 1,
+                                           layout.qubit_rows,
+                                           layout.clbit_rows,
+                                           layout.qubits_number)
+    for gate in layout.gates:
+        _draw_gate(drawing, gate, coordinates, font_sizes)
+    for repeat in layout.repeats:
+        _draw_repeat(drawing, repeat, coordinates)
     return drawing.tostring(), (width, height)
+
+
+def draw_layout_pages(layout: _types.CircuitLayout, columns_per_page: int,
+                      unit: str = 'px', round_index: int = 0) -> \
+        Iterator[Tuple[str, Tuple[int, int]]]:
+    """Draw a circuit as a sequence of pages of at most columns_per_page columns.
+
+    Each page is a complete image, with the names and the lines of the
+    registers. The pages are drawn one by one, when the iterator is
+    consumed, so only one page is held in memory at a time.
+
+    Args:
+        layout (CircuitLayout): The layout of the circuit, computed by
+                                _layout.layout_json_circuit.
+        columns_per_page (int): Maximum number of columns on a page.
+        unit         (str) : See draw_layout.
+        round_index  (int) : See draw_layout.
+    Returns:
+        Iterator[Tuple[str, Tuple[int, int]]]: (SVG, (width, height)) for
+            each page, see draw_layout.
+    Raises:
+        ValueError: if columns_per_page is not positive.
+    """
+    if columns_per_page < 1:
+        raise ValueError("The number of columns per page should be "
+                         "positive.")
+    pages_number = max(1, -(-layout.columns // columns_per_page))
+    # Sort the gates by page. A trailing barrier, placed after the last
+    # column, is kept on the last page.
+    # The texts are measured once for all the pages.
+    font_sizes = get_font_sizes(layout)
+    pages_gates = [list() for _ in range(pages_number)]
+    for gate in layout.gates:
+        page = min(gate.column // columns_per_page, pages_number - 1)
+        pages_gates[page].append(gate)
+
+    for page, page_gates in enumerate(pages_gates):
+        first_column = page * columns_per_page
+        last_column = first_column + columns_per_page - 1
+        # The boxes of the repeated blocks are cut at the page borders.
+        page_repeats = [
+            repeat._replace(
+                first_column=max(repeat.first_column, first_column) -
+                first_column,
+                last_column=min(repeat.last_column, last_column) -
+                first_column)
+            for repeat in layout.repeats
+            if repeat.first_column <= last_column and
+            repeat.last_column >= first_column]
+        page_layout = layout._replace(
+            columns=min(columns_per_page, layout.columns - first_column),
+            gates=[gate._replace(column=gate.column - first_column)
+                   for gate in page_gates],
+            repeats=page_repeats)
+        # Free the gates of the page once it is drawn.
+        pages_gates[page] = None
+        yield draw_layout(page_layout, unit=unit, round_index=round_index,
+                          font_sizes=font_sizes)
+
+
+def draw_gates(gates: Iterable[_types.GateLayout],
+               coordinates: _types.Coordinates,
+               font_sizes: _types.FontSizesType = None) -> Iterator[str]:
+    """Draw each gate separately.
+
+    Args:
+        gates (Iterable[GateLayout]): The layouts of the gates to draw.
+        coordinates (Coordinates): The coordinates of the drawing, see
+                                   _helpers.get_coordinates. The columns and
+                                   the bits of all the gates should be
+                                   covered.
+        font_sizes (FontSizesType): Font size of the drawn texts, see
+                                    get_font_sizes. The missing texts are
+                                    measured and added to it.
+    Returns:
+        Iterator[str]: The SVG elements drawing each gate, see
+                       draw_layout_fragments.
+    """
+    if font_sizes is None:
+        font_sizes = dict()
+    gates = list(gates)
+    font_sizes.update(_helpers.adapt_texts_font_sizes(
+        text for text in _iter_gates_texts(gates) if text not in font_sizes))
+    drawing = Drawing()
+    # The drawing starts with the empty definitions element.
+    first_element = len(drawing.elements)
+    for gate in gates:
+        _draw_gate(drawing, gate, coordinates, font_sizes)
+        yield "".join(element.tostring()
+                      for element in drawing.elements[first_element:])
+        del drawing.elements[first_element:]
+
+
+def draw_layout_fragments(layout: _types.CircuitLayout,
+                          fragments: Iterable[str], unit: str = 'px',
+                          round_index: int = 0,
+                          font_sizes: _types.FontSizesType = None) -> \
+        Tuple[str, Tuple[int, int]]:
+    """Draw a circuit whose gates have already been drawn by draw_gates.
+
+    The result is the same as the one of draw_layout, but the gates of the
+    layout are not drawn again.
+
+    Args:
+        layout (CircuitLayout): The layout of the circuit. Its gates field is
+                                not used.
+        fragments (Iterable[str]): The SVG elements drawing the gates.
+        unit         (str) : See draw_layout.
+        round_index  (int) : See draw_layout.
+        font_sizes (FontSizesType): See draw_gates.
+    Returns:
+        Tuple[str, Tuple[int, int]]: (SVG, (width, height))
+    Raises:
+        ValueError: if the layout has collapsed repeated blocks.
+    """
+    if layout.repeats:
+        raise ValueError("The fragments cannot be drawn with the boxes of the "
+                         "repeated blocks, use draw_layout instead.")
+    if font_sizes is None:
+        font_sizes = dict()
+    width, height = _helpers.get_dimensions_from_sizes(
+        layout.columns, layout.qubits_number + layout.clbits_number)
+    width, height = round(width, round_index), round(height, round_index)
+    width_str, height_str = str(width) + unit, str(height) + unit
+
+    drawing = Drawing(size=(width_str, height_str))
+    _draw_registers_names_and_lines(drawing, width, layout, font_sizes)
+    # Insert the gates after the registers, before the closing tag.
+    svg = drawing.tostring()
+    closing_tag_position = svg.rindex('</')
+    return (svg[:closing_tag_position] + "".join(fragments) +
+            svg[closing_tag_position:]), (width, height)
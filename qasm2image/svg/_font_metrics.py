@@ -0,0 +1,233 @@
+# ======================================================================
+# Copyright CERFACS (October 2018)
+# Contributor: Adrien Suau (suau@cerfacs.fr)
+#
+# This software is governed by the CeCILL-B license under French law and
+# abiding  by the  rules of  distribution of free software. You can use,
+# modify  and/or  redistribute  the  software  under  the  terms  of the
+# CeCILL-B license as circulated by CEA, CNRS and INRIA at the following
+# URL "http://www.cecill.info".
+#
+# As a counterpart to the access to  the source code and rights to copy,
+# modify and  redistribute granted  by the  license, users  are provided
+# only with a limited warranty and  the software's author, the holder of
+# the economic rights,  and the  successive licensors  have only limited
+# liability.
+#
+# In this respect, the user's attention is drawn to the risks associated
+# with loading,  using, modifying and/or  developing or reproducing  the
+# software by the user in light of its specific status of free software,
+# that  may mean  that it  is complicated  to manipulate,  and that also
+# therefore  means that  it is reserved for  developers and  experienced
+# professionals having in-depth  computer knowledge. Users are therefore
+# encouraged  to load and  test  the software's  suitability as  regards
+# their  requirements  in  conditions  enabling  the  security  of their
+# systems  and/or  data to be  ensured and,  more generally,  to use and
+# operate it in the same conditions as regards security.
+#
+# The fact that you  are presently reading this  means that you have had
+# knowledge of the CeCILL-B license and that you accept its terms.
+# ======================================================================
+
+"""Metrics of the DejaVu Sans Bold font.
+
+Generated by tools/generate_font_metrics.py, do not edit this module by
+hand.
+"""
+
+FONT_NAME = 'DejaVu Sans Bold'
+UNITS_PER_EM = 2048
+
+# Horizontal advance of each character.
+ADVANCES = {' ': 713,
+            '!': 934,
+            '"': 1067,
+            '#': 1716,
+            '$': 1425,
+            '%': 2052,
+            '&': 1786,
+            "'": 627,
+            '(': 936,
+            ')': 936,
+            '*': 1071,
+            '+': 1716,
+            ',': 778,
+            '-': 850,
+            '.': 778,
+            '/': 748,
+            '0': 1425,
+            '1': 1425,
+            '2': 1425,
+            '3': 1425,
+            '4': 1425,
+            '5': 1425,
+            '6': 1425,
+            '7': 1425,
+            '8': 1425,
+            '9': 1425,
+            ':': 819,
+            ';': 819,
+            '<': 1716,
+            '=': 1716,
+            '>': 1716,
+            '?': 1188,
+            '@': 2048,
+            'A': 1585,
+            'B': 1561,
+            'C': 1503,
+            'D': 1700,
+            'E': 1399,
+            'F': 1399,
+            'G': 1681,
+            'H': 1714,
+            'I': 762,
+            'J': 762,
+            'K': 1587,
+            'L': 1305,
+            'M': 2038,
+            'N': 1714,
+            'O': 1741,
+            'P': 1501,
+            'Q': 1741,
+            'R': 1577,
+            'S': 1475,
+            'T': 1397,
+            'U': 1663,
+            'V': 1585,
+            'W': 2259,
+            'X': 1579,
+            'Y': 1483,
+            'Z': 1485,
+            '[': 936,
+            '\\': 748,
+            ']': 936,
+            '^': 1716,
+            '_': 1024,
+            '`': 1024,
+            'a': 1382,
+            'b': 1466,
+            'c': 1214,
+            'd': 1466,
+            'e': 1389,
+            'f': 891,
+            'g': 1466,
+            'h': 1458,
+            'i': 702,
+            'j': 702,
+            'k': 1362,
+            'l': 702,
+            'm': 2134,
+            'n': 1458,
+            'o': 1407,
+            'p': 1466,
+            'q': 1466,
+            'r': 1010,
+            's': 1219,
+            't': 979,
+            'u': 1458,
+            'v': 1335,
+            'w': 1892,
+            'x': 1321,
+            'y': 1335,
+            'z': 1192,
+            '{': 1458,
+            '|': 748,
+            '}': 1458,
+            '~': 1716}
+
+# Ink bounding box (x_min, x_max, y_min, y_max) of each character drawing
+# something.
+BOUNDS = {'!': (287, 647, 0, 1493),
+          '"': (195, 872, 938, 1493),
+          '#': (139, 1577, 0, 1470),
+          '$': (160, 1286, -301, 1556),
+          '%': (66, 1987, -29, 1520),
+          '&': (123, 1700, -29, 1520),
+          "'": (195, 432, 938, 1493),
+          '(': (176, 772, -270, 1554),
+          ')': (164, 760, -270, 1554),
+          '*': (41, 1030, 569, 1520),
+          '+': (217, 1499, 0, 1284),
+          ',': (109, 569, -291, 387),
+          '-': (111, 739, 444, 735),
+          '.': (209, 569, 0, 387),
+          '/': (0, 748, -190, 1493),
+          '0': (98, 1327, -29, 1520),
+          '1': (231, 1284, 0, 1493),
+          '2': (162, 1247, 0, 1520),
+          '3': (137, 1262, -29, 1520),
+          '4': (92, 1331, 0, 1493),
+          '5': (158, 1282, -29, 1493),
+          '6': (127, 1315, -29, 1518),
+          '7': (137, 1262, 0, 1493),
+          '8': (125, 1298, -29, 1520),
+          '9': (106, 1294, -29, 1518),
+          ':': (229, 590, 0, 1120),
+          ';': (129, 590, -291, 1120),
+          '<': (217, 1499, 61, 1223),
+          '=': (217, 1499, 295, 987),
+          '>': (217, 1499, 61, 1223),
+          '?': (141, 1055, 0, 1520),
+          '@': (135, 1903, -356, 1440),
+          'A': (10, 1575, 0, 1493),
+          'B': (188, 1417, 0, 1493),
+          'C': (102, 1372, -29, 1520),
+          'D': (188, 1593, 0, 1493),
+          'E': (188, 1249, 0, 1493),
+          'F': (188, 1227, 0, 1493),
+          'G': (102, 1530, -29, 1520),
+          'H': (188, 1526, 0, 1493),
+          'I': (188, 573, 0, 1493),
+          'J': (-115, 573, -410, 1493),
+          'K': (188, 1649, 0, 1493),
+          'L': (188, 1249, 0, 1493),
+          'M': (188, 1849, 0, 1493),
+          'N': (188, 1526, 0, 1493),
+          'O': (102, 1638, -29, 1520),
+          'P': (188, 1417, 0, 1493),
+          'Q': (102, 1638, -299, 1520),
+          'R': (188, 1536, 0, 1493),
+          'S': (147, 1325, -29, 1520),
+          'T': (10, 1386, 0, 1493),
+          'U': (188, 1475, -29, 1493),
+          'V': (10, 1575, 0, 1493),
+          'W': (61, 2195, 0, 1493),
+          'X': (39, 1538, 0, 1493),
+          'Y': (-20, 1503, 0, 1493),
+          'Z': (92, 1393, 0, 1493),
+          '[': (176, 797, -270, 1556),
+          '\\': (0, 748, -190, 1493),
+          ']': (139, 760, -270, 1556),
+          '^': (207, 1509, 936, 1493),
+          '_': (0, 1024, -483, -293),
+          '`': (94, 659, 1262, 1638),
+          'a': (88, 1221, -29, 1147),
+          'b': (172, 1374, -29, 1556),
+          'c': (88, 1077, -29, 1147),
+          'd': (92, 1294, -29, 1556),
+          'e': (88, 1290, -29, 1147),
+          'f': (39, 909, 0, 1556),
+          'g': (92, 1294, -442, 1145),
+          'h': (172, 1298, 0, 1556),
+          'i': (172, 530, 0, 1556),
+          'j': (-68, 530, -442, 1556),
+          'k': (172, 1401, 0, 1556),
+          'l': (172, 530, 0, 1556),
+          'm': (170, 1972, 0, 1147),
+          'n': (172, 1298, 0, 1147),
+          'o': (88, 1319, -29, 1147),
+          'p': (172, 1374, -426, 1147),
+          'q': (92, 1294, -426, 1145),
+          'r': (172, 1004, 0, 1147),
+          's': (106, 1122, -29, 1147),
+          't': (27, 932, 0, 1438),
+          'u': (160, 1286, -29, 1120),
+          'v': (31, 1305, 0, 1120),
+          'w': (72, 1821, 0, 1120),
+          'x': (31, 1290, 0, 1120),
+          'y': (25, 1298, -442, 1120),
+          'z': (92, 1094, 0, 1120),
+          '{': (256, 1202, -334, 1556),
+          '|': (260, 487, -483, 1565),
+          '}': (256, 1202, -334, 1556),
+          '~': (217, 1499, 434, 850)}
@@ -34,10 +34,12 @@
 The functions here are used in many places in the code of qasm2svg
 and needed to be in a separate module.
 """
+import concurrent.futures
+import itertools
 import os
-from typing import Tuple, Sequence, Union
+from typing import Iterable, List, Tuple, Sequence, Union
 
-from qasm2image.svg import _constants, _types
+from qasm2image.svg import _constants, _font_metrics, _types
 
 QubitType = Tuple[str, int]
 
@@ -78,60 +80,47 @@ def get_x_from_index(index: int) -> int:
     return x_coord
 
 
-def get_y_from_quantum_register(qreg_index_in_json: int,
-                                bit_mapping: dict) -> int:
-    """Compute the y-coordinate associated to the given quantum register.
+def get_y_from_row(row: int) -> int:
+    """Compute the y-coordinate of the line drawn at the given row.
 
-    This method assumes that all the quantum registers are drawn *before* the
-    classical ones.
+    The quantum registers are drawn *before* the classical ones, so the row
+    of the i-th classical bit line is (number of qubits + i).
 
     Parameter:
-        quantum_register_index_in_JSON (int): identifier of the quantum
-               register from the JSON circuit representation.
-        bit_mapping (dict): the map that stores the correspondances between
-               bits indices in the JSON circuit and the desired output
-               indices.
-               Structure:
-                  {'qubits': {index_in_JSON : index_in_drawing},
-                   'clbits': {index_in_JSON : index_in_drawing}}
+        row (int): index of the register line, from the top of the circuit.
     Returns:
-      int: The y-coordinate of the line representing the quantum register
-           number quantum_register_index.
+      int: The y-coordinate of the line drawn at the given row.
     """
-    y_coord = _constants.VERTICAL_BORDER
-    index_to_draw = bit_mapping['qubits'][qreg_index_in_json]
-    y_coord += index_to_draw * _constants.REGISTER_LINES_VERTICAL_SPACING
-    return y_coord
+    return _constants.VERTICAL_BORDER + \
+        row * _constants.REGISTER_LINES_VERTICAL_SPACING
 
 
-def get_y_from_classical_register(clreg_index_in_json: int,
-                                  quantum_registers_number: int,
-                                  bit_mapping: dict) -> int:
-    """Compute the y-coordinate associated to the given classical register.
+def get_coordinates(columns: int, qubit_rows: Sequence[int],
+                    clbit_rows: Sequence[int],
+                    qubits_number: int) -> _types.Coordinates:
+    """Precompute the coordinates used to draw a circuit.
 
-    This method assumes that all the quantum registers are drawn *before* the
-    classical ones.
+    The drawing functions need the coordinates of the columns and of the bit
+    lines several times per gate. They are computed once here and then
+    accessed with plain indexed lookups.
 
     Parameters:
-        clreg_index_in_json (int): identifier of the classical
-                                from the JSON circuit representation.
-        quantum_registers_number (int): Number of quantum registers in the
-                                        circuit.
-        bit_mapping (dict): the map that stores the correspondances between
-               bits indices in the JSON circuit and the desired output
-               indices.
-               Structure:
-                  {'qubits': {index_in_JSON : index_in_drawing},
-                   'clbits': {index_in_JSON : index_in_drawing}}
+        columns (int): Number of columns of the circuit.
+        qubit_rows (Sequence[int]): drawn row of each qubit, indexed by the
+                                    qubit indices in the JSON circuit.
+        clbit_rows (Sequence[int]): drawn row of each classical bit, counted
+                                    from the first classical bit line and
+                                    indexed by the classical bit indices in
+                                    the JSON circuit.
+        qubits_number (int): Number of quantum register lines.
     Returns:
-      int: The y-coordinate of the line representing the classical register
-           number classical_register_index.
+        Coordinates: the x-coordinate of each column and the y-coordinate of
+                     each bit line.
     """
-    y_coord = _constants.VERTICAL_BORDER
-    cl_index_to_draw = bit_mapping['clbits'][clreg_index_in_json]
-    index_to_draw = quantum_registers_number + cl_index_to_draw
-    y_coord += index_to_draw * _constants.REGISTER_LINES_VERTICAL_SPACING
-    return y_coord
+    return _types.Coordinates(
+        [get_x_from_index(index) for index in range(columns)],
+        [get_y_from_row(row) for row in qubit_rows],
+        [get_y_from_row(qubits_number + row) for row in clbit_rows])
 
 
 def get_dimensions(json_circuit, show_clbits: bool) -> Tuple[int, int]:
@@ -159,6 +148,20 @@ def get_dimensions(json_circuit, show_clbits: bool) -> Tuple[int, int]:
     if show_clbits:
         register_number += json_circuit['header'].get('number_of_clbits', 0)
 
+    return get_dimensions_from_sizes(circuit_gates_number, register_number)
+
+
+def get_dimensions_from_sizes(columns: int,
+                              register_number: int) -> Tuple[int, int]:
+    """Compute the width and height of a circuit from its number of columns.
+
+    Parameter:
+        columns         (int): Number of columns needed to draw the circuit.
+        register_number (int): Number of drawn register lines.
+    Returns:
+        tuple: The computed width and height of the circuit.
+    """
+    circuit_gates_number = columns
     width = _constants.REGISTER_NAME_WIDTH
     width += _constants.GATE_LEFT_BORDER
     width += circuit_gates_number * (
@@ -317,22 +320,95 @@ def get_max_index(bit_gate_rank: _types.BitRankType, instruction=None,
     return max(max_index_c, max_index_q), (minq, maxq, minc, maxc)
 
 
-def _get_text_dimensions(text: str, fontsize: int):
+# Arbitrary font size used to measure the texts, big enough to lower the
+# errors of the computations in adapt_text_font_size.
+_MEASURE_FONT_SIZE = 100
+
+# Character measured in place of the characters missing from the embedded
+# font metrics. It is one of the widest ones, so the texts still fit their
+# box.
+_FALLBACK_CHARACTER = 'W'
+
+
+def _get_metrics_text_dimensions(text: str,
+                                 fontsize: int) -> Tuple[float, float]:
+    """Measure a text with the embedded metrics of the bold font.
+
+    The metrics are only used when cairo is not available: they approximate
+    the ink extents cairo computes, without any call to a native library.
+
+    :param text: The text to measure.
+    :param fontsize: The font size of the text.
+    :return: The width and height of the text. The characters missing from
+    the embedded metrics are measured as _FALLBACK_CHARACTER.
+    """
+    pen_x = 0
+    x_min = y_min = float('inf')
+    x_max = y_max = float('-inf')
+    for character in text:
+        if character not in _font_metrics.ADVANCES:
+            character = _FALLBACK_CHARACTER
+        bounds = _font_metrics.BOUNDS.get(character)
+        if bounds is not None:
+            x_min = min(x_min, pen_x + bounds[0])
+            x_max = max(x_max, pen_x + bounds[1])
+            y_min = min(y_min, bounds[2])
+            y_max = max(y_max, bounds[3])
+        pen_x += _font_metrics.ADVANCES[character]
+    if x_min > x_max:
+        # Nothing is drawn.
+        return 0, 0
+    scale = fontsize / _font_metrics.UNITS_PER_EM
+    return (x_max - x_min) * scale, (y_max - y_min) * scale
+
+
+def _import_cairo():
     try:
         import cairocffi as cairo
-    except ImportError:
-        return len(text) * fontsize, fontsize
-    surface = cairo.SVGSurface('undefined65761354373731713.svg', 1280, 200)
+    except (ImportError, OSError):
+        # OSError is raised when cairocffi does not find the cairo library.
+        return None
+    return cairo
+
+
+def _get_texts_dimensions(texts: Sequence[str],
+                          fontsize: int) -> List[Tuple[float, float]]:
+    cairo = _import_cairo()
+    if cairo is None:
+        return [_get_metrics_text_dimensions(text, fontsize)
+                for text in texts]
+    # All the texts are measured with the same context, on a surface that
+    # does not write anything.
+    surface = cairo.SVGSurface(None, 1280, 200)
     cairo_context = cairo.Context(surface)
     cairo_context.select_font_face('Arial', cairo.FONT_SLANT_NORMAL,
                                    cairo.FONT_WEIGHT_BOLD)
     cairo_context.set_font_size(fontsize)
-    _, _, width, height, _, _ = cairo_context.text_extents(text)
+    dimensions = list()
+    for text in texts:
+        _, _, width, height, _, _ = cairo_context.text_extents(text)
+        dimensions.append((width, height))
+    surface.finish()
+    return dimensions
 
-    # Don't forget to remove the undefined65761354373731713.svg file
-    os.remove("undefined65761354373731713.svg")
 
-    return width, height
+def _get_text_dimensions(text: str, fontsize: int):
+    return _get_texts_dimensions([text], fontsize)[0]
+
+
+def _fit_font_size(text_width: float, text_height: float,
+                   desired_width: Union[int, float],
+                   desired_height: Union[int, float]) -> int:
+    # We want to fit the full text to the box, so we compute the scaling
+    # factor needed to fit the text measured with _MEASURE_FONT_SIZE.
+    font_scale = max(text_width / desired_width, text_height / desired_height)
+    if font_scale == 0:
+        # The text does not draw anything (empty or blank label), any font
+        # size fits the box.
+        return _MEASURE_FONT_SIZE
+    # Finally we do the assumption that applying a scaling factor to the font
+    # size is the same as applying this scaling factor to the rendered text.
+    return int(_MEASURE_FONT_SIZE / font_scale)
 
 
 def adapt_text_font_size(text: str, desired_width: Union[int, float],
@@ -344,19 +420,51 @@ def adapt_text_font_size(text: str, desired_width: Union[int, float],
     :param desired_height: The maximal height we want to obtain for the text.
     :return: The font-size that will make the text have the desired dimensions.
     """
-    # Take an arbitrary initial font size, big enough to lower the errors of
-    # the computations below
-    initial_font_size = 100
     # Draw the text. To draw the text with the best font size (not too small
     # nor too big) we compute its width with a known font size and adapt the
     # real font size.
-    text_width, text_height = _get_text_dimensions(text, initial_font_size)
-    # We want to fit the full gate name to the gate box, so we compute the
-    # scaling factor needed to fit the gate name.
-    font_scale = max(text_width / desired_width, text_height / desired_height)
-    # Finally we do the assumption that applying a scaling factor to the font
-    # size is the same as applying this scaling factor to the rendered text.
-    return int(initial_font_size / font_scale)
+    text_width, text_height = _get_text_dimensions(text, _MEASURE_FONT_SIZE)
+    return _fit_font_size(text_width, text_height, desired_width,
+                          desired_height)
+
+
+def adapt_texts_font_sizes(
+        texts_and_boxes: Iterable[Tuple[str, Union[int, float],
+                                        Union[int, float]]],
+        processes: int = 1) -> _types.FontSizesType:
+    """Compute the font size of several texts, measuring each text once.
+
+    A circuit usually draws a few distinct texts many times, so the texts are
+    deduplicated before being measured. The texts are measured with cairo,
+    or with the embedded font metrics when cairo is not available.
+
+    :param texts_and_boxes: (text, desired width, desired height) for each
+    text, see adapt_text_font_size. Repeated entries are allowed.
+    :param processes: Number of processes measuring the texts with cairo.
+    None uses all the processors of the machine.
+    :return: The font size of each (text, desired width, desired height).
+    """
+    if processes is None:
+        processes = os.cpu_count() or 1
+    texts_and_boxes = set(texts_and_boxes)
+    texts = sorted({text for text, _, _ in texts_and_boxes})
+    if processes > 1 and len(texts) > processes and \
+            _import_cairo() is not None:
+        chunks = [texts[first::processes] for first in range(processes)]
+        with concurrent.futures.ProcessPoolExecutor(
+                max_workers=processes) as executor:
+            measures = executor.map(_get_texts_dimensions, chunks,
+                                    itertools.repeat(_MEASURE_FONT_SIZE))
+            dimensions = dict(zip(itertools.chain.from_iterable(chunks),
+                                  itertools.chain.from_iterable(measures)))
+    else:
+        dimensions = dict(zip(texts, _get_texts_dimensions(
+            texts, _MEASURE_FONT_SIZE)))
+    font_sizes = dict()
+    for text, desired_width, desired_height in texts_and_boxes:
+        font_sizes[(text, desired_width, desired_height)] = _fit_font_size(
+            *dimensions[text], desired_width, desired_height)
+    return font_sizes
 
 
 def _update_data_structure(bit_gate_rank: _types.BitRankType,
@@ -368,13 +476,19 @@ def _update_data_structure(bit_gate_rank: _types.BitRankType,
         increment = 0
 
     # Compute the values to update.
-    index_to_update, (minq, maxq, minc, maxc) = get_max_index(bit_gate_rank,
-                                                              instruction=instruction)
+    index_to_update, bit_ranges = get_max_index(bit_gate_rank,
+                                                instruction=instruction)
     # And perform the update.
+    _update_bit_gate_rank(bit_gate_rank, index_to_update + increment,
+                          *bit_ranges)
+
+
+def _update_bit_gate_rank(bit_gate_rank: _types.BitRankType, rank: int,
+                          minq: int, maxq: int, minc: int, maxc: int) -> None:
     for qubit in range(minq, maxq + 1):
-        bit_gate_rank['qubits'][qubit] = index_to_update + increment
+        bit_gate_rank['qubits'][qubit] = rank
     for clbit in range(minc, maxc + 1):
-        bit_gate_rank['clbits'][clbit] = index_to_update + increment
+        bit_gate_rank['clbits'][clbit] = rank
 
 
 def get_involved_bits(instruction) -> Tuple[Sequence[int], Sequence[int]]:
@@ -388,6 +502,7 @@ def get_involved_bits(instruction) -> Tuple[Sequence[int], Sequence[int]]:
     if 'conditional' in instruction:
         mask = int(instruction['conditional']['mask'], 0)
         number_of_clbits = len(bin(mask)[2:])
-        clbits += list(range(number_of_clbits))
+        # Build a new list, the instruction should not be modified.
+        clbits = list(clbits) + list(range(number_of_clbits))
 
     return qubits, clbits
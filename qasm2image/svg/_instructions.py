@@ -0,0 +1,195 @@
+# ======================================================================
+# Copyright CERFACS (October 2018)
+# Contributor: Adrien Suau (suau@cerfacs.fr)
+#
+# This software is governed by the CeCILL-B license under French law and
+# abiding  by the  rules of  distribution of free software. You can use,
+# modify  and/or  redistribute  the  software  under  the  terms  of the
+# CeCILL-B license as circulated by CEA, CNRS and INRIA at the following
+# URL "http://www.cecill.info".
+#
+# As a counterpart to the access to  the source code and rights to copy,
+# modify and  redistribute granted  by the  license, users  are provided
+# only with a limited warranty and  the software's author, the holder of
+# the economic rights,  and the  successive licensors  have only limited
+# liability.
+#
+# In this respect, the user's attention is drawn to the risks associated
+# with loading,  using, modifying and/or  developing or reproducing  the
+# software by the user in light of its specific status of free software,
+# that  may mean  that it  is complicated  to manipulate,  and that also
+# therefore  means that  it is reserved for  developers and  experienced
+# professionals having in-depth  computer knowledge. Users are therefore
+# encouraged  to load and  test  the software's  suitability as  regards
+# their  requirements  in  conditions  enabling  the  security  of their
+# systems  and/or  data to be  ensured and,  more generally,  to use and
+# operate it in the same conditions as regards security.
+#
+# The fact that you  are presently reading this  means that you have had
+# knowledge of the CeCILL-B license and that you accept its terms.
+# ======================================================================
+
+
+"""Compact columnar representation of the instructions of a circuit.
+
+The JSON circuits produced by QISKit store each instruction as a dictionary
+with a string name, lists of bits and a classical condition encoded as
+hexadecimal strings. This module converts them once into an InstructionTable
+whose fields are flat arrays, so that the layout computation does not need to
+look up dictionaries or to parse strings for each instruction.
+
+The bits of the i-th instruction are stored in
+    qubits[qubit_offsets[i]:qubit_offsets[i + 1]]
+and the same scheme is used for the classical bits and the parameters.
+"""
+
+import array
+from typing import Dict, List, Sequence, Tuple
+
+# Typecode of the integer arrays. 'l' is at least 32 bits wide.
+_INDEX_TYPECODE = 'l'
+
+
+class InstructionTable:
+    """Instructions of a circuit, stored column by column.
+
+    Attributes:
+        qubits_number (int): number of qubits in the circuit.
+        clbits_number (int): number of classical bits in the circuit.
+        names (List[str]): table of the unique gate names, indexed by the
+                           values of name_ids.
+        name_ids (array): index in names of the gate name of each
+                          instruction.
+        qubit_offsets, clbit_offsets, param_offsets (array): position of the
+                          first qubit, classical bit and parameter of each
+                          instruction in the corresponding flat array. They
+                          have one more entry than there are instructions.
+        qubits, clbits (array): flat arrays of the bit indices.
+        params (array): flat array of the numeric parameters.
+        conditions (Dict[int, Tuple[int, int]]): decoded classical condition
+                          of the classically controlled instructions, indexed
+                          by instruction index. Each condition is stored as
+                          (value, number of classical bits in the mask).
+    """
+
+    __slots__ = ('qubits_number', 'clbits_number', 'names', 'name_ids',
+                 'qubit_offsets', 'qubits', 'clbit_offsets', 'clbits',
+                 'param_offsets', 'params', 'conditions')
+
+    def __init__(self, qubits_number: int = 0, clbits_number: int = 0) -> None:
+        self.qubits_number = qubits_number
+        self.clbits_number = clbits_number
+        self.names = list()  # type: List[str]
+        self.name_ids = array.array(_INDEX_TYPECODE)
+        self.qubit_offsets = array.array(_INDEX_TYPECODE, [0])
+        self.qubits = array.array(_INDEX_TYPECODE)
+        self.clbit_offsets = array.array(_INDEX_TYPECODE, [0])
+        self.clbits = array.array(_INDEX_TYPECODE)
+        self.param_offsets = array.array(_INDEX_TYPECODE, [0])
+        self.params = array.array('d')
+        self.conditions = dict()  # type: Dict[int, Tuple[int, int]]
+
+    @classmethod
+    def from_json(cls, json_circuit) -> 'InstructionTable':
+        """Convert the instructions of a JSON circuit.
+
+        :param json_circuit: A quantum circuit in JSON format.
+        :return: the instructions of the circuit in columnar form.
+        """
+        header = json_circuit['header']
+        table = cls(header.get('number_of_qubits', 0),
+                    header.get('number_of_clbits', 0))
+        # Name interning is done with a local dictionary, the table only
+        # keeps the list of names.
+        name_ids = dict()  # type: Dict[str, int]
+        for instruction in json_circuit['instructions']:
+            name = instruction['name']
+            name_id = name_ids.get(name)
+            if name_id is None:
+                name_id = name_ids[name] = len(table.names)
+                table.names.append(name)
+            conditional = instruction.get('conditional', None)
+            condition = None
+            if conditional is not None:
+                # int(x, 0) let the 'int' function choose automatically the
+                # good basis. The number of classical bits involved is the
+                # number of digits of the binary representation of the mask.
+                # The [2:] is to remove the "Ob" part returned by the "bin"
+                # function.
+                condition = (int(conditional['val'], 0),
+                             len(bin(int(conditional['mask'], 0))[2:]))
+            table.append(name_id, instruction['qubits'],
+                         instruction.get('clbits', ()),
+                         instruction.get('params', ()), condition)
+        return table
+
+    def append(self, name_id: int, qubits: Sequence[int],
+               clbits: Sequence[int] = (), params: Sequence[float] = (),
+               condition: Tuple[int, int] = None) -> None:
+        """Add an instruction at the end of the table.
+
+        :param name_id: index of the gate name in self.names.
+        :param qubits: qubits used by the instruction.
+        :param clbits: classical bits used by the instruction.
+        :param params: numeric parameters of the instruction.
+        :param condition: (value, number of classical bits) if the
+        instruction is classically controlled, None otherwise.
+        """
+        if condition is not None:
+            self.conditions[len(self.name_ids)] = condition
+        self.name_ids.append(name_id)
+        self.qubits.extend(qubits)
+        self.qubit_offsets.append(len(self.qubits))
+        self.clbits.extend(clbits)
+        self.clbit_offsets.append(len(self.clbits))
+        self.params.extend(params)
+        self.param_offsets.append(len(self.params))
+
+    def slice(self, start: int, stop: int) -> 'InstructionTable':
+        """Extract the instructions start to stop - 1 in a new table.
+
+        The gate names table is shared with the new table.
+
+        :param start: index of the first extracted instruction.
+        :param stop: index following the last extracted instruction.
+        :return: the extracted instructions.
+        """
+        table = InstructionTable(self.qubits_number, self.clbits_number)
+        table.names = self.names
+        table.name_ids = self.name_ids[start:stop]
+        for offsets_name, values_name in (('qubit_offsets', 'qubits'),
+                                          ('clbit_offsets', 'clbits'),
+                                          ('param_offsets', 'params')):
+            offsets = getattr(self, offsets_name)
+            first, last = offsets[start], offsets[stop]
+            setattr(table, values_name, getattr(self, values_name)[first:last])
+            setattr(table, offsets_name,
+                    array.array(_INDEX_TYPECODE,
+                                (offset - first
+                                 for offset in offsets[start:stop + 1])))
+        table.conditions = {index - start: condition
+                            for index, condition in self.conditions.items()
+                            if start <= index < stop}
+        return table
+
+    def __len__(self) -> int:
+        return len(self.name_ids)
+
+    def name(self, index: int) -> str:
+        """Name of the gate applied by the index-th instruction."""
+        return self.names[self.name_ids[index]]
+
+    def instruction_qubits(self, index: int) -> Sequence[int]:
+        """Qubits used by the index-th instruction."""
+        offsets = self.qubit_offsets
+        return self.qubits[offsets[index]:offsets[index + 1]]
+
+    def instruction_clbits(self, index: int) -> Sequence[int]:
+        """Classical bits used by the index-th instruction."""
+        offsets = self.clbit_offsets
+        return self.clbits[offsets[index]:offsets[index + 1]]
+
+    def instruction_params(self, index: int) -> Sequence[float]:
+        """Numeric parameters of the index-th instruction."""
+        offsets = self.param_offsets
+        return self.params[offsets[index]:offsets[index + 1]]
@@ -0,0 +1,447 @@
+# ======================================================================
+# Copyright CERFACS (October 2018)
+# Contributor: Adrien Suau (suau@cerfacs.fr)
+#
+# This software is governed by the CeCILL-B license under French law and
+# abiding  by the  rules of  distribution of free software. You can use,
+# modify  and/or  redistribute  the  software  under  the  terms  of the
+# CeCILL-B license as circulated by CEA, CNRS and INRIA at the following
+# URL "http://www.cecill.info".
+#
+# As a counterpart to the access to  the source code and rights to copy,
+# modify and  redistribute granted  by the  license, users  are provided
+# only with a limited warranty and  the software's author, the holder of
+# the economic rights,  and the  successive licensors  have only limited
+# liability.
+#
+# In this respect, the user's attention is drawn to the risks associated
+# with loading,  using, modifying and/or  developing or reproducing  the
+# software by the user in light of its specific status of free software,
+# that  may mean  that it  is complicated  to manipulate,  and that also
+# therefore  means that  it is reserved for  developers and  experienced
+# professionals having in-depth  computer knowledge. Users are therefore
+# encouraged  to load and  test  the software's  suitability as  regards
+# their  requirements  in  conditions  enabling  the  security  of their
+# systems  and/or  data to be  ensured and,  more generally,  to use and
+# operate it in the same conditions as regards security.
+#
+# The fact that you  are presently reading this  means that you have had
+# knowledge of the CeCILL-B license and that you accept its terms.
+# ======================================================================
+
+"""This module computes the layout of a quantum circuit.
+
+The layout is everything a drawing backend needs to know about the circuit:
+the column in which each instruction should be drawn, the bits it uses, the
+kind of glyph representing it and the label written in the glyph. It is
+computed once and then consumed by the SVG drawer in _drawing.py or by any
+other output format (see qasm2html for example).
+
+The way each gate is drawn is described by a GateRenderer stored in a
+registry indexed by gate name. New gates can be drawn by registering them with
+register_gate.
+
+The instructions are first converted into the compact InstructionTable of
+_instructions.py. The column of each instruction is then computed with the
+bit_gate_rank data structure described in the documentation of the _drawing
+module.
+"""
+
+import sys
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from qasm2image.svg import _constants, _helpers, _instructions, _repeats, \
+    _types
+
+# The different glyphs used to represent an instruction.
+# Instruction that uses a column but is not drawn (unsupported gates).
+GLYPH_NONE = 'none'
+# Instruction drawn as a box with its label inside.
+GLYPH_GATE = 'gate'
+# Controlled gate: control circles linked to a round box with a label.
+GLYPH_CONTROLLED_GATE = 'controlled_gate'
+# (C)CX gate: control circles linked to the stylised cross.
+GLYPH_CNOT = 'cnot'
+# Swap gate: two crosses linked by a line.
+GLYPH_SWAP = 'swap'
+# Measure: a box on the qubit linked to the classical bit.
+GLYPH_MEASURE = 'measure'
+# Barrier: nothing is drawn and no column is used.
+GLYPH_BARRIER = 'barrier'
+
+_GLYPHS = (GLYPH_NONE, GLYPH_GATE, GLYPH_CONTROLLED_GATE, GLYPH_CNOT,
+           GLYPH_SWAP, GLYPH_MEASURE, GLYPH_BARRIER)
+
+# Gate name -> GateRenderer describing how to draw the gate. Filled by
+# register_gate, see _register_default_gates for the supported gates.
+_GATE_RENDERERS = dict()
+
+# (label of the renderer, conditional part, parameters) -> label written in
+# the gate. Circuits repeat the same gates with the same parameters many
+# times, so each label is formatted once. The cache is emptied when full.
+_LABELS = dict()  # type: Dict[Tuple[str, str, Tuple[float, ...]], str]
+_LABELS_MAX_SIZE = 2 ** 16
+
+
+def get_bit_labels(json_circuit) -> Tuple[List[Tuple[str, int]],
+                                          List[Tuple[str, int]]]:
+    """Compute the labels of the qubits and classical bits of the circuit.
+
+    :param json_circuit: A quantum circuit in JSON format.
+    :return: the qubit labels and the classical bit labels, each label being
+    a (register name, index in register) pair.
+    """
+    json_header = json_circuit['header']
+    qubit_labels = [tuple(label) for label in
+                    json_header.get('qubit_labels', [])]
+    # TEMPORARY FIX FOR THE QOBJ STRUCTURE
+    # "issue": the json_circuit['header']['clbit_labels'] and
+    # json_circuit['header']['qubit_labels'] don't have the same meaning and it
+    # seems unintuitive. I fix that here. This part should be removed if the
+    # qobj structure change to fix this behaviour.
+    clbit_labels = list()
+    for clbit_label in json_header.get('clbit_labels', []):
+        for i in range(clbit_label[1] + 1):
+            clbit_labels.append((clbit_label[0], i))
+    return qubit_labels, clbit_labels
+
+
+def get_bit_rows(json_circuit, bit_order: dict = None) -> \
+        Tuple[List[int], List[int]]:
+    """Compute the drawn row of each bit of the circuit.
+
+    :param json_circuit: A quantum circuit in JSON format.
+    :param bit_order: A Python dictionary mapping bit labels, given as
+    (register name, index in register) tuples, to the row where the bit should
+    be drawn. If None, the bits are drawn in the order of the JSON circuit.
+    :return: the row of each qubit and of each classical bit, indexed by the
+    bit indices in the JSON circuit. The classical bit rows are counted from
+    the first classical bit line.
+    """
+    qubit_labels, clbit_labels = get_bit_labels(json_circuit)
+
+    # Take the appropriate default value for bit_order if not provided by the
+    # user. Register names and indices are kept separated in the keys, so
+    # that the labels ('q1', 1) and ('q', 11) do not collide.
+    if bit_order is None:
+        return list(range(len(qubit_labels))), list(range(len(clbit_labels)))
+
+    # Transform the bit_order structure in a more useful one: the bit_order
+    # structure associates bit labels to their index, but in the json circuit
+    # we don't have bit labels but rather bit indices. So we want lists
+    # mapping indices in the json circuit to indices on the drawn circuit.
+    return ([bit_order[qubit_label] for qubit_label in qubit_labels],
+            [bit_order[clbit_label] for clbit_label in clbit_labels])
+
+
+def register_gate(name: str, glyph: str, label: str = None,
+                  controls: int = 0) -> None:
+    """Register how the gate called name should be drawn.
+
+    The registered gates are drawn without any further analysis of their
+    name, so this function can be used to draw new gates or to change the
+    representation of the supported ones. For example:
+
+        register_gate('cswap', GLYPH_SWAP, controls=1)
+        register_gate('rzz', GLYPH_GATE, 'ZZ')
+
+    :param name: Name of the gate in the unrolled circuit.
+    :param glyph: Glyph representing the gate, one of the GLYPH_* constants.
+    :param label: Text written in the gate. The conditional part and the
+    parameters of the instruction are appended to this text. Default to the
+    name of the gate for GLYPH_GATE and GLYPH_CONTROLLED_GATE, '' otherwise.
+    :param controls: Number of control qubits. The controls are the first
+    qubits of the gate and are drawn as black circles linked to the targets.
+    :raise ValueError: if the glyph is unknown or if the number of controls is
+    negative.
+    """
+    if glyph not in _GLYPHS:
+        raise ValueError("Unknown glyph '{}'. The glyph should be one of "
+                         "{}.".format(glyph, ", ".join(_GLYPHS)))
+    if controls < 0:
+        raise ValueError("The number of controls should be non-negative.")
+    if label is None:
+        label = name if glyph in (GLYPH_GATE, GLYPH_CONTROLLED_GATE) else ""
+    _GATE_RENDERERS[name] = _types.GateRenderer(glyph, label, controls)
+
+
+def _register_default_gates() -> None:
+    base_gates = ['x', 'y', 'z', 'h', 's', 't', 'sdg', 'tdg']
+    parametrised_gates = ['u0', 'u1', 'u2', 'u3', 'u', 'U', 'rx', 'ry', 'rz']
+    for name in base_gates:
+        register_gate(name, GLYPH_GATE, name.upper())
+        register_gate('c' + name, GLYPH_CONTROLLED_GATE, name.upper(), 1)
+        register_gate('cc' + name, GLYPH_CONTROLLED_GATE, name.upper(), 2)
+    for name in parametrised_gates:
+        register_gate(name, GLYPH_GATE)
+        register_gate('c' + name, GLYPH_CONTROLLED_GATE, name, 1)
+        register_gate('cc' + name, GLYPH_CONTROLLED_GATE, name, 2)
+    for name, controls in [('cx', 1), ('CX', 1), ('ccx', 2)]:
+        register_gate(name, GLYPH_CNOT, controls=controls)
+    register_gate('swap', GLYPH_SWAP)
+    register_gate('cswap', GLYPH_SWAP, controls=1)
+    register_gate('rzz', GLYPH_GATE)
+    register_gate('reset', GLYPH_GATE)
+    register_gate('measure', GLYPH_MEASURE, "M")
+    register_gate('barrier', GLYPH_BARRIER)
+    # The identity takes a column but is not drawn.
+    register_gate('id', GLYPH_NONE)
+
+
+def _round_numeric_param(numeric_param: float) -> str:
+    if abs(numeric_param) < 1e-10:
+        # Avoid the "0.0"
+        return "0"
+    return str(round(numeric_param, _constants.PARAMETERS_ROUND_DECIMAL))
+
+
+def _get_label(label: str, name_conditional_part: str,
+               params: Tuple[float, ...]) -> str:
+    """Return the label of a gate, formatting it only the first time."""
+    key = (label, name_conditional_part, params)
+    gate_label = _LABELS.get(key, None)
+    if gate_label is None:
+        gate_label = label + name_conditional_part
+        if params:
+            gate_label += "({})".format(
+                ",".join(map(_round_numeric_param, params)))
+        if len(_LABELS) >= _LABELS_MAX_SIZE:
+            _LABELS.clear()
+        # Parameters rounded to the same values share the same string.
+        gate_label = _LABELS[key] = sys.intern(gate_label)
+    return gate_label
+
+
+def _make_gate_layout(instructions: _instructions.InstructionTable,
+                      index: int, column: int,
+                      show_clbits: bool) -> _types.GateLayout:
+    """Compute the layout of one instruction whose column is already known.
+
+    :param instructions: The instructions of the circuit.
+    :param index: Index of the instruction in instructions.
+    :param column: Column in which the instruction is drawn.
+    :param show_clbits: True if the classical bits are drawn, False otherwise.
+    :return: the layout of the given instruction.
+    :raise NotImplementedError: if the given instruction is classically
+    controlled, affects more than 1 qubit and the classical bits are drawn.
+    """
+    name = instructions.name(index)
+    params = instructions.instruction_params(index)
+    renderer = _GATE_RENDERERS.get(name, None)
+    if renderer is None:
+        # Warn the user we encountered a non-implemented gate. Its parameters
+        # are still displayed if it has some.
+        print("WARNING: Gate '{}' is not implemented".format(name))
+        renderer = _types.GateRenderer(GLYPH_GATE if params else GLYPH_NONE,
+                                       name, 0)
+    glyph, label, controls = renderer
+
+    qubits = tuple(instructions.instruction_qubits(index))
+    clbits = tuple()
+    name_conditional_part = ""
+    condition, condition_clbits = None, tuple()
+
+    if index in instructions.conditions:
+        value, number_of_clbits = instructions.conditions[index]
+        if show_clbits:
+            if len(qubits) > 1:
+                raise NotImplementedError("Classically controlled multi-qubit "
+                                          "instructions are not implemented "
+                                          "for the moment.")
+            assert number_of_clbits <= instructions.clbits_number
+            condition = value
+            condition_clbits = tuple(range(number_of_clbits))
+        else:
+            # TODO: Change 'c' by the name of the classical register.
+            name_conditional_part = "[c={}]".format(value)
+
+    if glyph == GLYPH_MEASURE:
+        clbit = instructions.instruction_clbits(index)[0]
+        if show_clbits:
+            clbits = (clbit,)
+        else:
+            # The classical bits are not drawn, so the measured bit is written
+            # in the gate.
+            glyph, label = GLYPH_GATE, label + str(clbit)
+    elif label:
+        label = _get_label(label, name_conditional_part, tuple(params))
+
+    return _types.GateLayout(column, glyph, label, qubits, controls, clbits,
+                             condition, condition_clbits)
+
+
+def _layout_gate(bit_gate_rank: _types.BitRankType,
+                 instructions: _instructions.InstructionTable, index: int,
+                 show_clbits: bool) -> _types.GateLayout:
+    """Compute the layout of one instruction and update bit_gate_rank.
+
+    :param bit_gate_rank: see module documentation for more information on this
+    data structure.
+    :param instructions: The instructions of the circuit.
+    :param index: Index of the instruction in instructions.
+    :param show_clbits: True if the classical bits are drawn, False otherwise.
+    :return: the layout of the given instruction.
+    :raise NotImplementedError: see _make_gate_layout.
+    """
+    qubits = instructions.instruction_qubits(index)
+    clbits = instructions.instruction_clbits(index)
+    if index in instructions.conditions:
+        # The classical bits of the condition are used even if they are not
+        # drawn.
+        clbits = tuple(clbits) + tuple(
+            range(instructions.conditions[index][1]))
+
+    # Compute the column of the gate.
+    column, bit_ranges = _helpers.get_max_index(bit_gate_rank, qubits=qubits,
+                                                clbits=clbits)
+
+    # And take care of our data structure that keeps track of the position
+    # where we want to draw. Barriers do not take a column.
+    _helpers._update_bit_gate_rank(
+        bit_gate_rank, column + (instructions.name(index) != 'barrier'),
+        *bit_ranges)
+
+    return _make_gate_layout(instructions, index, column, show_clbits)
+
+
+def _compute_columns_vectorized(
+        instructions: _instructions.InstructionTable) -> Optional[List[int]]:
+    """Compute the column of each instruction with NumPy, if possible.
+
+    :param instructions: The instructions of the circuit.
+    :return: the column of each instruction, or None if the vectorized
+    algorithm cannot be used: NumPy is not installed or the circuit contains
+    instructions not supported by _vectorized.compute_columns.
+    """
+    if instructions.conditions:
+        return None
+    try:
+        from qasm2image.svg import _vectorized
+    except ImportError:
+        return None
+    return _vectorized.compute_columns(instructions)
+
+
+def iter_gate_layouts(instructions: _instructions.InstructionTable,
+                      show_clbits: bool = True, vectorize: bool = False,
+                      bit_gate_rank: _types.BitRankType = None) -> \
+        Iterator[_types.GateLayout]:
+    """Lazily compute the layout of each instruction of the circuit.
+
+    :param instructions: The instructions of the circuit, see
+    _instructions.InstructionTable.from_json.
+    :param show_clbits: True if the classical bits are drawn, False otherwise.
+    :param vectorize: True to compute the columns with NumPy (see
+    _vectorized.py). The scalar algorithm is used if NumPy is not available
+    or if the circuit has classically controlled instructions.
+    :param bit_gate_rank: The state of the bit_gate_rank structure before the
+    first instruction, updated in place while the iterator is consumed. It
+    allows to continue the layout of a circuit with new instructions. Default
+    to the state of an empty circuit. The columns are never vectorized when
+    it is given.
+    :return: an iterator over the layouts of the instructions, in the order of
+    the circuit.
+    """
+    columns = None
+    if vectorize and bit_gate_rank is None:
+        columns = _compute_columns_vectorized(instructions)
+    if columns is not None:
+        for index, column in enumerate(columns):
+            yield _make_gate_layout(instructions, index, column, show_clbits)
+        return
+
+    # Create the internal structure used to compute the columns.
+    if bit_gate_rank is None:
+        bit_gate_rank = {'clbits': [0] * instructions.clbits_number,
+                         'qubits': [0] * instructions.qubits_number}
+    for index in range(len(instructions)):
+        yield _layout_gate(bit_gate_rank, instructions, index, show_clbits)
+
+
+def _get_repeat_layouts(gates: List[_types.GateLayout],
+                        instructions: _instructions.InstructionTable,
+                        blocks: List[Tuple[int, int]],
+                        runs: List[_repeats.Run],
+                        show_clbits: bool) -> List[_types.RepeatLayout]:
+    """Compute the boxes of the collapsed blocks, see _repeats.collapse_runs.
+
+    :param gates: The layout of each instruction of the collapsed circuit.
+    :param instructions: The instructions of the collapsed circuit.
+    :param blocks: The (start, stop) indices of each copied block.
+    :param runs: The collapsed runs, in the order of blocks.
+    :param show_clbits: True if the classical bits are drawn, False otherwise.
+    :return: the layout of the box of each block drawing something.
+    """
+    repeats = list()
+    for (start, stop), run in zip(blocks, runs):
+        columns = [gate.column for gate in gates[start:stop]
+                   if gate.glyph != GLYPH_BARRIER]
+        if not columns:
+            continue
+        # The barrier preceding the block uses the bits drawn in the rows of
+        # the block.
+        clbits = instructions.instruction_clbits(start - 1)
+        repeats.append(_types.RepeatLayout(
+            min(columns), max(columns),
+            tuple(instructions.instruction_qubits(start - 1)),
+            tuple(clbits) if show_clbits else tuple(), run.count))
+    return repeats
+
+
+def layout_json_circuit(json_circuit, show_clbits: bool = True,
+                        bit_order: dict = None, vectorize: bool = False,
+                        processes: int = 1,
+                        collapse_repeats: bool = False) -> \
+        _types.CircuitLayout:
+    """Compute the layout of a circuit represented as a JSON dictionary.
+
+    :param json_circuit: A quantum circuit in JSON format. This can be obtained
+    with the QISKit object qiskit.unroll.JsonBackend.
+    :param show_clbits: True if the classical bits are drawn, False otherwise.
+    :param bit_order: A Python dictionary storing the bit ordering. See
+    get_bit_rows.
+    :param vectorize: True to compute the columns with NumPy, see
+    iter_gate_layouts.
+    :param processes: Number of processes used to compute the layout. The
+    circuit is split at the points where all the qubits are aligned, see
+    _parallel.py. 1 computes the layout in the current process, None uses
+    all the processors of the machine.
+    :param collapse_repeats: True to lay out only once the blocks of
+    instructions repeated consecutively, see _repeats.py. The repetitions
+    are described by the repeats field of the layout.
+    :return: the layout of the circuit.
+    """
+    qubit_labels, clbit_labels = get_bit_labels(json_circuit)
+    qubits_number = json_circuit['header'].get('number_of_qubits', 0)
+    clbits_number = json_circuit['header'].get('number_of_clbits', 0)
+    if not show_clbits:
+        clbit_labels, clbits_number = [], 0
+
+    qubit_rows, clbit_rows = get_bit_rows(json_circuit, bit_order)
+
+    instructions = _instructions.InstructionTable.from_json(json_circuit)
+    runs, blocks = list(), list()
+    if collapse_repeats:
+        runs = _repeats.find_runs(instructions)
+        instructions, blocks = _repeats.collapse_runs(instructions, runs,
+                                                      qubit_rows, clbit_rows)
+    if processes == 1:
+        gates = list(iter_gate_layouts(instructions, show_clbits, vectorize))
+    else:
+        from qasm2image.svg import _parallel
+        gates = _parallel.layout_instructions(instructions, show_clbits,
+                                              vectorize, processes)
+    columns = max((gate.column + (gate.glyph != GLYPH_BARRIER)
+                   for gate in gates), default=0)
+
+    repeats = _get_repeat_layouts(gates, instructions, blocks, runs,
+                                  show_clbits)
+
+    return _types.CircuitLayout(
+        ["{}[{}]".format(*label) for label in qubit_labels],
+        ["{}[{}]".format(*label) for label in clbit_labels],
+        qubits_number, clbits_number, columns, qubit_rows, clbit_rows, gates,
+        repeats)
+
+
+_register_default_gates()
@@ -0,0 +1,171 @@
+# ======================================================================
+# Copyright CERFACS (October 2018)
+# Contributor: Adrien Suau (suau@cerfacs.fr)
+#
+# This software is governed by the CeCILL-B license under French law and
+# abiding  by the  rules of  distribution of free software. You can use,
+# modify  and/or  redistribute  the  software  under  the  terms  of the
+# CeCILL-B license as circulated by CEA, CNRS and INRIA at the following
+# URL "http://www.cecill.info".
+#
+# As a counterpart to the access to  the source code and rights to copy,
+# modify and  redistribute granted  by the  license, users  are provided
+# only with a limited warranty and  the software's author, the holder of
+# the economic rights,  and the  successive licensors  have only limited
+# liability.
+#
+# In this respect, the user's attention is drawn to the risks associated
+# with loading,  using, modifying and/or  developing or reproducing  the
+# software by the user in light of its specific status of free software,
+# that  may mean  that it  is complicated  to manipulate,  and that also
+# therefore  means that  it is reserved for  developers and  experienced
+# professionals having in-depth  computer knowledge. Users are therefore
+# encouraged  to load and  test  the software's  suitability as  regards
+# their  requirements  in  conditions  enabling  the  security  of their
+# systems  and/or  data to be  ensured and,  more generally,  to use and
+# operate it in the same conditions as regards security.
+#
+# The fact that you  are presently reading this  means that you have had
+# knowledge of the CeCILL-B license and that you accept its terms.
+# ======================================================================
+
+
+"""Parallel computation of the layout of a circuit.
+
+An instruction whose drawn part spans all the qubit lines (a barrier on all
+the qubits, a gate between the first and the last qubit, a measure of the
+first qubit, ...) aligns the ranks of all the qubits in the bit_gate_rank
+structure. As all the instructions use at least one qubit, the layout of the
+instructions following such a synchronisation point does not depend on the
+previous ones, except for a column offset.
+
+This module cuts the circuit at these points, computes the layout of the
+segments in a pool of processes and stitches them back together. The result
+is identical to the one of the sequential algorithm.
+"""
+
+import concurrent.futures
+import os
+from typing import Dict, List, Tuple
+
+from qasm2image.svg import _instructions, _layout, _types
+
+# Number of segments given to each process. More segments balance the load
+# better, but each segment has a fixed cost.
+_SEGMENTS_PER_PROCESS = 4
+
+
+def get_synchronisation_points(
+        instructions: _instructions.InstructionTable) -> List[int]:
+    """Find the instructions that align the ranks of all the qubits.
+
+    :param instructions: The instructions of the circuit.
+    :return: the indices of the instructions after which the layout of the
+    circuit can be split, in increasing order. The list is empty if the
+    circuit contains an instruction without qubits.
+    """
+    last_qubit = instructions.qubits_number - 1
+    qubit_offsets, clbit_offsets = (instructions.qubit_offsets,
+                                    instructions.clbit_offsets)
+    qubits = instructions.qubits
+    points = list()
+    for index in range(len(instructions)):
+        start, stop = qubit_offsets[index], qubit_offsets[index + 1]
+        if start == stop:
+            return []
+        if min(qubits[start:stop]) != 0:
+            continue
+        # Instructions using classical bits are drawn up to the last qubit,
+        # see _helpers.get_max_index.
+        if (clbit_offsets[index] != clbit_offsets[index + 1] or
+                index in instructions.conditions or
+                max(qubits[start:stop]) == last_qubit):
+            points.append(index)
+    return points
+
+
+def split_instructions(instructions: _instructions.InstructionTable,
+                       segments_number: int) -> List[Tuple[int, int]]:
+    """Split the circuit in segments whose layouts can be computed separately.
+
+    :param instructions: The instructions of the circuit.
+    :param segments_number: The desired number of segments. Fewer segments
+    are returned if the circuit does not have enough synchronisation points.
+    :return: the (start, stop) indices of the segments. All the segments
+    except the last one end with a synchronisation point.
+    """
+    instructions_number = len(instructions)
+    points = get_synchronisation_points(instructions)
+    segments, start, point_index = list(), 0, 0
+    for segment in range(1, segments_number):
+        # Take the first synchronisation point after the ideal boundary.
+        boundary = segment * instructions_number // segments_number
+        while point_index < len(points) and points[point_index] < boundary:
+            point_index += 1
+        if point_index == len(points):
+            break
+        stop = points[point_index] + 1
+        if start < stop < instructions_number:
+            segments.append((start, stop))
+            start = stop
+    segments.append((start, instructions_number))
+    return segments
+
+
+def _layout_segment(instructions: _instructions.InstructionTable,
+                    show_clbits: bool, vectorize: bool,
+                    renderers: Dict[str, _types.GateRenderer]) -> \
+        Tuple[List[_types.GateLayout], int]:
+    """Compute the layout of a segment, in a worker process.
+
+    :return: the layouts of the instructions of the segment, as if the
+    segment started the circuit, and the rank of all the qubits after the
+    segment.
+    """
+    # The gates registered in the parent process are not known by the worker
+    # processes started with the 'spawn' method.
+    _layout._GATE_RENDERERS.update(renderers)
+    gates = list(_layout.iter_gate_layouts(instructions, show_clbits,
+                                           vectorize))
+    last = len(instructions) - 1
+    end_rank = gates[-1].column + (instructions.name(last) != 'barrier')
+    return gates, end_rank
+
+
+def layout_instructions(instructions: _instructions.InstructionTable,
+                        show_clbits: bool = True, vectorize: bool = False,
+                        processes: int = None) -> List[_types.GateLayout]:
+    """Compute the layout of each instruction with a pool of processes.
+
+    :param instructions: The instructions of the circuit.
+    :param show_clbits: True if the classical bits are drawn, False otherwise.
+    :param vectorize: see _layout.iter_gate_layouts.
+    :param processes: Number of processes used. Default to the number of
+    processors on the machine.
+    :return: the layouts of the instructions, identical to the ones computed
+    by _layout.iter_gate_layouts.
+    """
+    if processes is None:
+        processes = os.cpu_count() or 1
+    segments = split_instructions(instructions,
+                                  processes * _SEGMENTS_PER_PROCESS)
+    if len(segments) == 1:
+        return list(_layout.iter_gate_layouts(instructions, show_clbits,
+                                              vectorize))
+
+    renderers = dict(_layout._GATE_RENDERERS)
+    with concurrent.futures.ProcessPoolExecutor(
+            max_workers=min(processes, len(segments))) as executor:
+        futures = [executor.submit(_layout_segment,
+                                   instructions.slice(start, stop),
+                                   show_clbits, vectorize, renderers)
+                   for start, stop in segments]
+        # Stitch the segments, each one being shifted by the ranks of the
+        # qubits at the end of the previous one.
+        gates, offset = list(), 0
+        for future in futures:
+            segment_gates, end_rank = future.result()
+            gates.extend(gate._replace(column=gate.column + offset)
+                         for gate in segment_gates)
+            offset += end_rank
+    return gates
@@ -0,0 +1,278 @@
+# ======================================================================
+# Copyright CERFACS (October 2018)
+# Contributor: Adrien Suau (suau@cerfacs.fr)
+#
+# This software is governed by the CeCILL-B license under French law and
+# abiding  by the  rules of  distribution of free software. You can use,
+# modify  and/or  redistribute  the  software  under  the  terms  of the
+# CeCILL-B license as circulated by CEA, CNRS and INRIA at the following
+# URL "http://www.cecill.info".
+#
+# As a counterpart to the access to  the source code and rights to copy,
+# modify and  redistribute granted  by the  license, users  are provided
+# only with a limited warranty and  the software's author, the holder of
+# the economic rights,  and the  successive licensors  have only limited
+# liability.
+#
+# In this respect, the user's attention is drawn to the risks associated
+# with loading,  using, modifying and/or  developing or reproducing  the
+# software by the user in light of its specific status of free software,
+# that  may mean  that it  is complicated  to manipulate,  and that also
+# therefore  means that  it is reserved for  developers and  experienced
+# professionals having in-depth  computer knowledge. Users are therefore
+# encouraged  to load and  test  the software's  suitability as  regards
+# their  requirements  in  conditions  enabling  the  security  of their
+# systems  and/or  data to be  ensured and,  more generally,  to use and
+# operate it in the same conditions as regards security.
+#
+# The fact that you  are presently reading this  means that you have had
+# knowledge of the CeCILL-B license and that you accept its terms.
+# ======================================================================
+
+
+"""Detection of the consecutive repetitions of instruction blocks.
+
+Trotterized and variational circuits apply the same layer of instructions
+many times in a row. This module finds these runs in an InstructionTable and
+builds a smaller table where each run is replaced by a single copy of its
+block, so that the layout and the drawing only depend on the unique content
+of the circuit. The drawing functions then surround the copy with a box
+annotated with the number of repetitions.
+
+The instructions are first mapped to integer tokens, two instructions having
+the same token if they apply the same gate with the same parameters and
+condition to the same bits. The blocks are compared with polynomial rolling
+hashes of the tokens: once the prefix hashes are computed, the hash of any
+block is obtained in constant time. For each block length, the hashes locate
+the regions of the circuit made of copies of a block, see
+_get_periodic_regions. The runs are then chosen greedily from the beginning
+of the circuit, and each run chosen is checked token by token, so a hash
+collision can never collapse different blocks.
+"""
+
+from typing import Callable, Dict, Iterable, List, NamedTuple, Sequence, \
+    Tuple
+
+from qasm2image.svg import _instructions
+
+# Maximal number of instructions in a repeated block.
+MAX_BLOCK_LENGTH = 512
+
+_HASH_BASE = 1000003
+_HASH_MODULUS = 2 ** 61 - 1
+
+Run = NamedTuple('Run', [
+    ('start', int),
+    ('length', int),
+    ('count', int)])
+"""count consecutive copies of the length instructions starting at start."""
+
+
+def _get_tokens(instructions: _instructions.InstructionTable) -> List[int]:
+    """Map each instruction to an integer identifying its content."""
+    token_ids = dict()  # type: Dict[tuple, int]
+    tokens = list()
+    for index in range(len(instructions)):
+        key = (instructions.name_ids[index],
+               tuple(instructions.instruction_qubits(index)),
+               tuple(instructions.instruction_clbits(index)),
+               tuple(instructions.instruction_params(index)),
+               instructions.conditions.get(index, None))
+        tokens.append(token_ids.setdefault(key, len(token_ids)))
+    return tokens
+
+
+def _get_periodic_regions(tokens: List[int], max_block_length: int,
+                          block_hash: Callable[[int, int], int]) -> \
+        List[Tuple[int, int, int]]:
+    """Find the maximal regions made of at least 2 copies of a block.
+
+    Any 2 consecutive copies of a block of length L contain an instruction
+    whose index is a multiple of L. For each length, only these anchors are
+    compared with the instruction L positions after them, and the matching
+    anchors are extended in both directions with a binary search on the
+    block hashes. The work is then O(n log(max_block_length) log(n)) for n
+    instructions, whether the circuit repeats itself or not.
+
+    :param tokens: The tokens of the instructions, see _get_tokens.
+    :param max_block_length: Maximal number of instructions in a block.
+    :param block_hash: Hash of the block of tokens of given start and length.
+    :return: the (start, stop, length) of each maximal region in which each
+    instruction is equal to the one length positions after it, if the region
+    holds at least 2 copies. The instructions are compared with their hash.
+    """
+    size = len(tokens)
+
+    def extension(first: int, second: int, limit: int, forward: bool) -> int:
+        # Number of equal instructions after (or before) first and second.
+        lower, upper = 0, limit
+        while lower < upper:
+            middle = (lower + upper + 1) // 2
+            if forward:
+                equal = block_hash(first, middle) == \
+                    block_hash(second, middle)
+            else:
+                equal = block_hash(first - middle, middle) == \
+                    block_hash(second - middle, middle)
+            if equal:
+                lower = middle
+            else:
+                upper = middle - 1
+        return lower
+
+    regions = list()
+    for length in range(1, min(max_block_length, size // 2) + 1):
+        region_end = 0
+        for anchor in range(0, size - length, length):
+            # An anchor inside the last region would find it again.
+            if anchor < region_end or \
+                    tokens[anchor] != tokens[anchor + length]:
+                continue
+            after = extension(anchor, anchor + length, size - anchor - length,
+                              True)
+            before = extension(anchor, anchor + length, anchor, False)
+            region_end = anchor + after
+            if before + after >= length:
+                regions.append((anchor - before, region_end + length, length))
+    return regions
+
+
+def find_runs(instructions: _instructions.InstructionTable,
+              max_block_length: int = MAX_BLOCK_LENGTH) -> List[Run]:
+    """Find the consecutive repetitions of blocks of instructions.
+
+    :param instructions: The instructions of the circuit.
+    :param max_block_length: Maximal number of instructions in a block.
+    :return: the runs of at least 2 copies of a block, sorted and not
+    overlapping. Among the runs starting at the same instruction, the one
+    saving the most instructions is kept, with the shortest block on ties.
+    """
+    tokens = _get_tokens(instructions)
+    size = len(tokens)
+    prefix_hashes = [0] * (size + 1)
+    powers = [1] * (size + 1)
+    for index, token in enumerate(tokens):
+        prefix_hashes[index + 1] = \
+            (prefix_hashes[index] * _HASH_BASE + token + 1) % _HASH_MODULUS
+        powers[index + 1] = powers[index] * _HASH_BASE % _HASH_MODULUS
+
+    def block_hash(start: int, length: int) -> int:
+        return (prefix_hashes[start + length] -
+                prefix_hashes[start] * powers[length]) % _HASH_MODULUS
+
+    # The regions are swept from the beginning of the circuit, keeping those
+    # in which a run can start at the current instruction.
+    regions = sorted(_get_periodic_regions(tokens, max_block_length,
+                                           block_hash))
+    next_region = 0
+    active_regions = list()  # type: List[Tuple[int, int, int]]
+    runs = list()
+    start = 0
+    while start < size:
+        while next_region < len(regions) and \
+                regions[next_region][0] <= start:
+            active_regions.append(regions[next_region])
+            next_region += 1
+        active_regions = [region for region in active_regions
+                          if start + 2 * region[2] <= region[1]]
+        best_length, best_count = 0, 1
+        for _, stop, length in active_regions:
+            count = (stop - start) // length
+            if length * (count - 1) > best_length * (best_count - 1) or \
+                    length * (count - 1) == best_length * (best_count - 1) \
+                    and length < best_length:
+                best_length, best_count = length, count
+        if best_count > 1:
+            # Only keep the copies that really are identical to the first.
+            block = tokens[start:start + best_length]
+            count = 1
+            while count < best_count and block == tokens[
+                    start + count * best_length:
+                    start + (count + 1) * best_length]:
+                count += 1
+            best_count = count
+        if best_count > 1:
+            runs.append(Run(start, best_length, best_count))
+            start += best_length * best_count
+        else:
+            start += 1
+    return runs
+
+
+def _get_fenced_bits(bits: Iterable[int], rows: Sequence[int]) -> List[int]:
+    """Return the bits drawn between the first and the last rows of bits."""
+    bit_rows = [rows[bit] for bit in bits]
+    if not bit_rows:
+        return list()
+    first_row, last_row = min(bit_rows), max(bit_rows)
+    return [bit for bit, row in enumerate(rows)
+            if first_row <= row <= last_row]
+
+
+def collapse_runs(instructions: _instructions.InstructionTable,
+                  runs: List[Run], qubit_rows: Sequence[int] = None,
+                  clbit_rows: Sequence[int] = None) -> \
+        Tuple[_instructions.InstructionTable, List[Tuple[int, int]]]:
+    """Replace each run by a single copy of its block.
+
+    Each copy is surrounded by two barriers on the bits drawn in the rows
+    spanned by the block, so that the block is drawn in its own columns and
+    no other instruction is drawn in the box surrounding it. The rows, and
+    not the bit indices, are used because the bits may be drawn in another
+    order than the one of the JSON circuit.
+
+    :param instructions: The instructions of the circuit.
+    :param runs: The runs to collapse, see find_runs.
+    :param qubit_rows: The row of each qubit, see _layout.get_bit_rows.
+    Default to the order of the qubits in the circuit.
+    :param clbit_rows: The row of each classical bit, see
+    _layout.get_bit_rows. Default to the order of the classical bits in the
+    circuit.
+    :return: the new instructions and the (start, stop) indices of each
+    copied block in the new instructions, in the order of runs.
+    """
+    if qubit_rows is None:
+        qubit_rows = range(instructions.qubits_number)
+    if clbit_rows is None:
+        clbit_rows = range(instructions.clbits_number)
+    table = _instructions.InstructionTable(instructions.qubits_number,
+                                           instructions.clbits_number)
+    table.names = list(instructions.names)
+    if 'barrier' not in table.names:
+        table.names.append('barrier')
+    barrier_id = table.names.index('barrier')
+
+    def copy(index: int) -> None:
+        table.append(instructions.name_ids[index],
+                     instructions.instruction_qubits(index),
+                     instructions.instruction_clbits(index),
+                     instructions.instruction_params(index),
+                     instructions.conditions.get(index, None))
+
+    blocks = list()
+    index = 0
+    for run in runs:
+        for kept_index in range(index, run.start):
+            copy(kept_index)
+        block = range(run.start, run.start + run.length)
+        qubits = _get_fenced_bits(
+            {qubit for block_index in block
+             for qubit in instructions.instruction_qubits(block_index)},
+            qubit_rows)
+        clbits = _get_fenced_bits(
+            {clbit for block_index in block
+             for clbit in instructions.instruction_clbits(block_index)} |
+            {clbit for block_index in block
+             if block_index in instructions.conditions
+             for clbit in range(instructions.conditions[block_index][1])},
+            clbit_rows)
+        table.append(barrier_id, qubits, clbits)
+        start = len(table)
+        for block_index in block:
+            copy(block_index)
+        blocks.append((start, len(table)))
+        table.append(barrier_id, qubits, clbits)
+        index = run.start + run.length * run.count
+    for kept_index in range(index, len(instructions)):
+        copy(kept_index)
+    return table, blocks
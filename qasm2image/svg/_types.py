@@ -34,3 +34,98 @@
 import typing
 
 BitRankType = typing.Dict[str, typing.List[int]]
+
+GateLayout = typing.NamedTuple('GateLayout', [
+    ('column', int),
+    ('glyph', str),
+    ('label', str),
+    ('qubits', typing.Sequence[int]),
+    ('controls', int),
+    ('clbits', typing.Sequence[int]),
+    ('condition', typing.Optional[int]),
+    ('condition_clbits', typing.Sequence[int])])
+"""Placement of one instruction in the drawn circuit.
+
+    - column: index of the column in which the instruction is drawn.
+    - glyph: kind of graphical element used to represent the instruction.
+      See the GLYPH_* constants in _layout.py.
+    - label: text written in the gate ('' if nothing is written).
+    - qubits: qubits (indices in the JSON circuit) used by the glyph. The
+      first qubits are the controls, the remaining ones are the targets.
+    - controls: number of control qubits at the beginning of qubits.
+    - clbits: classical bits (indices in the JSON circuit) used by the glyph,
+      i.e. the classical bit storing the result of a measure.
+    - condition: value compared to the classical bits for classically
+      controlled instructions, None if the instruction is not conditioned
+      or if the classical bits are not drawn.
+    - condition_clbits: classical bits (indices in the JSON circuit) involved
+      in the drawn condition, in little-endian order.
+"""
+
+GateRenderer = typing.NamedTuple('GateRenderer', [
+    ('glyph', str),
+    ('label', str),
+    ('controls', int)])
+"""Description of how a gate is drawn, see _layout.register_gate.
+
+    - glyph: kind of graphical element used to represent the gate.
+    - label: text written in the gate, before the conditional part and the
+      parameters are appended ('' if nothing is written).
+    - controls: number of control qubits, the first qubits of the gate.
+"""
+
+RepeatLayout = typing.NamedTuple('RepeatLayout', [
+    ('first_column', int),
+    ('last_column', int),
+    ('qubits', typing.Sequence[int]),
+    ('clbits', typing.Sequence[int]),
+    ('count', int)])
+"""Block of instructions repeated several times but drawn only once.
+
+    - first_column, last_column: columns of the first and of the last drawn
+      instructions of the block.
+    - qubits, clbits: bits (indices in the JSON circuit) drawn in the rows
+      spanned by the block.
+    - count: number of consecutive repetitions of the block.
+"""
+
+CircuitLayout = typing.NamedTuple('CircuitLayout', [
+    ('qubit_labels', typing.List[str]),
+    ('clbit_labels', typing.List[str]),
+    ('qubits_number', int),
+    ('clbits_number', int),
+    ('columns', int),
+    ('qubit_rows', typing.Sequence[int]),
+    ('clbit_rows', typing.Sequence[int]),
+    ('gates', typing.List[GateLayout]),
+    ('repeats', typing.List[RepeatLayout])])
+"""Layout of a whole circuit, shared by all the drawing backends.
+
+    - qubit_labels, clbit_labels: names of the drawn bits ("q[0]", ...).
+    - qubits_number, clbits_number: number of drawn register lines.
+    - columns: number of columns needed to draw the circuit.
+    - qubit_rows, clbit_rows: drawn row of each qubit and classical bit,
+      indexed by the bit indices in the JSON circuit. The classical bit rows
+      are counted from the first classical bit line.
+    - gates: layout of each instruction, in the order of the circuit.
+    - repeats: blocks of gates standing for several repetitions, see
+      _repeats.py. Empty if the repetitions are not collapsed.
+"""
+
+Coordinates = typing.NamedTuple('Coordinates', [
+    ('column_x', typing.Sequence[float]),
+    ('qubit_y', typing.Sequence[float]),
+    ('clbit_y', typing.Sequence[float])])
+"""Coordinates of the drawn elements, precomputed once per drawing.
+
+    - column_x: x-coordinate of the center of each column.
+    - qubit_y, clbit_y: y-coordinate of the line of each qubit and classical
+      bit, indexed by the bit indices in the JSON circuit.
+"""
+
+FontSizesType = typing.Dict[typing.Tuple[str, float, float], int]
+"""Font size of the drawn texts, keyed by (text, box width, box height).
+
+The font size is the largest one that fits the text in the box, see
+_helpers.adapt_texts_font_sizes.
+"""
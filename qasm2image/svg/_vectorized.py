@@ -0,0 +1,161 @@
+# ======================================================================
+# Copyright CERFACS (October 2018)
+# Contributor: Adrien Suau (suau@cerfacs.fr)
+#
+# This software is governed by the CeCILL-B license under French law and
+# abiding  by the  rules of  distribution of free software. You can use,
+# modify  and/or  redistribute  the  software  under  the  terms  of the
+# CeCILL-B license as circulated by CEA, CNRS and INRIA at the following
+# URL "http://www.cecill.info".
+#
+# As a counterpart to the access to  the source code and rights to copy,
+# modify and  redistribute granted  by the  license, users  are provided
+# only with a limited warranty and  the software's author, the holder of
+# the economic rights,  and the  successive licensors  have only limited
+# liability.
+#
+# In this respect, the user's attention is drawn to the risks associated
+# with loading,  using, modifying and/or  developing or reproducing  the
+# software by the user in light of its specific status of free software,
+# that  may mean  that it  is complicated  to manipulate,  and that also
+# therefore  means that  it is reserved for  developers and  experienced
+# professionals having in-depth  computer knowledge. Users are therefore
+# encouraged  to load and  test  the software's  suitability as  regards
+# their  requirements  in  conditions  enabling  the  security  of their
+# systems  and/or  data to be  ensured and,  more generally,  to use and
+# operate it in the same conditions as regards security.
+#
+# The fact that you  are presently reading this  means that you have had
+# knowledge of the CeCILL-B license and that you accept its terms.
+# ======================================================================
+
+
+"""NumPy implementation of the column computation of _layout.py.
+
+The scalar algorithm processes the instructions one by one and keeps the rank
+of the last gate drawn on each bit in the bit_gate_rank structure. Because
+the drawn part of an instruction spans a contiguous range of register lines
+(see _helpers.get_max_index) and because the ranks never decrease, the column
+of an instruction is also
+
+    max(0, max(column(j) + increment(j)))
+
+where j ranges over the previous instructions whose range of lines overlaps
+the range of the instruction, and increment(j) is 0 for barriers and 1 for
+the other instructions. It is enough to consider, on each line, the last
+previous instruction drawn on this line.
+
+This module builds this dependency graph with array operations and then
+computes the columns layer by layer: all the instructions whose predecessors
+are known are processed in the same vectorized pass. The number of passes is
+the depth of the dependency graph, so this is faster than the scalar
+algorithm for circuits with many instructions per layer (wide circuits) and
+slower for deep and narrow ones. See tests/benchmark_layout.py.
+
+Classically controlled instructions are not supported, the scalar algorithm
+should be used for circuits containing them.
+"""
+
+from typing import List, Optional
+
+import numpy
+
+from qasm2image.svg import _instructions
+
+
+def _segment_reduce(ufunc: numpy.ufunc, values: numpy.ndarray,
+                    offsets: numpy.ndarray) -> numpy.ndarray:
+    """Reduce each non-empty segment values[offsets[i]:offsets[i + 1]].
+
+    :return: an array with the reduction of each segment, undefined (0) for
+    the empty segments.
+    """
+    result = numpy.zeros(len(offsets) - 1, dtype=numpy.int64)
+    non_empty = offsets[1:] > offsets[:-1]
+    if values.size:
+        # The empty segments start where the following segment starts, so
+        # they can be removed from the reduceat indices.
+        result[non_empty] = ufunc.reduceat(values, offsets[:-1][non_empty])
+    return result
+
+
+def compute_columns(
+        instructions: _instructions.InstructionTable) -> Optional[List[int]]:
+    """Compute the column of each instruction.
+
+    :param instructions: The instructions of the circuit.
+    :return: the column of each instruction, the same as the one computed by
+    the scalar algorithm of _layout.py, or None if the circuit contains
+    classically controlled instructions or instructions without any bit.
+    """
+    if instructions.conditions:
+        return None
+    instructions_number = len(instructions)
+    if instructions_number == 0:
+        return []
+    qubits_number = instructions.qubits_number
+
+    qubit_offsets = numpy.asarray(instructions.qubit_offsets, dtype=numpy.int64)
+    clbit_offsets = numpy.asarray(instructions.clbit_offsets, dtype=numpy.int64)
+    qubits = numpy.asarray(instructions.qubits, dtype=numpy.int64)
+    clbits = numpy.asarray(instructions.clbits, dtype=numpy.int64)
+    has_qubits = qubit_offsets[1:] > qubit_offsets[:-1]
+    has_clbits = clbit_offsets[1:] > clbit_offsets[:-1]
+    if not numpy.all(has_qubits | has_clbits):
+        return None
+
+    # 1. Range [low, high] of the register lines used by each instruction,
+    #    the classical bit lines being numbered after the qubit lines. See
+    #    _helpers.get_max_index for the ranges used by each instruction.
+    low = numpy.where(
+        has_qubits, _segment_reduce(numpy.minimum, qubits, qubit_offsets),
+        qubits_number + _segment_reduce(numpy.minimum, clbits, clbit_offsets))
+    high = numpy.where(
+        has_clbits,
+        qubits_number + _segment_reduce(numpy.maximum, clbits, clbit_offsets),
+        _segment_reduce(numpy.maximum, qubits, qubit_offsets))
+
+    # 2. Expand the ranges into (instruction, line) pairs and sort them by
+    #    line, then by instruction. Consecutive pairs on the same line are
+    #    the edges of the dependency graph.
+    lengths = high - low + 1
+    pair_instructions = numpy.repeat(numpy.arange(instructions_number),
+                                     lengths)
+    pair_starts = numpy.cumsum(lengths) - lengths
+    pair_lines = numpy.arange(pair_instructions.size) + numpy.repeat(
+        low - pair_starts, lengths)
+    order = numpy.lexsort((pair_instructions, pair_lines))
+    pair_instructions, pair_lines = pair_instructions[order], pair_lines[order]
+    same_line = pair_lines[1:] == pair_lines[:-1]
+    edges = numpy.unique(
+        pair_instructions[:-1][same_line] * instructions_number +
+        pair_instructions[1:][same_line])
+    sources, destinations = numpy.divmod(edges, instructions_number)
+
+    # 3. Compute the columns layer by layer. The edges are sorted by source,
+    #    so the edges leaving an instruction are contiguous.
+    increments = numpy.ones(instructions_number, dtype=numpy.int64)
+    barrier = instructions.names.index('barrier') \
+        if 'barrier' in instructions.names else -1
+    increments[numpy.asarray(instructions.name_ids) == barrier] = 0
+    out_degrees = numpy.bincount(sources, minlength=instructions_number)
+    out_offsets = numpy.cumsum(out_degrees) - out_degrees
+    in_degrees = numpy.bincount(destinations, minlength=instructions_number)
+    columns = numpy.zeros(instructions_number, dtype=numpy.int64)
+    layer = numpy.flatnonzero(in_degrees == 0)
+    while layer.size:
+        counts = out_degrees[layer]
+        total = int(counts.sum())
+        if not total:
+            break
+        edge_indices = numpy.arange(total) + numpy.repeat(
+            out_offsets[layer] - (numpy.cumsum(counts) - counts), counts)
+        layer_sources = sources[edge_indices]
+        layer_destinations = destinations[edge_indices]
+        numpy.maximum.at(columns, layer_destinations,
+                         columns[layer_sources] + increments[layer_sources])
+        reached, reached_counts = numpy.unique(layer_destinations,
+                                               return_counts=True)
+        in_degrees[reached] -= reached_counts
+        layer = reached[in_degrees[reached] == 0]
+    return columns.tolist()
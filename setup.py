@@ -134,7 +134,7 @@ setup(
     #
     # Similar to `install_requires` above, these must be valid existing
     # projects.
-    extras_require={},
+    extras_require={'numpy': ['numpy']},
 
     # If there are data files included in your packages that need to be
     # installed, specify them here.
@@ -162,6 +162,7 @@ setup(
     entry_points={
         'console_scripts': [
             'qasm2image = tools.qasm2image_script:main',
+            'qasm2image-server = tools.qasm2image_server:main',
         ],
     },
 
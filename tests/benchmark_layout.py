@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+
+# ======================================================================
+# Copyright CERFACS (February 2018)
+# Contributor: Adrien Suau (suau@cerfacs.fr)
+#
+# This software is governed by the CeCILL-B license under French law and
+# abiding  by the  rules of  distribution of free software. You can use,
+# modify  and/or  redistribute  the  software  under  the  terms  of the
+# CeCILL-B license as circulated by CEA, CNRS and INRIA at the following
+# URL "http://www.cecill.info".
+#
+# As a counterpart to the access to  the source code and rights to copy,
+# modify and  redistribute granted  by the  license, users  are provided
+# only with a limited warranty and  the software's author, the holder of
+# the economic rights,  and the  successive licensors  have only limited
+# liability.
+#
+# In this respect, the user's attention is drawn to the risks associated
+# with loading,  using, modifying and/or  developing or reproducing  the
+# software by the user in light of its specific status of free software,
+# that  may mean  that it  is complicated  to manipulate,  and that also
+# therefore  means that  it is reserved for  developers and  experienced
+# professionals having in-depth  computer knowledge. Users are therefore
+# encouraged  to load and  test  the software's  suitability as  regards
+# their  requirements  in  conditions  enabling  the  security  of their
+# systems  and/or  data to be  ensured and,  more generally,  to use and
+# operate it in the same conditions as regards security.
+#
+# The fact that you  are presently reading this  means that you have had
+# knowledge of the CeCILL-B license and that you accept its terms.
+# ======================================================================
+
+
+"""Compare the scalar and the NumPy layout algorithms.
+
+Random circuits without classical control are generated for several numbers
+of qubits and instructions, and the time needed to compute their layout is
+measured with both algorithms. The instructions are generated directly in an
+InstructionTable, so the QASM parsing time is not included.
+
+The vectorized algorithm processes one layer of the circuit per pass, so it
+pays off when there are many instructions per layer, i.e. for wide circuits.
+The last column gives the speed-up of the vectorized algorithm; the crossover
+is where it becomes greater than 1.
+"""
+
+import os
+import random
+import sys
+import timeit
+
+# Add '..' in the Python path and import qasm2image
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from qasm2image.svg import _instructions, _layout
+
+
+def random_instructions(qubits_number: int, instructions_number: int,
+                        seed: int = 0) -> _instructions.InstructionTable:
+    generator = random.Random(seed)
+    instructions = _instructions.InstructionTable(qubits_number, 0)
+    instructions.names.extend(['h', 'cx', 'u3'])
+    for _ in range(instructions_number):
+        kind = generator.randrange(3)
+        if kind == 1 and qubits_number > 1:
+            # Two-qubit gates mostly act on close qubits, as in usual circuits.
+            control = generator.randrange(qubits_number - 1)
+            target = min(qubits_number - 1,
+                         control + 1 + int(generator.expovariate(0.5)))
+            instructions.append(1, [control, target])
+        elif kind == 2:
+            instructions.append(2, [generator.randrange(qubits_number)],
+                                params=[0.1, 0.2, 0.3])
+        else:
+            instructions.append(0, [generator.randrange(qubits_number)])
+    return instructions
+
+
+def time_layout(instructions: _instructions.InstructionTable,
+                vectorize: bool, repeat: int = 3) -> float:
+    return min(timeit.repeat(
+        lambda: list(_layout.iter_gate_layouts(instructions, True, vectorize)),
+        number=1, repeat=repeat))
+
+
+if __name__ == '__main__':
+    print("{:>7} {:>13} {:>8} {:>11} {:>11} {:>8}".format(
+        "qubits", "instructions", "columns", "scalar (s)", "numpy (s)",
+        "speed-up"))
+    for qubits in (5, 20, 100, 500):
+        for instructions_number in (100, 1000, 10000, 100000):
+            table = random_instructions(qubits, instructions_number)
+            columns = max(gate.column for gate in
+                          _layout.iter_gate_layouts(table, True, False)) + 1
+            scalar_time = time_layout(table, False)
+            numpy_time = time_layout(table, True)
+            print("{:>7} {:>13} {:>8} {:>11.4f} {:>11.4f} {:>8.2f}".format(
+                qubits, instructions_number, columns, scalar_time, numpy_time,
+                scalar_time / numpy_time))
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+
+# ======================================================================
+# Copyright CERFACS (October 2018)
+# Contributor: Adrien Suau (suau@cerfacs.fr)
+#
+# This software is governed by the CeCILL-B license under French law and
+# abiding  by the  rules of  distribution of free software. You can use,
+# modify  and/or  redistribute  the  software  under  the  terms  of the
+# CeCILL-B license as circulated by CEA, CNRS and INRIA at the following
+# URL "http://www.cecill.info".
+#
+# As a counterpart to the access to  the source code and rights to copy,
+# modify and  redistribute granted  by the  license, users  are provided
+# only with a limited warranty and  the software's author, the holder of
+# the economic rights,  and the  successive licensors  have only limited
+# liability.
+#
+# In this respect, the user's attention is drawn to the risks associated
+# with loading,  using, modifying and/or  developing or reproducing  the
+# software by the user in light of its specific status of free software,
+# that  may mean  that it  is complicated  to manipulate,  and that also
+# therefore  means that  it is reserved for  developers and  experienced
+# professionals having in-depth  computer knowledge. Users are therefore
+# encouraged  to load and  test  the software's  suitability as  regards
+# their  requirements  in  conditions  enabling  the  security  of their
+# systems  and/or  data to be  ensured and,  more generally,  to use and
+# operate it in the same conditions as regards security.
+#
+# The fact that you  are presently reading this  means that you have had
+# knowledge of the CeCILL-B license and that you accept its terms.
+# ======================================================================
+
+
+
+"""Compare the size of the PNG outputs and the time needed to produce them.
+
+Each example circuit is drawn once in SVG, and then converted to PNG with
+cairo, as done by default, and with each colour mode of the PNG encoder of
+qasm2image. The sizes are given in kilobytes and the times, in milliseconds,
+include the drawing by cairo and the encoding.
+"""
+
+import glob
+import os
+import sys
+import timeit
+
+# Add '..' in the Python path and import qasm2image
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from qasm2image import _png, qasm2svg
+from qasm2image.qasm2png import _svg2png
+
+MODES = (None,) + _png.COLOR_MODES
+
+
+def measure(svg: str, width: int, height: int, color_mode: str,
+            repeat: int = 3):
+    size = len(_svg2png(svg, width, height, 1.0, color_mode=color_mode))
+    duration = min(timeit.repeat(
+        lambda: _svg2png(svg, width, height, 1.0, color_mode=color_mode),
+        number=1, repeat=repeat))
+    return size / 1000, duration * 1000
+
+
+if __name__ == '__main__':
+    examples_folder = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                   'examples')
+    print("{:>28} ".format("circuit") + " ".join(
+        "{:>16}".format(mode or "cairo") for mode in MODES))
+    print("{:>28} ".format("") + " ".join(
+        "{:>7} {:>8}".format("kB", "ms") for _ in MODES))
+    qasm_files = (glob.glob(os.path.join(examples_folder, 'generic', '*.qasm'))
+                  + glob.glob(os.path.join(examples_folder, 'ibmqx2',
+                                           '*.qasm')))
+    for qasm_file in qasm_files:
+        with open(qasm_file, 'r') as qasm:
+            svg, (width, height) = qasm2svg(qasm.read(),
+                                            output_dimensions=True)
+        print("{:>28} ".format(os.path.basename(qasm_file)[:28]) + " ".join(
+            "{:>7.1f} {:>8.1f}".format(*measure(svg, width, height, mode))
+            for mode in MODES))
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+
+# ======================================================================
+# Copyright CERFACS (October 2018)
+# Contributor: Adrien Suau (suau@cerfacs.fr)
+#
+# This software is governed by the CeCILL-B license under French law and
+# abiding  by the  rules of  distribution of free software. You can use,
+# modify  and/or  redistribute  the  software  under  the  terms  of the
+# CeCILL-B license as circulated by CEA, CNRS and INRIA at the following
+# URL "http://www.cecill.info".
+#
+# As a counterpart to the access to  the source code and rights to copy,
+# modify and  redistribute granted  by the  license, users  are provided
+# only with a limited warranty and  the software's author, the holder of
+# the economic rights,  and the  successive licensors  have only limited
+# liability.
+#
+# In this respect, the user's attention is drawn to the risks associated
+# with loading,  using, modifying and/or  developing or reproducing  the
+# software by the user in light of its specific status of free software,
+# that  may mean  that it  is complicated  to manipulate,  and that also
+# therefore  means that  it is reserved for  developers and  experienced
+# professionals having in-depth  computer knowledge. Users are therefore
+# encouraged  to load and  test  the software's  suitability as  regards
+# their  requirements  in  conditions  enabling  the  security  of their
+# systems  and/or  data to be  ensured and,  more generally,  to use and
+# operate it in the same conditions as regards security.
+#
+# The fact that you  are presently reading this  means that you have had
+# knowledge of the CeCILL-B license and that you accept its terms.
+# ======================================================================
+
+
+
+"""Compare the drawing of a Trotterized circuit with and without collapsing.
+
+A Trotterized circuit repeats the same layer of instructions once per time
+step. The layer used here applies a ZZ interaction (CX, U1, CX) to each pair
+of neighbouring qubits, then an RX rotation to each qubit. The circuits are
+built directly in JSON, so the QASM parsing time is not included.
+
+Without collapsing, the drawing time and the SVG size grow with the number
+of steps. With collapsing, the layer is drawn once in a box annotated with
+the number of steps, and only the detection of the repetitions depends on the
+number of steps.
+"""
+
+import os
+import sys
+import timeit
+
+# Add '..' in the Python path and import qasm2image
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from qasm2image.svg import _drawing
+
+
+def trotter_circuit(qubits_number: int, steps: int) -> dict:
+    layer = list()
+    for qubit in range(qubits_number - 1):
+        layer.append({'name': 'cx', 'qubits': [qubit, qubit + 1]})
+        layer.append({'name': 'u1', 'qubits': [qubit + 1], 'params': [0.3]})
+        layer.append({'name': 'cx', 'qubits': [qubit, qubit + 1]})
+    layer.extend({'name': 'rx', 'qubits': [qubit], 'params': [0.2]}
+                 for qubit in range(qubits_number))
+    instructions = [{'name': 'h', 'qubits': [qubit]}
+                    for qubit in range(qubits_number)]
+    instructions.extend(layer * steps)
+    instructions.extend({'name': 'measure', 'qubits': [qubit],
+                         'clbits': [qubit]}
+                        for qubit in range(qubits_number))
+    return {'header': {'number_of_qubits': qubits_number,
+                       'number_of_clbits': qubits_number,
+                       'qubit_labels': [['q', qubit]
+                                        for qubit in range(qubits_number)],
+                       'clbit_labels': [['c', qubit]
+                                        for qubit in range(qubits_number)]},
+            'instructions': instructions}
+
+
+def time_drawing(json_circuit: dict, collapse_repeats: bool,
+                 repeat: int = 3) -> float:
+    return min(timeit.repeat(
+        lambda: _drawing.draw_json_circuit(json_circuit,
+                                           collapse_repeats=collapse_repeats),
+        number=1, repeat=repeat))
+
+
+if __name__ == '__main__':
+    print("{:>7} {:>6} {:>13} {:>10} {:>10} {:>11} {:>11}".format(
+        "qubits", "steps", "instructions", "full (s)", "collapsed",
+        "full (kB)", "collapsed"))
+    for qubits in (5, 20):
+        for steps in (10, 100, 1000):
+            circuit = trotter_circuit(qubits, steps)
+            full_svg, _ = _drawing.draw_json_circuit(circuit)
+            collapsed_svg, _ = _drawing.draw_json_circuit(
+                circuit, collapse_repeats=True)
+            print("{:>7} {:>6} {:>13} {:>10.4f} {:>10.4f} {:>11.1f} "
+                  "{:>11.1f}".format(
+                      qubits, steps, len(circuit['instructions']),
+                      time_drawing(circuit, False),
+                      time_drawing(circuit, True),
+                      len(full_svg) / 1000, len(collapsed_svg) / 1000))
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+
+# ======================================================================
+# Copyright CERFACS (October 2018)
+# Contributor: Adrien Suau (suau@cerfacs.fr)
+#
+# This software is governed by the CeCILL-B license under French law and
+# abiding  by the  rules of  distribution of free software. You can use,
+# modify  and/or  redistribute  the  software  under  the  terms  of the
+# CeCILL-B license as circulated by CEA, CNRS and INRIA at the following
+# URL "http://www.cecill.info".
+#
+# As a counterpart to the access to  the source code and rights to copy,
+# modify and  redistribute granted  by the  license, users  are provided
+# only with a limited warranty and  the software's author, the holder of
+# the economic rights,  and the  successive licensors  have only limited
+# liability.
+#
+# In this respect, the user's attention is drawn to the risks associated
+# with loading,  using, modifying and/or  developing or reproducing  the
+# software by the user in light of its specific status of free software,
+# that  may mean  that it  is complicated  to manipulate,  and that also
+# therefore  means that  it is reserved for  developers and  experienced
+# professionals having in-depth  computer knowledge. Users are therefore
+# encouraged  to load and  test  the software's  suitability as  regards
+# their  requirements  in  conditions  enabling  the  security  of their
+# systems  and/or  data to be  ensured and,  more generally,  to use and
+# operate it in the same conditions as regards security.
+#
+# The fact that you  are presently reading this  means that you have had
+# knowledge of the CeCILL-B license and that you accept its terms.
+# ======================================================================
+
+
+
+"""Compare the size of the SVG outputs and the time needed to produce them.
+
+Each example circuit is drawn once, and the SVG is then written in four
+forms: as produced by svgwrite, compact, gzip-compressed (SVGZ) and compact
+and gzip-compressed. The sizes are given in bytes and the times, in
+milliseconds, only include the compaction and the compression, not the
+drawing of the circuit.
+"""
+
+import glob
+import gzip
+import os
+import sys
+import timeit
+
+# Add '..' in the Python path and import qasm2image
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from qasm2image import qasm2svg
+from qasm2image.svg import _compact
+
+
+def time_ms(function, repeat: int = 5) -> float:
+    return 1000 * min(timeit.repeat(function, number=1, repeat=repeat))
+
+
+if __name__ == '__main__':
+    examples_folder = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                   'examples')
+    print("{:>28} {:>9} {:>9} {:>9} {:>9} {:>9} {:>9} {:>9}".format(
+        "circuit", "svg", "compact", "(ms)", "svgz", "(ms)", "both",
+        "(ms)"))
+    qasm_files = (glob.glob(os.path.join(examples_folder, 'generic', '*.qasm'))
+                  + glob.glob(os.path.join(examples_folder, 'ibmqx2',
+                                           '*.qasm')))
+    for qasm_file in qasm_files:
+        with open(qasm_file, 'r') as qasm:
+            svg = qasm2svg(qasm.read())
+        compact = _compact.compact_svg(svg)
+        svg_bytes, compact_bytes = svg.encode('utf-8'), compact.encode('utf-8')
+        print("{:>28} {:>9} {:>9} {:>9.2f} {:>9} {:>9.2f} {:>9} {:>9.2f}"
+              .format(os.path.basename(qasm_file)[:28], len(svg_bytes),
+                      len(compact_bytes),
+                      time_ms(lambda: _compact.compact_svg(svg)),
+                      len(gzip.compress(svg_bytes)),
+                      time_ms(lambda: gzip.compress(svg_bytes)),
+                      len(gzip.compress(compact_bytes)),
+                      time_ms(lambda: gzip.compress(
+                          _compact.compact_svg(svg).encode('utf-8')))))
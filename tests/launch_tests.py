@@ -31,12 +31,14 @@
 # knowledge of the CeCILL-B license and that you accept its terms.
 # ======================================================================
 
-"""Transform all the QASM files in the qasm subfolder to PNG."""
+"""Transform all the QASM files in the qasm subfolder to PNG.
+
+The unit tests of the test_*.py modules in this folder are run afterwards.
+"""
 
 import os
 import sys
-
-from utils.visualisation.tests.launch_tests import use_colors
+import unittest
 
 USE_COLOR = True
 try:
@@ -57,7 +59,7 @@ def recursive_check_all_qasm_files(directory, exception_expected=False):
     ok_coloring_format = colorama.Fore.GREEN + '{}' + colorama.Style.RESET_ALL
 
     def color_text(text, coloring_format):
-        if use_colors:
+        if USE_COLOR:
             return coloring_format.format(text)
         else:
             return text
@@ -107,3 +109,7 @@ if __name__ == '__main__':
         current_directory = os.path.join(test_files_directory, directory)
         recursive_check_all_qasm_files(current_directory, exception_expected=(
             directory == "invalid"))
+
+    test_suite = unittest.defaultTestLoader.discover(this_directory)
+    test_result = unittest.TextTestRunner(verbosity=2).run(test_suite)
+    sys.exit(0 if test_result.wasSuccessful() else 1)
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+
+# ======================================================================
+# Copyright CERFACS (February 2018)
+# Contributor: Adrien Suau (suau@cerfacs.fr)
+#
+# This software is governed by the CeCILL-B license under French law and
+# abiding  by the  rules of  distribution of free software. You can use,
+# modify  and/or  redistribute  the  software  under  the  terms  of the
+# CeCILL-B license as circulated by CEA, CNRS and INRIA at the following
+# URL "http://www.cecill.info".
+#
+# As a counterpart to the access to  the source code and rights to copy,
+# modify and  redistribute granted  by the  license, users  are provided
+# only with a limited warranty and  the software's author, the holder of
+# the economic rights,  and the  successive licensors  have only limited
+# liability.
+#
+# In this respect, the user's attention is drawn to the risks associated
+# with loading,  using, modifying and/or  developing or reproducing  the
+# software by the user in light of its specific status of free software,
+# that  may mean  that it  is complicated  to manipulate,  and that also
+# therefore  means that  it is reserved for  developers and  experienced
+# professionals having in-depth  computer knowledge. Users are therefore
+# encouraged  to load and  test  the software's  suitability as  regards
+# their  requirements  in  conditions  enabling  the  security  of their
+# systems  and/or  data to be  ensured and,  more generally,  to use and
+# operate it in the same conditions as regards security.
+#
+# The fact that you  are presently reading this  means that you have had
+# knowledge of the CeCILL-B license and that you accept its terms.
+# ======================================================================
+
+
+
+"""Tests of the asynchronous API."""
+
+import asyncio
+import concurrent.futures
+import os
+import sys
+import threading
+import time
+import unittest
+
+# Add '..' in the Python path and import qasm2image
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from qasm2image import aio
+
+
+class AioTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=4)
+        # Unblocks the renders waiting on it at the end of the test.
+        self.event = threading.Event()
+        aio.configure(max_concurrency=1)
+
+    def tearDown(self):
+        self.event.set()
+        self.executor.shutdown()
+        self.loop.close()
+        asyncio.set_event_loop(None)
+        aio.configure(max_concurrency=os.cpu_count() or 1)
+
+    def _run(self, coroutine):
+        return self.loop.run_until_complete(coroutine)
+
+    def _blocking_render(self, timeout: float = None):
+        return asyncio.ensure_future(aio._run(
+            self.event.wait, timeout=timeout, executor=self.executor),
+            loop=self.loop)
+
+    def test_result_and_keyword_arguments(self):
+        result = self._run(aio._run(int, '10', base=2,
+                                    executor=self.executor))
+        self.assertEqual(result, 2)
+
+    def test_timeout_while_waiting_for_a_slot(self):
+        blocking = self._blocking_render()
+        start = time.perf_counter()
+        with self.assertRaises(asyncio.TimeoutError):
+            self._run(aio._run(int, '1', timeout=0.1,
+                               executor=self.executor))
+        self.assertLess(time.perf_counter() - start, 5)
+        self.event.set()
+        self.assertTrue(self._run(blocking))
+        # The slot of the timed out render has not been kept.
+        self.assertEqual(self._run(aio._run(int, '1', timeout=5,
+                                            executor=self.executor)), 1)
+
+    def test_timeout_while_running(self):
+        with self.assertRaises(asyncio.TimeoutError):
+            self._run(aio._run(self.event.wait, timeout=0.1,
+                               executor=self.executor))
+        # The running render keeps its slot until it finishes.
+        limiter = aio._get_limiter(self.loop)
+        self.assertTrue(limiter.locked())
+        self.event.set()
+        self.assertEqual(self._run(aio._run(int, '1', timeout=5,
+                                            executor=self.executor)), 1)
+
+    def test_cancel_pending_render(self):
+        blocking = self._blocking_render()
+        pending = asyncio.ensure_future(
+            aio._run(int, '1', executor=self.executor), loop=self.loop)
+        self._run(asyncio.sleep(0.05))
+        pending.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            self._run(pending)
+        self.event.set()
+        self._run(blocking)
+        self._run(asyncio.sleep(0.05))
+        limiter = aio._get_limiter(self.loop)
+        self.assertFalse(limiter.locked())
+        self.assertEqual(self._run(aio._run(int, '1', timeout=5,
+                                            executor=self.executor)), 1)
+
+    def test_max_concurrency(self):
+        aio.configure(max_concurrency=2)
+        lock = threading.Lock()
+        running = [0, 0]  # Current and maximal number of running renders.
+
+        def _render():
+            with lock:
+                running[0] += 1
+                running[1] = max(running)
+            time.sleep(0.05)
+            with lock:
+                running[0] -= 1
+
+        renders = [asyncio.ensure_future(
+            aio._run(_render, executor=self.executor), loop=self.loop)
+            for _ in range(8)]
+        self._run(asyncio.gather(*renders))
+        self.assertEqual(running[1], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+
+# ======================================================================
+# Copyright CERFACS (February 2018)
+# Contributor: Adrien Suau (suau@cerfacs.fr)
+#
+# This software is governed by the CeCILL-B license under French law and
+# abiding  by the  rules of  distribution of free software. You can use,
+# modify  and/or  redistribute  the  software  under  the  terms  of the
+# CeCILL-B license as circulated by CEA, CNRS and INRIA at the following
+# URL "http://www.cecill.info".
+#
+# As a counterpart to the access to  the source code and rights to copy,
+# modify and  redistribute granted  by the  license, users  are provided
+# only with a limited warranty and  the software's author, the holder of
+# the economic rights,  and the  successive licensors  have only limited
+# liability.
+#
+# In this respect, the user's attention is drawn to the risks associated
+# with loading,  using, modifying and/or  developing or reproducing  the
+# software by the user in light of its specific status of free software,
+# that  may mean  that it  is complicated  to manipulate,  and that also
+# therefore  means that  it is reserved for  developers and  experienced
+# professionals having in-depth  computer knowledge. Users are therefore
+# encouraged  to load and  test  the software's  suitability as  regards
+# their  requirements  in  conditions  enabling  the  security  of their
+# systems  and/or  data to be  ensured and,  more generally,  to use and
+# operate it in the same conditions as regards security.
+#
+# The fact that you  are presently reading this  means that you have had
+# knowledge of the CeCILL-B license and that you accept its terms.
+# ======================================================================
+
+
+"""Tests of the compaction of the SVG images."""
+
+import os
+import sys
+import unittest
+
+# Add '..' in the Python path and import qasm2image
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from qasm2image.svg._compact import compact_svg
+
+# The form of the SVG images written by svgwrite.
+SVG = ('<svg baseProfile="full" height="80.0px" version="1.1" width="120.0px" '
+       'xmlns="http://www.w3.org/2000/svg" '
+       'xmlns:ev="http://www.w3.org/2001/xml-events" '
+       'xmlns:xlink="http://www.w3.org/1999/xlink"><defs />'
+       '<line stroke="black" stroke-width="2" x1="0.0" x2="120.0" '
+       'y1="10.123456" y2="10.123456" />'
+       '<rect fill="white" height="40" stroke="black" stroke-width="2" '
+       'width="40" x="20.25" y="5.04" />'
+       '<text fill="black" font-size="20.16" text-anchor="middle" x="40.0" '
+       'y="25.0">H</text>'
+       '<text fill="black" font-size="12" x="-0.01" y="25.0">q[0]</text>'
+       '<circle cx="60.04" cy="50.0" fill="black" r="5.0" stroke="black" '
+       'stroke-width="1" /></svg>')
+
+
+class CompactSvgTestCase(unittest.TestCase):
+
+    def test_compact_svg(self):
+        self.assertEqual(compact_svg(SVG), (
+            '<svg height="80" width="120" xmlns="http://www.w3.org/2000/svg" '
+            'stroke-width="2" text-anchor="middle">'
+            '<line stroke="#000" x1="0" x2="120" y1="10.1" y2="10.1"/>'
+            '<rect fill="#fff" height="40" stroke="#000" width="40" x="20.2" '
+            'y="5"/>'
+            '<text font-size="20.2" x="40" y="25">H</text>'
+            '<text font-size="12" x="0" y="25" text-anchor="start">q[0]</text>'
+            '<circle cx="60" cy="50" r="5" stroke="#000" stroke-width="1"/>'
+            '</svg>'))
+
+    def test_precision(self):
+        compact = compact_svg(SVG, precision=3)
+        self.assertIn('y1="10.123"', compact)
+        self.assertIn('x="20.25"', compact)
+        self.assertIn('cx="60.04"', compact)
+        self.assertIn('x="-0.01"', compact)
+        self.assertIn('height="80"', compact)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+
+# ======================================================================
+# Copyright CERFACS (February 2018)
+# Contributor: Adrien Suau (suau@cerfacs.fr)
+#
+# This software is governed by the CeCILL-B license under French law and
+# abiding  by the  rules of  distribution of free software. You can use,
+# modify  and/or  redistribute  the  software  under  the  terms  of the
+# CeCILL-B license as circulated by CEA, CNRS and INRIA at the following
+# URL "http://www.cecill.info".
+#
+# As a counterpart to the access to  the source code and rights to copy,
+# modify and  redistribute granted  by the  license, users  are provided
+# only with a limited warranty and  the software's author, the holder of
+# the economic rights,  and the  successive licensors  have only limited
+# liability.
+#
+# In this respect, the user's attention is drawn to the risks associated
+# with loading,  using, modifying and/or  developing or reproducing  the
+# software by the user in light of its specific status of free software,
+# that  may mean  that it  is complicated  to manipulate,  and that also
+# therefore  means that  it is reserved for  developers and  experienced
+# professionals having in-depth  computer knowledge. Users are therefore
+# encouraged  to load and  test  the software's  suitability as  regards
+# their  requirements  in  conditions  enabling  the  security  of their
+# systems  and/or  data to be  ensured and,  more generally,  to use and
+# operate it in the same conditions as regards security.
+#
+# The fact that you  are presently reading this  means that you have had
+# knowledge of the CeCILL-B license and that you accept its terms.
+# ======================================================================
+
+
+
+"""Tests of the measure of the texts drawn in the circuits."""
+
+import os
+import sys
+import unittest
+from unittest import mock
+
+# Add '..' in the Python path and import qasm2image
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from qasm2image.svg import _helpers
+
+
+class FakeCairoContext:
+    """Cairo context measuring every text as 10 by 5."""
+
+    def __init__(self, surface):
+        self.measured = list()
+
+    def select_font_face(self, *args):
+        pass
+
+    def set_font_size(self, fontsize):
+        pass
+
+    def text_extents(self, text):
+        self.measured.append(text)
+        return 0, 0, 10, 5, 0, 0
+
+
+class TextDimensionsTestCase(unittest.TestCase):
+
+    def test_cairo_measures_all_texts(self):
+        cairo = mock.Mock(Context=FakeCairoContext)
+        with mock.patch.object(_helpers, '_import_cairo',
+                               return_value=cairo):
+            dimensions = _helpers._get_texts_dimensions(['H', 'U1(π)'], 100)
+        self.assertEqual(dimensions, [(10, 5), (10, 5)])
+
+    def test_metrics_without_cairo(self):
+        with mock.patch.object(_helpers, '_import_cairo', return_value=None):
+            dimensions = _helpers._get_text_dimensions('H', 100)
+        self.assertEqual(dimensions,
+                         _helpers._get_metrics_text_dimensions('H', 100))
+        self.assertGreater(dimensions[0], 0)
+        self.assertGreater(dimensions[1], 0)
+
+    def test_missing_characters_measured_as_fallback(self):
+        self.assertEqual(
+            _helpers._get_metrics_text_dimensions('U1(π)', 100),
+            _helpers._get_metrics_text_dimensions(
+                'U1({})'.format(_helpers._FALLBACK_CHARACTER), 100))
+
+    def test_metrics_scale_with_font_size(self):
+        width, height = _helpers._get_metrics_text_dimensions('CX', 100)
+        self.assertEqual(_helpers._get_metrics_text_dimensions('CX', 50),
+                         (width / 2, height / 2))
+
+    def test_adapt_texts_font_sizes_without_cairo(self):
+        texts_and_boxes = [('H', 40, 40), ('H', 40, 40), ('CX', 40, 20)]
+        with mock.patch.object(_helpers, '_import_cairo', return_value=None):
+            font_sizes = _helpers.adapt_texts_font_sizes(texts_and_boxes,
+                                                         processes=2)
+            for text, width, height in texts_and_boxes:
+                self.assertEqual(
+                    font_sizes[(text, width, height)],
+                    _helpers.adapt_text_font_size(text, width, height))
+        self.assertEqual(len(font_sizes), 2)
+
+    def test_blank_texts(self):
+        texts_and_boxes = [('', 40, 40), (' ', 40, 40)]
+        with mock.patch.object(_helpers, '_import_cairo', return_value=None):
+            font_sizes = _helpers.adapt_texts_font_sizes(texts_and_boxes)
+        self.assertEqual(font_sizes, {
+            text_and_box: _helpers._MEASURE_FONT_SIZE
+            for text_and_box in texts_and_boxes})
+
+
+if __name__ == '__main__':
+    unittest.main()
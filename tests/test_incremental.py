@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+
+# ======================================================================
+# Copyright CERFACS (February 2018)
+# Contributor: Adrien Suau (suau@cerfacs.fr)
+#
+# This software is governed by the CeCILL-B license under French law and
+# abiding  by the  rules of  distribution of free software. You can use,
+# modify  and/or  redistribute  the  software  under  the  terms  of the
+# CeCILL-B license as circulated by CEA, CNRS and INRIA at the following
+# URL "http://www.cecill.info".
+#
+# As a counterpart to the access to  the source code and rights to copy,
+# modify and  redistribute granted  by the  license, users  are provided
+# only with a limited warranty and  the software's author, the holder of
+# the economic rights,  and the  successive licensors  have only limited
+# liability.
+#
+# In this respect, the user's attention is drawn to the risks associated
+# with loading,  using, modifying and/or  developing or reproducing  the
+# software by the user in light of its specific status of free software,
+# that  may mean  that it  is complicated  to manipulate,  and that also
+# therefore  means that  it is reserved for  developers and  experienced
+# professionals having in-depth  computer knowledge. Users are therefore
+# encouraged  to load and  test  the software's  suitability as  regards
+# their  requirements  in  conditions  enabling  the  security  of their
+# systems  and/or  data to be  ensured and,  more generally,  to use and
+# operate it in the same conditions as regards security.
+#
+# The fact that you  are presently reading this  means that you have had
+# knowledge of the CeCILL-B license and that you accept its terms.
+# ======================================================================
+
+
+"""Tests of the IncrementalRenderer class."""
+
+import os
+import sys
+import unittest
+
+# Add '..' in the Python path and import qasm2image
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from qasm2image import qasm2svg
+from qasm2image.incremental import IncrementalRenderer
+
+HEADER = """OPENQASM 2.0;
+include "qelib1.inc";
+qreg q[3];
+creg c[3];
+"""
+
+
+class IncrementalRendererTestCase(unittest.TestCase):
+
+    def test_render_is_the_same_as_qasm2svg(self):
+        renderer = IncrementalRenderer()
+        qasm_str = HEADER
+        for statement in ["h q[0];", "cx q[0],q[1];", "measure q[1] -> c[1];",
+                          "if(c==2) x q[2];", "barrier q;", "cx q[2],q[0];"]:
+            qasm_str += statement + "\n"
+            self.assertEqual(renderer.render(qasm_str), qasm2svg(qasm_str))
+
+    def test_edit_of_a_statement(self):
+        renderer = IncrementalRenderer()
+        renderer.render(HEADER + "h q[0];\ncx q[0],q[1];\nx q[2];\n")
+        qasm_str = HEADER + "h q[0];\ncx q[1],q[2];\nx q[2];\n"
+        self.assertEqual(renderer.render(qasm_str), qasm2svg(qasm_str))
+
+    def test_edit_after_an_error(self):
+        renderer = IncrementalRenderer()
+        failing_str = HEADER + "h q[0];\nif(c==1) cx q[0],q[1];\n"
+        with self.assertRaises(NotImplementedError):
+            renderer.render(failing_str)
+        with self.assertRaises(NotImplementedError):
+            renderer.render(failing_str + "h q[2];\n")
+        qasm_str = HEADER + "h q[0];\nif(c==1) x q[1];\nh q[2];\n"
+        self.assertEqual(renderer.render(qasm_str), qasm2svg(qasm_str))
+
+    def test_collapse_repeats_is_rejected(self):
+        renderer = IncrementalRenderer(collapse_repeats=True)
+        with self.assertRaises(ValueError):
+            renderer.render(HEADER + "h q[0];\nh q[0];\n")
+        renderer = IncrementalRenderer()
+        renderer.render(HEADER + "h q[0];\nh q[0];\n")
+        renderer.collapse_repeats = True
+        with self.assertRaises(ValueError):
+            _ = renderer.layout
+
+
+if __name__ == '__main__':
+    unittest.main()
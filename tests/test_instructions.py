@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+
+# ======================================================================
+# Copyright CERFACS (February 2018)
+# Contributor: Adrien Suau (suau@cerfacs.fr)
+#
+# This software is governed by the CeCILL-B license under French law and
+# abiding  by the  rules of  distribution of free software. You can use,
+# modify  and/or  redistribute  the  software  under  the  terms  of the
+# CeCILL-B license as circulated by CEA, CNRS and INRIA at the following
+# URL "http://www.cecill.info".
+#
+# As a counterpart to the access to  the source code and rights to copy,
+# modify and  redistribute granted  by the  license, users  are provided
+# only with a limited warranty and  the software's author, the holder of
+# the economic rights,  and the  successive licensors  have only limited
+# liability.
+#
+# In this respect, the user's attention is drawn to the risks associated
+# with loading,  using, modifying and/or  developing or reproducing  the
+# software by the user in light of its specific status of free software,
+# that  may mean  that it  is complicated  to manipulate,  and that also
+# therefore  means that  it is reserved for  developers and  experienced
+# professionals having in-depth  computer knowledge. Users are therefore
+# encouraged  to load and  test  the software's  suitability as  regards
+# their  requirements  in  conditions  enabling  the  security  of their
+# systems  and/or  data to be  ensured and,  more generally,  to use and
+# operate it in the same conditions as regards security.
+#
+# The fact that you  are presently reading this  means that you have had
+# knowledge of the CeCILL-B license and that you accept its terms.
+# ======================================================================
+
+
+"""Tests of the InstructionTable class."""
+
+import os
+import sys
+import unittest
+
+# Add '..' in the Python path and import qasm2image
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from qasm2image.svg._instructions import InstructionTable
+
+JSON_CIRCUIT = {
+    'header': {'number_of_qubits': 2, 'number_of_clbits': 3},
+    'instructions': [
+        {'name': 'h', 'qubits': [0]},
+        {'name': 'u1', 'qubits': [1], 'params': [0.5]},
+        {'name': 'measure', 'qubits': [1], 'clbits': [2]},
+        {'name': 'x', 'qubits': [0],
+         'conditional': {'type': 'equals', 'mask': '0x6', 'val': '0x2'}},
+        {'name': 'x', 'qubits': [1],
+         'conditional': {'type': 'equals', 'mask': '0x0', 'val': '0x0'}},
+        {'name': 'h', 'qubits': [1]}]}
+
+
+class InstructionTableTestCase(unittest.TestCase):
+
+    def test_from_json(self):
+        table = InstructionTable.from_json(JSON_CIRCUIT)
+        self.assertEqual(len(table), 6)
+        self.assertEqual(table.names, ['h', 'u1', 'measure', 'x'])
+        self.assertEqual(table.name(5), 'h')
+        self.assertEqual(list(table.instruction_qubits(2)), [1])
+        self.assertEqual(list(table.instruction_clbits(2)), [2])
+        self.assertEqual(list(table.instruction_params(1)), [0.5])
+        self.assertEqual(list(table.instruction_params(0)), [])
+
+    def test_conditions(self):
+        table = InstructionTable.from_json(JSON_CIRCUIT)
+        self.assertEqual(table.conditions[3], (2, 3))
+        # The width of a zero mask is the length of '0', as in the baseline
+        # drawing code.
+        self.assertEqual(table.conditions[4], (0, 1))
+
+    def test_slice(self):
+        table = InstructionTable.from_json(JSON_CIRCUIT).slice(1, 4)
+        self.assertEqual(len(table), 3)
+        self.assertEqual(table.name(0), 'u1')
+        self.assertEqual(list(table.instruction_params(0)), [0.5])
+        self.assertEqual(list(table.instruction_clbits(1)), [2])
+        self.assertEqual(table.conditions, {2: (2, 3)})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+
+# ======================================================================
+# Copyright CERFACS (February 2018)
+# Contributor: Adrien Suau (suau@cerfacs.fr)
+#
+# This software is governed by the CeCILL-B license under French law and
+# abiding  by the  rules of  distribution of free software. You can use,
+# modify  and/or  redistribute  the  software  under  the  terms  of the
+# CeCILL-B license as circulated by CEA, CNRS and INRIA at the following
+# URL "http://www.cecill.info".
+#
+# As a counterpart to the access to  the source code and rights to copy,
+# modify and  redistribute granted  by the  license, users  are provided
+# only with a limited warranty and  the software's author, the holder of
+# the economic rights,  and the  successive licensors  have only limited
+# liability.
+#
+# In this respect, the user's attention is drawn to the risks associated
+# with loading,  using, modifying and/or  developing or reproducing  the
+# software by the user in light of its specific status of free software,
+# that  may mean  that it  is complicated  to manipulate,  and that also
+# therefore  means that  it is reserved for  developers and  experienced
+# professionals having in-depth  computer knowledge. Users are therefore
+# encouraged  to load and  test  the software's  suitability as  regards
+# their  requirements  in  conditions  enabling  the  security  of their
+# systems  and/or  data to be  ensured and,  more generally,  to use and
+# operate it in the same conditions as regards security.
+#
+# The fact that you  are presently reading this  means that you have had
+# knowledge of the CeCILL-B license and that you accept its terms.
+# ======================================================================
+
+
+"""Tests of the sequential, vectorized and parallel layout algorithms."""
+
+import os
+import random
+import sys
+import unittest
+from unittest import mock
+
+# Add '..' in the Python path and import qasm2image
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from qasm2image.svg import _instructions, _layout, _parallel
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def random_json_circuit(qubits_number: int, clbits_number: int,
+                        instructions_number: int, seed: int,
+                        conditions: bool = True) -> dict:
+    """Generate a circuit with gates, barriers, measures and conditions."""
+    generator = random.Random(seed)
+    instructions = list()
+    for _ in range(instructions_number):
+        kind = generator.random()
+        if kind < 0.1:
+            if generator.random() < 0.5:
+                qubits = list(range(qubits_number))
+            else:
+                qubits = sorted(generator.sample(
+                    range(qubits_number),
+                    generator.randint(1, qubits_number)))
+            instructions.append({'name': 'barrier', 'qubits': qubits})
+        elif kind < 0.2:
+            instructions.append({
+                'name': 'measure',
+                'qubits': [generator.randrange(qubits_number)],
+                'clbits': [generator.randrange(clbits_number)]})
+        elif kind < 0.45:
+            instructions.append({'name': 'cx', 'qubits': generator.sample(
+                range(qubits_number), 2)})
+        else:
+            instruction = {'name': 'h',
+                           'qubits': [generator.randrange(qubits_number)]}
+            if generator.random() < 0.5:
+                instruction.update(name='u1', params=[generator.random()],
+                                   texparams=['0.5'])
+            if conditions and generator.random() < 0.2:
+                instruction['conditional'] = {
+                    'type': 'equals',
+                    'mask': hex((1 << clbits_number) - 1),
+                    'val': hex(generator.randrange(1 << clbits_number))}
+            instructions.append(instruction)
+    return {'header': {'number_of_qubits': qubits_number,
+                       'number_of_clbits': clbits_number,
+                       'qubit_labels': [['q', index]
+                                        for index in range(qubits_number)],
+                       'clbit_labels': [['c', clbits_number]]},
+            'instructions': instructions}
+
+
+def sequential_layout(instructions: _instructions.InstructionTable,
+                      show_clbits: bool = True):
+    return list(_layout.iter_gate_layouts(instructions, show_clbits))
+
+
+class ParallelLayoutTestCase(unittest.TestCase):
+
+    def test_circuits_are_split(self):
+        instructions = _instructions.InstructionTable.from_json(
+            random_json_circuit(4, 3, 500, seed=0))
+        segments = _parallel.split_instructions(instructions, 8)
+        self.assertGreater(len(segments), 1)
+        self.assertEqual(segments[0][0], 0)
+        self.assertEqual(segments[-1][1], len(instructions))
+        for (_, stop), (start, _) in zip(segments, segments[1:]):
+            self.assertEqual(stop, start)
+
+    def test_same_layout_as_sequential(self):
+        for seed in range(10):
+            for show_clbits in (True, False):
+                instructions = _instructions.InstructionTable.from_json(
+                    random_json_circuit(2 + seed % 4, 3, 300, seed))
+                self.assertEqual(
+                    _parallel.layout_instructions(instructions, show_clbits,
+                                                  processes=2),
+                    sequential_layout(instructions, show_clbits))
+
+    def test_layout_json_circuit(self):
+        json_circuit = random_json_circuit(5, 2, 400, seed=1)
+        self.assertEqual(_layout.layout_json_circuit(json_circuit,
+                                                     processes=3),
+                         _layout.layout_json_circuit(json_circuit))
+
+
+@unittest.skipIf(numpy is None, "NumPy is not installed")
+class VectorizedLayoutTestCase(unittest.TestCase):
+
+    def test_same_layout_as_scalar(self):
+        for seed in range(10):
+            instructions = _instructions.InstructionTable.from_json(
+                random_json_circuit(2 + seed, 4, 300, seed,
+                                    conditions=False))
+            self.assertEqual(
+                list(_layout.iter_gate_layouts(instructions, vectorize=True)),
+                sequential_layout(instructions))
+
+    def test_conditions_use_the_scalar_algorithm(self):
+        instructions = _instructions.InstructionTable.from_json(
+            random_json_circuit(3, 2, 200, seed=2))
+        self.assertTrue(instructions.conditions)
+        self.assertEqual(
+            list(_layout.iter_gate_layouts(instructions, vectorize=True)),
+            sequential_layout(instructions))
+
+    def test_empty_circuit(self):
+        instructions = _instructions.InstructionTable(2, 0)
+        self.assertEqual(
+            list(_layout.iter_gate_layouts(instructions, vectorize=True)), [])
+
+
+def layout_instructions(*instructions):
+    """Lay out instructions on 3 qubits, without classical bits."""
+    return _layout.layout_json_circuit({
+        'header': {'number_of_qubits': 3, 'number_of_clbits': 0,
+                   'qubit_labels': [['q', index] for index in range(3)],
+                   'clbit_labels': []},
+        'instructions': list(instructions)}).gates
+
+
+class GateRegistryTestCase(unittest.TestCase):
+
+    def test_register_gate(self):
+        self.addCleanup(_layout._GATE_RENDERERS.pop, 'crot')
+        _layout.register_gate('crot', _layout.GLYPH_CONTROLLED_GATE, 'Rot',
+                              controls=1)
+        gate, = layout_instructions(
+            {'name': 'crot', 'qubits': [2, 0], 'params': [0.25]})
+        self.assertEqual(gate.glyph, _layout.GLYPH_CONTROLLED_GATE)
+        self.assertEqual(gate.label, 'Rot(0.25)')
+        self.assertEqual(gate.controls, 1)
+        self.assertEqual(gate.qubits, (2, 0))
+
+    def test_default_label(self):
+        self.addCleanup(_layout._GATE_RENDERERS.pop, 'sx')
+        _layout.register_gate('sx', _layout.GLYPH_GATE)
+        gate, = layout_instructions({'name': 'sx', 'qubits': [1]})
+        self.assertEqual(gate.label, 'sx')
+
+    def test_invalid_renderer(self):
+        with self.assertRaises(ValueError):
+            _layout.register_gate('sx', 'circle')
+        with self.assertRaises(ValueError):
+            _layout.register_gate('sx', _layout.GLYPH_CNOT, controls=-1)
+        self.assertNotIn('sx', _layout._GATE_RENDERERS)
+
+    def test_cswap(self):
+        gate, = layout_instructions({'name': 'cswap', 'qubits': [0, 1, 2]})
+        self.assertEqual((gate.glyph, gate.label, gate.controls),
+                         (_layout.GLYPH_SWAP, '', 1))
+
+    def test_rzz(self):
+        gate, = layout_instructions(
+            {'name': 'rzz', 'qubits': [0, 2], 'params': [0.5]})
+        self.assertEqual((gate.glyph, gate.label, gate.controls),
+                         (_layout.GLYPH_GATE, 'rzz(0.5)', 0))
+
+
+class LabelCacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        _layout._LABELS.clear()
+        self.addCleanup(_layout._LABELS.clear)
+
+    def test_labels_are_formatted_once(self):
+        gates = layout_instructions(
+            {'name': 'u1', 'qubits': [0], 'params': [0.5]},
+            {'name': 'u1', 'qubits': [1], 'params': [0.5]},
+            {'name': 'u1', 'qubits': [2], 'params': [0.25]},
+            {'name': 'h', 'qubits': [0]})
+        self.assertEqual([gate.label for gate in gates],
+                         ['u1(0.5)', 'u1(0.5)', 'u1(0.25)', 'H'])
+        self.assertIs(gates[0].label, gates[1].label)
+        self.assertEqual(len(_layout._LABELS), 3)
+        # A hit does not format the label again.
+        with mock.patch.object(_layout, '_round_numeric_param') as round_:
+            gate, = layout_instructions(
+                {'name': 'u1', 'qubits': [0], 'params': [0.5]})
+        round_.assert_not_called()
+        self.assertIs(gate.label, gates[0].label)
+
+    def test_cache_is_cleared_when_full(self):
+        self.addCleanup(setattr, _layout, '_LABELS_MAX_SIZE',
+                        _layout._LABELS_MAX_SIZE)
+        _layout._LABELS_MAX_SIZE = 4
+        gates = layout_instructions(*[
+            {'name': 'rx', 'qubits': [0], 'params': [index + 0.5]}
+            for index in range(4)])
+        self.assertEqual(len(_layout._LABELS), 4)
+        gate, = layout_instructions(
+            {'name': 'rx', 'qubits': [0], 'params': [4.5]})
+        self.assertEqual(gate.label, 'rx(4.5)')
+        self.assertEqual(list(_layout._LABELS.values()), ['rx(4.5)'])
+        self.assertEqual([gate.label for gate in gates],
+                         ['rx(0.5)', 'rx(1.5)', 'rx(2.5)', 'rx(3.5)'])
+
+
+if __name__ == '__main__':
+    unittest.main()
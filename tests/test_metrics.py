@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+
+# ======================================================================
+# Copyright CERFACS (February 2018)
+# Contributor: Adrien Suau (suau@cerfacs.fr)
+#
+# This software is governed by the CeCILL-B license under French law and
+# abiding  by the  rules of  distribution of free software. You can use,
+# modify  and/or  redistribute  the  software  under  the  terms  of the
+# CeCILL-B license as circulated by CEA, CNRS and INRIA at the following
+# URL "http://www.cecill.info".
+#
+# As a counterpart to the access to  the source code and rights to copy,
+# modify and  redistribute granted  by the  license, users  are provided
+# only with a limited warranty and  the software's author, the holder of
+# the economic rights,  and the  successive licensors  have only limited
+# liability.
+#
+# In this respect, the user's attention is drawn to the risks associated
+# with loading,  using, modifying and/or  developing or reproducing  the
+# software by the user in light of its specific status of free software,
+# that  may mean  that it  is complicated  to manipulate,  and that also
+# therefore  means that  it is reserved for  developers and  experienced
+# professionals having in-depth  computer knowledge. Users are therefore
+# encouraged  to load and  test  the software's  suitability as  regards
+# their  requirements  in  conditions  enabling  the  security  of their
+# systems  and/or  data to be  ensured and,  more generally,  to use and
+# operate it in the same conditions as regards security.
+#
+# The fact that you  are presently reading this  means that you have had
+# knowledge of the CeCILL-B license and that you accept its terms.
+# ======================================================================
+
+
+"""Tests of the metrics registry."""
+
+import os
+import sys
+import unittest
+
+# Add '..' in the Python path and import qasm2image
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from qasm2image import metrics
+
+
+@metrics.instrument('svg')
+def _render(output):
+    return output
+
+
+class MetricsTestCase(unittest.TestCase):
+
+    def setUp(self):
+        metrics.reset()
+        metrics.enable()
+
+    def tearDown(self):
+        metrics.disable()
+        metrics.reset()
+
+    def test_output_size(self):
+        _render("<svg/>")
+        _render(("<svg/>", (10, 20)))
+        _render(b"\x89PNG")
+        summary, = metrics.snapshot()['summaries']['qasm2image_output_bytes']
+        self.assertEqual(summary['count'], 3)
+        self.assertEqual(summary['sum'], 16)
+
+    def test_output_written_to_a_file_has_no_size(self):
+        _render(None)
+        snapshot = metrics.snapshot()
+        self.assertNotIn('qasm2image_output_bytes', snapshot['summaries'])
+        self.assertEqual(
+            snapshot['counters']['qasm2image_renders_total'][0]['value'], 1)
+        self.assertNotIn('qasm2image_output_bytes', metrics.to_prometheus())
+
+    def test_disabled(self):
+        metrics.disable()
+        _render("<svg/>")
+        self.assertEqual(metrics.snapshot()['counters'], dict())
+
+    def test_drain_and_merge(self):
+        worker_registry = metrics.MetricsRegistry()
+        worker_registry.increment('qasm2image_renders_total',
+                                  (('format', 'svg'),))
+        worker_registry.observe('qasm2image_output_bytes',
+                                (('format', 'svg'),), 6)
+        _render("<svg/>")
+        metrics.REGISTRY.merge(worker_registry.drain())
+        snapshot = metrics.snapshot()
+        self.assertEqual(
+            snapshot['counters']['qasm2image_renders_total'][0]['value'], 2)
+        summary, = snapshot['summaries']['qasm2image_output_bytes']
+        self.assertEqual((summary['count'], summary['sum']), (2, 12))
+        # The drained values are forgotten.
+        self.assertEqual(worker_registry.drain(), (dict(), dict()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+
+# ======================================================================
+# Copyright CERFACS (February 2018)
+# Contributor: Adrien Suau (suau@cerfacs.fr)
+#
+# This software is governed by the CeCILL-B license under French law and
+# abiding  by the  rules of  distribution of free software. You can use,
+# modify  and/or  redistribute  the  software  under  the  terms  of the
+# CeCILL-B license as circulated by CEA, CNRS and INRIA at the following
+# URL "http://www.cecill.info".
+#
+# As a counterpart to the access to  the source code and rights to copy,
+# modify and  redistribute granted  by the  license, users  are provided
+# only with a limited warranty and  the software's author, the holder of
+# the economic rights,  and the  successive licensors  have only limited
+# liability.
+#
+# In this respect, the user's attention is drawn to the risks associated
+# with loading,  using, modifying and/or  developing or reproducing  the
+# software by the user in light of its specific status of free software,
+# that  may mean  that it  is complicated  to manipulate,  and that also
+# therefore  means that  it is reserved for  developers and  experienced
+# professionals having in-depth  computer knowledge. Users are therefore
+# encouraged  to load and  test  the software's  suitability as  regards
+# their  requirements  in  conditions  enabling  the  security  of their
+# systems  and/or  data to be  ensured and,  more generally,  to use and
+# operate it in the same conditions as regards security.
+#
+# The fact that you  are presently reading this  means that you have had
+# knowledge of the CeCILL-B license and that you accept its terms.
+# ======================================================================
+
+
+
+"""Tests of the multi-page PDF and PostScript documents."""
+
+import collections
+import io
+import os
+import re
+import sys
+import unittest
+import zlib
+from unittest import mock
+
+# Add '..' in the Python path and import qasm2image
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from qasm2image import _pages
+from qasm2image.svg import _drawing, _layout
+
+from test_layout import layout_instructions, random_json_circuit
+
+SVG = ('<svg xmlns="http://www.w3.org/2000/svg" width="{}" height="{}">'
+       '<rect x="1" y="1" width="8" height="8"/></svg>')
+
+
+def pdf_objects(pdf: bytes) -> bytes:
+    """Return a PDF with its compressed streams appended, uncompressed.
+
+    Recent versions of cairo write the objects in compressed object
+    streams.
+    """
+    objects = [pdf]
+    for stream in re.findall(rb'stream\r?\n(.*?)endstream', pdf, re.DOTALL):
+        try:
+            objects.append(zlib.decompress(stream))
+        except zlib.error:
+            pass
+    return b'\n'.join(objects)
+
+
+class DocumentTestCase(unittest.TestCase):
+
+    def test_pdf_pages(self):
+        pdf = _pages.svgs2document([SVG.format(100, 50), SVG.format(40, 80),
+                                    SVG.format(100, 50)], 'pdf')
+        self.assertTrue(pdf.startswith(b'%PDF'))
+        objects = pdf_objects(pdf)
+        self.assertEqual(len(re.findall(rb'/Type\s*/Page\b', objects)), 3)
+        # Each page has the size of its image.
+        boxes = re.findall(rb'/MediaBox\s*\[([^\]]*)\]', objects)
+        self.assertEqual(len(boxes), 3)
+        self.assertNotEqual(boxes[0], boxes[1])
+        self.assertEqual(boxes[0], boxes[2])
+
+    def test_ps_pages(self):
+        ps = _pages.svgs2document((SVG.format(20 * index, 30)
+                                   for index in range(1, 5)), 'ps')
+        self.assertTrue(ps.startswith(b'%!PS'))
+        self.assertEqual(len(re.findall(rb'^%%Page:', ps, re.MULTILINE)), 4)
+
+    def test_write_to(self):
+        output = io.BytesIO()
+        self.assertIsNone(_pages.svgs2document([SVG.format(10, 10)], 'pdf',
+                                               write_to=output))
+        self.assertTrue(output.getvalue().startswith(b'%PDF'))
+
+
+class PagesLayoutTestCase(unittest.TestCase):
+
+    def draw_pages(self, layout, columns_per_page):
+        """Return the layouts of the pages drawn by draw_layout_pages."""
+        with mock.patch.object(_drawing, 'draw_layout',
+                               wraps=_drawing.draw_layout) as draw_layout:
+            pages = list(_drawing.draw_layout_pages(layout,
+                                                    columns_per_page))
+        self.assertEqual(len(pages), draw_layout.call_count)
+        return [call[0][0] for call in draw_layout.call_args_list]
+
+    def test_column_split(self):
+        layout = _layout.layout_json_circuit(
+            random_json_circuit(3, 2, 60, seed=1))
+        self.assertGreater(layout.columns, 20)
+        pages = self.draw_pages(layout, 7)
+        self.assertEqual(len(pages), -(-layout.columns // 7))
+        self.assertEqual([page.columns for page in pages[:-1]],
+                         [7] * (len(pages) - 1))
+        self.assertEqual(pages[-1].columns,
+                         layout.columns - 7 * (len(pages) - 1))
+        gates = collections.Counter()
+        for index, page in enumerate(pages):
+            for gate in page.gates:
+                self.assertLessEqual(gate.column, page.columns)
+                gates[gate._replace(column=gate.column + 7 * index)] += 1
+        self.assertEqual(gates, collections.Counter(layout.gates))
+
+    def test_single_page(self):
+        layout = _layout.layout_json_circuit(
+            random_json_circuit(3, 2, 20, seed=2))
+        page, = self.draw_pages(layout, layout.columns)
+        self.assertEqual(page, layout)
+
+    def test_trailing_barrier(self):
+        layout = _layout.layout_json_circuit({
+            'header': {'number_of_qubits': 1, 'number_of_clbits': 0,
+                       'qubit_labels': [['q', 0]], 'clbit_labels': []},
+            'instructions': [{'name': 'h', 'qubits': [0]},
+                             {'name': 'x', 'qubits': [0]},
+                             {'name': 'barrier', 'qubits': [0]}]})
+        self.assertEqual(layout.columns, 2)
+        first, last = self.draw_pages(layout, 1)
+        self.assertEqual([gate.column for gate in first.gates], [0])
+        # The barrier is kept on the last page, after its only column.
+        self.assertEqual([(gate.glyph, gate.column) for gate in last.gates],
+                         [(_layout.GLYPH_GATE, 0),
+                          (_layout.GLYPH_BARRIER, 1)])
+
+    def test_invalid_columns_per_page(self):
+        layout = _layout.layout_json_circuit(
+            random_json_circuit(2, 1, 5, seed=3))
+        with self.assertRaises(ValueError):
+            next(_drawing.draw_layout_pages(layout, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
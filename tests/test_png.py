@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+
+# ======================================================================
+# Copyright CERFACS (February 2018)
+# Contributor: Adrien Suau (suau@cerfacs.fr)
+#
+# This software is governed by the CeCILL-B license under French law and
+# abiding  by the  rules of  distribution of free software. You can use,
+# modify  and/or  redistribute  the  software  under  the  terms  of the
+# CeCILL-B license as circulated by CEA, CNRS and INRIA at the following
+# URL "http://www.cecill.info".
+#
+# As a counterpart to the access to  the source code and rights to copy,
+# modify and  redistribute granted  by the  license, users  are provided
+# only with a limited warranty and  the software's author, the holder of
+# the economic rights,  and the  successive licensors  have only limited
+# liability.
+#
+# In this respect, the user's attention is drawn to the risks associated
+# with loading,  using, modifying and/or  developing or reproducing  the
+# software by the user in light of its specific status of free software,
+# that  may mean  that it  is complicated  to manipulate,  and that also
+# therefore  means that  it is reserved for  developers and  experienced
+# professionals having in-depth  computer knowledge. Users are therefore
+# encouraged  to load and  test  the software's  suitability as  regards
+# their  requirements  in  conditions  enabling  the  security  of their
+# systems  and/or  data to be  ensured and,  more generally,  to use and
+# operate it in the same conditions as regards security.
+#
+# The fact that you  are presently reading this  means that you have had
+# knowledge of the CeCILL-B license and that you accept its terms.
+# ======================================================================
+
+
+"""Tests of the PNG encoder of qasm2image."""
+
+import os
+import struct
+import sys
+import unittest
+import zlib
+
+# Add '..' in the Python path and import qasm2image
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from qasm2image import _png
+
+BLACK, WHITE, GRAY, RED = (0, 0, 0), (255, 255, 255), (100, 100, 100), \
+                          (255, 0, 0)
+
+
+def argb_surface(pixels, padding: int = 8):
+    """Pack rows of (red, green, blue, alpha) pixels as cairo ARGB32 data.
+
+    The colours are premultiplied by the alpha, as in cairo.
+    """
+    stride = 4 * len(pixels[0]) + padding
+    data = bytearray()
+    for row in pixels:
+        for red, green, blue, alpha in row:
+            data += struct.pack('=I', (alpha << 24) |
+                                ((red * alpha + 127) // 255 << 16) |
+                                ((green * alpha + 127) // 255 << 8) |
+                                (blue * alpha + 127) // 255)
+        data += bytes(padding)
+    return bytes(data), len(pixels[0]), len(pixels), stride
+
+
+def decode_png(png: bytes):
+    """Decode the PNG files written by _png.argb2png.
+
+    Returns:
+        (color type, bit depth, pixels per meter, rows of pixel tuples)
+    """
+    assert png[:8] == b'\x89PNG\r\n\x1a\n'
+    position, chunks = 8, dict()
+    while position < len(png):
+        length, = struct.unpack_from('>I', png, position)
+        chunk_type = png[position + 4:position + 8]
+        data = png[position + 8:position + 8 + length]
+        crc, = struct.unpack_from('>I', png, position + 8 + length)
+        assert crc == zlib.crc32(chunk_type + data)
+        chunks[chunk_type] = data
+        position += 12 + length
+    width, height, bit_depth, color_type = struct.unpack_from(
+        '>IIBB', chunks[b'IHDR'])
+    channels = {0: 1, 2: 3, 3: 1, 6: 4}[color_type]
+    row_bytes = (width * channels * bit_depth + 7) // 8
+    raw = zlib.decompress(chunks[b'IDAT'])
+    rows, previous = list(), bytes(row_bytes)
+    for row_index in range(height):
+        start = row_index * (row_bytes + 1)
+        filter_type, row = raw[start], raw[start + 1:start + 1 + row_bytes]
+        if filter_type == 2:
+            row = bytes((value + up) % 256 for value, up in zip(row, previous))
+        else:
+            assert filter_type == 0
+        previous = row
+        if bit_depth < 8:
+            bits = ''.join('{:08b}'.format(byte) for byte in row)
+            values = [int(bits[index:index + bit_depth], 2)
+                      for index in range(0, width * bit_depth, bit_depth)]
+        else:
+            values = list(row)
+        rows.append([tuple(values[index:index + channels])
+                     for index in range(0, width * channels, channels)])
+    if color_type == 3:
+        palette = chunks[b'PLTE']
+        rows = [[tuple(palette[3 * index:3 * index + 3]) for index, in row]
+                for row in rows]
+    pixels_per_meter = None
+    if b'pHYs' in chunks:
+        pixels_per_meter, = struct.unpack_from('>I', chunks[b'pHYs'])
+    return color_type, bit_depth, pixels_per_meter, rows
+
+
+class Argb2PngTestCase(unittest.TestCase):
+
+    COLOUR_ROWS = [[BLACK, WHITE, GRAY, RED, WHITE],
+                   [BLACK, WHITE, GRAY, RED, WHITE],
+                   [WHITE, WHITE, WHITE, WHITE, WHITE],
+                   [RED, BLACK, BLACK, GRAY, WHITE]]
+    GRAY_ROWS = [[BLACK, WHITE, GRAY, WHITE, BLACK, BLACK, WHITE, GRAY, BLACK,
+                  WHITE],
+                 [BLACK, WHITE, GRAY, WHITE, BLACK, BLACK, WHITE, GRAY, BLACK,
+                  WHITE],
+                 [GRAY, GRAY, WHITE, BLACK, BLACK, WHITE, WHITE, WHITE, BLACK,
+                  BLACK]]
+
+    @staticmethod
+    def _encode(rows, color_mode, **kwargs):
+        surface = argb_surface([[colour + (255,) for colour in row]
+                                for row in rows])
+        return decode_png(_png.argb2png(*surface, color_mode=color_mode,
+                                        **kwargs))
+
+    def test_rgba(self):
+        rows = [[(0, 0, 0, 255), (255, 255, 255, 0)],
+                [(255, 0, 0, 255), (0, 0, 0, 128)]]
+        color_type, bit_depth, _, decoded = decode_png(
+            _png.argb2png(*argb_surface(rows), color_mode='rgba'))
+        self.assertEqual((color_type, bit_depth), (6, 8))
+        self.assertEqual(decoded, [[(0, 0, 0, 255), (0, 0, 0, 0)],
+                                   [(255, 0, 0, 255), (0, 0, 0, 128)]])
+
+    def test_rgb(self):
+        color_type, bit_depth, _, decoded = self._encode(self.COLOUR_ROWS,
+                                                         'rgb')
+        self.assertEqual((color_type, bit_depth), (2, 8))
+        self.assertEqual(decoded, self.COLOUR_ROWS)
+
+    def test_palette(self):
+        color_type, bit_depth, _, decoded = self._encode(self.COLOUR_ROWS,
+                                                         'palette')
+        # 4 colours fit in 2 bits.
+        self.assertEqual((color_type, bit_depth), (3, 2))
+        self.assertEqual(decoded, self.COLOUR_ROWS)
+
+    def test_palette_with_too_many_colours(self):
+        rows = [[(index, 0, 0) for index in range(256)] + [(0, 1, 0)]]
+        with self.assertRaises(ValueError):
+            self._encode(rows, 'palette')
+
+    def test_gray(self):
+        color_type, bit_depth, _, decoded = self._encode(self.GRAY_ROWS,
+                                                         'gray')
+        self.assertEqual((color_type, bit_depth), (0, 8))
+        self.assertEqual(decoded, [[colour[:1] for colour in row]
+                                   for row in self.GRAY_ROWS])
+
+    def test_bilevel(self):
+        color_type, bit_depth, _, decoded = self._encode(self.GRAY_ROWS,
+                                                         'bilevel')
+        self.assertEqual((color_type, bit_depth), (0, 1))
+        self.assertEqual(decoded, [[(int(colour[0] >= 128),) for colour in row]
+                                   for row in self.GRAY_ROWS])
+
+    def test_dpi_and_compression_level(self):
+        for compresslevel in (0, 9):
+            _, _, pixels_per_meter, decoded = self._encode(
+                self.COLOUR_ROWS, 'rgb', compresslevel=compresslevel, dpi=96)
+            self.assertEqual(pixels_per_meter, 3780)
+            self.assertEqual(decoded, self.COLOUR_ROWS)
+
+    def test_unknown_color_mode(self):
+        with self.assertRaises(ValueError):
+            self._encode(self.COLOUR_ROWS, 'cmyk')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+
+# ======================================================================
+# Copyright CERFACS (February 2018)
+# Contributor: Adrien Suau (suau@cerfacs.fr)
+#
+# This software is governed by the CeCILL-B license under French law and
+# abiding  by the  rules of  distribution of free software. You can use,
+# modify  and/or  redistribute  the  software  under  the  terms  of the
+# CeCILL-B license as circulated by CEA, CNRS and INRIA at the following
+# URL "http://www.cecill.info".
+#
+# As a counterpart to the access to  the source code and rights to copy,
+# modify and  redistribute granted  by the  license, users  are provided
+# only with a limited warranty and  the software's author, the holder of
+# the economic rights,  and the  successive licensors  have only limited
+# liability.
+#
+# In this respect, the user's attention is drawn to the risks associated
+# with loading,  using, modifying and/or  developing or reproducing  the
+# software by the user in light of its specific status of free software,
+# that  may mean  that it  is complicated  to manipulate,  and that also
+# therefore  means that  it is reserved for  developers and  experienced
+# professionals having in-depth  computer knowledge. Users are therefore
+# encouraged  to load and  test  the software's  suitability as  regards
+# their  requirements  in  conditions  enabling  the  security  of their
+# systems  and/or  data to be  ensured and,  more generally,  to use and
+# operate it in the same conditions as regards security.
+#
+# The fact that you  are presently reading this  means that you have had
+# knowledge of the CeCILL-B license and that you accept its terms.
+# ======================================================================
+
+
+
+"""Tests of the circuits prepared for several outputs."""
+
+import os
+import sys
+import unittest
+from unittest import mock
+
+# Add '..' in the Python path and import qasm2image
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from qasm2image import _trees, qasm2png
+from qasm2image.prepared import prepare
+
+TELEPORT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             'examples', 'generic', 'teleport.qasm')
+
+
+class PreparedCircuitTestCase(unittest.TestCase):
+
+    def setUp(self):
+        with open(TELEPORT_PATH) as qasm_file:
+            self.qasm_str = qasm_file.read()
+
+    def test_same_png_as_qasm2png(self):
+        circuit = prepare(self.qasm_str)
+        for kwargs in ({}, {'scale': 0.5}, {'scale': 2, 'color_mode': 'rgb'},
+                       {'color_mode': 'gray', 'background': 'white'},
+                       {'pixel_width': 300, 'dpi': 300}):
+            with self.subTest(**kwargs):
+                self.assertEqual(circuit.to_png(**kwargs),
+                                 qasm2png(self.qasm_str, **kwargs))
+
+    def test_svg_is_parsed_once(self):
+        circuit = prepare(self.qasm_str)
+        with mock.patch.object(_trees, 'parse',
+                               wraps=_trees.parse) as parse:
+            circuit.to_png()
+            circuit.to_png(2)
+            circuit.to_pdf()
+            circuit.to_ps()
+        self.assertEqual(parse.call_count, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
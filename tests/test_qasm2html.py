@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+
+# ======================================================================
+# Copyright CERFACS (February 2018)
+# Contributor: Adrien Suau (suau@cerfacs.fr)
+#
+# This software is governed by the CeCILL-B license under French law and
+# abiding  by the  rules of  distribution of free software. You can use,
+# modify  and/or  redistribute  the  software  under  the  terms  of the
+# CeCILL-B license as circulated by CEA, CNRS and INRIA at the following
+# URL "http://www.cecill.info".
+#
+# As a counterpart to the access to  the source code and rights to copy,
+# modify and  redistribute granted  by the  license, users  are provided
+# only with a limited warranty and  the software's author, the holder of
+# the economic rights,  and the  successive licensors  have only limited
+# liability.
+#
+# In this respect, the user's attention is drawn to the risks associated
+# with loading,  using, modifying and/or  developing or reproducing  the
+# software by the user in light of its specific status of free software,
+# that  may mean  that it  is complicated  to manipulate,  and that also
+# therefore  means that  it is reserved for  developers and  experienced
+# professionals having in-depth  computer knowledge. Users are therefore
+# encouraged  to load and  test  the software's  suitability as  regards
+# their  requirements  in  conditions  enabling  the  security  of their
+# systems  and/or  data to be  ensured and,  more generally,  to use and
+# operate it in the same conditions as regards security.
+#
+# The fact that you  are presently reading this  means that you have had
+# knowledge of the CeCILL-B license and that you accept its terms.
+# ======================================================================
+
+
+
+"""Tests of the layout table embedded in the HTML viewer."""
+
+import json
+import os
+import sys
+import unittest
+
+# Add '..' in the Python path and import qasm2image
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from qasm2image.qasm2html import _get_layout_table, _layout2html
+from qasm2image.svg import _layout
+
+
+def make_json_circuit(instructions) -> dict:
+    return {'header': {'number_of_qubits': 2, 'number_of_clbits': 2,
+                       'qubit_labels': [['q', 0], ['q', 1]],
+                       'clbit_labels': [['c', 1]]},
+            'instructions': instructions}
+
+
+class LayoutTableTestCase(unittest.TestCase):
+
+    def test_small_circuit(self):
+        layout = _layout.layout_json_circuit(make_json_circuit([
+            {'name': 'h', 'qubits': [0]},
+            {'name': 'cx', 'qubits': [0, 1]},
+            {'name': 'measure', 'qubits': [1], 'clbits': [1]}]))
+        table = _get_layout_table(layout)
+        self.assertEqual(table['columns'], 3)
+        self.assertEqual(table['labels'], ['H', '', 'M'])
+        glyph = table['glyphs'].index
+        self.assertEqual(table['gates'], [
+            # glyph, label, #controls, #qubits, qubits, #clbits, clbits,
+            # condition, #condition clbits
+            glyph('gate'), 0, 0, 1, 0, 0, -1, 0,
+            glyph('cnot'), 1, 1, 2, 0, 1, 0, -1, 0,
+            glyph('measure'), 2, 0, 1, 1, 1, 1, -1, 0])
+        self.assertEqual(table['column_offsets'], [0, 8, 17, 26, 26])
+
+    def test_bit_order(self):
+        layout = _layout.layout_json_circuit(
+            make_json_circuit([{'name': 'cx', 'qubits': [0, 1]}]),
+            bit_order={('q', 0): 1, ('q', 1): 0, ('c', 0): 0, ('c', 1): 1})
+        # The bits are given as drawn rows.
+        self.assertEqual(_get_layout_table(layout)['gates'][4:6], [1, 0])
+
+    def test_conditioned_barrier_in_last_column(self):
+        layout = _layout.layout_json_circuit(make_json_circuit([
+            {'name': 'h', 'qubits': [1]},
+            {'name': 'barrier', 'qubits': [1],
+             'conditional': {'mask': '0x3', 'val': '0x1',
+                             'type': 'equals'}}]))
+        self.assertEqual(layout.columns, 1)
+        self.assertEqual(layout.gates[-1].column, 1)
+        table = _get_layout_table(layout)
+        # Only the condition of the barrier is drawn.
+        self.assertEqual(table['gates'][8:], [
+            table['glyphs'].index('none'), 1, 0, 1, 1, 0, 1, 2, 0, 1])
+        self.assertEqual(table['column_offsets'], [0, 8, 18])
+
+    def test_labels_cannot_close_the_script(self):
+        layout = _layout.layout_json_circuit(make_json_circuit([
+            {'name': 'h', 'qubits': [0]}]))
+        page = _layout2html(layout._replace(qubit_labels=['</script>',
+                                                          'q[1]']),
+                            'Circuit')
+        script = page.split('id="layout">')[1].split('</script>')[0]
+        self.assertEqual(json.loads(script)['qubit_labels'][0], '</script>')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+
+# ======================================================================
+# Copyright CERFACS (February 2018)
+# Contributor: Adrien Suau (suau@cerfacs.fr)
+#
+# This software is governed by the CeCILL-B license under French law and
+# abiding  by the  rules of  distribution of free software. You can use,
+# modify  and/or  redistribute  the  software  under  the  terms  of the
+# CeCILL-B license as circulated by CEA, CNRS and INRIA at the following
+# URL "http://www.cecill.info".
+#
+# As a counterpart to the access to  the source code and rights to copy,
+# modify and  redistribute granted  by the  license, users  are provided
+# only with a limited warranty and  the software's author, the holder of
+# the economic rights,  and the  successive licensors  have only limited
+# liability.
+#
+# In this respect, the user's attention is drawn to the risks associated
+# with loading,  using, modifying and/or  developing or reproducing  the
+# software by the user in light of its specific status of free software,
+# that  may mean  that it  is complicated  to manipulate,  and that also
+# therefore  means that  it is reserved for  developers and  experienced
+# professionals having in-depth  computer knowledge. Users are therefore
+# encouraged  to load and  test  the software's  suitability as  regards
+# their  requirements  in  conditions  enabling  the  security  of their
+# systems  and/or  data to be  ensured and,  more generally,  to use and
+# operate it in the same conditions as regards security.
+#
+# The fact that you  are presently reading this  means that you have had
+# knowledge of the CeCILL-B license and that you accept its terms.
+# ======================================================================
+
+
+"""Tests of the JSON and binary layout formats and of the layout index."""
+
+import json
+import os
+import random
+import sys
+import tempfile
+import unittest
+
+# Add '..' in the Python path and import qasm2image
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from qasm2image.qasm2layout import (layout2binary, layout2dict, qasm2layout,
+                                    read_binary_layout)
+from qasm2image.layout_index import (LayoutIndex, build_layout_index,
+                                     write_layout_index)
+from qasm2image.svg import _layout
+
+from test_layout import random_json_circuit
+
+
+class BinaryLayoutTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.layout = _layout.layout_json_circuit(
+            random_json_circuit(4, 3, 200, seed=3))
+        self.layout_dict = layout2dict(self.layout)
+        self.binary = layout2binary(self.layout)
+
+    def test_round_trip(self):
+        self.assertEqual(read_binary_layout(self.binary),
+                         self.layout_dict)
+
+    def test_window(self):
+        columns = self.layout.columns
+        for first, last in ((0, 1), (3, 17), (columns - 5, columns),
+                            (columns, columns), (-2, 4), (5, columns + 10)):
+            window = read_binary_layout(self.binary, first, last)
+            self.assertEqual(window['instructions'], [
+                instruction
+                for instruction in self.layout_dict['instructions']
+                if first <= instruction['column'] < last])
+            self.assertEqual(window['columns'], columns)
+
+    def test_invalid_data(self):
+        with self.assertRaises(ValueError):
+            read_binary_layout(b'\0' * len(self.binary))
+
+    def test_layout_index(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'circuit.layout')
+            write_layout_index(self.layout, path)
+            self.assertEqual(os.listdir(directory), ['circuit.layout'])
+            with LayoutIndex(path) as index:
+                self.assertEqual(index.columns, self.layout.columns)
+                self.assertEqual(len(index),
+                                 len(self.layout_dict['instructions']))
+                self.assertEqual(index.qubit_labels,
+                                 self.layout_dict['qubit_labels'])
+                self.assertEqual(index.clbit_labels,
+                                 self.layout_dict['clbit_labels'])
+                self.assertEqual(index.window(10, 20), [
+                    instruction
+                    for instruction in self.layout_dict['instructions']
+                    if 10 <= instruction['column'] < 20])
+
+    def test_conditioned_barrier_in_last_column(self):
+        layout = _layout.layout_json_circuit({
+            'header': {'number_of_qubits': 1, 'number_of_clbits': 1,
+                       'qubit_labels': [['q', 0]],
+                       'clbit_labels': [['c', 1]]},
+            'instructions': [
+                {'name': 'h', 'qubits': [0]},
+                {'name': 'barrier', 'qubits': [0],
+                 'conditional': {'mask': '0x1', 'val': '0x1',
+                                 'type': 'equals'}}]})
+        self.assertEqual(layout.columns, 1)
+        instructions = layout2dict(layout)['instructions']
+        self.assertEqual(instructions[-1], {
+            'column': 1, 'glyph': 'none', 'label': '', 'controls': 0,
+            'qubits': [0], 'clbits': [], 'condition': 1,
+            'condition_clbits': [0]})
+        binary = layout2binary(layout)
+        self.assertEqual(read_binary_layout(binary)['instructions'],
+                         instructions)
+        self.assertEqual(read_binary_layout(binary, 1)['instructions'],
+                         instructions[-1:])
+
+
+class LayoutIndexTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.path = os.path.join(self.directory.name, 'circuit.layout')
+
+    def assertWindowsEqual(self, layout_dict: dict, windows) -> None:
+        with LayoutIndex(self.path) as index:
+            self.assertEqual(index.columns, layout_dict['columns'])
+            for first, last in windows:
+                self.assertEqual(index.window(first, last), [
+                    instruction for instruction in layout_dict['instructions']
+                    if first <= instruction['column'] < last])
+
+    def test_windows(self):
+        layout = _layout.layout_json_circuit(
+            random_json_circuit(6, 4, 2000, seed=5))
+        write_layout_index(layout, self.path)
+        columns = layout.columns
+        generator = random.Random(5)
+        windows = [(0, columns + 1), (0, 0), (columns, columns + 1),
+                   (-10, 3), (columns - 3, columns + 10)]
+        for _ in range(50):
+            first = generator.randrange(columns)
+            windows.append((first, first + generator.randint(1, 40)))
+        self.assertWindowsEqual(layout2dict(layout), windows)
+
+    def test_build_layout_index(self):
+        qasm_str = ('OPENQASM 2.0;\ninclude "qelib1.inc";\nqreg q[3];\n'
+                    'creg c[3];\n' + 'h q[0];\ncx q[0],q[1];\nx q[2];\n'
+                    'measure q[1] -> c[1];\n' * 20)
+        build_layout_index(qasm_str, self.path)
+        self.assertWindowsEqual(json.loads(qasm2layout(qasm_str)),
+                                [(0, 5), (17, 30), (40, 100)])
+
+    def test_invalid_file(self):
+        with open(self.path, 'wb') as layout_file:
+            layout_file.write(b'\0' * 256)
+        with self.assertRaises(ValueError):
+            LayoutIndex(self.path)
+
+
+if __name__ == '__main__':
+    unittest.main()
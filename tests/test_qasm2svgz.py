@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+
+# ======================================================================
+# Copyright CERFACS (February 2018)
+# Contributor: Adrien Suau (suau@cerfacs.fr)
+#
+# This software is governed by the CeCILL-B license under French law and
+# abiding  by the  rules of  distribution of free software. You can use,
+# modify  and/or  redistribute  the  software  under  the  terms  of the
+# CeCILL-B license as circulated by CEA, CNRS and INRIA at the following
+# URL "http://www.cecill.info".
+#
+# As a counterpart to the access to  the source code and rights to copy,
+# modify and  redistribute granted  by the  license, users  are provided
+# only with a limited warranty and  the software's author, the holder of
+# the economic rights,  and the  successive licensors  have only limited
+# liability.
+#
+# In this respect, the user's attention is drawn to the risks associated
+# with loading,  using, modifying and/or  developing or reproducing  the
+# software by the user in light of its specific status of free software,
+# that  may mean  that it  is complicated  to manipulate,  and that also
+# therefore  means that  it is reserved for  developers and  experienced
+# professionals having in-depth  computer knowledge. Users are therefore
+# encouraged  to load and  test  the software's  suitability as  regards
+# their  requirements  in  conditions  enabling  the  security  of their
+# systems  and/or  data to be  ensured and,  more generally,  to use and
+# operate it in the same conditions as regards security.
+#
+# The fact that you  are presently reading this  means that you have had
+# knowledge of the CeCILL-B license and that you accept its terms.
+# ======================================================================
+
+
+"""Tests of the qasm2svgz function."""
+
+import gzip
+import os
+import sys
+import unittest
+
+# Add '..' in the Python path and import qasm2image
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from qasm2image import qasm2svg, qasm2svgz
+
+QASM = """OPENQASM 2.0;
+include "qelib1.inc";
+qreg q[2];
+creg c[2];
+h q[0];
+cx q[0],q[1];
+measure q -> c;
+"""
+
+
+class Qasm2SvgzTestCase(unittest.TestCase):
+
+    def test_output_is_reproducible(self):
+        self.assertEqual(qasm2svgz(QASM), qasm2svgz(QASM))
+
+    def test_output_decompresses_to_the_svg(self):
+        svg = qasm2svg(QASM)
+        self.assertEqual(gzip.decompress(qasm2svgz(QASM)).decode('utf-8'), svg)
+
+    def test_compact_output_decompresses_to_the_compact_svg(self):
+        svg = qasm2svg(QASM, compact=True, precision=2)
+        svgz = qasm2svgz(QASM, compact=True, precision=2, compresslevel=1)
+        self.assertEqual(gzip.decompress(svgz).decode('utf-8'), svg)
+
+
+if __name__ == '__main__':
+    unittest.main()
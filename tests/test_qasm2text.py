@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+
+# ======================================================================
+# Copyright CERFACS (February 2018)
+# Contributor: Adrien Suau (suau@cerfacs.fr)
+#
+# This software is governed by the CeCILL-B license under French law and
+# abiding  by the  rules of  distribution of free software. You can use,
+# modify  and/or  redistribute  the  software  under  the  terms  of the
+# CeCILL-B license as circulated by CEA, CNRS and INRIA at the following
+# URL "http://www.cecill.info".
+#
+# As a counterpart to the access to  the source code and rights to copy,
+# modify and  redistribute granted  by the  license, users  are provided
+# only with a limited warranty and  the software's author, the holder of
+# the economic rights,  and the  successive licensors  have only limited
+# liability.
+#
+# In this respect, the user's attention is drawn to the risks associated
+# with loading,  using, modifying and/or  developing or reproducing  the
+# software by the user in light of its specific status of free software,
+# that  may mean  that it  is complicated  to manipulate,  and that also
+# therefore  means that  it is reserved for  developers and  experienced
+# professionals having in-depth  computer knowledge. Users are therefore
+# encouraged  to load and  test  the software's  suitability as  regards
+# their  requirements  in  conditions  enabling  the  security  of their
+# systems  and/or  data to be  ensured and,  more generally,  to use and
+# operate it in the same conditions as regards security.
+#
+# The fact that you  are presently reading this  means that you have had
+# knowledge of the CeCILL-B license and that you accept its terms.
+# ======================================================================
+
+
+
+"""Tests of the text output of qasm2image."""
+
+import io
+import os
+import sys
+import unittest
+
+# Add '..' in the Python path and import qasm2image
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from qasm2image.qasm2text import qasm2text
+
+TELEPORT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             'examples', 'generic', 'teleport.qasm')
+
+# The classical bit labels and conditions are those of the SVG output.
+TELEPORT = """\
+ q[0]: ─┤u3(0.3,0.2,0.1)├─────●──┤H├──┤M├─────────────────────
+                              │        ║
+ q[1]: ────────┤H├─────────●──⊕────────╫───┤M├────────────────
+                           │           ║    ║
+ q[2]: ────────────────────⊕───────────╫────╫───┤Z├──┤X├──┤M├─
+                                       ║    ║    ║    ║    ║
+c0[0]: ════════════════════════════════╩════╬════●════●════╬══
+                                            ║         ║    ║
+c0[1]: ═════════════════════════════════════╩═════════○════╬══
+                                                           ║
+c1[0]: ════════════════════════════════════════════════════╩══
+"""
+
+TELEPORT_WITHOUT_CLBITS = """\
+q[0]: ─┤u3(0.3,0.2,0.1)├─────●──┤H├──┤M0├─────────────────────────────────
+                             │
+q[1]: ────────┤H├─────────●──⊕─────────────┤M1├───────────────────────────
+                          │
+q[2]: ────────────────────⊕──────────────────────┤Z[c=1]├──┤X[c=1]├──┤M2├─
+"""
+
+TELEPORT_PAGES = """\
+ q[0]: ─┤u3(0.3,0.2,0.1)├─────●──┤H├─
+                              │
+ q[1]: ────────┤H├─────────●──⊕──────
+                           │
+ q[2]: ────────────────────⊕─────────
+
+c0[0]: ══════════════════════════════
+
+c0[1]: ══════════════════════════════
+
+c1[0]: ══════════════════════════════
+
+ q[0]: ─┤M├────────────────
+         ║
+ q[1]: ──╫───┤M├───────────
+         ║    ║
+ q[2]: ──╫────╫───┤Z├──┤X├─
+         ║    ║    ║    ║
+c0[0]: ══╩════╬════●════●══
+              ║         ║
+c0[1]: ═══════╩═════════○══
+
+c1[0]: ════════════════════
+
+ q[0]: ─────
+
+ q[1]: ─────
+
+ q[2]: ─┤M├─
+         ║
+c0[0]: ══╬══
+         ║
+c0[1]: ══╬══
+         ║
+c1[0]: ══╩══
+"""
+
+
+class TextTestCase(unittest.TestCase):
+
+    def setUp(self):
+        with open(TELEPORT_PATH) as qasm_file:
+            self.qasm_str = qasm_file.read()
+
+    def test_teleport(self):
+        self.assertEqual(qasm2text(self.qasm_str), TELEPORT)
+
+    def test_without_clbits(self):
+        self.assertEqual(qasm2text(self.qasm_str, show_clbits=False),
+                         TELEPORT_WITHOUT_CLBITS)
+
+    def test_pages(self):
+        self.assertEqual(qasm2text(self.qasm_str, columns_per_page=4),
+                         TELEPORT_PAGES)
+        with self.assertRaises(ValueError):
+            qasm2text(self.qasm_str, columns_per_page=0)
+
+    def test_write_to(self):
+        output = io.StringIO()
+        self.assertIsNone(qasm2text(self.qasm_str, write_to=output))
+        self.assertEqual(output.getvalue(), TELEPORT)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+
+# ======================================================================
+# Copyright CERFACS (February 2018)
+# Contributor: Adrien Suau (suau@cerfacs.fr)
+#
+# This software is governed by the CeCILL-B license under French law and
+# abiding  by the  rules of  distribution of free software. You can use,
+# modify  and/or  redistribute  the  software  under  the  terms  of the
+# CeCILL-B license as circulated by CEA, CNRS and INRIA at the following
+# URL "http://www.cecill.info".
+#
+# As a counterpart to the access to  the source code and rights to copy,
+# modify and  redistribute granted  by the  license, users  are provided
+# only with a limited warranty and  the software's author, the holder of
+# the economic rights,  and the  successive licensors  have only limited
+# liability.
+#
+# In this respect, the user's attention is drawn to the risks associated
+# with loading,  using, modifying and/or  developing or reproducing  the
+# software by the user in light of its specific status of free software,
+# that  may mean  that it  is complicated  to manipulate,  and that also
+# therefore  means that  it is reserved for  developers and  experienced
+# professionals having in-depth  computer knowledge. Users are therefore
+# encouraged  to load and  test  the software's  suitability as  regards
+# their  requirements  in  conditions  enabling  the  security  of their
+# systems  and/or  data to be  ensured and,  more generally,  to use and
+# operate it in the same conditions as regards security.
+#
+# The fact that you  are presently reading this  means that you have had
+# knowledge of the CeCILL-B license and that you accept its terms.
+# ======================================================================
+
+
+"""Tests of the detection and collapse of repeated blocks."""
+
+import os
+import sys
+import unittest
+
+# Add '..' in the Python path and import qasm2image
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from qasm2image.svg import _drawing, _repeats
+from qasm2image.svg._instructions import InstructionTable
+from qasm2image.svg._layout import layout_json_circuit
+from qasm2image.svg._repeats import Run
+
+
+def make_table(instructions, qubits_number: int = 3,
+               clbits_number: int = 2) -> InstructionTable:
+    """Build a table from (name, qubits) or (name, qubits, params) tuples."""
+    table = InstructionTable(qubits_number, clbits_number)
+    for instruction in instructions:
+        name, qubits, params = (tuple(instruction) + ((),))[:3]
+        if name not in table.names:
+            table.names.append(name)
+        table.append(table.names.index(name), qubits, params=params)
+    return table
+
+
+def instructions_of(table: InstructionTable):
+    return [(table.name(index), list(table.instruction_qubits(index)),
+             list(table.instruction_params(index)))
+            for index in range(len(table))]
+
+
+LAYER = [('h', [0]), ('cx', [0, 1]), ('u1', [1], [0.5])]
+
+
+def make_json_circuit(instructions, qubits_number: int = 3) -> dict:
+    """Build a JSON circuit from the tuples of make_table."""
+    json_instructions = list()
+    for instruction in instructions:
+        name, qubits, params = (tuple(instruction) + ((),))[:3]
+        json_instructions.append({'name': name, 'qubits': qubits,
+                                  'params': list(params)})
+    return {'header': {'number_of_qubits': qubits_number,
+                       'number_of_clbits': 0,
+                       'qubit_labels': [['q', index]
+                                        for index in range(qubits_number)],
+                       'clbit_labels': []},
+            'instructions': json_instructions}
+
+
+class FindRunsTestCase(unittest.TestCase):
+
+    def test_repeated_block(self):
+        table = make_table([('x', [2])] + LAYER * 3 + [('h', [2])])
+        self.assertEqual(_repeats.find_runs(table), [Run(1, 3, 3)])
+
+    def test_no_repetition(self):
+        table = make_table([('h', [0]), ('x', [1]), ('h', [1]), ('x', [0])])
+        self.assertEqual(_repeats.find_runs(table), [])
+
+    def test_parameters_are_compared(self):
+        table = make_table([('u1', [1], [0.5]), ('u1', [1], [0.25]),
+                            ('u1', [1], [0.5])])
+        self.assertEqual(_repeats.find_runs(table), [])
+
+    def test_shortest_block_on_ties(self):
+        table = make_table([('h', [0])] * 4)
+        self.assertEqual(_repeats.find_runs(table), [Run(0, 1, 4)])
+
+    def test_largest_saving(self):
+        # The block of length 3 saves 9 instructions, the repetition of 'h'
+        # at the start of each block only saves 1.
+        block = [('h', [0]), ('h', [0]), ('x', [1])]
+        table = make_table(block * 4)
+        self.assertEqual(_repeats.find_runs(table), [Run(0, 3, 4)])
+
+    def test_several_runs(self):
+        table = make_table(LAYER * 2 + [('x', [2])] + [('h', [1])] * 3)
+        self.assertEqual(_repeats.find_runs(table),
+                         [Run(0, 3, 2), Run(7, 1, 3)])
+
+    def test_overlapping_periods(self):
+        # 'h h x' repeated, then a run of 'x' sharing its first instruction
+        # with the last block.
+        block = [('h', [0]), ('h', [0]), ('x', [1])]
+        table = make_table(block * 2 + [('x', [1])] * 3)
+        self.assertEqual(_repeats.find_runs(table),
+                         [Run(0, 3, 2), Run(6, 1, 3)])
+
+    def test_max_block_length(self):
+        table = make_table(LAYER * 2)
+        self.assertEqual(_repeats.find_runs(table, max_block_length=2), [])
+        self.assertEqual(_repeats.find_runs(table, max_block_length=3),
+                         [Run(0, 3, 2)])
+
+
+class CollapseRunsTestCase(unittest.TestCase):
+
+    def test_collapse(self):
+        table = make_table([('x', [2])] + LAYER * 3 + [('h', [2])])
+        collapsed, blocks = _repeats.collapse_runs(table, [Run(1, 3, 3)])
+        self.assertEqual(blocks, [(2, 5)])
+        self.assertEqual(instructions_of(collapsed), [
+            ('x', [2], []), ('barrier', [0, 1], []), ('h', [0], []),
+            ('cx', [0, 1], []), ('u1', [1], [0.5]), ('barrier', [0, 1], []),
+            ('h', [2], [])])
+
+    def test_rows_are_fenced(self):
+        # The qubit 2 is drawn between the qubits 0 and 1 used by the block.
+        table = make_table(LAYER * 2)
+        collapsed, _ = _repeats.collapse_runs(table, [Run(0, 3, 2)],
+                                              qubit_rows=[0, 2, 1])
+        self.assertEqual(instructions_of(collapsed)[0],
+                         ('barrier', [0, 1, 2], []))
+        collapsed, _ = _repeats.collapse_runs(table, [Run(0, 3, 2)],
+                                              qubit_rows=[1, 0, 2])
+        self.assertEqual(instructions_of(collapsed)[0],
+                         ('barrier', [0, 1], []))
+
+    def test_no_runs(self):
+        table = make_table(LAYER)
+        collapsed, blocks = _repeats.collapse_runs(table, [])
+        self.assertEqual(blocks, [])
+        self.assertEqual(instructions_of(collapsed), instructions_of(table))
+
+    def test_conditions_are_fenced(self):
+        table = make_table([])
+        table.names.append('x')
+        for _ in range(2):
+            table.append(0, [1], condition=(1, 2))
+        collapsed, blocks = _repeats.collapse_runs(
+            table, _repeats.find_runs(table))
+        self.assertEqual(blocks, [(1, 2)])
+        self.assertEqual(collapsed.conditions, {1: (1, 2)})
+        self.assertEqual(list(collapsed.instruction_clbits(0)), [0, 1])
+
+
+class RepeatLayoutTestCase(unittest.TestCase):
+
+    def test_bit_order(self):
+        # The qubit q[2] is drawn between q[0] and q[1], so the gate applied
+        # to it must not be drawn in the box of the block.
+        json_circuit = make_json_circuit(LAYER * 2 + [('x', [2])])
+        bit_order = {('q', 0): 0, ('q', 1): 2, ('q', 2): 1}
+        layout = layout_json_circuit(json_circuit, bit_order=bit_order,
+                                     collapse_repeats=True)
+        repeat, = layout.repeats
+        self.assertEqual(repeat.count, 2)
+        self.assertEqual(sorted(repeat.qubits), [0, 1, 2])
+        x_gate = layout.gates[-1]
+        self.assertEqual(list(x_gate.qubits), [2])
+        self.assertGreater(x_gate.column, repeat.last_column)
+
+    def test_fragments_reject_repeats(self):
+        json_circuit = make_json_circuit(LAYER * 2)
+        layout = layout_json_circuit(json_circuit, collapse_repeats=True)
+        self.assertTrue(layout.repeats)
+        with self.assertRaises(ValueError):
+            _drawing.draw_layout_fragments(layout, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
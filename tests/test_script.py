@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+
+# ======================================================================
+# Copyright CERFACS (February 2018)
+# Contributor: Adrien Suau (suau@cerfacs.fr)
+#
+# This software is governed by the CeCILL-B license under French law and
+# abiding  by the  rules of  distribution of free software. You can use,
+# modify  and/or  redistribute  the  software  under  the  terms  of the
+# CeCILL-B license as circulated by CEA, CNRS and INRIA at the following
+# URL "http://www.cecill.info".
+#
+# As a counterpart to the access to  the source code and rights to copy,
+# modify and  redistribute granted  by the  license, users  are provided
+# only with a limited warranty and  the software's author, the holder of
+# the economic rights,  and the  successive licensors  have only limited
+# liability.
+#
+# In this respect, the user's attention is drawn to the risks associated
+# with loading,  using, modifying and/or  developing or reproducing  the
+# software by the user in light of its specific status of free software,
+# that  may mean  that it  is complicated  to manipulate,  and that also
+# therefore  means that  it is reserved for  developers and  experienced
+# professionals having in-depth  computer knowledge. Users are therefore
+# encouraged  to load and  test  the software's  suitability as  regards
+# their  requirements  in  conditions  enabling  the  security  of their
+# systems  and/or  data to be  ensured and,  more generally,  to use and
+# operate it in the same conditions as regards security.
+#
+# The fact that you  are presently reading this  means that you have had
+# knowledge of the CeCILL-B license and that you accept its terms.
+# ======================================================================
+
+
+
+"""Tests of the command line interface."""
+
+import io
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+# Add '..' in the Python path and import the command line interface
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from qasm2image import qasm2svg
+from tools import qasm2image_script
+
+QASM = """OPENQASM 2.0;
+include "qelib1.inc";
+qreg q[2];
+h q[0];
+cx q[0],q[1];
+"""
+OTHER_QASM = QASM + "x q[1];\n"
+INVALID_QASM = QASM + "x r[0];\n"
+
+
+class ScriptTestCase(unittest.TestCase):
+
+    def _main(self, arguments, input_bytes: bytes = b'') -> bytes:
+        """Run main with in-memory standard streams, return the output."""
+        stdin = io.TextIOWrapper(io.BytesIO(input_bytes), encoding='utf-8')
+        stdout = io.TextIOWrapper(io.BytesIO(), encoding='utf-8')
+        with mock.patch.object(sys, 'argv', ['qasm2image'] + arguments), \
+                mock.patch.object(sys, 'stdin', stdin), \
+                mock.patch.object(sys, 'stdout', stdout), \
+                mock.patch.object(sys, 'stderr', io.StringIO()):
+            qasm2image_script.main()
+        return stdout.buffer.getvalue()
+
+    def test_standard_streams(self):
+        output = self._main(['-f', 'svg', '-', '-'], QASM.encode('utf-8'))
+        self.assertEqual(output.decode('utf-8'), qasm2svg(QASM))
+
+    def test_nul_delimiter(self):
+        documents = [QASM, OTHER_QASM]
+        output = self._main(['-d', 'nul', '-f', 'svg', '-', '-'],
+                            '\0'.join(documents).encode('utf-8'))
+        self.assertEqual(output.split(b'\0'),
+                         [qasm2svg(document).encode('utf-8')
+                          for document in documents] + [b''])
+
+    def test_length_delimiter(self):
+        documents = [QASM, INVALID_QASM, OTHER_QASM]
+        input_bytes = b''.join(
+            "{}\n".format(len(document)).encode('ascii') +
+            document.encode('utf-8') for document in documents)
+        output = io.BytesIO(self._main(['-d', 'length', '-f', 'svg', '-', '-'],
+                                       input_bytes))
+        outputs = list()
+        for length_line in iter(output.readline, b''):
+            outputs.append(output.read(int(length_line)).decode('utf-8'))
+        # The document that cannot be rendered produces an empty output.
+        self.assertEqual(outputs, [qasm2svg(QASM), '', qasm2svg(OTHER_QASM)])
+
+    def test_nul_delimiter_with_binary_format(self):
+        with self.assertRaises(SystemExit):
+            self._main(['-d', 'nul', '-f', 'png', '-', '-'])
+
+    def test_file_output_is_utf8(self):
+        # The boxes of the repeated blocks are annotated with a non-ASCII
+        # character.
+        qasm_str = QASM + "h q[1];\n" * 3
+        with tempfile.TemporaryDirectory() as directory:
+            input_path = os.path.join(directory, 'circuit.qasm')
+            output_path = os.path.join(directory, 'circuit.svg')
+            with open(input_path, 'w') as input_file:
+                input_file.write(qasm_str)
+            self._main(['-r', input_path, output_path])
+            with open(output_path, 'rb') as output_file:
+                file_output = output_file.read()
+        self.assertIn('\u00d7'.encode('utf-8'), file_output)
+        self.assertEqual(file_output,
+                         self._main(['-r', '-f', 'svg', '-', '-'],
+                                    qasm_str.encode('utf-8')))
+
+    def test_watch(self):
+        with tempfile.TemporaryDirectory() as directory:
+            input_path = os.path.join(directory, 'circuit.qasm')
+            output_path = os.path.join(directory, 'circuit.svg')
+            with open(input_path, 'w') as input_file:
+                input_file.write(QASM)
+            outputs = list()
+
+            def _sleep(_):
+                # Called after each check of the files and before the render
+                # of a change.
+                if not outputs:
+                    with open(output_path, 'r', encoding='utf-8') as output:
+                        outputs.append(output.read())
+                    with open(input_path, 'w') as input_file:
+                        input_file.write(OTHER_QASM)
+                elif len(outputs) == 1 and os.path.getmtime(output_path) \
+                        >= os.path.getmtime(input_path):
+                    with open(output_path, 'r', encoding='utf-8') as output:
+                        outputs.append(output.read())
+                    raise KeyboardInterrupt
+
+            with mock.patch.object(qasm2image_script.time, 'sleep', _sleep):
+                self._main(['-w', input_path, output_path])
+        self.assertEqual(outputs, [qasm2svg(QASM), qasm2svg(OTHER_QASM)])
+
+    def test_watch_needs_files(self):
+        with self.assertRaises(SystemExit):
+            self._main(['-w', '-f', 'svg', '-', '-'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+
+# ======================================================================
+# Copyright CERFACS (February 2018)
+# Contributor: Adrien Suau (suau@cerfacs.fr)
+#
+# This software is governed by the CeCILL-B license under French law and
+# abiding  by the  rules of  distribution of free software. You can use,
+# modify  and/or  redistribute  the  software  under  the  terms  of the
+# CeCILL-B license as circulated by CEA, CNRS and INRIA at the following
+# URL "http://www.cecill.info".
+#
+# As a counterpart to the access to  the source code and rights to copy,
+# modify and  redistribute granted  by the  license, users  are provided
+# only with a limited warranty and  the software's author, the holder of
+# the economic rights,  and the  successive licensors  have only limited
+# liability.
+#
+# In this respect, the user's attention is drawn to the risks associated
+# with loading,  using, modifying and/or  developing or reproducing  the
+# software by the user in light of its specific status of free software,
+# that  may mean  that it  is complicated  to manipulate,  and that also
+# therefore  means that  it is reserved for  developers and  experienced
+# professionals having in-depth  computer knowledge. Users are therefore
+# encouraged  to load and  test  the software's  suitability as  regards
+# their  requirements  in  conditions  enabling  the  security  of their
+# systems  and/or  data to be  ensured and,  more generally,  to use and
+# operate it in the same conditions as regards security.
+#
+# The fact that you  are presently reading this  means that you have had
+# knowledge of the CeCILL-B license and that you accept its terms.
+# ======================================================================
+
+
+"""Tests of the render server, on a local port."""
+
+import http.client
+import json
+import os
+import sys
+import threading
+import time
+import unittest
+
+# Add '..' in the Python path and import the server
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from qasm2image import metrics
+from tools.qasm2image_server import DEFAULT_BASIS, RenderServer
+
+QASM = """OPENQASM 2.0;
+include "qelib1.inc";
+qreg q[2];
+h q[0];
+cx q[0],q[1];
+"""
+
+
+class RenderServerTestCase(unittest.TestCase):
+
+    def _start_server(self, workers: int = 1, **kwargs) -> RenderServer:
+        server = RenderServer(('127.0.0.1', 0), workers=workers, **kwargs)
+        thread = threading.Thread(target=server.serve_forever)
+        thread.start()
+
+        def _stop():
+            server.shutdown()
+            thread.join()
+            server.server_close()
+
+        self.addCleanup(_stop)
+        return server
+
+    @staticmethod
+    def _post(server: RenderServer, request: dict):
+        connection = http.client.HTTPConnection(*server.server_address[:2],
+                                                timeout=60)
+        try:
+            connection.request('POST', '/render', json.dumps(request),
+                               {'Content-Type': 'application/json'})
+            response = connection.getresponse()
+            return response.status, response.read()
+        finally:
+            connection.close()
+
+    @staticmethod
+    def _post_raw(server: RenderServer, content_length: str):
+        connection = http.client.HTTPConnection(*server.server_address[:2],
+                                                timeout=60)
+        try:
+            connection.putrequest('POST', '/render')
+            connection.putheader('Content-Length', content_length)
+            connection.endheaders()
+            return connection.getresponse().status
+        finally:
+            connection.close()
+
+    def test_render(self):
+        server = self._start_server()
+        status, body = self._post(server, {'qasm': QASM, 'format': 'svg'})
+        self.assertEqual(status, 200)
+        self.assertIn(b'<svg', body)
+
+    def test_invalid_circuit(self):
+        server = self._start_server()
+        status, _ = self._post(server, {'qasm': QASM + "h r[0];\n",
+                                        'format': 'svg'})
+        self.assertEqual(status, 422)
+
+    def test_invalid_content_length(self):
+        server = self._start_server()
+        self.assertEqual(self._post_raw(server, 'abc'), 400)
+        self.assertEqual(self._post_raw(server, '-1'), 400)
+
+    def test_full_queue(self):
+        server = self._start_server(max_pending=0)
+        status, _ = self._post(server, {'qasm': QASM, 'format': 'svg'})
+        self.assertEqual(status, 503)
+
+    def test_dead_worker(self):
+        server = self._start_server()
+        # pylint: disable=protected-access
+        crash = server._executor.submit(os._exit, 1)
+        self.assertIsNotNone(crash.exception(timeout=60))
+        status, _ = self._post(server, {'qasm': QASM, 'format': 'svg'})
+        self.assertEqual(status, 503)
+        # The workers were started again.
+        status, _ = self._post(server, {'qasm': QASM, 'format': 'svg'})
+        self.assertEqual(status, 200)
+
+    def test_single_flight(self):
+        server = self._start_server()
+        # Keep the only worker busy so that the renders stay in flight.
+        # pylint: disable=protected-access
+        blocker = server._executor.submit(time.sleep, 1)
+        first = server.submit(QASM, 'svg', DEFAULT_BASIS, True, 1.0)
+        second = server.submit(QASM, 'svg', DEFAULT_BASIS, True, 1.0)
+        other = server.submit(QASM, 'svg', DEFAULT_BASIS, False, 1.0)
+        self.assertIs(first, second)
+        self.assertIsNot(first, other)
+        blocker.result(timeout=60)
+        self.assertEqual(first.result(timeout=60), second.result(timeout=60))
+
+    def test_every_worker_is_warmed_up(self):
+        server = self._start_server(workers=2)
+        # pylint: disable=protected-access
+        pids = {warm_up.result(timeout=60) for warm_up in server._warm_ups}
+        self.assertEqual(len(pids), 2)
+
+    def test_worker_metrics(self):
+        metrics.reset()
+        metrics.enable()
+        self.addCleanup(metrics.reset)
+        self.addCleanup(metrics.disable)
+        server = self._start_server()
+        self.assertEqual(
+            self._post(server, {'qasm': QASM, 'format': 'svg'})[0], 200)
+        self.assertEqual(
+            self._post(server, {'qasm': QASM + "h r[0];\n",
+                                'format': 'svg'})[0], 422)
+        # The metrics may be merged after the answer is sent.
+        deadline = time.perf_counter() + 60
+        while len(metrics.snapshot()['counters'].get(
+                'qasm2image_render_failures_total', [])) < 1 and \
+                time.perf_counter() < deadline:
+            time.sleep(0.01)
+        counters = metrics.snapshot()['counters']
+        self.assertEqual(counters['qasm2image_renders_total'],
+                         [{'labels': {'format': 'svg'}, 'value': 1}])
+        failures, = counters['qasm2image_render_failures_total']
+        self.assertEqual(failures['labels']['format'], 'svg')
+        self.assertEqual(failures['value'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+
+# ======================================================================
+# Copyright CERFACS (February 2018)
+# Contributor: Adrien Suau (suau@cerfacs.fr)
+#
+# This software is governed by the CeCILL-B license under French law and
+# abiding  by the  rules of  distribution of free software. You can use,
+# modify  and/or  redistribute  the  software  under  the  terms  of the
+# CeCILL-B license as circulated by CEA, CNRS and INRIA at the following
+# URL "http://www.cecill.info".
+#
+# As a counterpart to the access to  the source code and rights to copy,
+# modify and  redistribute granted  by the  license, users  are provided
+# only with a limited warranty and  the software's author, the holder of
+# the economic rights,  and the  successive licensors  have only limited
+# liability.
+#
+# In this respect, the user's attention is drawn to the risks associated
+# with loading,  using, modifying and/or  developing or reproducing  the
+# software by the user in light of its specific status of free software,
+# that  may mean  that it  is complicated  to manipulate,  and that also
+# therefore  means that  it is reserved for  developers and  experienced
+# professionals having in-depth  computer knowledge. Users are therefore
+# encouraged  to load and  test  the software's  suitability as  regards
+# their  requirements  in  conditions  enabling  the  security  of their
+# systems  and/or  data to be  ensured and,  more generally,  to use and
+# operate it in the same conditions as regards security.
+#
+# The fact that you  are presently reading this  means that you have had
+# knowledge of the CeCILL-B license and that you accept its terms.
+# ======================================================================
+
+
+
+"""Tests of the rendering of parsed SVG images."""
+
+import io
+import os
+import sys
+import unittest
+
+# Add '..' in the Python path and import qasm2image
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from qasm2image import _trees
+
+
+class OldSurface:
+    """Surface of the cairosvg versions without background_color."""
+
+    def __init__(self, tree, output, dpi, scale=1):
+        self.output = output
+        self.arguments = (tree, dpi, scale)
+
+    def finish(self):
+        self.output.write(repr(self.arguments).encode('utf-8'))
+
+
+class NewSurface(OldSurface):
+    """Surface of cairosvg 2.2 and later."""
+
+    def __init__(self, tree, output, dpi, scale=1, background_color=None):
+        super().__init__(tree, output, dpi, scale)
+        self.arguments += (background_color,)
+
+
+class RenderTestCase(unittest.TestCase):
+
+    def test_without_background(self):
+        # The surfaces of older cairosvg versions do not accept the
+        # background_color argument.
+        self.assertEqual(_trees.render(OldSurface, 'tree', 2.0),
+                         repr(('tree', _trees.SVG_DPI, 2.0)).encode('utf-8'))
+
+    def test_with_background(self):
+        self.assertEqual(
+            _trees.render(NewSurface, 'tree', background='white'),
+            repr(('tree', _trees.SVG_DPI, 1.0, 'white')).encode('utf-8'))
+
+    def test_write_to(self):
+        output = io.BytesIO()
+        self.assertIsNone(_trees.render(OldSurface, 'tree', write_to=output))
+        self.assertTrue(output.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+
+# ======================================================================
+# Copyright CERFACS (October 2018)
+# Contributor: Adrien Suau (suau@cerfacs.fr)
+#
+# This software is governed by the CeCILL-B license under French law and
+# abiding  by the  rules of  distribution of free software. You can use,
+# modify  and/or  redistribute  the  software  under  the  terms  of the
+# CeCILL-B license as circulated by CEA, CNRS and INRIA at the following
+# URL "http://www.cecill.info".
+#
+# As a counterpart to the access to  the source code and rights to copy,
+# modify and  redistribute granted  by the  license, users  are provided
+# only with a limited warranty and  the software's author, the holder of
+# the economic rights,  and the  successive licensors  have only limited
+# liability.
+#
+# In this respect, the user's attention is drawn to the risks associated
+# with loading,  using, modifying and/or  developing or reproducing  the
+# software by the user in light of its specific status of free software,
+# that  may mean  that it  is complicated  to manipulate,  and that also
+# therefore  means that  it is reserved for  developers and  experienced
+# professionals having in-depth  computer knowledge. Users are therefore
+# encouraged  to load and  test  the software's  suitability as  regards
+# their  requirements  in  conditions  enabling  the  security  of their
+# systems  and/or  data to be  ensured and,  more generally,  to use and
+# operate it in the same conditions as regards security.
+#
+# The fact that you  are presently reading this  means that you have had
+# knowledge of the CeCILL-B license and that you accept its terms.
+# ======================================================================
+
+
+"""Generate the font metrics table of qasm2image/svg/_font_metrics.py.
+
+The table stores, for each printable ASCII character, the advance width and
+the ink bounding box of its glyph in the bold font used to write the texts
+of the circuits. It is generated with fontTools:
+
+    python3 tools/generate_font_metrics.py /path/to/DejaVuSans-Bold.ttf
+
+and written to qasm2image/svg/_font_metrics.py, which is overwritten.
+"""
+
+import argparse
+import os
+import pprint
+
+from fontTools.ttLib import TTFont
+
+_CHARACTERS = [chr(code) for code in range(0x20, 0x7f)]
+_OUTPUT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir,
+                       'qasm2image', 'svg', '_font_metrics.py')
+_LICENSE_END = '# ' + '=' * 70 + '\n'
+
+
+def _get_license_header() -> str:
+    # The license header of this script, without the shebang line.
+    with open(__file__, encoding='utf-8') as script:
+        source = script.read()
+    start = source.index(_LICENSE_END)
+    end = source.index(_LICENSE_END, start + 1) + len(_LICENSE_END)
+    return source[start:end]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('font', help="Path of the TrueType bold font.")
+    parser.add_argument('-o', '--output', default=_OUTPUT,
+                        help="Path of the generated module.")
+    args = parser.parse_args()
+
+    font = TTFont(args.font)
+    character_map = font.getBestCmap()
+    glyph_set = font.getGlyphSet()
+    glyph_table = font['glyf']
+    family = font['name'].getDebugName(4)
+
+    advances, bounds = dict(), dict()
+    for character in _CHARACTERS:
+        glyph_name = character_map[ord(character)]
+        advances[character] = glyph_set[glyph_name].width
+        glyph = glyph_table[glyph_name]
+        # Glyphs without contours (the space) do not have a bounding box.
+        if glyph.numberOfContours:
+            bounds[character] = (glyph.xMin, glyph.xMax, glyph.yMin,
+                                 glyph.yMax)
+
+    with open(args.output, 'w', encoding='utf-8') as output:
+        output.write(_get_license_header())
+        output.write('\n"""Metrics of the {} font.\n\n'
+                     'Generated by tools/generate_font_metrics.py, do not '
+                     'edit this module by\nhand.\n"""\n\n'.format(family))
+        output.write('FONT_NAME = {!r}\n'.format(family))
+        output.write('UNITS_PER_EM = {}\n\n'.format(font['head'].unitsPerEm))
+        output.write('# Horizontal advance of each character.\n')
+        output.write('ADVANCES = {}\n\n'.format(
+            pprint.pformat(advances, width=79 - len('ADVANCES = '))
+            .replace('\n', '\n' + ' ' * len('ADVANCES = '))))
+        output.write('# Ink bounding box (x_min, x_max, y_min, y_max) of each '
+                     'character drawing\n# something.\n')
+        output.write('BOUNDS = {}\n'.format(
+            pprint.pformat(bounds, width=79 - len('BOUNDS = '))
+            .replace('\n', '\n' + ' ' * len('BOUNDS = '))))
+
+
+if __name__ == '__main__':
+    main()
@@ -36,6 +36,311 @@
 Type './qasm2image.py -h' for more informations.
 """
 
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+
+_OUTPUT_FORMATS = ('svg', 'svgz', 'png', 'ps', 'pdf', 'html', 'text', 'json',
+                   'layout')
+# Output file extensions that are not the name of their format.
+_EXTENSION_FORMATS = {'txt': 'text'}
+# Formats whose output can contain NUL bytes.
+_BINARY_FORMATS = ('svgz', 'png', 'ps', 'pdf', 'layout')
+# Standard input or output.
+_STANDARD_STREAM = '-'
+
+
+def _write_text(text, write_to):
+    """Write a text output to a path or to a binary stream."""
+    if isinstance(write_to, str):
+        with open(write_to, 'w', encoding='utf-8') as output_file:
+            output_file.write(text)
+    else:
+        write_to.write(text.encode('utf-8'))
+
+
+def _write_lines(lines, write_to):
+    """Write lines of text, as they are produced, to a path or a stream."""
+    if isinstance(write_to, str):
+        with open(write_to, 'w', encoding='utf-8') as output_file:
+            output_file.writelines(line + '\n' for line in lines)
+    else:
+        for line in lines:
+            write_to.write((line + '\n').encode('utf-8'))
+
+
+def _render(qasm_str, arguments, write_to):
+    """Render the QASM code to write_to, a path or a writable binary stream."""
+    from qasm2image.qasm2svg import qasm2svg
+    from qasm2image.qasm2svgz import qasm2svgz
+    from qasm2image.qasm2png import qasm2png
+    from qasm2image.qasm2ps import qasm2ps
+    from qasm2image.qasm2pdf import qasm2pdf
+    from qasm2image.qasm2html import qasm2html
+    from qasm2image.qasm2text import qasm2text
+    from qasm2image.qasm2layout import qasm2layout
+
+    if arguments.format == 'svg':
+        _write_text(
+            qasm2svg(qasm_str, arguments.basis, not arguments.hide_clbits,
+                     compact=arguments.compact,
+                     precision=arguments.precision,
+                     collapse_repeats=arguments.collapse_repeats,
+                     vectorize=arguments.vectorize,
+                     processes=arguments.processes),
+            write_to)
+    elif arguments.format == 'svgz':
+        qasm2svgz(qasm_str, arguments.basis, not arguments.hide_clbits,
+                  compact=arguments.compact, precision=arguments.precision,
+                  write_to=write_to,
+                  collapse_repeats=arguments.collapse_repeats,
+                  vectorize=arguments.vectorize,
+                  processes=arguments.processes)
+    elif arguments.format == 'png':
+        qasm2png(qasm_str, arguments.basis, not arguments.hide_clbits,
+                 arguments.scale, write_to=write_to,
+                 color_mode=arguments.color_mode,
+                 compresslevel=arguments.compression_level,
+                 background=arguments.background,
+                 pixel_width=arguments.width, dpi=arguments.dpi,
+                 collapse_repeats=arguments.collapse_repeats,
+                 vectorize=arguments.vectorize,
+                 processes=arguments.processes)
+    elif arguments.format == 'ps':
+        qasm2ps(qasm_str, arguments.basis, not arguments.hide_clbits,
+                arguments.scale, write_to=write_to,
+                columns_per_page=arguments.columns_per_page,
+                collapse_repeats=arguments.collapse_repeats,
+                vectorize=arguments.vectorize,
+                processes=arguments.processes)
+    elif arguments.format == 'pdf':
+        qasm2pdf(qasm_str, arguments.basis, not arguments.hide_clbits,
+                 arguments.scale, write_to=write_to,
+                 columns_per_page=arguments.columns_per_page,
+                 collapse_repeats=arguments.collapse_repeats,
+                 vectorize=arguments.vectorize,
+                 processes=arguments.processes)
+    elif arguments.format == 'html':
+        _write_text(
+            qasm2html(qasm_str, arguments.basis, not arguments.hide_clbits,
+                      vectorize=arguments.vectorize,
+                      processes=arguments.processes),
+            write_to)
+    elif arguments.format == 'text':
+        if isinstance(write_to, str):
+            qasm2text(qasm_str, arguments.basis, not arguments.hide_clbits,
+                      arguments.columns_per_page, write_to=write_to,
+                      vectorize=arguments.vectorize,
+                      processes=arguments.processes)
+        else:
+            text_stream = io.TextIOWrapper(write_to, encoding='utf-8',
+                                           write_through=True)
+            qasm2text(qasm_str, arguments.basis, not arguments.hide_clbits,
+                      arguments.columns_per_page, write_to=text_stream,
+                      vectorize=arguments.vectorize,
+                      processes=arguments.processes)
+            # Leave the binary stream open.
+            text_stream.detach()
+    elif arguments.format in ('json', 'layout'):
+        qasm2layout(qasm_str, arguments.basis, not arguments.hide_clbits,
+                    binary=(arguments.format == 'layout'), write_to=write_to,
+                    vectorize=arguments.vectorize,
+                    processes=arguments.processes)
+
+
+def _render_incremental(renderer, qasm_str, arguments):
+    """Render the QASM code to the output file with an IncrementalRenderer."""
+    from cairosvg import svg2pdf, svg2ps
+    from qasm2image.qasm2html import _layout2html
+    from qasm2image.qasm2text import _layout2text
+    from qasm2image.qasm2layout import layout2dict
+    from qasm2image.layout_index import write_layout_index
+    from qasm2image.qasm2png import _svg2png
+    from qasm2image.qasm2svgz import _svg2svgz
+    from qasm2image.svg._compact import compact_svg
+
+    svg, (width, height) = renderer.render(qasm_str, output_dimensions=True)
+    if arguments.format in ('svg', 'svgz') and arguments.compact:
+        svg = compact_svg(svg, arguments.precision)
+    if arguments.format == 'svg':
+        _write_text(svg, arguments.output_file)
+    elif arguments.format == 'svgz':
+        _svg2svgz(svg, write_to=arguments.output_file)
+    elif arguments.format == 'png':
+        _svg2png(svg, width, height, arguments.scale, arguments.output_file,
+                 arguments.color_mode, arguments.compression_level,
+                 arguments.background, arguments.width, arguments.dpi)
+    elif arguments.format == 'ps':
+        svg2ps(bytestring=svg.encode('utf-8'), scale=arguments.scale,
+               write_to=arguments.output_file)
+    elif arguments.format == 'pdf':
+        svg2pdf(bytestring=svg.encode('utf-8'), scale=arguments.scale,
+                write_to=arguments.output_file)
+    elif arguments.format == 'html':
+        _write_text(_layout2html(renderer.layout, 'Quantum circuit'),
+                    arguments.output_file)
+    elif arguments.format == 'text':
+        _write_lines(_layout2text(renderer.layout, arguments.columns_per_page),
+                     arguments.output_file)
+    elif arguments.format == 'json':
+        _write_text(json.dumps(layout2dict(renderer.layout),
+                               separators=(',', ':')), arguments.output_file)
+    elif arguments.format == 'layout':
+        # Replace the index at once, it may be opened by a server.
+        write_layout_index(renderer.layout, arguments.output_file)
+
+
+def _read_documents(input_stream, delimiter):
+    """Read the QASM documents of a stream as soon as they are complete.
+
+    Args:
+        input_stream: a readable binary stream.
+        delimiter (str): 'nul' if the documents are separated by NUL bytes,
+                         'length' if each document is preceded by its size in
+                         bytes, written in decimal on its own line.
+    Returns:
+        Iterator[str]: the documents.
+    """
+    if delimiter == 'length':
+        while True:
+            length_line = input_stream.readline()
+            if not length_line.strip():
+                if not length_line:
+                    return
+                continue
+            document = input_stream.read(int(length_line))
+            yield document.decode('utf-8')
+    else:
+        pending = b''
+        while True:
+            # read1 returns the available data instead of waiting for a full
+            # buffer, so each document is rendered as soon as it is received.
+            chunk = input_stream.read1(65536)
+            if not chunk:
+                break
+            pending += chunk
+            *documents, pending = pending.split(b'\0')
+            for document in documents:
+                yield document.decode('utf-8')
+        if pending.strip():
+            yield pending.decode('utf-8')
+
+
+def _render_documents(arguments, input_stream, output_stream):
+    """Render each document of the input stream to the output stream.
+
+    The outputs are delimited as the inputs. A document that cannot be
+    rendered is reported on the standard error and produces an empty output,
+    so that the outputs stay aligned with the inputs.
+    """
+    for document in _read_documents(input_stream, arguments.delimiter):
+        if arguments.delimiter == 'length':
+            # The size of the output is needed before the output itself.
+            write_to = io.BytesIO()
+        else:
+            write_to = output_stream
+        try:
+            _render(document, arguments, write_to)
+        except Exception as exception:  # pylint: disable=broad-except
+            print("Render failed: {}".format(exception), file=sys.stderr)
+            if arguments.delimiter == 'length':
+                write_to = io.BytesIO()
+        if arguments.delimiter == 'length':
+            output = write_to.getvalue()
+            output_stream.write("{}\n".format(len(output)).encode('ascii'))
+            output_stream.write(output)
+        else:
+            output_stream.write(b'\0')
+        output_stream.flush()
+
+
+def _render_merged_documents(arguments, input_stream, output_stream):
+    """Render the documents of the input stream as the pages of one output.
+
+    Each page is written as soon as its document is read and drawn.
+    """
+    from qasm2image.qasm2pdf import qasms2pdf
+    from qasm2image.qasm2ps import qasms2ps
+
+    render = qasms2pdf if arguments.format == 'pdf' else qasms2ps
+    render(_read_documents(input_stream, arguments.delimiter),
+           arguments.basis, not arguments.hide_clbits, arguments.scale,
+           write_to=output_stream,
+           columns_per_page=arguments.columns_per_page,
+           collapse_repeats=arguments.collapse_repeats,
+           vectorize=arguments.vectorize,
+           processes=arguments.processes)
+    output_stream.flush()
+
+
+def _get_files_state(paths):
+    """Return the modification time and size of each file, None if missing."""
+    state = dict()
+    for path in paths:
+        try:
+            file_stat = os.stat(path)
+        except OSError:
+            state[path] = None
+        else:
+            state[path] = (file_stat.st_mtime_ns, file_stat.st_size)
+    return state
+
+
+def _watch(arguments):
+    """Render the input file each time it or one of its includes changes.
+
+    The files are polled every arguments.poll_interval seconds. A change is
+    rendered once the files did not change for arguments.debounce seconds,
+    so that a file being saved is not rendered half-written. The renders
+    reuse the work done for the unchanged statements applying instructions,
+    see qasm2image.incremental. The header statements and the included files
+    are parsed again by QISKit for each render.
+    """
+    from qasm2image import _parsing
+    from qasm2image.incremental import IncrementalRenderer
+
+    renderer = IncrementalRenderer(arguments.basis, not arguments.hide_clbits)
+    watched_paths = [arguments.input_file]
+    rendered_state = None
+    print("Watching '{}', press Ctrl+C to stop.".format(arguments.input_file))
+    try:
+        while True:
+            state = _get_files_state(watched_paths)
+            if state != rendered_state and rendered_state is not None:
+                time.sleep(arguments.debounce)
+                if _get_files_state(watched_paths) != state:
+                    continue
+            if state != rendered_state:
+                rendered_state = state
+                start = time.perf_counter()
+                try:
+                    with open(arguments.input_file, 'r') as qasm_file:
+                        qasm_str = qasm_file.read()
+                    watched_paths = [arguments.input_file] + \
+                        _parsing.get_included_files(qasm_str)
+                    rendered_state = _get_files_state(watched_paths)
+                    if (arguments.columns_per_page is None or
+                            arguments.format == 'text') and \
+                            not arguments.collapse_repeats:
+                        _render_incremental(renderer, qasm_str, arguments)
+                    else:
+                        # Paginated and collapsed outputs are drawn from
+                        # scratch.
+                        _render(qasm_str, arguments, arguments.output_file)
+                except Exception as exception:  # pylint: disable=broad-except
+                    # Keep watching, the file may be fixed by the next save.
+                    renderer.reset()
+                    print("Render failed: {}".format(exception))
+                else:
+                    print("Rendered '{}' in {:.3f}s.".format(
+                        arguments.output_file, time.perf_counter() - start))
+            time.sleep(arguments.poll_interval)
+    except KeyboardInterrupt:
+        pass
+
 
 def main():
     """Main function executed if this file is directly launched with Python."""
@@ -47,10 +352,11 @@ def main():
 
     argument_parser.add_argument('input_file',
                                  help='the QASM file implementing the circuit '
-                                      'to transform')
+                                      'to transform, - for the standard '
+                                      'input')
     argument_parser.add_argument('output_file',
                                  help='the image file that will be generated '
-                                      'by the tool')
+                                      'by the tool, - for the standard output')
     argument_parser.add_argument('-b', '--basis', default=(
         'id,u0,u1,u2,u3,x,y,z,h,s,sdg,t,tdg,rx,ry,rz,'
         'cx,cy,cz,ch,crz,cu1,cu3,swap,ccx'),
@@ -63,41 +369,163 @@ def main():
     argument_parser.add_argument('-s', '--scale', default=1, type=float,
                                  help='scale of the image. SVG output is not '
                                       'affected by this parameter')
+    argument_parser.add_argument('-c', '--compact', action='store_true',
+                                 help='if present, SVG and SVGZ outputs are '
+                                      'written in a compact form: rounded '
+                                      'numbers and no redundant attributes')
+    argument_parser.add_argument('--precision', default=1, type=int,
+                                 help='number of digits kept after the '
+                                      'decimal point in compact SVG and SVGZ '
+                                      'outputs')
+    argument_parser.add_argument('--color-mode',
+                                 choices=('rgba', 'rgb', 'gray', 'bilevel',
+                                          'palette'),
+                                 help='colour mode of PNG outputs. Black and '
+                                      'white circuits are much smaller with '
+                                      '"gray", "bilevel" or "palette". By '
+                                      'default, the PNG is written by cairo '
+                                      'in RGBA')
+    argument_parser.add_argument('--compression-level', default=6, type=int,
+                                 choices=range(10), metavar='{0..9}',
+                                 help='zlib compression level of PNG outputs '
+                                      'with a --color-mode')
+    argument_parser.add_argument('--background',
+                                 help='colour painted below PNG outputs, '
+                                      'transparent by default for RGBA '
+                                      'outputs and white otherwise')
+    argument_parser.add_argument('--width', type=int,
+                                 help='width of PNG outputs in pixels, '
+                                      'replaces --scale')
+    argument_parser.add_argument('--dpi', type=float,
+                                 help='resolution of PNG outputs, replaces '
+                                      '--scale. 96 gives the size of the SVG')
+    argument_parser.add_argument('-f', '--format', choices=_OUTPUT_FORMATS,
+                                 help='format of the output. Default to the '
+                                      'extension of the output file, required '
+                                      'when writing to the standard output')
+    argument_parser.add_argument('-d', '--delimiter',
+                                 choices=('nul', 'length'),
+                                 help='if present, the input is a stream of '
+                                      'QASM documents, each one rendered as '
+                                      'soon as it is read. With "nul", the '
+                                      'documents are separated by NUL bytes. '
+                                      'With "length", each document is '
+                                      'preceded by a line with its size in '
+                                      'bytes. The outputs are delimited the '
+                                      'same way')
+    argument_parser.add_argument('-m', '--merge', action='store_true',
+                                 help='with --delimiter and a PDF or '
+                                      'PostScript output, draw all the '
+                                      'documents as the pages of a single '
+                                      'output document')
+    argument_parser.add_argument('-p', '--columns-per-page', type=int,
+                                 help='with a PDF, PostScript or text '
+                                      'output, split the circuit into pages '
+                                      'of at most this number of columns')
+    argument_parser.add_argument('-r', '--collapse-repeats',
+                                 action='store_true',
+                                 help='with an SVG, SVGZ, PNG, PDF or '
+                                      'PostScript output, draw only once the '
+                                      'blocks of instructions repeated '
+                                      'consecutively, in a box annotated with '
+                                      'the number of repetitions')
+    argument_parser.add_argument('--vectorize', action='store_true',
+                                 help='if present, compute the layout of the '
+                                      'circuit with NumPy when it is '
+                                      'installed, faster for wide circuits')
+    argument_parser.add_argument('--processes', default=1, type=int,
+                                 help='number of processes computing the '
+                                      'layout of the circuit, 0 for all the '
+                                      'processors. Useful for deep circuits '
+                                      'with barriers on all the qubits')
+    argument_parser.add_argument('-w', '--watch', action='store_true',
+                                 help='if present, keep running and render '
+                                      'the output again each time the input '
+                                      'file or one of its includes changes')
+    argument_parser.add_argument('--poll-interval', default=0.5, type=float,
+                                 help='time in seconds between two checks of '
+                                      'the watched files')
+    argument_parser.add_argument('--debounce', default=0.2, type=float,
+                                 help='time in seconds the watched files '
+                                      'should stay unchanged before a render')
     arguments = argument_parser.parse_args()
 
+    if arguments.format is None:
+        if arguments.output_file == _STANDARD_STREAM:
+            argument_parser.error("--format is required when writing to the "
+                                  "standard output")
+        extension = os.path.splitext(arguments.output_file)[1][1:]
+        arguments.format = _EXTENSION_FORMATS.get(extension, extension)
+        if arguments.format not in _OUTPUT_FORMATS:
+            raise NotImplementedError(
+                "The output type you wanted is not implemented! Time has "
+                "come to implement it by your own.")
+    if arguments.delimiter == 'nul' and arguments.format in _BINARY_FORMATS:
+        argument_parser.error("{} outputs can contain NUL bytes, use "
+                              "--delimiter length".format(arguments.format))
+    if arguments.merge and (arguments.delimiter is None or
+                            arguments.format not in ('pdf', 'ps')):
+        argument_parser.error("--merge needs --delimiter and a PDF or "
+                              "PostScript output")
+    if arguments.columns_per_page is not None and (
+            arguments.format not in ('pdf', 'ps', 'text') or
+            arguments.columns_per_page < 1):
+        argument_parser.error("--columns-per-page needs a positive number "
+                              "and a PDF, PostScript or text output")
+    if arguments.collapse_repeats and arguments.format not in (
+            'svg', 'svgz', 'png', 'pdf', 'ps'):
+        argument_parser.error("--collapse-repeats needs an SVG, SVGZ, PNG, "
+                              "PDF or PostScript output")
+    if arguments.processes < 0:
+        argument_parser.error("--processes needs a positive number, or 0 for "
+                              "all the processors")
+    # None is the number of processors for the qasm2* functions.
+    arguments.processes = arguments.processes or None
+    if arguments.watch and _STANDARD_STREAM in (arguments.input_file,
+                                                arguments.output_file):
+        argument_parser.error("--watch needs an input and an output file")
+
     # 2. Drawing.
-    from qasm2image.qasm2svg import qasm2svg
-    from qasm2image.qasm2png import qasm2png
-    from qasm2image.qasm2ps import qasm2ps
-    from qasm2image.qasm2pdf import qasm2pdf
+    if arguments.watch:
+        _watch(arguments)
+        return
+
+    if arguments.output_file == _STANDARD_STREAM:
+        output_stream = sys.stdout.buffer
+        # The warnings printed while rendering should not be mixed with the
+        # output.
+        sys.stdout = sys.stderr
+    else:
+        output_stream = None
+
+    if arguments.delimiter is not None:
+        with contextlib.ExitStack() as opened_files:
+            if arguments.input_file == _STANDARD_STREAM:
+                input_stream = sys.stdin.buffer
+            else:
+                input_stream = opened_files.enter_context(
+                    open(arguments.input_file, 'rb'))
+            if output_stream is None:
+                output_stream = opened_files.enter_context(
+                    open(arguments.output_file, 'wb'))
+            if arguments.merge:
+                _render_merged_documents(arguments, input_stream,
+                                         output_stream)
+            else:
+                _render_documents(arguments, input_stream, output_stream)
+        return
 
     # Read the QASM code.
-    with open(arguments.input_file, 'r') as qasm_file:
-        qasm_str = qasm_file.read()
-
-    if arguments.output_file.endswith('.svg'):
-        with open(arguments.output_file, 'w') as svg_file:
-            svg_file.write(
-                qasm2svg(qasm_str, arguments.basis, not arguments.hide_clbits))
-    elif arguments.output_file.endswith('.png'):
-        with open(arguments.output_file, 'wb') as png_file:
-            png_file.write(
-                qasm2png(qasm_str, arguments.basis, not arguments.hide_clbits,
-                         arguments.scale))
-    elif arguments.output_file.endswith('.ps'):
-        with open(arguments.output_file, 'wb') as ps_file:
-            ps_file.write(
-                qasm2ps(qasm_str, arguments.basis, not arguments.hide_clbits,
-                        arguments.scale))
-    elif arguments.output_file.endswith('.pdf'):
-        with open(arguments.output_file, 'wb') as pdf_file:
-            pdf_file.write(
-                qasm2pdf(qasm_str, arguments.basis, not arguments.hide_clbits,
-                         arguments.scale))
+    if arguments.input_file == _STANDARD_STREAM:
+        qasm_str = sys.stdin.read()
     else:
-        raise NotImplementedError(
-            "The output type you wanted is not implemented! Time has "
-            "come to implement it by your own.")
+        with open(arguments.input_file, 'r') as qasm_file:
+            qasm_str = qasm_file.read()
+    # The images are written to the output as they are produced.
+    _render(qasm_str, arguments,
+            output_stream if output_stream else arguments.output_file)
+    if output_stream:
+        output_stream.flush()
 
 
 if __name__ == '__main__':
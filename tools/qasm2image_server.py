@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+
+# ======================================================================
+# Copyright CERFACS (February 2018)
+# Contributor: Adrien Suau (suau@cerfacs.fr)
+#
+# This software is governed by the CeCILL-B license under French law and
+# abiding  by the  rules of  distribution of free software. You can use,
+# modify  and/or  redistribute  the  software  under  the  terms  of the
+# CeCILL-B license as circulated by CEA, CNRS and INRIA at the following
+# URL "http://www.cecill.info".
+#
+# As a counterpart to the access to  the source code and rights to copy,
+# modify and  redistribute granted  by the  license, users  are provided
+# only with a limited warranty and  the software's author, the holder of
+# the economic rights,  and the  successive licensors  have only limited
+# liability.
+#
+# In this respect, the user's attention is drawn to the risks associated
+# with loading,  using, modifying and/or  developing or reproducing  the
+# software by the user in light of its specific status of free software,
+# that  may mean  that it  is complicated  to manipulate,  and that also
+# therefore  means that  it is reserved for  developers and  experienced
+# professionals having in-depth  computer knowledge. Users are therefore
+# encouraged  to load and  test  the software's  suitability as  regards
+# their  requirements  in  conditions  enabling  the  security  of their
+# systems  and/or  data to be  ensured and,  more generally,  to use and
+# operate it in the same conditions as regards security.
+#
+# The fact that you  are presently reading this  means that you have had
+# knowledge of the CeCILL-B license and that you accept its terms.
+# ======================================================================
+
+
+"""HTTP server rendering QASM circuits with the qasm2* functions.
+
+The server keeps a pool of warm worker processes (the qasm2image modules,
+QISKit and the font caches are loaded once per worker) and answers to
+
+    POST /render
+    {"qasm": "...", "format": "png", "basis": "...", "show_clbits": true,
+     "scale": 1.0}
+
+with the rendered image. Only "qasm" is mandatory, the other fields take the
+default values of the qasm2* functions. Identical concurrent requests are
+coalesced into a single render, and the number of renders waiting for a
+worker is bounded: when the queue is full the server answers immediately with
+"503 Service Unavailable" instead of accumulating requests. The same answer
+is given when a worker process died, the workers are then started again.
+
+The metrics of the server (see qasm2image.metrics) are exported in the
+Prometheus text format on GET /metrics and as JSON on GET /metrics.json. The
+renders are recorded in the worker processes and added to the metrics of the
+server when they end.
+
+Type './qasm2image_server.py -h' for more informations.
+"""
+
+import concurrent.futures
+import concurrent.futures.process
+import hashlib
+import http.server
+import json
+import multiprocessing
+import os
+import socketserver
+import threading
+
+from qasm2image import metrics
+
+DEFAULT_BASIS = ('id,u0,u1,u2,u3,x,y,z,h,s,sdg,t,tdg,rx,ry,rz,'
+                 'cx,cy,cz,ch,crz,cu1,cu3,swap,ccx')
+
+CONTENT_TYPES = {'svg': 'image/svg+xml',
+                 'png': 'image/png',
+                 'pdf': 'application/pdf',
+                 'ps': 'application/postscript',
+                 'html': 'text/html; charset=utf-8'}
+
+MAX_REQUEST_SIZE = 16 * 1024 * 1024
+
+# Maximum time (in seconds) a worker waits for the others to be warmed up.
+WARM_UP_TIMEOUT = 60.0
+
+
+class RenderError(Exception):
+    """Raised by the workers when a circuit cannot be rendered.
+
+    Args:
+        reason  (str): Name of the exception raised by the render.
+        message (str): Message of the exception raised by the render.
+        values (tuple): Metrics recorded by the render, see
+                        MetricsRegistry.drain.
+    """
+
+    def __str__(self):
+        return "{}: {}".format(*self.args)
+
+
+def _warm_up(barrier=None) -> int:
+    """Load the modules and caches needed to render in a worker process.
+
+    Args:
+        barrier: A multiprocessing.Manager().Barrier shared by the warm-up
+                 tasks. Each task waits for the others on it, so that each
+                 worker process runs exactly one of them.
+    Returns:
+        int: The identifier of the worker process.
+    """
+    # pylint: disable=unused-import
+    import qasm2image.qasm2png
+    import qasm2image.qasm2pdf
+    import qasm2image.qasm2ps
+    import qasm2image.qasm2html
+    from qasm2image.svg import _helpers
+    # Measuring a text loads the fonts used to draw the gate names.
+    _helpers.adapt_text_font_size("H", 80, 80)
+    if barrier is not None:
+        try:
+            barrier.wait(WARM_UP_TIMEOUT)
+        except threading.BrokenBarrierError:
+            # A worker did not start, the others are warmed up anyway.
+            pass
+    return os.getpid()
+
+
+def _render(qasm_str: str, output_format: str, basis: str, show_clbits: bool,
+            scale: float) -> tuple:
+    """Render the circuit in the given format. Executed in a worker process.
+
+    Returns:
+        tuple: The rendered image and the metrics recorded while rendering,
+            see MetricsRegistry.drain.
+    """
+    from qasm2image import qasm2svg, qasm2png, qasm2pdf, qasm2ps, qasm2html
+    metrics.enable()
+    try:
+        if output_format == 'svg':
+            image = qasm2svg(qasm_str, basis, show_clbits).encode('utf-8')
+        elif output_format == 'html':
+            image = qasm2html(qasm_str, basis, show_clbits).encode('utf-8')
+        else:
+            renderers = {'png': qasm2png, 'pdf': qasm2pdf, 'ps': qasm2ps}
+            image = renderers[output_format](qasm_str, basis, show_clbits,
+                                             scale)
+    except Exception as exception:  # pylint: disable=broad-except
+        # The exceptions raised by QISKit or cairo are not always picklable,
+        # so they are transformed before being sent to the server process.
+        raise RenderError(type(exception).__name__, str(exception),
+                          metrics.REGISTRY.drain())
+    return image, metrics.REGISTRY.drain()
+
+
+class RenderServer(socketserver.ThreadingMixIn, http.server.HTTPServer):
+    """HTTP server dispatching the render requests to warm worker processes.
+
+    Args:
+        server_address (tuple): (host, port) on which the server listens. Use
+                                port 0 to let the system choose a free port.
+        workers        (int)  : Number of worker processes.
+        max_pending    (int)  : Maximum number of distinct renders submitted
+                                to the workers at the same time. Requests
+                                above this limit are rejected with a 503.
+        timeout        (float): Maximum time (in seconds) waited for a render
+                                before answering with a 504.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, server_address, workers: int = None,
+                 max_pending: int = 64, timeout: float = 60.0):
+        super().__init__(server_address, _RenderRequestHandler)
+        self.render_timeout = timeout
+        self._workers = workers or os.cpu_count() or 1
+        self._warm_ups = list()
+        self._executor = self._start_workers()
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._in_flight = dict()
+
+    def _start_workers(self) -> concurrent.futures.ProcessPoolExecutor:
+        executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=self._workers)
+        # The initializer argument of ProcessPoolExecutor needs Python 3.7,
+        # the workers are warmed up by a first task instead. The tasks wait
+        # for each other on a barrier, so that an idle worker cannot run
+        # several of them while the others stay cold. The barrier needs a
+        # manager process to be shared with the workers after their start,
+        # it is stopped once the workers are warmed up.
+        manager = multiprocessing.Manager()
+        barrier = manager.Barrier(self._workers)
+        self._warm_ups = [executor.submit(_warm_up, barrier)
+                          for _ in range(self._workers)]
+        remaining = [len(self._warm_ups)]
+        remaining_lock = threading.Lock()
+
+        def _stop_manager(_):
+            with remaining_lock:
+                remaining[0] -= 1
+                if remaining[0] == 0:
+                    manager.shutdown()
+
+        for warm_up in self._warm_ups:
+            warm_up.add_done_callback(_stop_manager)
+        return executor
+
+    def restart_workers(self) -> None:
+        """Replace the worker processes if one of them died.
+
+        Several requests may fail because of the same dead worker, only the
+        first call replaces the workers.
+        """
+        with self._lock:
+            # pylint: disable=protected-access
+            if self._executor._broken:
+                broken_executor = self._executor
+                self._executor = self._start_workers()
+                broken_executor.shutdown(wait=False)
+
+    def submit(self, qasm_str: str, output_format: str, basis: str,
+               show_clbits: bool, scale: float) -> concurrent.futures.Future:
+        """Submit a render, or join an identical render already in flight.
+
+        Returns:
+            Future: the future of the render, None if the queue is full.
+        Raises:
+            BrokenProcessPool: if a worker process died, see restart_workers.
+        """
+        key = hashlib.sha256(json.dumps(
+            [qasm_str, output_format, basis, show_clbits, scale]).encode(
+            'utf-8')).hexdigest()
+        with self._lock:
+            future = self._in_flight.get(key, None)
+            if future is not None:
+                metrics.increment('qasm2image_cache_requests_total',
+                                  cache='single_flight', result='hit')
+                return future
+            metrics.increment('qasm2image_cache_requests_total',
+                              cache='single_flight', result='miss')
+            if not self._slots.acquire(blocking=False):
+                return None
+            try:
+                future = self._executor.submit(_render, qasm_str,
+                                               output_format, basis,
+                                               show_clbits, scale)
+            except concurrent.futures.process.BrokenProcessPool:
+                self._slots.release()
+                raise
+            self._in_flight[key] = future
+
+        def _forget(_):
+            with self._lock:
+                del self._in_flight[key]
+            self._slots.release()
+            _merge_metrics(future)
+
+        future.add_done_callback(_forget)
+        return future
+
+    def server_close(self):
+        super().server_close()
+        self._executor.shutdown(wait=True)
+
+
+def _merge_metrics(future: concurrent.futures.Future) -> None:
+    """Add the metrics recorded by a finished render to the server ones."""
+    try:
+        _, values = future.result()
+    except RenderError as exception:
+        values = exception.args[2]
+    except BaseException:  # pylint: disable=broad-except
+        # The worker died or the render was cancelled, nothing was recorded.
+        return
+    if metrics.is_enabled():
+        metrics.REGISTRY.merge(values)
+
+
+class _RenderRequestHandler(http.server.BaseHTTPRequestHandler):
+    """Answer to the POST /render requests of a RenderServer."""
+
+    def _send(self, status: int, body: bytes,
+              content_type: str = 'text/plain; charset=utf-8',
+              headers: dict = None) -> None:
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or dict()).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """Health check and metrics."""
+        if self.path == '/health':
+            self._send(200, b"OK\n")
+        elif self.path == '/metrics':
+            self._send(200, metrics.to_prometheus().encode('utf-8'),
+                       'text/plain; version=0.0.4; charset=utf-8')
+        elif self.path == '/metrics.json':
+            self._send(200, json.dumps(metrics.snapshot()).encode('utf-8'),
+                       'application/json')
+        else:
+            self._send(404, b"Not found\n")
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        """Render the circuit described in the JSON body of the request."""
+        if self.path != '/render':
+            self._send(404, b"Not found\n")
+            return
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+        except ValueError:
+            length = -1
+        if length < 0:
+            self._send(400, b"Invalid Content-Length\n")
+            return
+        if length > MAX_REQUEST_SIZE:
+            self._send(413, b"Request too large\n")
+            return
+        try:
+            request = json.loads(self.rfile.read(length).decode('utf-8'))
+            qasm_str = request['qasm']
+            output_format = request.get('format', 'png').lower()
+            basis = request.get('basis', DEFAULT_BASIS)
+            show_clbits = bool(request.get('show_clbits', True))
+            scale = float(request.get('scale', 1.0))
+            if output_format not in CONTENT_TYPES:
+                raise ValueError("Unsupported format '{}'.".format(
+                    output_format))
+        except (ValueError, KeyError, TypeError, AttributeError) as exception:
+            self._send(400, "Invalid request: {}\n".format(exception).encode(
+                'utf-8'))
+            return
+
+        try:
+            future = self.server.submit(qasm_str, output_format, basis,
+                                        show_clbits, scale)
+            if future is None:
+                metrics.increment('qasm2image_render_failures_total',
+                                  format=output_format, reason='QueueFull')
+                self._send(503, b"Too many pending renders\n",
+                           headers={'Retry-After': '1'})
+                return
+            image, _ = future.result(timeout=self.server.render_timeout)
+        except concurrent.futures.process.BrokenProcessPool:
+            metrics.increment('qasm2image_render_failures_total',
+                              format=output_format, reason='BrokenProcessPool')
+            self.server.restart_workers()
+            self._send(503, b"Render workers restarting\n",
+                       headers={'Retry-After': '1'})
+        except concurrent.futures.TimeoutError:
+            metrics.increment('qasm2image_render_failures_total',
+                              format=output_format, reason='Timeout')
+            self._send(504, b"Render timed out\n")
+        except RenderError as exception:
+            # The failure is recorded by the worker, see _merge_metrics.
+            self._send(422, "{}\n".format(exception).encode('utf-8'))
+        else:
+            self._send(200, image, CONTENT_TYPES[output_format])
+
+
+def main():
+    """Main function executed if this file is directly launched with Python."""
+    import argparse
+    argument_parser = argparse.ArgumentParser(
+        description='Serve renders of quantum circuits in QASM format over '
+                    'HTTP.')
+    argument_parser.add_argument('--host', default='127.0.0.1',
+                                 help='the address the server listens on')
+    argument_parser.add_argument('-p', '--port', default=8000, type=int,
+                                 help='the port the server listens on')
+    argument_parser.add_argument('-w', '--workers', default=None, type=int,
+                                 help='number of worker processes (default: '
+                                      'number of processors)')
+    argument_parser.add_argument('--max-pending', default=64, type=int,
+                                 help='maximum number of renders waiting for '
+                                      'a worker before rejecting requests')
+    argument_parser.add_argument('--timeout', default=60.0, type=float,
+                                 help='maximum time in seconds waited for a '
+                                      'render')
+    arguments = argument_parser.parse_args()
+
+    metrics.enable()
+    server = RenderServer((arguments.host, arguments.port),
+                          workers=arguments.workers,
+                          max_pending=arguments.max_pending,
+                          timeout=arguments.timeout)
+    print("Serving on http://{}:{}/render".format(*server.server_address[:2]))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()